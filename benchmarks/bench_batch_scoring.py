@@ -0,0 +1,85 @@
+"""カテゴリスコアの一括計算（NumPy）とスカラー版の処理時間を比較する
+
+ランダムに生成した N か国分のツール結果について、以下を計測する。
+
+- scalar     : calculate_safety_score などを1か国ずつ呼び出す
+- vectorized : 列形式の指標から score_all で一括計算する（変換時間は別に表示）
+
+使い方:
+    python benchmarks/bench_batch_scoring.py --countries 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from safety_score_agent.scoring import columns_from_tool_results, score_all  # noqa: E402
+from safety_score_agent.sub_agents.crime_agent.tool import calculate_safety_score  # noqa: E402
+from safety_score_agent.sub_agents.infra_agent.tool import calculate_infrastructure_score  # noqa: E402
+from safety_score_agent.sub_agents.law_agent.tool import calculate_law_enforcement_score  # noqa: E402
+
+
+def random_records(rng: random.Random, size: int):
+    crime, infra, law = [], [], []
+    for _ in range(size):
+        crime.append({
+            "numbeo_data": {"safety_index": rng.uniform(20, 90)},
+            "global_peace_index": {"peace_score": rng.uniform(1, 4)},
+            "unodc_homicide_rate": {"homicide_rate_per_100k": rng.uniform(0, 30)},
+        })
+        infra.append({
+            "corruption_perception_index": {"cpi_score": rng.randint(10, 90)},
+            "traffic_safety_data": {"road_traffic_deaths_per_100k": rng.uniform(2, 35)},
+            "healthcare_system": {"healthcare_access_quality_index": rng.uniform(30, 95)},
+        })
+        law.append({
+            "global_peace_index_data": {"police_reliability_score": rng.uniform(1, 5)},
+            "world_bank_governance": {"rule_of_law_percentile": rng.uniform(0, 100)},
+            "police_trust_indicators": {
+                "public_trust_in_police": rng.uniform(20, 90),
+                "corruption_in_police_force": rng.uniform(5, 80),
+            },
+        })
+    return crime, infra, law
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--countries", type=int, default=20000)
+    args = parser.parse_args()
+
+    crime, infra, law = random_records(random.Random(0), args.countries)
+
+    started = time.perf_counter()
+    scalar = {
+        "crime": [calculate_safety_score(record) for record in crime],
+        "infrastructure": [calculate_infrastructure_score(record) for record in infra],
+        "law_enforcement": [calculate_law_enforcement_score(record) for record in law],
+    }
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columns = columns_from_tool_results(crime, infra, law)
+    convert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = score_all(columns)
+    vectorized_seconds = time.perf_counter() - started
+
+    mismatches = sum(
+        int(np.count_nonzero(vectorized[key] != np.array(scalar[key]))) for key in scalar
+    )
+    print(f"countries={args.countries}")
+    print(f"scalar      {scalar_seconds * 1000:9.2f} ms")
+    print(f"vectorized  {vectorized_seconds * 1000:9.2f} ms  (+ {convert_seconds * 1000:.2f} ms columnar conversion)")
+    print(f"speedup     {scalar_seconds / vectorized_seconds:9.1f}x  mismatches={mismatches}")
+
+
+if __name__ == "__main__":
+    main()
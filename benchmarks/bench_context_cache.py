@@ -0,0 +1,155 @@
+"""統合エージェントの静的指示文キャッシュによる入力トークン数と TTFT の変化を計測する
+
+統合エージェントを以下の2通りで実行し、1リクエストあたりの非キャッシュ入力トークン数と
+最初のトークンまでの時間（TTFT）の中央値を比較する。
+
+- full   : 指示文全体を system_instruction として毎回送る（従来方式）
+- cached : 静的指示文をコンテキストキャッシュから参照し、動的部分のみを送る
+
+既定では、入力トークン数に比例したプレフィル時間を持つ模擬モデルと
+LocalContextCache を使う（トークン数は文字数からの推定値）。
+--live を指定すると Gemini API（GOOGLE_API_KEY が必要）と GenaiContextCache を使い、
+usage_metadata のトークン数と実際の TTFT を計測する。
+
+使い方:
+    python benchmarks/bench_context_cache.py --runs 5
+    python benchmarks/bench_context_cache.py --runs 3 --live
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.agents.run_config import RunConfig, StreamingMode  # noqa: E402
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from safety_score_agent.context_cache import (  # noqa: E402
+    ContextCacheBackend,
+    GenaiContextCache,
+    LocalContextCache,
+)
+from safety_score_agent.sub_agents.synthesizer_agent.agent import SafetyScoreSynthesizerAgent  # noqa: E402
+
+# 日本語テキストの1トークンあたりの文字数（推定値）
+CHARS_PER_TOKEN = 1.3
+# 模擬モデルのプレフィル速度（トークン/秒）と固定の遅延（秒）
+PREFILL_TOKENS_PER_SECOND = 8000.0
+BASE_LATENCY_SECONDS = 0.15
+
+SECTIONS = {
+    "conflict_info": "## テロ・紛争リスク分析\n外務省指定レベル: レベル1\n" + "治安情勢は安定しています。" * 40,
+    "crime_info": "## 犯罪・治安\n総合安全スコア: 78.4\n" + "スリ・置き引きに注意が必要です。" * 40,
+    "infra_info": "## 社会基盤\nCPI: 73\n" + "医療水準は高く交通安全も良好です。" * 40,
+    "law_info": "## 法執行機関\n警察信頼性: 高\n" + "警察への信頼度は高い水準です。" * 40,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def request_text(llm_request: LlmRequest) -> str:
+    """リクエストで実際に送られるテキスト（system_instruction とメッセージ）"""
+    texts = [llm_request.config.system_instruction or ""]
+    for content in llm_request.contents:
+        texts.extend(part.text or "" for part in content.parts or [])
+    return "".join(texts)
+
+
+class SimulatedGemini(BaseLlm):
+    """非キャッシュ入力トークン数に比例したプレフィル時間を持つ模擬モデル"""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        uncached = estimate_tokens(request_text(llm_request))
+        cached = 0
+        if llm_request.config.cached_content:
+            cached = estimate_tokens(CACHED_TEXTS.get(llm_request.config.cached_content, ""))
+        await asyncio.sleep(BASE_LATENCY_SECONDS + uncached / PREFILL_TOKENS_PER_SECOND)
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=uncached + cached,
+            cached_content_token_count=cached or None,
+        )
+        text = "## 🌍 総合安全スコア評価レポート"
+        if stream:
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]), partial=True)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]), usage_metadata=usage)
+
+
+CACHED_TEXTS: Dict[str, str] = {}
+
+
+async def run_once(runner: InMemoryRunner) -> Dict[str, float]:
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="bench", state=dict(SECTIONS)
+    )
+    started = time.perf_counter()
+    ttft: Optional[float] = None
+    usage = None
+    async for event in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text="Japan")]),
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    ):
+        if ttft is None and event.content and event.content.parts and event.content.parts[0].text:
+            ttft = time.perf_counter() - started
+        if event.usage_metadata and not event.partial:
+            usage = event.usage_metadata
+    prompt = (usage.prompt_token_count or 0) if usage else 0
+    cached = (usage.cached_content_token_count or 0) if usage else 0
+    return {"ttft": ttft or 0.0, "uncached_tokens": prompt - cached, "cached_tokens": cached}
+
+
+async def run_mode(cache: Optional[ContextCacheBackend], runs: int, live: bool) -> List[Dict[str, float]]:
+    if cache is None:
+        os.environ["SAFETY_SCORE_CONTEXT_CACHE"] = "off"
+    synthesizer = SafetyScoreSynthesizerAgent(context_cache=cache)
+    if not live:
+        synthesizer.agent.model = SimulatedGemini(model="gemini-2.0-flash")
+    runner = InMemoryRunner(agent=synthesizer.agent, app_name="bench")
+
+    await run_once(runner)  # キャッシュ作成・接続確立を計測から除く
+    if isinstance(cache, LocalContextCache):
+        CACHED_TEXTS.update(cache.contents)
+    return [await run_once(runner) for _ in range(runs)]
+
+
+def summarize(label: str, samples: List[Dict[str, float]]) -> Dict[str, float]:
+    result = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+    print(f"{label:<8} uncached_input_tokens={result['uncached_tokens']:8.0f}  "
+          f"cached_tokens={result['cached_tokens']:8.0f}  ttft={result['ttft']:7.3f}s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--live", action="store_true", help="Gemini API と実際のコンテキストキャッシュを使う")
+    args = parser.parse_args()
+
+    cache = GenaiContextCache() if args.live else LocalContextCache()
+    full = asyncio.run(run_mode(None, args.runs, args.live))
+    cached = asyncio.run(run_mode(cache, args.runs, args.live))
+
+    print(f"runs={args.runs} mode={'live' if args.live else 'simulated'}")
+    before = summarize("full", full)
+    after = summarize("cached", cached)
+    print(f"Input tokens per request: {before['uncached_tokens']:.0f} -> {after['uncached_tokens']:.0f} "
+          f"({(1 - after['uncached_tokens'] / before['uncached_tokens']) * 100:.1f}% reduction)")
+    print(f"TTFT: {before['ttft']:.3f}s -> {after['ttft']:.3f}s "
+          f"({(1 - after['ttft'] / before['ttft']) * 100:.1f}% reduction)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""劣化したサイトに対するツール層の所要時間を計測する
+
+代替サーバー（safety_score_agent/fixtures/site_server.py）に遅延と障害（fixtures/faults.py）を
+注入し、各エージェントのツール（get_crime_data / get_infrastructure_data /
+get_law_enforcement_data / get_conflict_risk_info）の所要時間と、サーバー側で
+返した応答の種類（ok / hang / truncated / ステータスコード）をシナリオごとに表示する。
+フォールバック・リトライ・タイムアウトが劣化時にどれだけ時間を使うかを確認できる。
+
+シナリオは SCENARIOS の名前、または --faults で JSON（またはそのファイルのパス）を指定する。
+シナリオごとに応答時間の記録（net/latency.py）とヘッジの予算をリセットする。
+
+使い方:
+    python benchmarks/bench_degraded_sites.py
+    python benchmarks/bench_degraded_sites.py --scenario gallup-hang --country Japan
+    python benchmarks/bench_degraded_sites.py --faults '{"www.who.int": {"bandwidth": 20000}}'
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Mapping
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safety_score_agent.fixtures.faults import FaultPlan  # noqa: E402
+from safety_score_agent.fixtures.site_server import SiteServer  # noqa: E402
+from safety_score_agent.net import hedge, latency, limits  # noqa: E402
+from safety_score_agent.sub_agents.conflict_agent import tool as conflict_tool  # noqa: E402
+from safety_score_agent.sub_agents.crime_agent import tool as crime_tool  # noqa: E402
+from safety_score_agent.sub_agents.infra_agent import tool as infra_tool  # noqa: E402
+from safety_score_agent.sub_agents.law_agent import tool as law_tool  # noqa: E402
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "baseline": {},
+    "gallup-hang": {"gallup.com": {"hang_rate": 1.0}},
+    "numbeo-429": {"numbeo.com": {"status_rates": {"429": 1.0}}},
+    "who-slow": {"who.int": {"latency": 1.0, "jitter": 0.3, "bandwidth": 50000}},
+    "lossy": {"*": {"latency": 0.2, "jitter": 0.5, "status_rates": {"503": 0.1}, "truncate_rate": 0.1}},
+}
+
+TOOLS: Dict[str, Callable[[str], Any]] = {
+    "crime": crime_tool.get_crime_data,
+    "infra": infra_tool.get_infrastructure_data,
+    "law": law_tool.get_law_enforcement_data,
+    "conflict": lambda country: conflict_tool.get_conflict_risk_info(country),
+}
+
+
+def run_scenario(faults: Mapping[str, Any], country: str, seed: int) -> Dict[str, Any]:
+    """1シナリオ分のツールを順に実行し、所要時間とサーバー側の応答の種類を返す"""
+    limits.install()
+    latency.set_tracker(None)
+    hedge.set_budget(None)
+    limits.set_governor(None)
+    seconds: Dict[str, float] = {}
+    with SiteServer(faults=FaultPlan.from_dict(faults, seed=seed)) as server:
+        os.environ["SAFETY_SCORE_SITE_BASE_URL"] = server.base_url
+        try:
+            for name, tool in TOOLS.items():
+                started = time.perf_counter()
+                tool(country)
+                seconds[name] = time.perf_counter() - started
+        finally:
+            del os.environ["SAFETY_SCORE_SITE_BASE_URL"]
+        outcomes = server.outcomes()
+    return {"seconds": seconds, "outcomes": outcomes}
+
+
+def format_outcomes(outcomes: Mapping[str, Mapping[str, int]]) -> List[str]:
+    lines = []
+    for host in sorted(outcomes):
+        counts = ", ".join(f"{outcome}={count}" for outcome, count in sorted(outcomes[host].items()))
+        lines.append(f"    {host:<32} {counts}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--faults", help="追加のシナリオ（JSON またはそのファイルのパス）")
+    parser.add_argument("--country", default="Japan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    scenarios = {name: SCENARIOS[name] for name in args.scenario}
+    if args.faults:
+        if os.path.exists(args.faults):
+            with open(args.faults, encoding="utf-8") as f:
+                scenarios["custom"] = json.load(f)
+        else:
+            scenarios["custom"] = json.loads(args.faults)
+
+    logging.disable(logging.CRITICAL)
+    print(f"{'scenario':<14}" + "".join(f"{name:>10}" for name in TOOLS) + f"{'total':>10}")
+    for name, faults in scenarios.items():
+        result = run_scenario(faults, args.country, args.seed)
+        seconds = result["seconds"]
+        print(f"{name:<14}" + "".join(f"{seconds[tool]:>9.2f}s" for tool in TOOLS)
+              + f"{sum(seconds.values()):>9.2f}s")
+        for line in format_outcomes(result["outcomes"]):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""ツール層の解析・抽出処理のマイクロベンチマーク
+
+フィクスチャコーパス（safety_score_agent/fixtures）の実物大のページを使い、
+以下を1件ずつ計測する（ops/sec と1回あたりのピークメモリ）。
+
+- parse.<ページ名>         : BeautifulSoup(html.parser) によるページの解析
+- <ツール>.<関数名>         : 解析済みのページに対する extract_* / scrape_* の実行
+
+抽出の途中で別のページを取得する関数（犯罪ツールの extract_gpi_data など）と、
+取得から抽出までを行う法執行機関ツールの scrape_* は、corpus.offline() でコーパスの
+ページを返して計測する（ソケットは使わない）。
+
+ツール関数は例外を捕まえてフォールバックの値を返すため、ウォームアップの結果を検証する。
+空の結果、フォールバックの印（"Fallback"）を含む結果、コーパスの値（expected）と
+一致しない結果は、計測せずにエラーとして報告し、終了コード 1 で終了する（失敗する経路の
+速さを計測しないため）。
+
+--output を指定すると、結果を JSON（ベースライン）で保存する（エラーがある場合は保存しない）。
+
+使い方:
+    python benchmarks/bench_extractors.py
+    python benchmarks/bench_extractors.py --filter numbeo --min-time 0.5
+    python benchmarks/bench_extractors.py --output benchmarks/baselines/extractors.json
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from safety_score_agent.fixtures import corpus  # noqa: E402
+from safety_score_agent.sub_agents.conflict_agent import tool as conflict_tool  # noqa: E402
+from safety_score_agent.sub_agents.crime_agent import tool as crime_tool  # noqa: E402
+from safety_score_agent.sub_agents.infra_agent import tool as infra_tool  # noqa: E402
+from safety_score_agent.sub_agents.law_agent import tool as law_tool  # noqa: E402
+
+SCHEMA_VERSION = 1
+
+
+class Benchmark(NamedTuple):
+    """
+    計測対象（setup の戻り値を引数に func を呼ぶ）
+
+    expected は結果に含まれるべき値（"." 区切りのキー → コーパスのページから抽出される値）
+    """
+    name: str
+    func: Callable[..., Any]
+    setup: Callable[[], tuple]
+    expected: Optional[Dict[str, Any]] = None
+
+
+class InvalidResult(Exception):
+    """抽出結果が空、フォールバック、またはコーパスの値と異なる"""
+
+
+def _lookup(result: Any, path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(result, dict) or key not in result:
+            raise InvalidResult(f"{path} is missing")
+        result = result[key]
+    return result
+
+
+def validate(benchmark: Benchmark, result: Any) -> None:
+    """ウォームアップの結果を検証（不正な場合は InvalidResult）"""
+    if isinstance(result, BeautifulSoup):
+        if result.find(True) is None or not result.get_text(strip=True):
+            raise InvalidResult("parsed document is empty")
+        return
+    if not result:
+        raise InvalidResult(f"empty result: {result!r}")
+    if "Fallback" in json.dumps(result, ensure_ascii=False, default=str):
+        raise InvalidResult("result contains fallback data")
+    for path, value in (benchmark.expected or {}).items():
+        actual = _lookup(result, path)
+        if isinstance(value, float) and isinstance(actual, (int, float)):
+            matched = math.isclose(actual, value, rel_tol=1e-9)
+        else:
+            matched = actual == value
+        if not matched:
+            raise InvalidResult(f"{path} is {actual!r} (expected {value!r})")
+
+
+def soup_args(page: str, *args: Any) -> Callable[[], tuple]:
+    return lambda: (corpus.parse_page(page),) + args
+
+
+def page_args(page: str) -> Callable[[], tuple]:
+    return lambda: (corpus.read_page(corpus.get_page(page)),)
+
+
+def parse(content: bytes) -> BeautifulSoup:
+    return BeautifulSoup(content, "html.parser")
+
+
+def _benchmarks() -> List[Benchmark]:
+    benchmarks = [Benchmark(f"parse.{page.name}", parse, page_args(page.name)) for page in corpus.pages()]
+    benchmarks += [
+        Benchmark("crime.extract_numbeo_crime_indices", crime_tool.extract_numbeo_crime_indices,
+                  soup_args("numbeo_japan"), {"crime_index": 22.11, "safety_index": 77.89}),
+        Benchmark("crime.extract_crime_categories", crime_tool.extract_crime_categories, soup_args("numbeo_japan"),
+                  {"violent_crime_level": "", "property_crime_level": ""}),
+        Benchmark("crime.extract_mofa_safety_level", crime_tool.extract_mofa_safety_level,
+                  soup_args("mofa_hazard_index", "Japan"), {"rank": 150, "score": 4.0}),
+        Benchmark("crime.extract_gpi_data", crime_tool.extract_gpi_data, soup_args("visionofhumanity_maps", "Japan"),
+                  {"overall_peace_rank": 150, "peace_score": 4.0}),
+        Benchmark("crime.extract_unodc_homicide_data", crime_tool.extract_unodc_homicide_data,
+                  soup_args("unodc_homicide", "Japan"), {"homicide_rate_per_100k": 0.3, "total_homicides": 30}),
+        Benchmark("infra.scrape_cpi_data", infra_tool.scrape_cpi_data, soup_args("transparency_cpi", "Japan"),
+                  {"cpi_score": 73.0, "cpi_rank": 37}),
+        Benchmark("infra.scrape_traffic_data", infra_tool.scrape_traffic_data, soup_args("who_road_safety", "Japan"),
+                  {"road_traffic_deaths_per_100k": 2.6, "total_road_deaths": 1300}),
+        Benchmark("infra.scrape_healthcare_data", infra_tool.scrape_healthcare_data, soup_args("who_gho", "Japan"),
+                  {"healthcare_access_quality_index": 83.0, "health_security_index": 74.7}),
+        Benchmark("law.extract_gpi_data", law_tool.extract_gpi_data, soup_args("visionofhumanity_japan", "Japan"),
+                  {"police_reliability_score": 2.171, "level_of_violent_crime": 1.151}),
+        Benchmark("law.extract_worldbank_data", law_tool.extract_worldbank_data, soup_args("worldbank_wgi", "Japan"),
+                  {"rule_of_law_percentile": 89.6, "government_effectiveness_percentile": 92.9}),
+        Benchmark("law.scrape_transparency_international_data", law_tool.scrape_transparency_international_data,
+                  lambda: ("Japan",), {"corruption_perception": 27}),
+        Benchmark("law.scrape_gallup_trust_data", law_tool.scrape_gallup_trust_data, lambda: ("Japan",),
+                  {"public_trust_score": 69.0, "effectiveness_score": 74.0}),
+        Benchmark("law.scrape_oecd_safety_data", law_tool.scrape_oecd_safety_data, lambda: ("Japan",),
+                  {"reporting_rate": 74.0, "satisfaction_rate": 74.0}),
+        Benchmark("conflict.get_conflict_risk_info", conflict_tool.get_conflict_risk_info, lambda: ("イエメン",),
+                  {"status": "success", "data.イエメン.danger_level": "レベル4（退避勧告）"}),
+    ]
+    return benchmarks
+
+
+BENCHMARKS = _benchmarks()
+
+
+def measure(func: Callable[..., Any], args: tuple, min_time: float, rounds: int,
+            check: Optional[Callable[[Any], None]] = None) -> Dict[str, Any]:
+    """
+    func(*args) の1回あたりの時間とピークメモリを計測
+
+    1ラウンドが min_time / rounds 秒以上になるよう回数を決め、rounds ラウンドの
+    1回あたりの時間の中央値から ops/sec を求める。check はウォームアップの結果を
+    引数に呼ばれ、例外を送出すると計測しない。
+    """
+    result = func(*args)  # ウォームアップ
+    if check is not None:
+        check(result)
+    number = 1
+    target = min_time / rounds
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        elapsed = time.perf_counter() - started
+        if elapsed >= target:
+            break
+        number = max(number * 2, int(number * target / max(elapsed, 1e-9)))
+
+    timings = [elapsed / number]
+    for _ in range(rounds - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        timings.append((time.perf_counter() - started) / number)
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "ops_per_sec": 1.0 / median,
+        "median_seconds": median,
+        "min_seconds": min(timings),
+        "stdev_seconds": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": rounds,
+        "iterations": number,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(filters: Optional[List[str]] = None, min_time: float = 1.0, rounds: int = 5,
+        progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    ベンチマークを実行して結果（ベースラインの形式）を返す
+
+    Args:
+        filters: 名前に含まれる文字列（いずれかに一致するものだけ実行。None なら全件）
+        min_time: 1件あたりの計測時間（秒）
+        rounds: ラウンド数
+        progress: 1件ごとに (名前, 結果) で呼ばれる関数
+
+    結果の検証に失敗したベンチマークは "benchmarks" に含めず、"errors"（名前 → 理由）に入れる。
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    # 抽出に失敗したときのログ出力を計測に含めない
+    logging.disable(logging.CRITICAL)
+    try:
+        with corpus.offline():
+            for benchmark in BENCHMARKS:
+                if filters and not any(pattern in benchmark.name for pattern in filters):
+                    continue
+                try:
+                    results[benchmark.name] = measure(benchmark.func, benchmark.setup(), min_time, rounds,
+                                                      check=lambda result, benchmark=benchmark: validate(benchmark, result))
+                except InvalidResult as e:
+                    errors[benchmark.name] = str(e)
+                    continue
+                if progress is not None:
+                    progress(benchmark.name, results[benchmark.name])
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "schema": SCHEMA_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus_version": corpus.corpus_version(),
+        "benchmarks": results,
+        "errors": errors,
+    }
+
+
+def print_result(name: str, result: Dict[str, Any]) -> None:
+    print(f"{name:<48}{result['ops_per_sec']:>12.1f}{result['median_seconds'] * 1000:>12.3f}"
+          f"{result['peak_memory_bytes'] / 1024:>12.1f}", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", action="append", help="名前に含まれる文字列（複数指定可）")
+    parser.add_argument("--min-time", type=float, default=1.0, help="1件あたりの計測時間（秒）")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="結果の JSON の保存先")
+    args = parser.parse_args()
+
+    print(f"{'benchmark':<48}{'ops/sec':>12}{'median ms':>12}{'peak KiB':>12}")
+    report = run(args.filter, args.min_time, args.rounds, progress=print_result)
+    if report["errors"]:
+        for name, error in report["errors"].items():
+            print(f"{name}: INVALID ({error})", file=sys.stderr)
+        sys.exit(1)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""エージェント定義の import 時間（コールドスタート）を計測する
+
+サーバーレス（Cloud Run など）ではインスタンス起動のたびに新しいインタープリターで
+safety_score_agent.agent を import する。毎回別プロセスで以下を計測し、中央値を表示する。
+
+- interpreter : 空のインタープリター起動（基準値）
+- import      : ``import safety_score_agent.agent``
+- import+build: import 後に root_agent を構築（初回リクエスト時の処理に相当）
+
+--baseline-ref を指定すると、その git リビジョンのツリーを一時ディレクトリに展開して
+同じ計測を行い、現在のツリーとの差を表示する。
+
+使い方:
+    python benchmarks/bench_import_time.py --runs 5 --baseline-ref HEAD~1
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "interpreter": "pass",
+    "import": "import safety_score_agent.agent",
+    "import+build": "import safety_score_agent.agent as agent; agent.root_agent",
+}
+
+
+def time_command(code: str, cwd: str) -> float:
+    """新しいインタープリターでコードを実行し、所要時間（秒）を返す"""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def measure_tree(cwd: str, runs: int) -> Dict[str, float]:
+    """各シナリオの所要時間の中央値を計測（初回はファイルキャッシュ温め用に捨てる）"""
+    results = {}
+    for name, code in SCENARIOS.items():
+        time_command(code, cwd)
+        results[name] = statistics.median(time_command(code, cwd) for _ in range(runs))
+    return results
+
+
+def export_revision(ref: str, destination: str) -> None:
+    """git リビジョンのツリーをディレクトリに展開"""
+    archive = os.path.join(destination, "tree.tar")
+    subprocess.run(["git", "archive", "--format=tar", "-o", archive, ref], cwd=REPO_ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(destination)
+
+
+def print_table(columns: Dict[str, Dict[str, float]]) -> None:
+    labels: List[str] = list(columns)
+    print(f"{'scenario':<14}" + "".join(f"{label:>16}" for label in labels))
+    for scenario in SCENARIOS:
+        print(f"{scenario:<14}" + "".join(f"{columns[label][scenario]:15.3f}s" for label in labels))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline-ref", help="比較対象の git リビジョン（例: HEAD~1）")
+    args = parser.parse_args()
+
+    columns = {}
+    if args.baseline_ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.baseline_ref, tmp)
+            columns[args.baseline_ref] = measure_tree(tmp, args.runs)
+    columns["working tree"] = measure_tree(REPO_ROOT, args.runs)
+
+    print(f"runs={args.runs} python={sys.version.split()[0]}")
+    print_table(columns)
+
+    if args.baseline_ref:
+        before = columns[args.baseline_ref]["import"]
+        after = columns["working tree"]["import"]
+        print(f"Cold import: {before:.3f}s -> {after:.3f}s ({(1 - after / before) * 100:.1f}% reduction)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""ストリーミング配信による time-to-first-byte（TTFB）の改善を計測する
+
+専門エージェントと統合エージェントを遅延付きの模擬エージェントに置き換えたパイプラインを
+uvicorn で起動し、以下の2つのエンドポイントを比較する。
+
+- GET /evaluate         : 評価完了後にまとめて返す（従来方式）
+- GET /evaluate/stream  : セクション・トークン単位の SSE 配信
+
+使い方:
+    python benchmarks/bench_streaming_ttfb.py --runs 5 --scale 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from typing import AsyncGenerator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from google.adk.agents import BaseAgent, SequentialAgent  # noqa: E402
+from google.adk.agents.invocation_context import InvocationContext  # noqa: E402
+from google.adk.events import Event, EventActions  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from safety_score_agent.deadline import DeadlineParallelAgent  # noqa: E402
+from safety_score_agent.streaming import add_streaming_routes  # noqa: E402
+
+# 実測に近い各エージェントの所要時間（秒）。--scale で一律に縮める。
+SPECIALIST_SECONDS = {
+    "conflict_info": 4.0,
+    "crime_info": 9.0,
+    "infra_info": 6.0,
+    "law_info": 12.0,
+}
+SYNTHESIS_TOKENS = 120
+SYNTHESIS_SECONDS = 10.0
+
+
+class SimulatedSpecialist(BaseAgent):
+    delay: float = 0.0
+    output_key: str = ""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.delay)
+        text = f"## {self.output_key}\n" + "分析結果 " * 200
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={self.output_key: text}),
+        )
+
+
+class SimulatedSynthesizer(BaseAgent):
+    tokens: int = SYNTHESIS_TOKENS
+    seconds: float = SYNTHESIS_SECONDS
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        for _ in range(self.tokens):
+            await asyncio.sleep(self.seconds / self.tokens)
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                partial=True,
+                content=types.Content(role="model", parts=[types.Part(text="評価 ")]),
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=types.Content(role="model", parts=[types.Part(text="評価 " * self.tokens)]),
+        )
+
+
+def build_pipeline(scale: float) -> SequentialAgent:
+    specialists = [
+        SimulatedSpecialist(name=f"Sim_{key}", delay=seconds * scale, output_key=key)
+        for key, seconds in SPECIALIST_SECONDS.items()
+    ]
+    return SequentialAgent(
+        name="simulated_pipeline",
+        sub_agents=[
+            DeadlineParallelAgent(name="gatherer", deadline_seconds=600, sub_agents=specialists),
+            SimulatedSynthesizer(name="Synthesizer", seconds=SYNTHESIS_SECONDS * scale),
+        ],
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(scale: float) -> str:
+    app = FastAPI()
+    add_streaming_routes(app, InMemoryRunner(agent=build_pipeline(scale), app_name="bench"),
+                         report_author="Synthesizer")
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def measure(client: httpx.Client, url: str, streaming: bool) -> dict:
+    """1回の評価の TTFB（本文の最初のバイト）と完了までの時間を計測"""
+    started = time.perf_counter()
+    first_byte = None
+    first_token = None
+    with client.stream("GET", url, params={"country": "Japan"}) as response:
+        for chunk in response.iter_text():
+            now = time.perf_counter() - started
+            if chunk and first_byte is None:
+                first_byte = now
+            if streaming and first_token is None and "event: token" in chunk:
+                first_token = now
+    total = time.perf_counter() - started
+    return {"ttfb": first_byte, "first_token": first_token or total, "total": total}
+
+
+def summarize(label: str, samples: List[dict]) -> None:
+    def median(key):
+        return statistics.median(sample[key] for sample in samples)
+
+    print(f"{label:<22} ttfb={median('ttfb'):7.3f}s  "
+          f"first_token={median('first_token'):7.3f}s  total={median('total'):7.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=0.1, help="模擬エージェントの所要時間の倍率")
+    args = parser.parse_args()
+
+    base_url = start_server(args.scale)
+    with httpx.Client(base_url=base_url, timeout=None) as client:
+        buffered = [measure(client, "/evaluate", streaming=False) for _ in range(args.runs)]
+        streamed = [measure(client, "/evaluate/stream", streaming=True) for _ in range(args.runs)]
+
+    print(f"runs={args.runs} scale={args.scale}")
+    summarize("GET /evaluate", buffered)
+    summarize("GET /evaluate/stream", streamed)
+    before = statistics.median(s["ttfb"] for s in buffered)
+    after = statistics.median(s["ttfb"] for s in streamed)
+    print(f"TTFB improvement: {before:.3f}s -> {after:.3f}s ({(1 - after / before) * 100:.1f}% reduction)")
+
+
+if __name__ == "__main__":
+    main()
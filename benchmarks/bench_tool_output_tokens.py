@@ -0,0 +1,106 @@
+"""ツール結果の full / compact 表現のトークン数を比較する
+
+4つの専門エージェントの主要なデータ取得ツールを実行し、モデルに渡す結果
+（JSON）の文字数と推定トークン数を full ビューと compact ビューで比較する。
+
+既定では外部サイトへの通信を 404 応答に置き換え（フォールバック値を使用）、
+結果を再現可能にする。--live-fetch で実際のサイトから取得する。
+--count-tokens を指定すると Gemini API の count_tokens（GOOGLE_API_KEY が必要）で数える。
+
+使い方:
+    python benchmarks/bench_tool_output_tokens.py
+    python benchmarks/bench_tool_output_tokens.py --live-fetch --count-tokens
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from safety_score_agent.projection import project_tool_output  # noqa: E402
+from safety_score_agent.sub_agents.conflict_agent.tool import get_conflict_risk_info  # noqa: E402
+from safety_score_agent.sub_agents.crime_agent.tool import get_crime_data  # noqa: E402
+from safety_score_agent.sub_agents.infra_agent.tool import get_infrastructure_data  # noqa: E402
+from safety_score_agent.sub_agents.law_agent.tool import get_law_enforcement_data  # noqa: E402
+
+TOOL_CALLS: List[Tuple[Callable[..., Any], Tuple[Any, ...]]] = [
+    (get_conflict_risk_info, ("イエメン",)),
+    (get_crime_data, ("Japan",)),
+    (get_infrastructure_data, ("Japan",)),
+    (get_law_enforcement_data, ("Japan",)),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """推定トークン数（ASCII は約4文字、それ以外は約1.3文字で1トークン）"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.3)
+
+
+def make_token_counter(use_api: bool) -> Callable[[str], int]:
+    if not use_api:
+        return estimate_tokens
+
+    from google.genai import Client
+
+    client = Client()
+
+    def count(text: str) -> int:
+        return client.models.count_tokens(model="gemini-2.0-flash", contents=text).total_tokens
+
+    return count
+
+
+def not_found(self, method, url, *args, **kwargs) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 404
+    response.reason = "Not Found"
+    response.url = url
+    response._content = b""
+    return response
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live-fetch", action="store_true", help="実際のサイトからデータを取得する")
+    parser.add_argument("--count-tokens", action="store_true", help="Gemini API でトークン数を数える")
+    args = parser.parse_args()
+
+    count_tokens = make_token_counter(args.count_tokens)
+    offline = contextlib.nullcontext() if args.live_fetch else patch.object(requests.Session, "request", not_found)
+
+    rows: List[Dict[str, Any]] = []
+    with offline:
+        for tool, call_args in TOOL_CALLS:
+            result = tool(*call_args)
+            full = json.dumps(project_tool_output(tool.__name__, result, view="full"), ensure_ascii=False)
+            compact = json.dumps(project_tool_output(tool.__name__, result, view="compact"), ensure_ascii=False)
+            rows.append({
+                "tool": tool.__name__,
+                "full_chars": len(full),
+                "compact_chars": len(compact),
+                "full_tokens": count_tokens(full),
+                "compact_tokens": count_tokens(compact),
+            })
+
+    unit = "tokens" if args.count_tokens else "est. tokens"
+    print(f"{'tool':<28}{'full chars':>12}{'compact chars':>15}{'full ' + unit:>20}{'compact ' + unit:>22}{'saved':>8}")
+    for row in rows + [{
+        "tool": "total",
+        **{key: sum(row[key] for row in rows) for key in ("full_chars", "compact_chars", "full_tokens", "compact_tokens")},
+    }]:
+        saved = (1 - row["compact_tokens"] / row["full_tokens"]) * 100
+        print(f"{row['tool']:<28}{row['full_chars']:>12}{row['compact_chars']:>15}"
+              f"{row['full_tokens']:>20}{row['compact_tokens']:>22}{saved:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
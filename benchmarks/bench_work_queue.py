@@ -0,0 +1,74 @@
+"""ジョブキューのワーカー数に対するスループットを計測する
+
+ツール層の代わりに一定時間待つ評価関数（ネットワーク待ちの模擬）を使い、
+1台のマシン上の同じキュー（SQLite WAL）から 1/2/4/8 個のワーカープロセスで処理したときの
+スループット（国/分）を比較する。ワーカーはそれぞれ独立にキューへ接続する。
+--journal-mode delete では複数のマシンで共有する場合のジャーナルモードで計測する
+（ネットワークファイルシステムのロックの遅延は含まない）。
+
+使い方:
+    python benchmarks/bench_work_queue.py --jobs 80 --job-seconds 0.2
+    python benchmarks/bench_work_queue.py --journal-mode delete
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from safety_score_agent.work_queue import WorkQueue, run_worker  # noqa: E402
+
+JOB_SECONDS = 0.2
+
+
+def simulated_evaluate(country: str) -> dict:
+    time.sleep(JOB_SECONDS)
+    return {"country": country}
+
+
+def worker(path: str, job_seconds: float, journal_mode: str) -> None:
+    global JOB_SECONDS
+    JOB_SECONDS = job_seconds
+    run_worker(path, evaluate=simulated_evaluate, poll_seconds=0.05, journal_mode=journal_mode)
+
+
+def measure(workers: int, jobs: int, job_seconds: float, journal_mode: str = "wal") -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "queue.sqlite3")
+        work_queue = WorkQueue(path, journal_mode=journal_mode)
+        work_queue.enqueue([f"Country {index}" for index in range(jobs)])
+        started = time.perf_counter()
+        processes = [multiprocessing.Process(target=worker, args=(path, job_seconds, journal_mode)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+        assert work_queue.stats()["done"] == jobs
+        work_queue.close()
+    return jobs / elapsed * 60
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=80)
+    parser.add_argument("--job-seconds", type=float, default=JOB_SECONDS)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--journal-mode", choices=("wal", "delete"), default="wal")
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'workers':>8}{'countries/min':>16}{'speedup':>10}{'efficiency':>12}")
+    for workers in args.workers:
+        throughput = measure(workers, args.jobs, args.job_seconds, args.journal_mode)
+        baseline = baseline or throughput / workers
+        speedup = throughput / baseline
+        print(f"{workers:>8}{throughput:>16.1f}{speedup:>9.2f}x{speedup / workers * 100:>11.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""解析・抽出処理のベンチマークをベースラインと比較する（性能劣化の検出）
+
+bench_extractors.py を実行し、コミット済みのベースライン
+（benchmarks/baselines/extractors.json）と1件ずつ比較する。1回あたりの時間（他の処理の影響を
+受けにくいラウンドの最小値）またはピークメモリが許容範囲を超えて増えたものがあれば、差分の表を
+表示して終了コード 1 で終了する。
+
+許容範囲はベースラインの "tolerances" に比率で指定する（0.25 なら 25% 増まで許容）。
+ベンチマーク名と完全に一致するキー、次に前方一致する最も長いキー、最後に "default" の順に探す。
+
+    "tolerances": {
+        "default": {"time": 0.25, "memory": 0.10},
+        "law.scrape_": {"time": 0.35}
+    }
+
+許容範囲を超えたものは --confirm 回まで計測し直し、最も速かった値で判定する（一時的な負荷による
+誤検出を減らす）。ベースラインにあって今回の結果にないもの（missing）と、抽出結果の検証に
+失敗したもの（invalid、bench_extractors.validate）も失敗として扱う。
+
+ベースラインは計測したマシンの値のため、CI など比較を行う環境で --update して更新する
+（tolerances はそのまま残る）。
+
+使い方:
+    python benchmarks/compare_extractors.py
+    python benchmarks/compare_extractors.py --filter numbeo --filter healthcare
+    python benchmarks/compare_extractors.py --current results.json
+    python benchmarks/compare_extractors.py --update
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import bench_extractors
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "extractors.json")
+DEFAULT_TOLERANCES = {"time": 0.25, "memory": 0.10}
+
+
+class Comparison(NamedTuple):
+    """1件の比較結果（status は ok / faster / slower / more-memory / new / missing / invalid）"""
+    name: str
+    baseline_seconds: Optional[float]
+    current_seconds: Optional[float]
+    baseline_memory: Optional[int]
+    current_memory: Optional[int]
+    time_tolerance: float
+    memory_tolerance: float
+    status: str
+
+    @property
+    def regressed(self) -> bool:
+        return self.status in ("slower", "more-memory", "missing", "invalid")
+
+    @property
+    def remeasurable(self) -> bool:
+        """計測し直すと結果が変わりうる劣化か"""
+        return self.status in ("slower", "more-memory")
+
+
+def tolerances_for(name: str, tolerances: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """ベンチマーク名に適用する許容範囲"""
+    result = dict(DEFAULT_TOLERANCES)
+    result.update(tolerances.get("default", {}))
+    if name in tolerances:
+        result.update(tolerances[name])
+        return result
+    prefixes = [key for key in tolerances if key != "default" and name.startswith(key)]
+    if prefixes:
+        result.update(tolerances[max(prefixes, key=len)])
+    return result
+
+
+def _change(baseline: Optional[float], current: Optional[float]) -> Optional[float]:
+    if not baseline or current is None:
+        return None
+    return current / baseline - 1.0
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Comparison]:
+    """
+    ベースラインと今回の結果を比較
+
+    Args:
+        baseline: ベースライン（bench_extractors.run の結果 + "tolerances"）
+        current: 今回の結果（bench_extractors.run の結果）
+    """
+    tolerances = baseline.get("tolerances", {})
+    before, after = baseline["benchmarks"], current["benchmarks"]
+    errors = current.get("errors", {})
+    comparisons = []
+    names = list(before) + [name for name in after if name not in before]
+    for name in names + [name for name in errors if name not in names]:
+        tolerance = tolerances_for(name, tolerances)
+        old, new = before.get(name), after.get(name)
+        if name in errors:
+            status = "invalid"
+        elif old is None:
+            status = "new"
+        elif new is None:
+            status = "missing"
+        else:
+            time_change = _change(old["min_seconds"], new["min_seconds"])
+            memory_change = _change(old["peak_memory_bytes"], new["peak_memory_bytes"])
+            if time_change is not None and time_change > tolerance["time"]:
+                status = "slower"
+            elif memory_change is not None and memory_change > tolerance["memory"]:
+                status = "more-memory"
+            elif time_change is not None and time_change < -tolerance["time"]:
+                status = "faster"
+            else:
+                status = "ok"
+        comparisons.append(Comparison(
+            name,
+            old and old["min_seconds"], new and new["min_seconds"],
+            old and old["peak_memory_bytes"], new and new["peak_memory_bytes"],
+            tolerance["time"], tolerance["memory"], status,
+        ))
+    return comparisons
+
+
+def _percent(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 100:+.1f}%"
+
+
+def _milliseconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.3f}"
+
+
+def _kib(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value / 1024:.1f}"
+
+
+def format_table(comparisons: List[Comparison]) -> str:
+    """比較結果の差分の表"""
+    lines = [f"{'benchmark':<46}{'base ms':>10}{'now ms':>10}{'time':>9}{'tol':>6}"
+             f"{'base KiB':>10}{'now KiB':>10}{'mem':>9}{'tol':>6}  status"]
+    for row in comparisons:
+        lines.append(
+            f"{row.name:<46}{_milliseconds(row.baseline_seconds):>10}{_milliseconds(row.current_seconds):>10}"
+            f"{_percent(_change(row.baseline_seconds, row.current_seconds)):>9}{row.time_tolerance * 100:>5.0f}%"
+            f"{_kib(row.baseline_memory):>10}{_kib(row.current_memory):>10}"
+            f"{_percent(_change(row.baseline_memory, row.current_memory)):>9}{row.memory_tolerance * 100:>5.0f}%"
+            f"  {row.status.upper() if row.regressed else row.status}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="ベースラインの JSON")
+    parser.add_argument("--current", help="比較する結果の JSON（省略時はベンチマークを実行）")
+    parser.add_argument("--filter", action="append", help="名前に含まれる文字列（複数指定可）")
+    parser.add_argument("--min-time", type=float, default=1.0, help="1件あたりの計測時間（秒）")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--confirm", type=int, default=2, help="劣化したものを計測し直す回数")
+    parser.add_argument("--update", action="store_true", help="比較せずにベースラインを今回の結果で更新")
+    args = parser.parse_args()
+
+    baseline: Dict[str, Any] = {"tolerances": {"default": dict(DEFAULT_TOLERANCES)}, "benchmarks": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = bench_extractors.run(args.filter, args.min_time, args.rounds)
+
+    if args.update:
+        if current.get("errors"):
+            for name, error in current["errors"].items():
+                print(f"{name}: INVALID ({error})", file=sys.stderr)
+            sys.exit(1)
+        current["tolerances"] = baseline.get("tolerances", {})
+        if args.filter:
+            # 一部だけ計測した場合は、計測していないベンチマークの値を残す
+            current["benchmarks"] = {**baseline["benchmarks"], **current["benchmarks"]}
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"updated {args.baseline} ({len(current['benchmarks'])} benchmarks)")
+        return
+
+    if args.filter:
+        baseline = dict(baseline, benchmarks={name: result for name, result in baseline["benchmarks"].items()
+                                              if any(pattern in name for pattern in args.filter)})
+    if baseline.get("corpus_version") != current.get("corpus_version"):
+        print(f"warning: corpus version differs (baseline {baseline.get('corpus_version')}, "
+              f"current {current.get('corpus_version')})", file=sys.stderr)
+
+    comparisons = compare(baseline, current)
+    for _ in range(0 if args.current else args.confirm):
+        regressed = [row.name for row in comparisons if row.remeasurable]
+        if not regressed:
+            break
+        retry = bench_extractors.run(regressed, args.min_time, args.rounds)["benchmarks"]
+        for name in regressed:
+            if name in retry and retry[name]["min_seconds"] < current["benchmarks"][name]["min_seconds"]:
+                current["benchmarks"][name] = retry[name]
+        comparisons = compare(baseline, current)
+    print(format_table(comparisons))
+    regressions = [row.name for row in comparisons if row.regressed]
+    for name, error in current.get("errors", {}).items():
+        print(f"{name}: {error}", file=sys.stderr)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
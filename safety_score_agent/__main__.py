@@ -0,0 +1,42 @@
+"""コマンドラインのエントリーポイント
+
+使い方:
+    python -m safety_score_agent batch --region asia
+    python -m safety_score_agent queue --run 2024-06-11 work
+    python -m safety_score_agent leaderboard top -n 10
+    python -m safety_score_agent dependencies cpi
+    python -m safety_score_agent serve --port 8000
+    python -m safety_score_agent corpus verify
+    python -m safety_score_agent sites --port 8800
+    python -m safety_score_agent cassette replay japan.cassette
+    python -m safety_score_agent loadtest --workers 2 --sessions 16
+"""
+
+import importlib
+import sys
+
+# サブコマンド → main() を持つモジュール
+COMMANDS = {
+    "batch": "safety_score_agent.batch",
+    "queue": "safety_score_agent.work_queue",
+    "leaderboard": "safety_score_agent.leaderboard",
+    "dependencies": "safety_score_agent.dependencies",
+    "serve": "safety_score_agent.server",
+    "corpus": "safety_score_agent.fixtures.corpus",
+    "sites": "safety_score_agent.fixtures.site_server",
+    "cassette": "safety_score_agent.net.cassette",
+    "loadtest": "safety_score_agent.loadtest",
+}
+
+
+def main() -> None:
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(f"usage: python -m safety_score_agent {{{','.join(COMMANDS)}}} ...", file=sys.stderr)
+        sys.exit(2)
+    command = sys.argv.pop(1)
+    sys.argv[0] = f"{sys.argv[0]} {command}"
+    importlib.import_module(COMMANDS[command]).main()
+
+
+if __name__ == "__main__":
+    main()
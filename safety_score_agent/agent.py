@@ -1,28 +1,65 @@
-from google.adk.agents import ParallelAgent, SequentialAgent
-
-# Import all sub-agents
-from .sub_agents.conflict_agent.agent import conflict_agent
-from .sub_agents.crime_agent.agent import crime_agent
-from .sub_agents.infra_agent.agent import infra_agent
-from .sub_agents.law_agent.agent import law_agent
-from .sub_agents.synthesizer_agent.agent import safety_score_synthesizer
-
-# Parallel agent for gathering safety information from all specialized agents
-safety_score_gatherer = ParallelAgent(
-    name="safety_score_gatherer",
-    sub_agents=[
-        conflict_agent,  # テロ・紛争リスク評価
-        crime_agent,          # 犯罪・治安評価
-        infra_agent,          # 社会基盤安定度評価
-        law_agent,            # 法執行機関信頼性評価
-    ]
-)
-
-# Main sequential agent that first gathers information, then synthesizes the final report
-root_agent = SequentialAgent(
-    name="safety_score_agent",
-    sub_agents=[
-        safety_score_gatherer,    # 4つの専門エージェントから情報収集
-        safety_score_synthesizer, # 総合安全スコア算出・レポート生成
-    ]
-)
\ No newline at end of file
+"""安全スコア評価エージェントのルート定義
+
+エージェントは初回アクセス時に構築する。import 時には google.adk や
+ツールモジュール（requests, bs4）を読み込まないため、コールドスタートが速い。
+"""
+
+import sys
+
+from .lazy import lazy_attributes
+
+
+def create_safety_score_gatherer():
+    """4つの専門エージェントから並列に情報収集するエージェントを作成"""
+    from .deadline import DeadlineParallelAgent
+    from .net import limits
+
+    # ツールのサイトへのリクエストに流量制限・タイムアウトの自動設定・ヘッジを組み込む
+    limits.install()
+
+    # Import all sub-agents
+    from .sub_agents.conflict_agent.agent import conflict_agent
+    from .sub_agents.crime_agent.agent import crime_agent
+    from .sub_agents.infra_agent.agent import infra_agent
+    from .sub_agents.law_agent.agent import law_agent
+
+    # Parallel agent for gathering safety information from all specialized agents
+    # 締め切り（SAFETY_SCORE_DEADLINE_SECONDS）を過ぎた専門エージェントはプレースホルダーに置き換えられる
+    return DeadlineParallelAgent(
+        name="safety_score_gatherer",
+        sub_agents=[
+            conflict_agent,  # テロ・紛争リスク評価
+            crime_agent,          # 犯罪・治安評価
+            infra_agent,          # 社会基盤安定度評価
+            law_agent,            # 法執行機関信頼性評価
+        ]
+    )
+
+
+def create_root_agent():
+    """情報収集と総合評価を順に実行するルートエージェントを作成"""
+    from google.adk.agents import SequentialAgent
+
+    module = sys.modules[__name__]
+
+    # Main sequential agent that first gathers information, then synthesizes the final report
+    return SequentialAgent(
+        name="safety_score_agent",
+        sub_agents=[
+            module.safety_score_gatherer,    # 4つの専門エージェントから情報収集
+            module.safety_score_synthesizer, # 総合安全スコア算出・レポート生成
+        ]
+    )
+
+
+def _load_synthesizer():
+    from .sub_agents.synthesizer_agent.agent import safety_score_synthesizer
+    return safety_score_synthesizer
+
+
+# root_agent などは初回アクセス時に構築してモジュール属性としてキャッシュする
+__getattr__ = lazy_attributes(__name__, {
+    "root_agent": create_root_agent,
+    "safety_score_gatherer": create_safety_score_gatherer,
+    "safety_score_synthesizer": _load_synthesizer,
+})
@@ -0,0 +1,41 @@
+"""専門エージェントに渡すツール関数のラッパー
+
+ツール関数は requests による同期通信を行うため、そのまま LlmAgent に渡すと
+イベントループがブロックされ、ParallelAgent の並列実行や締め切りが機能しない。
+ここでは同期関数をスレッドで実行するコルーチン関数に変換する。
+あわせて、モデルに渡す結果をコンパクト表現（projection.py）に射影する。
+"""
+
+import asyncio
+import functools
+from typing import Any, Callable, List
+
+from .projection import project_tool_output
+
+
+def run_in_thread(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    同期ツール関数をスレッドで実行するコルーチン関数に変換
+
+    functools.wraps により関数名・docstring・シグネチャを引き継ぐため、
+    ADK が生成する関数宣言は元の関数と同一になる。
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+def with_projection(func: Callable[..., Any]) -> Callable[..., Any]:
+    """ツール関数の戻り値をモデルに渡す形式（projection.py）に射影する関数に変換"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return project_tool_output(func.__name__, func(*args, **kwargs))
+
+    return wrapper
+
+
+def as_agent_tools(funcs: List[Callable[..., Any]]) -> List[Callable[..., Any]]:
+    """ツール関数のリストを LlmAgent の tools 用に変換"""
+    return [run_in_thread(with_projection(func)) for func in funcs]
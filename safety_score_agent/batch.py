@@ -0,0 +1,309 @@
+"""多数の国をまとめて評価するバッチ実行
+
+ルートエージェントを1か国ずつ実行する代わりに、ツール層（4つのツールモジュールの
+データ取得とスコア計算）をプロセスプールで並列に実行し、国ごとの結果を完了順に
+JSON Lines で出力する。終了時にスループット（国/分）と段階別の所要時間を表示する。
+
+- 並列度: --workers（プロセス数）
+- サイトごとの同時接続数: --host-concurrency（全ワーカープロセスで共有する上限）。
+  各ワーカーのサイトごとの流量制限（net/limits.py の HostGovernor）に併せて適用される
+
+使い方:
+    python -m safety_score_agent batch --region asia --workers 8 > asia.jsonl
+    python -m safety_score_agent batch Japan France 韓国 -o scores.jsonl
+    python -m safety_score_agent batch --countries-file countries.txt
+    python -m safety_score_agent batch --countries-file countries.txt --checkpoint-dir ckpt --resume
+
+--checkpoint-dir を指定すると、完了した国の結果とダウンロード済みのページをそのディレクトリに
+保存し、--resume で中断した実行を再開できる（--resume だけの場合は SAFETY_SCORE_DATA_DIR/batch）。
+前回のチェックポイントは自動では削除しない。残っている場合は --resume で再開するか、
+--fresh で削除して新しく始める。どちらも指定しない場合はチェックポイントを使わない。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import IO, Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from . import config
+from .countries import Country, get_countries, get_country
+from .leaderboard import fetch_country_sources, score_country_sources
+from .metrics import percentile
+from .net import limits
+from .page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+# 段階（ツールの出力キー → 取得に使うツール）。score はスコア計算
+STAGES = ("conflict", "crime", "infra", "law", "score")
+
+DEFAULT_WORKERS = 4
+DEFAULT_HOST_CONCURRENCY = 2
+
+
+class Checkpoint:
+    """
+    バッチ実行のチェックポイント
+
+    完了した国の結果を1行ずつ追記するログと、ワーカーがダウンロードしたページの
+    キャッシュ（page_cache.PageCache）をディレクトリに保存する。再開時は完了済みの国を
+    評価せずにログの結果を使い、途中だった国はキャッシュ済みのページを再利用する。
+    """
+
+    LOG_FILENAME = "completed.jsonl"
+    PAGES_DIRNAME = "pages"
+
+    def __init__(self, directory: Optional[str] = None, fresh: bool = False):
+        """
+        Args:
+            directory: 保存先（省略時は SAFETY_SCORE_DATA_DIR/batch）
+            fresh: True の場合は前回のログとキャッシュを削除して新しく始める。
+                False の場合は前回の内容を残したまま続きから記録する
+        """
+        if directory is None:
+            directory = os.path.join(config.get_data_dir(), "batch")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.log_path = os.path.join(directory, self.LOG_FILENAME)
+        self.pages_dir = os.path.join(directory, self.PAGES_DIRNAME)
+        if fresh:
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            PageCache(self.pages_dir).clear()
+        self._log: Optional[IO[str]] = None
+
+    def has_previous_run(self) -> bool:
+        """前回の実行のログまたはダウンロード済みのページが残っているか"""
+        if os.path.exists(self.log_path):
+            return True
+        return os.path.isdir(self.pages_dir) and bool(os.listdir(self.pages_dir))
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """完了済みの国（英語名 → 結果）。書きかけの最終行は無視する"""
+        records: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.log_path):
+            return records
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                records[record["country"]] = record
+        return records
+
+    def add(self, record: Mapping[str, Any]) -> None:
+        """完了した国の結果を追記"""
+        if self._log is None:
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        self._log.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._log.flush()
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def _init_worker(shared_slots: Optional[Mapping[str, Any]], pages_dir: Optional[str] = None) -> None:
+    """
+    ワーカープロセスの初期化（キャッシュ済みのページは接続数の上限の対象外）
+
+    Args:
+        shared_slots: 全ワーカーで共有するサイトごとの接続枠（limits.create_shared_slots）
+        pages_dir: ダウンロード済みのページの保存先
+    """
+    if shared_slots is not None:
+        limits.set_governor(limits.HostGovernor.from_config(shared_slots))
+    limits.install()
+    if pages_dir is not None:
+        PageCache(pages_dir).install()
+
+
+def evaluate_country(country: Country) -> Dict[str, Any]:
+    """
+    1か国分のツール層を実行（ワーカープロセスで実行される）
+
+    Returns:
+        Dict[str, Any]: 国名・地域・スコア・段階別の所要時間（秒）
+    """
+    timings: Dict[str, float] = {}
+    sources = fetch_country_sources(country, timings)
+    started = time.perf_counter()
+    scores = score_country_sources(country, sources)
+    timings["score"] = time.perf_counter() - started
+    return {
+        "country": country.name,
+        "country_ja": country.name_ja,
+        "region": country.region,
+        "scores": scores,
+        "timings": timings,
+    }
+
+
+def summarize(results: List[Dict[str, Any]], errors: int, elapsed: float, resumed: int = 0) -> Dict[str, Any]:
+    """スループットと段階別の所要時間の集計（チェックポイントから再利用した国は含めない）"""
+    stages: Dict[str, Dict[str, float]] = {}
+    for stage in STAGES:
+        values = [result["timings"][stage] for result in results if stage in result.get("timings", {})]
+        if values:
+            stages[stage] = {
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": max(values),
+                "total": sum(values),
+            }
+    completed = len(results)
+    return {
+        "countries": completed,
+        "errors": errors,
+        "resumed": resumed,
+        "elapsed_seconds": elapsed,
+        "countries_per_minute": completed / elapsed * 60 if elapsed > 0 else 0.0,
+        "stages": stages,
+    }
+
+
+def run_batch(
+    countries: Iterable[Country],
+    output: IO[str],
+    workers: int = DEFAULT_WORKERS,
+    host_concurrency: Optional[int] = DEFAULT_HOST_CONCURRENCY,
+    evaluate: Callable[[Country], Dict[str, Any]] = evaluate_country,
+    checkpoint: Optional[Checkpoint] = None,
+) -> Dict[str, Any]:
+    """
+    対象国をプロセスプールで評価し、完了した国から1行ずつ JSON を出力
+
+    Args:
+        countries: 対象国
+        output: JSON Lines の出力先
+        workers: ワーカープロセス数
+        host_concurrency: サイトごとの同時接続数の上限（None で無制限）
+        evaluate: 1か国分の評価関数（プロセス間で受け渡せるモジュールレベルの関数）
+        checkpoint: 完了した国とダウンロード済みページの保存先。完了済みの国は
+            評価せずに保存済みの結果を出力する
+
+    Returns:
+        Dict[str, Any]: summarize の集計結果
+    """
+    countries = list(countries)
+    shared_slots = limits.create_shared_slots(host_concurrency) if host_concurrency else None
+    results: List[Dict[str, Any]] = []
+    errors = 0
+    started = time.perf_counter()
+
+    resumed = 0
+    if checkpoint is not None:
+        completed = checkpoint.completed()
+        for country in countries:
+            if country.name in completed:
+                output.write(json.dumps(completed[country.name], ensure_ascii=False) + "\n")
+                resumed += 1
+        output.flush()
+        countries = [country for country in countries if country.name not in completed]
+    pages_dir = checkpoint.pages_dir if checkpoint is not None else None
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(shared_slots, pages_dir)) as executor:
+        futures = {executor.submit(evaluate, country): country for country in countries}
+        for future in as_completed(futures):
+            country = futures[future]
+            try:
+                record = future.result()
+                results.append(record)
+                if checkpoint is not None:
+                    checkpoint.add(record)
+            except Exception as e:
+                logger.warning(f"Batch evaluation failed for {country.name}: {e}")
+                record = {"country": country.name, "country_ja": country.name_ja, "region": country.region,
+                          "error": f"{type(e).__name__}: {e}"}
+                errors += 1
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+    return summarize(results, errors, time.perf_counter() - started, resumed)
+
+
+def format_summary(summary: Mapping[str, Any]) -> str:
+    """集計結果を表形式の文字列にする"""
+    lines = [
+        f"countries: {summary['countries']} (errors: {summary['errors']}, resumed: {summary.get('resumed', 0)})  "
+        f"elapsed: {summary['elapsed_seconds']:.1f}s  "
+        f"throughput: {summary['countries_per_minute']:.1f} countries/min",
+        f"{'stage':<10}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}{'total':>10}  (seconds)",
+    ]
+    for stage, stats in summary["stages"].items():
+        lines.append(f"{stage:<10}" + "".join(f"{stats[key]:>10.3f}" for key in ("mean", "p50", "p95", "max", "total")))
+    return "\n".join(lines)
+
+
+def resolve_countries(names: Iterable[str], region: Optional[str] = None) -> List[Country]:
+    """国名（英語名・日本語名）の一覧を対象国に変換（省略時は地域または全対象国）"""
+    names = [name.strip() for name in names if name.strip() and not name.strip().startswith("#")]
+    if not names:
+        return get_countries(region)
+    countries, unknown = [], []
+    for name in names:
+        country = get_country(name)
+        if country is None:
+            unknown.append(name)
+        elif country not in countries:
+            countries.append(country)
+    if unknown:
+        raise ValueError(f"Unknown countries: {', '.join(unknown)}")
+    return countries
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """バッチ評価を実行"""
+    parser = argparse.ArgumentParser(prog="safety_score_agent batch", description="多数の国のツール層をまとめて評価")
+    parser.add_argument("countries", nargs="*", help="国名（英語名または日本語名。省略時は全対象国）")
+    parser.add_argument("--countries-file", help="国名を1行ずつ書いたファイル")
+    parser.add_argument("--region", help="地域キー（countries.REGION_LABELS）")
+    parser.add_argument("-o", "--output", help="JSON Lines の出力先（省略時は標準出力）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="ワーカープロセス数")
+    parser.add_argument("--host-concurrency", type=int, default=DEFAULT_HOST_CONCURRENCY,
+                        help="サイトごとの同時接続数の上限（0 で無制限）")
+    parser.add_argument("--checkpoint-dir",
+                        help="チェックポイントの保存先（--resume / --fresh だけの場合は SAFETY_SCORE_DATA_DIR/batch）")
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument("--resume", action="store_true",
+                       help="前回のチェックポイントから再開する（完了済みの国とダウンロード済みのページを再利用）")
+    start.add_argument("--fresh", action="store_true", help="前回のチェックポイントを削除して新しく始める")
+    args = parser.parse_args(argv)
+
+    names = list(args.countries)
+    if args.countries_file:
+        with open(args.countries_file, encoding="utf-8") as f:
+            names.extend(f.read().splitlines())
+    try:
+        countries = resolve_countries(names, args.region)
+    except ValueError as e:
+        parser.error(str(e))
+
+    logging.basicConfig(level=logging.WARNING)
+    checkpoint = None
+    if args.checkpoint_dir or args.resume or args.fresh:
+        checkpoint = Checkpoint(args.checkpoint_dir, fresh=args.fresh)
+        if not args.resume and not args.fresh and checkpoint.has_previous_run():
+            parser.error(f"{checkpoint.directory} に前回のチェックポイントがあります"
+                         "（--resume で再開するか、--fresh で削除して新しく始めてください）")
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_batch(countries, output, workers=args.workers, host_concurrency=args.host_concurrency or None,
+                            checkpoint=checkpoint)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if output is not sys.stdout:
+            output.close()
+    print(format_summary(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
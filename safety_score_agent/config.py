@@ -0,0 +1,244 @@
+"""実行時設定
+
+各設定値は環境変数から読み込み、未設定または不正な値の場合はデフォルト値を使用する。
+値は呼び出しのたびに読み込むため、プロセス起動後の変更も反映される。
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# --- Defaults ---
+DEFAULT_EVALUATION_DEADLINE_SECONDS = 90.0
+DEFAULT_SYNTHESIS_RESERVE_SECONDS = 20.0
+MIN_GATHER_DEADLINE_SECONDS = 1.0
+DEFAULT_CONTEXT_CACHE_MODE = "auto"
+DEFAULT_CONTEXT_CACHE_TTL_SECONDS = 3600.0
+CONTEXT_CACHE_MODES = ("auto", "genai", "off")
+DEFAULT_TOOL_OUTPUT_VIEW = "compact"
+TOOL_OUTPUT_VIEWS = ("compact", "full")
+DEFAULT_DATA_DIR = os.path.join("~", ".safety_score_agent")
+DEFAULT_TIMEOUT_FLOOR_SECONDS = 3.0
+DEFAULT_TIMEOUT_CEILING_SECONDS = 30.0
+DEFAULT_HEDGE_BUDGET_RATIO = 0.05
+DEFAULT_CASSETTE_MODE = "replay"
+CASSETTE_MODES = ("record", "replay")
+# fake モデル（fake_llm.py）として LLMRegistry に登録するモデル名
+FAKE_MODEL_PATTERN = r"fake(/.*)?"
+DEFAULT_QUEUE_JOURNAL_MODE = "wal"
+QUEUE_JOURNAL_MODES = ("wal", "delete")
+
+
+def get_float_env(name: str, default: float) -> float:
+    """環境変数を float として取得"""
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"Invalid value for {name}: {raw!r} (using {default})")
+        return default
+
+
+def get_bool_env(name: str, default: bool = False) -> bool:
+    """環境変数を真偽値として取得（1/true/yes/on を真とする）"""
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_evaluation_deadline_seconds() -> float:
+    """1回の評価全体（情報収集＋統合）に許容する時間（秒）"""
+    return get_float_env("SAFETY_SCORE_DEADLINE_SECONDS", DEFAULT_EVALUATION_DEADLINE_SECONDS)
+
+
+def get_synthesis_reserve_seconds() -> float:
+    """評価時間のうち統合レポート生成のために確保する時間（秒）"""
+    return get_float_env("SAFETY_SCORE_SYNTHESIS_RESERVE_SECONDS", DEFAULT_SYNTHESIS_RESERVE_SECONDS)
+
+
+def get_gather_deadline_seconds(evaluation_deadline: Optional[float] = None) -> float:
+    """
+    専門エージェントによる情報収集の締め切り（秒）を計算
+
+    Args:
+        evaluation_deadline: 評価全体の締め切り（省略時は環境変数の値）
+
+    Returns:
+        float: 評価全体の締め切りから統合用の予備時間を差し引いた値
+    """
+    if evaluation_deadline is None:
+        evaluation_deadline = get_evaluation_deadline_seconds()
+    return max(MIN_GATHER_DEADLINE_SECONDS, evaluation_deadline - get_synthesis_reserve_seconds())
+
+
+def get_context_cache_mode() -> str:
+    """
+    統合エージェントの静的指示文に対するコンテキストキャッシュの利用方法
+
+    - ``auto``: Gemini の認証情報が設定されている場合のみ利用
+    - ``genai``: 常に利用（作成に失敗した場合は通常の指示文で続行）
+    - ``off``: 利用しない
+    """
+    mode = os.environ.get("SAFETY_SCORE_CONTEXT_CACHE", DEFAULT_CONTEXT_CACHE_MODE).strip().lower()
+    if mode not in CONTEXT_CACHE_MODES:
+        logger.warning(f"Invalid value for SAFETY_SCORE_CONTEXT_CACHE: {mode!r} (using {DEFAULT_CONTEXT_CACHE_MODE})")
+        return DEFAULT_CONTEXT_CACHE_MODE
+    return mode
+
+
+def get_context_cache_ttl_seconds() -> float:
+    """コンテキストキャッシュの有効期間（秒）"""
+    return get_float_env("SAFETY_SCORE_CONTEXT_CACHE_TTL_SECONDS", DEFAULT_CONTEXT_CACHE_TTL_SECONDS)
+
+
+def get_tool_output_view() -> str:
+    """
+    ツール結果をモデルに渡す形式
+
+    - ``compact``: 定数フィールドを除き、小数を丸め、null を省いた形式
+    - ``full``: ツール関数の戻り値そのまま（デバッグ用）
+    """
+    view = os.environ.get("SAFETY_SCORE_TOOL_OUTPUT", DEFAULT_TOOL_OUTPUT_VIEW).strip().lower()
+    if view not in TOOL_OUTPUT_VIEWS:
+        logger.warning(f"Invalid value for SAFETY_SCORE_TOOL_OUTPUT: {view!r} (using {DEFAULT_TOOL_OUTPUT_VIEW})")
+        return DEFAULT_TOOL_OUTPUT_VIEW
+    return view
+
+
+def get_data_dir() -> str:
+    """ローカルに保存するデータ（ランキング表など）のディレクトリ"""
+    return os.path.expanduser(os.environ.get("SAFETY_SCORE_DATA_DIR") or DEFAULT_DATA_DIR)
+
+
+def get_timeout_floor_seconds() -> float:
+    """HTTP リクエストのタイムアウトの下限（秒）"""
+    return get_float_env("SAFETY_SCORE_TIMEOUT_FLOOR_SECONDS", DEFAULT_TIMEOUT_FLOOR_SECONDS)
+
+
+def get_timeout_ceiling_seconds() -> float:
+    """HTTP リクエストのタイムアウトの上限（秒）"""
+    return get_float_env("SAFETY_SCORE_TIMEOUT_CEILING_SECONDS", DEFAULT_TIMEOUT_CEILING_SECONDS)
+
+
+def get_hedge_budget_ratio() -> float:
+    """ヘッジリクエストに使える全リクエスト数に対する割合（0 でヘッジしない）"""
+    return max(0.0, get_float_env("SAFETY_SCORE_HEDGE_BUDGET", DEFAULT_HEDGE_BUDGET_RATIO))
+
+
+def get_timing_table_enabled() -> bool:
+    """評価ごとの所要時間の内訳を表形式でログに出力するか（デバッグ用）"""
+    return get_bool_env("SAFETY_SCORE_TIMING_TABLE")
+
+
+def get_site_base_url() -> Optional[str]:
+    """
+    取得対象サイトの代わりにリクエストを送る代替サーバーの URL（未設定なら None）
+
+    SAFETY_SCORE_SITE_BASE_URL に http://127.0.0.1:8800 のように指定する（net/standin.py）。
+    """
+    raw = (os.environ.get("SAFETY_SCORE_SITE_BASE_URL") or "").strip()
+    return raw.rstrip("/") or None
+
+
+def get_site_faults() -> Dict[str, Any]:
+    """
+    代替サーバーに注入するサイトごとの遅延と障害（fixtures/faults.py）
+
+    SAFETY_SCORE_SITE_FAULTS にホスト名（またはドメイン）→ 設定の JSON を指定する。
+    例: {"gallup.com": {"hang_rate": 1.0}, "*": {"latency": 0.2, "jitter": 0.5}}
+    """
+    return get_json_env("SAFETY_SCORE_SITE_FAULTS")
+
+
+def get_model_name(default: str) -> str:
+    """
+    各エージェントが使うモデル名（SAFETY_SCORE_MODEL、未設定なら default）
+
+    ``fake`` を指定すると、ネットワークを使わない決定的なモデル（fake_llm.py）で動かす。
+    """
+    return (os.environ.get("SAFETY_SCORE_MODEL") or "").strip() or default
+
+
+def is_fake_model(model: str) -> bool:
+    """モデル名が fake モデル（fake_llm.py）を指すか"""
+    return re.fullmatch(FAKE_MODEL_PATTERN, model) is not None
+
+
+def get_fake_llm_settings() -> Dict[str, Any]:
+    """
+    fake モデルの応答時間・台本・応答文（fake_llm.py）
+
+    SAFETY_SCORE_FAKE_LLM に JSON で指定する。
+    例: {"first_token_seconds": 0.3, "token_seconds": 0.01}
+    """
+    return get_json_env("SAFETY_SCORE_FAKE_LLM")
+
+
+def get_cassette_path() -> Optional[str]:
+    """HTTP の記録と再生に使うカセットのパス（net/cassette.py、未設定なら None）"""
+    return (os.environ.get("SAFETY_SCORE_CASSETTE") or "").strip() or None
+
+
+def get_cassette_mode() -> str:
+    """
+    カセットの使い方
+
+    - ``replay``: 記録した応答を返す（ソケットを使わない）
+    - ``record``: 通信を記録し、プロセス終了時に保存する
+    """
+    mode = os.environ.get("SAFETY_SCORE_CASSETTE_MODE", DEFAULT_CASSETTE_MODE).strip().lower()
+    if mode not in CASSETTE_MODES:
+        logger.warning(f"Invalid value for SAFETY_SCORE_CASSETTE_MODE: {mode!r} (using {DEFAULT_CASSETTE_MODE})")
+        return DEFAULT_CASSETTE_MODE
+    return mode
+
+
+def get_queue_journal_mode() -> str:
+    """
+    ジョブキュー（work_queue.py）の SQLite のジャーナルモード
+
+    - ``wal``: 1台のマシン上の複数プロセスで共有する（ネットワークファイルシステムでは使えない）
+    - ``delete``: 複数のマシンから NFS などの共有ディレクトリ上のファイルを使う
+    """
+    mode = os.environ.get("SAFETY_SCORE_QUEUE_JOURNAL_MODE", DEFAULT_QUEUE_JOURNAL_MODE).strip().lower()
+    if mode not in QUEUE_JOURNAL_MODES:
+        logger.warning(f"Invalid value for SAFETY_SCORE_QUEUE_JOURNAL_MODE: {mode!r} "
+                       f"(using {DEFAULT_QUEUE_JOURNAL_MODE})")
+        return DEFAULT_QUEUE_JOURNAL_MODE
+    return mode
+
+
+def get_json_env(name: str) -> Dict[str, Any]:
+    """環境変数を JSON オブジェクトとして取得（未設定または不正な場合は空の辞書）"""
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return {}
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        logger.warning(f"Invalid JSON for {name}: {raw!r} (ignored)")
+        return {}
+    if not isinstance(value, dict):
+        logger.warning(f"{name} must be a JSON object: {raw!r} (ignored)")
+        return {}
+    return value
+
+
+def get_host_limit_overrides() -> Dict[str, Any]:
+    """
+    サイトごとの流量制限の上書き設定
+
+    SAFETY_SCORE_HOST_LIMITS にホスト名（またはドメイン）→ 設定の JSON を指定する。
+    例: {"numbeo.com": {"rate": 0.2, "burst": 1, "max_in_flight": 1}}
+    rate は1秒あたりのリクエスト数、burst は連続して送れる数、max_in_flight は同時接続数、
+    adaptive は同時接続数の自動調整、hedge は遅い応答へのヘッジリクエストの有無。
+    null は無制限。一覧にないサイトへのリクエストには上限を適用しない。
+    """
+    return get_json_env("SAFETY_SCORE_HOST_LIMITS")
@@ -0,0 +1,192 @@
+"""統合エージェントの静的指示文のコンテキストキャッシュ
+
+統合エージェントの指示文は、評価基準・出力形式などの静的な部分（数千トークン）と、
+専門エージェントの結果を埋め込む動的な部分に分かれる。静的な部分をプロバイダー側の
+コンテキストキャッシュ（Gemini の cachedContents）に登録し、リクエストでは
+キャッシュ名と動的な部分だけを送ることで、入力トークン数と最初のトークンまでの時間を減らす。
+
+キャッシュの保存先は ContextCacheBackend を差し替えて変更できる。
+- GenaiContextCache: google-genai の caches API（本番用）
+- LocalContextCache: プロセス内の辞書（テスト・ベンチマーク用）
+
+キャッシュを作成できない場合（認証情報がない、最小トークン数に満たない等）は、
+従来どおり指示文全体を system_instruction として送る。
+"""
+
+import abc
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# 有効期限のこの時間前にキャッシュを作り直す（リクエスト中の失効を避ける）
+REFRESH_MARGIN_SECONDS = 60.0
+# 作成に失敗したキャッシュを再試行するまでの時間（秒）
+RETRY_AFTER_FAILURE_SECONDS = 300.0
+
+
+def cache_key(model: str, static_instruction: str) -> str:
+    """モデル名と静的指示文からキャッシュのキーを作成"""
+    digest = hashlib.sha256(static_instruction.encode("utf-8")).hexdigest()[:16]
+    return f"{model}:{digest}"
+
+
+class ContextCacheBackend(abc.ABC):
+    """
+    静的指示文のキャッシュを作成・管理する基底クラス
+
+    サブクラスは _create を実装する。有効期限の管理、失敗時の再試行間隔、
+    同時リクエストでの重複作成の防止はこのクラスで行う。
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.get_context_cache_ttl_seconds()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def get_or_create(self, model: str, static_instruction: str) -> Optional[str]:
+        """
+        静的指示文のキャッシュ名を取得（なければ作成）
+
+        Args:
+            model: リクエストのモデル名
+            static_instruction: キャッシュする静的指示文
+
+        Returns:
+            Optional[str]: キャッシュ名（利用できない場合は None）
+        """
+        key = cache_key(model, static_instruction)
+        name = self._lookup(key)
+        if name or self._failed_until.get(key, 0.0) > time.time():
+            return name
+
+        async with self._lock:
+            name = self._lookup(key)
+            if name:
+                return name
+            try:
+                name = await self._create(model, static_instruction, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"Context cache creation failed for {model}: {e}")
+                self._failed_until[key] = time.time() + RETRY_AFTER_FAILURE_SECONDS
+                return None
+
+            self._entries[key] = {"name": name, "expires_at": time.time() + self.ttl_seconds}
+            logger.info(f"Created context cache {name} for {model}")
+            return name
+
+    def _lookup(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry and entry["expires_at"] - REFRESH_MARGIN_SECONDS > time.time():
+            return entry["name"]
+        return None
+
+    @abc.abstractmethod
+    async def _create(self, model: str, static_instruction: str, ttl_seconds: float) -> str:
+        """キャッシュを作成してキャッシュ名を返す"""
+
+
+class GenaiContextCache(ContextCacheBackend):
+    """google-genai の caches API を使うバックエンド"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, client: Any = None):
+        super().__init__(ttl_seconds)
+        self._client = client
+
+    async def _create(self, model: str, static_instruction: str, ttl_seconds: float) -> str:
+        from google.genai import Client, types
+
+        if self._client is None:
+            self._client = Client()
+        cache = await self._client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name="safety-score-synthesizer",
+                system_instruction=static_instruction,
+                ttl=f"{int(ttl_seconds)}s",
+            ),
+        )
+        return cache.name
+
+
+class LocalContextCache(ContextCacheBackend):
+    """プロセス内にキャッシュを保持するバックエンド（テスト・ベンチマーク用）"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        super().__init__(ttl_seconds)
+        self.contents: Dict[str, str] = {}
+
+    async def _create(self, model: str, static_instruction: str, ttl_seconds: float) -> str:
+        name = f"cachedContents/local-{len(self.contents) + 1}"
+        self.contents[name] = static_instruction
+        return name
+
+
+def has_genai_credentials() -> bool:
+    """Gemini API（または Vertex AI）の認証情報が設定されているか"""
+    if os.environ.get("GOOGLE_API_KEY"):
+        return True
+    return os.environ.get("GOOGLE_GENAI_USE_VERTEXAI", "").lower() in ("1", "true")
+
+
+def create_default_backend() -> Optional[ContextCacheBackend]:
+    """
+    環境変数 SAFETY_SCORE_CONTEXT_CACHE に従ってバックエンドを作成
+
+    fake モデル（SAFETY_SCORE_MODEL=fake）ではモデルが Gemini ではないため作成しない。
+    """
+    mode = config.get_context_cache_mode()
+    if mode == "off" or (mode == "auto" and not has_genai_credentials()):
+        return None
+    if config.is_fake_model(config.get_model_name("")):
+        return None
+    return GenaiContextCache()
+
+
+def make_context_cache_callback(
+    static_instruction: str,
+    backend: ContextCacheBackend,
+) -> Callable[..., Any]:
+    """
+    静的指示文をキャッシュ参照に置き換える before_model_callback を作成
+
+    ADK が組み立てた system_instruction（静的指示文＋状態を埋め込んだ動的部分）のうち、
+    静的指示文をキャッシュ名（config.cached_content）に置き換え、動的部分は
+    最初のユーザーメッセージとして送る（Gemini ではキャッシュ利用時に
+    system_instruction を併用できないため）。
+
+    Args:
+        static_instruction: キャッシュする静的指示文
+        backend: キャッシュのバックエンド
+
+    Returns:
+        Callable: LlmAgent の before_model_callback
+    """
+    async def before_model_callback(callback_context, llm_request):
+        from google.genai import types
+
+        system_instruction = llm_request.config.system_instruction
+        if not isinstance(system_instruction, str) or not system_instruction.startswith(static_instruction):
+            return None
+
+        name = await backend.get_or_create(llm_request.model, static_instruction)
+        if not name:
+            return None
+
+        dynamic_instruction = system_instruction[len(static_instruction):].strip()
+        llm_request.config.cached_content = name
+        llm_request.config.system_instruction = None
+        if dynamic_instruction:
+            llm_request.contents.insert(
+                0, types.Content(role="user", parts=[types.Part(text=dynamic_instruction)])
+            )
+        return None
+
+    return before_model_callback
@@ -0,0 +1,122 @@
+"""評価対象国の一覧
+
+各ツールは国名の表記が異なる（犯罪・インフラ・法執行機関は英語名、
+テロ・紛争は外務省の日本語名）ため、対象国ごとに両方の表記と地域を持つ。
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+
+class Country(NamedTuple):
+    """評価対象国"""
+    name: str      # 英語名（犯罪・インフラ・法執行機関ツール用）
+    name_ja: str   # 日本語名（テロ・紛争ツール用）
+    region: str    # 地域キー（REGION_LABELS のキー）
+
+
+REGION_LABELS = {
+    "asia": "アジア",
+    "middle_east": "中東",
+    "europe": "ヨーロッパ",
+    "africa": "アフリカ",
+    "americas": "南北アメリカ",
+    "oceania": "オセアニア",
+}
+
+COUNTRIES: List[Country] = [
+    # アジア
+    Country("Japan", "日本", "asia"),
+    Country("South Korea", "韓国", "asia"),
+    Country("China", "中国", "asia"),
+    Country("Taiwan", "台湾", "asia"),
+    Country("Mongolia", "モンゴル", "asia"),
+    Country("Singapore", "シンガポール", "asia"),
+    Country("Thailand", "タイ", "asia"),
+    Country("Vietnam", "ベトナム", "asia"),
+    Country("Malaysia", "マレーシア", "asia"),
+    Country("Indonesia", "インドネシア", "asia"),
+    Country("Philippines", "フィリピン", "asia"),
+    Country("Cambodia", "カンボジア", "asia"),
+    Country("Myanmar", "ミャンマー", "asia"),
+    Country("India", "インド", "asia"),
+    Country("Sri Lanka", "スリランカ", "asia"),
+    Country("Nepal", "ネパール", "asia"),
+    Country("Bangladesh", "バングラデシュ", "asia"),
+    Country("Pakistan", "パキスタン", "asia"),
+    Country("Afghanistan", "アフガニスタン", "asia"),
+    # 中東
+    Country("Turkey", "トルコ", "middle_east"),
+    Country("Israel", "イスラエル", "middle_east"),
+    Country("Jordan", "ヨルダン", "middle_east"),
+    Country("Saudi Arabia", "サウジアラビア", "middle_east"),
+    Country("United Arab Emirates", "アラブ首長国連邦", "middle_east"),
+    Country("Qatar", "カタール", "middle_east"),
+    Country("Iran", "イラン", "middle_east"),
+    Country("Iraq", "イラク", "middle_east"),
+    Country("Syria", "シリア", "middle_east"),
+    Country("Yemen", "イエメン", "middle_east"),
+    # ヨーロッパ
+    Country("United Kingdom", "英国", "europe"),
+    Country("Ireland", "アイルランド", "europe"),
+    Country("France", "フランス", "europe"),
+    Country("Germany", "ドイツ", "europe"),
+    Country("Netherlands", "オランダ", "europe"),
+    Country("Switzerland", "スイス", "europe"),
+    Country("Austria", "オーストリア", "europe"),
+    Country("Italy", "イタリア", "europe"),
+    Country("Spain", "スペイン", "europe"),
+    Country("Portugal", "ポルトガル", "europe"),
+    Country("Greece", "ギリシャ", "europe"),
+    Country("Denmark", "デンマーク", "europe"),
+    Country("Norway", "ノルウェー", "europe"),
+    Country("Sweden", "スウェーデン", "europe"),
+    Country("Finland", "フィンランド", "europe"),
+    Country("Iceland", "アイスランド", "europe"),
+    Country("Poland", "ポーランド", "europe"),
+    Country("Ukraine", "ウクライナ", "europe"),
+    Country("Russia", "ロシア", "europe"),
+    # アフリカ
+    Country("Egypt", "エジプト", "africa"),
+    Country("Morocco", "モロッコ", "africa"),
+    Country("Libya", "リビア", "africa"),
+    Country("Mali", "マリ", "africa"),
+    Country("Burkina Faso", "ブルキナファソ", "africa"),
+    Country("Nigeria", "ナイジェリア", "africa"),
+    Country("Central African Republic", "中央アフリカ", "africa"),
+    Country("Democratic Republic of the Congo", "コンゴ民主共和国", "africa"),
+    Country("South Sudan", "南スーダン", "africa"),
+    Country("Ethiopia", "エチオピア", "africa"),
+    Country("Somalia", "ソマリア", "africa"),
+    Country("Kenya", "ケニア", "africa"),
+    Country("South Africa", "南アフリカ", "africa"),
+    # 南北アメリカ
+    Country("United States", "米国", "americas"),
+    Country("Canada", "カナダ", "americas"),
+    Country("Mexico", "メキシコ", "americas"),
+    Country("Colombia", "コロンビア", "americas"),
+    Country("Venezuela", "ベネズエラ", "americas"),
+    Country("Peru", "ペルー", "americas"),
+    Country("Brazil", "ブラジル", "americas"),
+    Country("Chile", "チリ", "americas"),
+    Country("Argentina", "アルゼンチン", "americas"),
+    # オセアニア
+    Country("Australia", "オーストラリア", "oceania"),
+    Country("New Zealand", "ニュージーランド", "oceania"),
+]
+
+_BY_NAME: Dict[str, Country] = {}
+for _country in COUNTRIES:
+    _BY_NAME[_country.name.lower()] = _country
+    _BY_NAME[_country.name_ja] = _country
+
+
+def get_country(name: str) -> Optional[Country]:
+    """英語名（大文字小文字を区別しない）または日本語名から対象国を取得"""
+    return _BY_NAME.get(name.strip().lower()) or _BY_NAME.get(name.strip())
+
+
+def get_countries(region: Optional[str] = None) -> List[Country]:
+    """対象国の一覧を取得（region を指定するとその地域のみ）"""
+    if region is None:
+        return list(COUNTRIES)
+    return [country for country in COUNTRIES if country.region == region]
@@ -0,0 +1,146 @@
+"""締め切り付きの並列情報収集エージェント
+
+ParallelAgent は全サブエージェントの完了を待つため、応答の遅いデータソースが
+1つあるだけで評価全体が遅延する。DeadlineParallelAgent は締め切りを過ぎた時点で
+未完了のサブエージェントを打ち切り、その output_key に「データ取得不可」の
+プレースホルダーを書き込んで後続の統合エージェントに処理を引き継ぐ。
+"""
+
+import asyncio
+import logging
+from typing import AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent, ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.parallel_agent import _create_branch_ctx_for_sub_agent
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from . import config
+from .sections import get_section_label
+
+logger = logging.getLogger(__name__)
+
+# 統合エージェントがデータ欠損を判別するための目印
+DATA_UNAVAILABLE_MARKER = "【データ取得不可】"
+
+# セッション状態でこのキーが指定された場合、評価単位で締め切りを上書きする
+DEADLINE_STATE_KEY = "evaluation_deadline_seconds"
+
+
+def build_unavailable_placeholder(label: str, deadline_seconds: float) -> str:
+    """締め切り超過時に output_key へ書き込むプレースホルダー文を作成"""
+    return (
+        f"{DATA_UNAVAILABLE_MARKER} {label}の情報は制限時間（{deadline_seconds:.0f}秒）内に"
+        f"取得できませんでした。この項目は取得済みの他項目と一般的な傾向に基づく暫定評価とし、"
+        f"レポート内でデータ欠損を明記してください。"
+    )
+
+
+def is_unavailable(section_text: Optional[str]) -> bool:
+    """セクションの内容がプレースホルダーかどうかを判定"""
+    return isinstance(section_text, str) and section_text.startswith(DATA_UNAVAILABLE_MARKER)
+
+
+class DeadlineParallelAgent(ParallelAgent):
+    """締め切り付きでサブエージェントを並列実行するエージェント
+
+    締め切りは以下の優先順で決定する:
+    1. セッション状態の ``evaluation_deadline_seconds``（評価全体の締め切り）
+    2. ``deadline_seconds`` フィールド（情報収集の締め切り）
+    3. 環境変数 ``SAFETY_SCORE_DEADLINE_SECONDS`` から算出した値
+    """
+
+    deadline_seconds: Optional[float] = None
+    """情報収集の締め切り（秒）。None の場合は実行時に設定から決定する。"""
+
+    def resolve_deadline_seconds(self, ctx: InvocationContext) -> float:
+        """この評価に適用する情報収集の締め切り（秒）を決定"""
+        override = ctx.session.state.get(DEADLINE_STATE_KEY)
+        if override is not None:
+            try:
+                return config.get_gather_deadline_seconds(float(override))
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid {DEADLINE_STATE_KEY} in session state: {override!r}")
+        if self.deadline_seconds is not None:
+            return self.deadline_seconds
+        return config.get_gather_deadline_seconds()
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        deadline_seconds = self.resolve_deadline_seconds(ctx)
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + deadline_seconds
+
+        agent_runs = [
+            sub_agent.run_async(_create_branch_ctx_for_sub_agent(self, sub_agent, ctx))
+            for sub_agent in self.sub_agents
+        ]
+        # 実行中の __anext__ タスク → サブエージェントのインデックス
+        pending: Dict[asyncio.Task, int] = {
+            asyncio.create_task(run.__anext__()): index
+            for index, run in enumerate(agent_runs)
+        }
+        published = set()
+
+        while pending:
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                index = pending.pop(task)
+                try:
+                    event = task.result()
+                except StopAsyncIteration:
+                    continue
+
+                output_key = getattr(self.sub_agents[index], "output_key", None)
+                if output_key and output_key in event.actions.state_delta:
+                    published.add(index)
+                yield event
+
+                # 上流で処理されてから次のイベントに進む（ParallelAgent と同じ保証）
+                pending[asyncio.create_task(agent_runs[index].__anext__())] = index
+
+        if not pending:
+            return
+
+        # 締め切り超過: 未完了のサブエージェントを打ち切る
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for index in sorted(pending.values()):
+            await agent_runs[index].aclose()
+            if index in published:
+                continue  # 出力は発行済み（後処理のみ未完了）
+
+            sub_agent = self.sub_agents[index]
+            logger.warning(
+                f"{sub_agent.name} did not finish within {deadline_seconds:.1f}s; "
+                f"publishing placeholder"
+            )
+            event = self._build_unavailable_event(ctx, sub_agent, deadline_seconds)
+            if event:
+                yield event
+
+    def _build_unavailable_event(
+        self, ctx: InvocationContext, sub_agent: BaseAgent, deadline_seconds: float
+    ) -> Optional[Event]:
+        """未完了のサブエージェントに代わってプレースホルダーを発行するイベントを作成"""
+        output_key = getattr(sub_agent, "output_key", None)
+        if not output_key:
+            return None
+
+        placeholder = build_unavailable_placeholder(get_section_label(output_key), deadline_seconds)
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=sub_agent.name,
+            branch=_create_branch_ctx_for_sub_agent(self, sub_agent, ctx).branch,
+            content=types.Content(role="model", parts=[types.Part(text=placeholder)]),
+            actions=EventActions(state_delta={output_key: placeholder}),
+        )
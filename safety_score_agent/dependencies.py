@@ -0,0 +1,209 @@
+"""データソース → フィールド → スコアの依存グラフ
+
+各ツールモジュールは複数の外部ソース（Numbeo、GPI/外務省、CPI など）から取得した
+値を1つの出力にまとめている。ここではソースごとに「どのツール出力のフィールドを
+生成し、そのフィールドがどの指標・構成要素・カテゴリスコアに使われるか」を宣言し、
+ソースのデータが変わったときに再計算が必要なスコアだけを求める。
+
+    source ─→ field ─→ indicator ─→ component ─→ category ─→ total
+
+例えば CPI（Transparency International）は社会基盤の政治的安定性と、法執行機関の
+警察信頼度（警察の汚職度）の両方に使われるため、CPI だけが変わった場合は
+この2つの構成要素と、それを含む2カテゴリ・合計だけが無効になる。
+
+フィールド → 指標、指標 → 構成要素の対応は scoring.py の INDICATOR_FIELDS /
+COMPONENTS から作るため、スコア計算と依存グラフがずれることはない。
+
+使い方:
+    python -m safety_score_agent.dependencies cpi
+"""
+
+import argparse
+import hashlib
+import json
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+from .scoring import COMPONENTS, INDICATOR_FIELDS
+
+# データソース → 表示名
+SOURCES = {
+    "numbeo": "Numbeo Crime Index",
+    "gpi_mofa": "Global Peace Index / 外務省 海外安全情報",
+    "unodc_who": "UNODC / WHO 殺人統計",
+    "cpi": "Transparency International CPI",
+    "who_road": "WHO 道路交通安全",
+    "who_gho": "WHO Global Health Observatory",
+    "wgi": "World Bank Worldwide Governance Indicators",
+    "gallup": "Gallup World Poll",
+    "oecd": "OECD Better Life Index",
+    "mofa_risk": "外務省 海外安全ホームページ（危険レベル）",
+}
+
+# スコアのカテゴリ → ツール出力のキー（leaderboard.fetch_country_sources の戻り値）
+TOOL_KEYS = {
+    "conflict": "conflict",
+    "crime": "crime",
+    "infrastructure": "infra",
+    "law_enforcement": "law",
+}
+
+# フィールド（ツール出力のキー, セクション, キー）→ 値を生成するデータソース
+FIELD_SOURCES = {
+    ("crime", "numbeo_data", "safety_index"): "numbeo",
+    ("crime", "global_peace_index", "peace_score"): "gpi_mofa",
+    ("crime", "unodc_homicide_rate", "homicide_rate_per_100k"): "unodc_who",
+    ("infra", "corruption_perception_index", "cpi_score"): "cpi",
+    ("infra", "traffic_safety_data", "road_traffic_deaths_per_100k"): "who_road",
+    ("infra", "healthcare_system", "healthcare_access_quality_index"): "who_gho",
+    ("law", "global_peace_index_data", "police_reliability_score"): "gpi_mofa",
+    ("law", "world_bank_governance", "rule_of_law_percentile"): "wgi",
+    # get_police_trust_data は TI（CPI）・Gallup・OECD の値を1つのセクションにまとめている
+    ("law", "police_trust_indicators", "corruption_in_police_force"): "cpi",
+    ("law", "police_trust_indicators", "public_trust_in_police"): "gallup",
+    ("law", "police_trust_indicators", "police_effectiveness_rating"): "gallup",
+    ("law", "police_trust_indicators", "crime_reporting_rate"): "oecd",
+    ("law", "police_trust_indicators", "victim_satisfaction_rate"): "oecd",
+    # テロ・紛争はツール出力から対象国の危険レベルと推定リスクを取り出して使う
+    ("conflict", "data", "danger_level"): "mofa_risk",
+    ("conflict", "high_risk_countries", "estimated_risk"): "mofa_risk",
+}
+
+Field = Tuple[str, str, str]
+
+
+class Invalidation(NamedTuple):
+    """データソースの変更で無効になるノード"""
+
+    sources: FrozenSet[str]
+    fields: FrozenSet[Field]
+    indicators: FrozenSet[str]
+    components: FrozenSet[str]
+    scores: FrozenSet[str]
+
+
+def _build_graph() -> Tuple[Dict[Field, FrozenSet[str]], Dict[str, str], Dict[str, str]]:
+    """フィールド → 指標、指標 → 構成要素、構成要素 → カテゴリの対応を作る"""
+    field_indicators: Dict[Field, FrozenSet[str]] = {field: frozenset() for field in FIELD_SOURCES}
+    for category, fields in INDICATOR_FIELDS.items():
+        for section, key, indicator in fields:
+            field = (TOOL_KEYS[category], section, key)
+            if field not in FIELD_SOURCES:
+                raise ValueError(f"Indicator field has no source: {field}")
+            field_indicators[field] = field_indicators[field] | {indicator}
+
+    indicator_components: Dict[str, str] = {}
+    component_categories: Dict[str, str] = {}
+    for category, components in COMPONENTS.items():
+        for name, indicators, _ in components:
+            component_categories[name] = category
+            for indicator in indicators:
+                indicator_components[indicator] = name
+    return field_indicators, indicator_components, component_categories
+
+
+FIELD_INDICATORS, INDICATOR_COMPONENTS, COMPONENT_CATEGORIES = _build_graph()
+
+
+def invalidated(sources: Iterable[str]) -> Invalidation:
+    """
+    データソースの変更で再計算が必要なフィールド・指標・構成要素・スコアを求める
+
+    Args:
+        sources: 変更のあったデータソース（SOURCES のキー）
+
+    Returns:
+        Invalidation: scores にはカテゴリ名（conflict / crime / infrastructure /
+        law_enforcement）と、いずれかが無効になる場合は total が含まれる
+    """
+    sources = frozenset(sources)
+    unknown = sources - SOURCES.keys()
+    if unknown:
+        raise ValueError(f"Unknown sources: {sorted(unknown)} (expected some of {sorted(SOURCES)})")
+
+    fields = frozenset(field for field, source in FIELD_SOURCES.items() if source in sources)
+    indicators = frozenset(indicator for field in fields for indicator in FIELD_INDICATORS[field])
+    components = frozenset(INDICATOR_COMPONENTS[indicator] for indicator in indicators)
+    scores = {COMPONENT_CATEGORIES[component] for component in components}
+    if any(field[0] == TOOL_KEYS["conflict"] for field in fields):
+        scores.add("conflict")
+    if scores:
+        scores.add("total")
+    return Invalidation(sources, fields, indicators, components, frozenset(scores))
+
+
+_MISSING_SECTION = "<missing section>"
+_MISSING_KEY = "<missing key>"
+
+
+def _field_value(tool_output: Any, field: Field, country_name_ja: str) -> Any:
+    """フィールドの値（セクション・キーの有無を区別する）"""
+    tool, section, key = field
+    if not isinstance(tool_output, Mapping):
+        return _MISSING_SECTION
+    if tool == TOOL_KEYS["conflict"]:
+        # テロ・紛争は対象国の値だけを見る（他国の危険レベルの変更で無効にしない）
+        if tool_output.get("status") != "success":
+            return {"status": tool_output.get("status")}
+        if section == "data":
+            entry = (tool_output.get("data") or {}).get(country_name_ja)
+            return entry.get(key, _MISSING_KEY) if isinstance(entry, Mapping) else _MISSING_SECTION
+        for entry in tool_output.get(section) or []:
+            if isinstance(entry, Mapping) and entry.get("country") == country_name_ja:
+                return entry.get(key, _MISSING_KEY)
+        return _MISSING_SECTION
+    if section not in tool_output:
+        return _MISSING_SECTION
+    values = tool_output[section]
+    if not isinstance(values, Mapping):
+        # スコア計算では例外になる値。型と値ごとフィンガープリントに含める
+        return repr(values)
+    return values.get(key, _MISSING_KEY)
+
+
+def source_fingerprints(tool_outputs: Mapping[str, Any], country_name_ja: str = "") -> Dict[str, str]:
+    """
+    1か国分のツール出力からデータソースごとのフィンガープリントを計算
+
+    Args:
+        tool_outputs: {"conflict", "crime", "infra", "law"} → ツール出力
+        country_name_ja: 対象国の日本語名（テロ・紛争の値の取り出しに使う）
+
+    Returns:
+        Dict[str, str]: データソース → そのソースが生成するフィールドの値のハッシュ
+    """
+    values: Dict[str, Dict[str, Any]] = {source: {} for source in SOURCES}
+    for field, source in FIELD_SOURCES.items():
+        value = _field_value(tool_outputs.get(field[0]), field, country_name_ja)
+        values[source][".".join(field)] = value
+    return {
+        source: hashlib.sha256(
+            json.dumps(fields, sort_keys=True, ensure_ascii=False, default=repr).encode("utf-8")
+        ).hexdigest()
+        for source, fields in values.items()
+    }
+
+
+def changed_sources(previous: Optional[Mapping[str, str]], current: Mapping[str, str]) -> FrozenSet[str]:
+    """前回と今回のフィンガープリントを比べて変更のあったデータソースを返す（前回がなければ全ソース）"""
+    previous = previous or {}
+    return frozenset(source for source, fingerprint in current.items() if previous.get(source) != fingerprint)
+
+
+def main() -> None:
+    """データソースの変更で無効になるフィールドとスコアを表示"""
+    parser = argparse.ArgumentParser(description="データソース → フィールド → スコアの依存グラフ")
+    parser.add_argument("sources", nargs="*", help=f"データソース（{', '.join(SOURCES)}）")
+    args = parser.parse_args()
+
+    for source in args.sources or SOURCES:
+        invalidation = invalidated([source])
+        print(f"{source} ({SOURCES[source]})")
+        for field in sorted(invalidation.fields):
+            indicators = ", ".join(sorted(FIELD_INDICATORS.get(field, ()))) or "-"
+            print(f"  {'.'.join(field):<62} → {indicators}")
+        print(f"  components: {', '.join(sorted(invalidation.components)) or '-'}")
+        print(f"  scores:     {', '.join(sorted(invalidation.scores)) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""ネットワークを使わない決定的なモデル（fake モデル）
+
+すべての LlmAgent は gemini-2.0-flash を呼び出すため、オフラインでは root_agent の
+パイプライン全体を動かせない。SAFETY_SCORE_MODEL=fake を設定すると、各エージェントは
+ADK の LLMRegistry に登録したこのモデルを使い、台本どおりにツールを呼び出してから
+定型の応答文を返す。SequentialAgent / ParallelAgent の実行や締め切り、配信サーバーの
+オーバーヘッドと並行性を、代替サーバー（fixtures/site_server.py）と組み合わせて計測できる。
+
+- 台本（SCRIPTS）: エージェント名 → ターンごとに呼び出すツールの一覧。引数の "$country"
+  などはユーザーのメッセージから特定した対象国に、"$<ツール名>" はそのツールの直前の結果に
+  置き換える。台本を終えたターンでは応答文（TEXT）を返す
+- 応答時間: 最初のトークンまでの秒数 first_token_seconds と、出力1トークンあたりの秒数
+  token_seconds（ストリーミングでは途中経過を分けて返す）
+
+設定は SAFETY_SCORE_FAKE_LLM に JSON で指定する（"scripts" と "texts" はエージェント名ごとに上書き、
+"*" は一覧にないエージェント）。
+
+    {"first_token_seconds": 0.3, "token_seconds": 0.01,
+     "texts": {"SafetyScoreSynthesizer": "{country} の総合安全スコア: 80/100"}}
+"""
+
+import asyncio
+import json
+import math
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import Field
+
+from . import config
+from .countries import COUNTRIES, Country, get_country
+
+FAKE_MODEL = "fake"
+
+# エージェント名 → ターンごとのツール呼び出し（同じターンの呼び出しは並列に実行される）
+SCRIPTS: Dict[str, List[List[Dict[str, Any]]]] = {
+    "ConflictInfoAgent": [
+        [{"name": "get_conflict_risk_info", "args": {"country_name": "$country_ja"}},
+         {"name": "get_terrorism_info", "args": {"region": "$region"}}],
+    ],
+    "CrimeAgent": [
+        [{"name": "get_crime_data", "args": {"country": "$country"}}],
+        [{"name": "analyze_travel_safety_risks", "args": {"crime_data": "$get_crime_data"}}],
+    ],
+    "InfrastructureAgent": [
+        [{"name": "get_infrastructure_data", "args": {"country": "$country"}}],
+        [{"name": "analyze_infrastructure_risks", "args": {"infra_data": "$get_infrastructure_data"}},
+         {"name": "calculate_infrastructure_stability_impact", "args": {"infra_data": "$get_infrastructure_data"}}],
+    ],
+    "LawEnforcementAgent": [
+        [{"name": "get_law_enforcement_data", "args": {"country": "$country"}}],
+        [{"name": "analyze_law_enforcement_risks", "args": {"law_data": "$get_law_enforcement_data"}},
+         {"name": "assess_traveler_law_enforcement_support", "args": {"law_data": "$get_law_enforcement_data"}},
+         {"name": "calculate_law_enforcement_reliability_impact", "args": {"law_data": "$get_law_enforcement_data"}}],
+    ],
+}
+
+# 台本を終えたターンの応答文（{agent} {country} {results} を置き換える）
+TEXT = "## {agent}: {country} の評価（fake モデル）\n\n{results}"
+
+# 応答文に含めるツール結果の最大文字数
+MAX_RESULTS_CHARS = 2000
+# ストリーミングで途中経過を分ける文字数
+STREAM_CHUNK_CHARS = 32
+
+_AGENT_NAME = re.compile(r'Your internal name is "([^"]+)"')
+
+
+def estimate_tokens(text: str) -> int:
+    """推定トークン数（ASCII は約4文字、それ以外は約1.3文字で1トークン）"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.3)
+
+
+def find_country(text: str) -> Optional[Country]:
+    """メッセージに含まれる対象国（英語名または日本語名、長い名前を優先）"""
+    country = get_country(text)
+    if country is not None:
+        return country
+    lowered = text.lower()
+    names = [(name, country) for country in COUNTRIES for name in (country.name.lower(), country.name_ja)]
+    for name, country in sorted(names, key=lambda item: -len(item[0])):
+        if name in lowered:
+            return country
+    return None
+
+
+def _user_text(contents: List[types.Content]) -> str:
+    """最初のユーザーのメッセージ"""
+    for content in contents:
+        if content.role == "user" and content.parts and content.parts[0].text:
+            return content.parts[0].text
+    return ""
+
+
+def _latest_responses(contents: List[types.Content]) -> Dict[str, Any]:
+    """ツール名 → 直前の結果"""
+    responses: Dict[str, Any] = {}
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_response is not None:
+                responses[part.function_response.name] = part.function_response.response
+    return responses
+
+
+def _resolve_args(args: Dict[str, Any], values: Dict[str, str], responses: Dict[str, Any]) -> Dict[str, Any]:
+    """台本の引数の "$country" などを対象国に、"$<ツール名>" をツールの直前の結果に置き換える"""
+    resolved = {}
+    for name, value in args.items():
+        if isinstance(value, str) and value.startswith("$"):
+            value = values[value] if value in values else responses.get(value[1:])
+        resolved[name] = value
+    return resolved
+
+
+def _model_turns(contents: List[types.Content]) -> int:
+    """これまでにツールを呼び出したモデルのターン数"""
+    return sum(1 for content in contents
+               if content.role == "model" and any(part.function_call for part in content.parts or []))
+
+
+class FakeLlm(BaseLlm):
+    """台本どおりにツールを呼び出し、定型の応答文を返すモデル"""
+
+    model: str = FAKE_MODEL
+    first_token_seconds: float = Field(
+        default_factory=lambda: float(config.get_fake_llm_settings().get("first_token_seconds", 0.0)))
+    token_seconds: float = Field(
+        default_factory=lambda: float(config.get_fake_llm_settings().get("token_seconds", 0.0)))
+    scripts: Dict[str, List[List[Dict[str, Any]]]] = Field(
+        default_factory=lambda: {**SCRIPTS, **config.get_fake_llm_settings().get("scripts", {})})
+    texts: Dict[str, str] = Field(default_factory=lambda: dict(config.get_fake_llm_settings().get("texts", {})))
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [config.FAKE_MODEL_PATTERN]
+
+    def respond(self, llm_request: LlmRequest) -> types.Content:
+        """リクエストに対する応答（ツール呼び出しまたは応答文）"""
+        system_instruction = str((llm_request.config and llm_request.config.system_instruction) or "")
+        match = _AGENT_NAME.search(system_instruction)
+        agent = match.group(1) if match else ""
+        text = _user_text(llm_request.contents)
+        country = find_country(text)
+        values = {
+            "$country": country.name if country else text.strip(),
+            "$country_ja": country.name_ja if country else text.strip(),
+            "$region": country.region if country else "global",
+        }
+        responses = _latest_responses(llm_request.contents)
+        script = self.scripts.get(agent, self.scripts.get("*", []))
+        turn = _model_turns(llm_request.contents)
+        if turn < len(script):
+            parts = [
+                types.Part.from_function_call(name=call["name"], args=_resolve_args(call.get("args", {}), values, responses))
+                for call in script[turn] if call["name"] in llm_request.tools_dict
+            ]
+            if parts:
+                return types.ModelContent(parts=parts)
+        results = json.dumps(responses, ensure_ascii=False, sort_keys=True, default=str)[:MAX_RESULTS_CHARS]
+        template = self.texts.get(agent, self.texts.get("*", TEXT))
+        return types.ModelContent(parts=[types.Part.from_text(
+            text=template.format(agent=agent, country=values["$country_ja"], results=results))])
+
+    def _usage(self, llm_request: LlmRequest, output_tokens: int) -> types.GenerateContentResponseUsageMetadata:
+        prompt = str((llm_request.config and llm_request.config.system_instruction) or "")
+        prompt += "".join(json.dumps(content.model_dump(mode="json", exclude_none=True), ensure_ascii=False)
+                          for content in llm_request.contents)
+        prompt_tokens = estimate_tokens(prompt)
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        content = self.respond(llm_request)
+        text = "".join(part.text or "" for part in content.parts)
+        output_tokens = estimate_tokens(text or json.dumps(
+            [part.function_call.model_dump(mode="json") for part in content.parts], ensure_ascii=False))
+        await asyncio.sleep(self.first_token_seconds)
+        if stream and text:
+            for start in range(0, len(text), STREAM_CHUNK_CHARS):
+                chunk = text[start:start + STREAM_CHUNK_CHARS]
+                await asyncio.sleep(estimate_tokens(chunk) * self.token_seconds)
+                yield LlmResponse(content=types.ModelContent(parts=[types.Part.from_text(text=chunk)]), partial=True)
+        else:
+            await asyncio.sleep(output_tokens * self.token_seconds)
+        yield LlmResponse(content=content, usage_metadata=self._usage(llm_request, output_tokens))
+
+
+def get_model_name(default: str) -> str:
+    """
+    エージェントに渡すモデル名（SAFETY_SCORE_MODEL、未設定なら default）
+
+    このモジュールの import 時に fake モデルを LLMRegistry に登録するため、
+    エージェントはモデル名をここから取得する。
+    """
+    return config.get_model_name(default)
+
+
+LLMRegistry.register(FakeLlm)
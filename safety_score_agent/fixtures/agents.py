@@ -0,0 +1,88 @@
+"""テスト用のエージェント
+
+ストリーミング配信・所要時間の内訳のテストで共通に使う、モデルを呼ばずに決まった時間で
+セクションとトークンを出力するエージェントと、その評価パイプライン。
+"""
+
+import asyncio
+import json
+from typing import AsyncGenerator, List, Optional
+
+from google.adk.agents import BaseAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ..deadline import DeadlineParallelAgent
+from ..streaming import create_evaluation_session, stream_report
+
+
+class SectionAgent(BaseAgent):
+    """指定時間後にセクションを出力するテスト用専門エージェント"""
+
+    delay: float = 0.0
+    output_key: str = ""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.delay)
+        text = f"{self.output_key} report"
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={self.output_key: text}),
+        )
+
+
+class TokenAgent(BaseAgent):
+    """部分イベントでトークンを出力するテスト用統合エージェント"""
+
+    tokens: List[str] = []
+    # False ではストリーミング非対応のモデルと同様に全文の最終イベントだけを出力する
+    stream: bool = True
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        for token in self.tokens if self.stream else []:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                partial=True,
+                content=types.Content(role="model", parts=[types.Part(text=token)]),
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=types.Content(role="model", parts=[types.Part(text="".join(self.tokens))]),
+        )
+
+
+def build_pipeline(deadline: float = 5.0) -> SequentialAgent:
+    """4つの専門エージェント（完了順は Crime → Infra → Conflict → Law）と統合エージェントのパイプライン"""
+    gatherer = DeadlineParallelAgent(
+        name="gatherer",
+        deadline_seconds=deadline,
+        sub_agents=[
+            SectionAgent(name="LawAgent", delay=0.3, output_key="law_info"),
+            SectionAgent(name="CrimeAgent", delay=0.01, output_key="crime_info"),
+            SectionAgent(name="InfraAgent", delay=0.1, output_key="infra_info"),
+            SectionAgent(name="ConflictAgent", delay=0.2, output_key="conflict_info"),
+        ],
+    )
+    synthesizer = TokenAgent(name="Synthesizer", tokens=["## 総合", "評価", "レポート"])
+    return SequentialAgent(name="pipeline", sub_agents=[gatherer, synthesizer])
+
+
+def collect(runner: InMemoryRunner, country: str = "Japan", deadline: Optional[float] = None) -> list:
+    """stream_report の配信イベントを (種類, データ) の一覧として集める"""
+    async def _collect():
+        session_id = await create_evaluation_session(runner, deadline_seconds=deadline)
+        return [
+            (item["event"], json.loads(item["data"]))
+            async for item in stream_report(
+                runner, session_id=session_id, country=country, report_author="Synthesizer"
+            )
+        ]
+
+    return asyncio.run(_collect())
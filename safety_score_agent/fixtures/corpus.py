@@ -0,0 +1,220 @@
+"""取得対象サイトのページのフィクスチャコーパス
+
+ツールモジュールが取得する全サイト（Numbeo、外務省、Vision of Humanity、UNODC、WHO、
+Transparency International、World Bank、Gallup、OECD）のページを pages/ に保存し、
+manifest.json に URL・データソース（dependencies.SOURCES のキー）・SHA-256 などを記録する。
+国ごとに URL が変わるページ（Numbeo など）は pattern に URL の形式を記録し、コーパスにない
+国にも同じページを使う。
+test_tool.py のような小さなインライン HTML ではなく実物大のページで、解析・抽出処理を
+ネットワークなしでテスト・計測できる（benchmarks/bench_extractors.py）。
+
+manifest.json の origin は、実サイトから取得したページが "recorded"、各サイトの構造を
+模して作成したページが "synthesized"。record を実行すると実サイトのページで置き換え、
+コーパスの version を上げる。
+
+offline() の間は requests の送信をコーパスのページの応答に置き換える（コーパスにない
+URL は 404）。HTTP サーバーとして提供する場合は site_server.py を使う。
+
+使い方:
+    python -m safety_score_agent corpus list
+    python -m safety_score_agent corpus verify
+    python -m safety_score_agent corpus record numbeo_japan
+"""
+
+import argparse
+import datetime
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+from unittest import mock
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+CORPUS_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(CORPUS_DIR, "manifest.json")
+
+# record で実サイトを取得するときの User-Agent（ツールモジュールと同じ）
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/91.0.4472.124 Safari/537.36")
+
+
+class Page(NamedTuple):
+    """コーパスの1ページ"""
+    name: str
+    source: str        # データソース（dependencies.SOURCES のキー）
+    url: str           # ツールモジュールが取得する URL
+    file: str          # CORPUS_DIR からの相対パス
+    content_type: str
+    origin: str        # "recorded" または "synthesized"
+    recorded_at: str
+    sha256: str
+    pattern: Optional[str] = None   # 同じ構造の他のページの URL（fnmatch 形式）にも使う場合
+
+    @property
+    def path(self) -> str:
+        return os.path.join(CORPUS_DIR, self.file)
+
+
+def load_manifest() -> Dict[str, Any]:
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest: Dict[str, Any]) -> None:
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def corpus_version() -> int:
+    return load_manifest()["version"]
+
+
+def pages() -> List[Page]:
+    return [Page(**entry) for entry in load_manifest()["pages"]]
+
+
+def get_page(name: str) -> Page:
+    for page in pages():
+        if page.name == name:
+            return page
+    raise KeyError(name)
+
+
+def find_page(url: str, candidates: Optional[List[Page]] = None) -> Optional[Page]:
+    """
+    URL に対応するページ（なければ None）
+
+    URL が一致するページがなければ、pattern が一致するページ（例えばコーパスにない国の
+    Numbeo のページには numbeo_japan）を返す。
+
+    Args:
+        url: URL
+        candidates: 探すページ（None なら manifest.json の全ページ）
+    """
+    candidates = pages() if candidates is None else candidates
+    for page in candidates:
+        if page.url == url:
+            return page
+    for page in candidates:
+        if page.pattern and fnmatch.fnmatchcase(url, page.pattern):
+            return page
+    return None
+
+
+def read_page(page: Page) -> bytes:
+    with open(page.path, "rb") as f:
+        return f.read()
+
+
+def parse_page(name: str) -> BeautifulSoup:
+    """ツールモジュールと同じパーサーで解析したページ"""
+    return BeautifulSoup(read_page(get_page(name)), "html.parser")
+
+
+def verify() -> List[str]:
+    """ファイルの欠落・SHA-256 の不一致の一覧（問題がなければ空）"""
+    problems = []
+    for page in pages():
+        if not os.path.exists(page.path):
+            problems.append(f"{page.name}: missing {page.file}")
+        elif hashlib.sha256(read_page(page)).hexdigest() != page.sha256:
+            problems.append(f"{page.name}: sha256 mismatch")
+    return problems
+
+
+def build_response(request: requests.PreparedRequest) -> requests.Response:
+    """request の URL のページを返す応答（コーパスにない URL は 404）"""
+    page = find_page(request.url)
+    if page is None:
+        status, body, headers = 404, b"", {"Content-Type": "text/html"}
+    else:
+        body = read_page(page)
+        status, headers = 200, {"Content-Type": page.content_type, "Content-Length": str(len(body))}
+    raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status, preload_content=False,
+                       decode_content=False)
+    return HTTPAdapter().build_response(request, raw)
+
+
+@contextmanager
+def offline() -> Iterator[None]:
+    """with ブロック内の requests の送信をコーパスの応答に置き換える（ソケットは使わない）"""
+    def send(session, request, **kwargs):
+        response = build_response(request)
+        if not kwargs.get("stream", False):
+            response.content
+        return response
+
+    with mock.patch.object(requests.Session, "send", send):
+        yield
+
+
+def record(names: Optional[List[str]] = None, session: Optional[requests.Session] = None) -> List[Page]:
+    """
+    実サイトからページを取得してコーパスを更新する
+
+    Args:
+        names: 更新するページ名（None なら全ページ）
+        session: 取得に使うセッション（None なら新規作成）
+
+    Returns:
+        更新したページ
+    """
+    session = session or requests.Session()
+    manifest = load_manifest()
+    today = datetime.date.today().isoformat()
+    updated = []
+    for entry in manifest["pages"]:
+        if names and entry["name"] not in names:
+            continue
+        response = session.get(entry["url"], headers={"User-Agent": USER_AGENT}, timeout=30)
+        response.raise_for_status()
+        with open(os.path.join(CORPUS_DIR, entry["file"]), "wb") as f:
+            f.write(response.content)
+        entry.update({
+            "content_type": response.headers.get("Content-Type", entry["content_type"]),
+            "origin": "recorded",
+            "recorded_at": today,
+            "sha256": hashlib.sha256(response.content).hexdigest(),
+        })
+        updated.append(Page(**entry))
+    if updated:
+        manifest["version"] += 1
+        _save_manifest(manifest)
+    return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="取得対象サイトのページのフィクスチャコーパス")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="ページの一覧")
+    commands.add_parser("verify", help="ファイルの欠落と SHA-256 を確認")
+    record_parser = commands.add_parser("record", help="実サイトから取得してページを更新")
+    record_parser.add_argument("names", nargs="*", help="ページ名（省略時は全ページ）")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print(f"version {corpus_version()}")
+        for page in pages():
+            size = os.path.getsize(page.path) if os.path.exists(page.path) else 0
+            print(f"{page.name:<32}{page.source:<12}{size:>9}  {page.origin:<12}{page.url}")
+    elif args.command == "verify":
+        problems = verify()
+        for problem in problems:
+            print(problem, file=sys.stderr)
+        sys.exit(1 if problems else 0)
+    else:
+        for page in record(args.names or None):
+            print(f"recorded {page.name} ({os.path.getsize(page.path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
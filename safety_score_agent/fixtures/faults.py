@@ -0,0 +1,118 @@
+"""代替サーバー（site_server.py）の遅延と障害の注入
+
+サイト（ホスト名またはドメイン）ごとに次の劣化を設定し、フォールバック・リトライ・
+タイムアウトの振る舞いと評価時間への影響を再現・計測する。
+
+- latency / jitter: 最初のバイトまでの遅延（秒）。jitter > 0 なら latency を中央値とする
+  対数正規分布（jitter は対数の標準偏差）
+- bandwidth: 本文の送信速度の上限（バイト/秒）
+- hang_rate: 応答を返さずに接続を保持する割合（hang_seconds 秒後に切断）。クライアントは
+  タイムアウトする
+- status_rates: ステータスコード → 割合（例: {"429": 0.1, "503": 0.05}）
+- truncate_rate: 本文を途中まで送って切断する割合
+
+設定はホスト流量制限（net/limits.py）と同じく、ホスト名 → 設定の JSON で指定する。
+ドメインは配下のホストにも適用され、"*" は一覧にないサイトに適用する。
+
+    {"gallup.com": {"hang_rate": 1.0},
+     "*": {"latency": 0.2, "jitter": 0.5, "bandwidth": 500000, "status_rates": {"503": 0.02}}}
+"""
+
+import math
+import random
+import threading
+from typing import Any, Mapping, NamedTuple, Optional
+
+
+class FaultProfile(NamedTuple):
+    """1サイトの遅延と障害"""
+    latency: float = 0.0
+    jitter: float = 0.0
+    bandwidth: Optional[float] = None
+    hang_rate: float = 0.0
+    hang_seconds: float = 300.0
+    status_rates: Mapping[int, float] = {}
+    truncate_rate: float = 0.0
+
+
+NO_FAULTS = FaultProfile()
+
+
+class Decision(NamedTuple):
+    """1リクエストへの応答方法"""
+    delay: float                    # 最初のバイトまでの遅延（秒）
+    hang: Optional[float]           # 応答を返さずに接続を保持する秒数（None なら応答する）
+    status: int                     # 返すステータスコード（ページの本来の値なら 200）
+    truncate_at: Optional[float]    # 本文を切断する位置（本文の長さに対する割合）
+
+
+def parse_profile(value: Any) -> FaultProfile:
+    if value is None:
+        return NO_FAULTS
+    if not isinstance(value, Mapping):
+        raise ValueError(f"fault profile must be an object or null: {value!r}")
+    unknown = set(value) - set(FaultProfile._fields)
+    if unknown:
+        raise ValueError(f"unknown fault settings: {', '.join(sorted(unknown))}")
+    bandwidth = value.get("bandwidth")
+    return FaultProfile(
+        latency=float(value.get("latency", 0.0)),
+        jitter=float(value.get("jitter", 0.0)),
+        bandwidth=float(bandwidth) if bandwidth else None,
+        hang_rate=float(value.get("hang_rate", 0.0)),
+        hang_seconds=float(value.get("hang_seconds", NO_FAULTS.hang_seconds)),
+        status_rates={int(status): float(rate) for status, rate in (value.get("status_rates") or {}).items()},
+        truncate_rate=float(value.get("truncate_rate", 0.0)),
+    )
+
+
+class FaultPlan:
+    """サイトごとの遅延と障害（乱数はシードで再現できる）"""
+
+    def __init__(self, profiles: Optional[Mapping[str, FaultProfile]] = None,
+                 default: FaultProfile = NO_FAULTS, seed: Optional[int] = None):
+        """
+        Args:
+            profiles: ホスト名（またはドメイン）→ 設定。ドメインは配下のホストにも適用される
+            default: 一覧にないサイトの設定
+            seed: 乱数のシード
+        """
+        self.profiles = dict(profiles or {})
+        self.default = default
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any], seed: Optional[int] = None) -> "FaultPlan":
+        """ホスト名 → 設定の辞書から作成（"*" は一覧にないサイト）"""
+        profiles = {host.lower(): parse_profile(value) for host, value in config.items() if host != "*"}
+        return cls(profiles, parse_profile(config.get("*")), seed)
+
+    def profile_for(self, host: str) -> FaultProfile:
+        """ホストの設定（完全一致 → 親ドメインの順に探す）"""
+        host = host.lower()
+        if host in self.profiles:
+            return self.profiles[host]
+        parts = host.split(".")
+        for index in range(1, len(parts) - 1):
+            profile = self.profiles.get(".".join(parts[index:]))
+            if profile is not None:
+                return profile
+        return self.default
+
+    def decide(self, host: str) -> Decision:
+        """ホストへの1リクエストの応答方法を決める"""
+        profile = self.profile_for(host)
+        with self._lock:
+            delay = profile.latency
+            if profile.jitter > 0 and profile.latency > 0:
+                delay = self._random.lognormvariate(math.log(profile.latency), profile.jitter)
+            if self._random.random() < profile.hang_rate:
+                return Decision(delay, profile.hang_seconds, 200, None)
+            draw = self._random.random()
+            for status, rate in sorted(profile.status_rates.items()):
+                if draw < rate:
+                    return Decision(delay, None, status, None)
+                draw -= rate
+            truncate_at = self._random.uniform(0.1, 0.9) if self._random.random() < profile.truncate_rate else None
+            return Decision(delay, None, 200, truncate_at)
@@ -0,0 +1,217 @@
+"""取得対象サイトの代替サーバー（フィクスチャコーパスのページを返すローカル HTTP サーバー）
+
+ツールモジュールが取得する全サイト（numbeo.com、anzen.mofa.go.jp、transparency.org、who.int、
+visionofhumanity.org、info.worldbank.org、gallup.com、oecdbetterlifeindex.org など）の
+ページをコーパス（corpus.py）から返す。インターネットに接続できない環境でも、評価全体の
+スループットや負荷を計測できる。
+
+リクエストは /<ホスト名><パス>?<クエリ> の形式で受け取る。ツールモジュールの URL は
+SAFETY_SCORE_SITE_BASE_URL（net/standin.py）を設定するとこの形式に書き換えられる。
+
+    python -m safety_score_agent sites --port 8800
+    SAFETY_SCORE_SITE_BASE_URL=http://127.0.0.1:8800 python -m safety_score_agent serve
+
+コーパスにない URL は 404 を返す。国ごとに URL が変わるページは manifest.json の
+pattern に一致すれば同じページを返す。
+
+--faults（または SAFETY_SCORE_SITE_FAULTS）でサイトごとの遅延・帯域・無応答・429/5xx・
+本文の切断を注入できる（faults.py）。
+
+    python -m safety_score_agent sites --faults '{"gallup.com": {"hang_rate": 1.0}}'
+"""
+
+import argparse
+import collections
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from .. import config
+from . import corpus
+from .faults import FaultPlan
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8800
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def _respond(self, body: bool) -> None:
+        site = self.server.site
+        host, page, content = site.lookup(self.path)
+        decision = site.faults.decide(host)
+        if decision.delay > 0 and site.wait(decision.delay):
+            return
+        if decision.hang is not None:
+            # 応答を返さずに接続を保持し、クライアントをタイムアウトさせる
+            site.record(host, "hang")
+            site.wait(decision.hang)
+            self.close_connection = True
+            return
+        if page is None or decision.status != 200:
+            status = 404 if page is None else decision.status
+            site.record(host, str(status))
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "0")
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", page.content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        site.record(host, "ok" if decision.truncate_at is None or not body else "truncated")
+        if not body:
+            return
+        if decision.truncate_at is not None:
+            content = content[:int(len(content) * decision.truncate_at)]
+            self.close_connection = True
+        try:
+            self._write(content, site.faults.profile_for(host).bandwidth, site)
+        except ConnectionError:
+            # クライアントが先に切断した（ヘッジの負けた側やタイムアウト）
+            pass
+
+    def _write(self, content: bytes, bandwidth: Optional[float], site: "SiteServer") -> None:
+        if not bandwidth:
+            self.wfile.write(content)
+            return
+        # 約 50ms ごとに区切って送り、送った量に応じて待つ
+        chunk = max(1024, int(bandwidth / 20))
+        for start in range(0, len(content), chunk):
+            part = content[start:start + chunk]
+            if site.wait(len(part) / bandwidth):
+                return
+            self.wfile.write(part)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    site: "SiteServer"
+
+
+class SiteServer:
+    """
+    取得対象サイトの代替サーバー
+
+    with SiteServer() as server: の間、server.base_url で待ち受ける（port=0 なら空きポート）。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Optional[FaultPlan] = None):
+        """
+        Args:
+            host: 待ち受けるアドレス
+            port: 待ち受けるポート（0 なら空きポート）
+            faults: サイトごとの遅延と障害（None なら注入しない）
+        """
+        self.faults = faults or FaultPlan()
+        self._pages = corpus.pages()
+        self._contents = {page.name: corpus.read_page(page) for page in self._pages}
+        self._outcomes: Dict[str, Dict[str, int]] = collections.defaultdict(collections.Counter)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._server = _Server((host, port), _Handler)
+        self._server.site = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def lookup(self, path: str) -> Tuple[str, Optional[corpus.Page], bytes]:
+        """/<ホスト名><パス> に対応する (ホスト名, ページ, 本文)（ページがなければ None）"""
+        host, _, rest = path.lstrip("/").partition("/")
+        for scheme in ("https", "http"):
+            page = corpus.find_page(f"{scheme}://{host}/{rest}", self._pages)
+            if page is not None:
+                return host, page, self._contents[page.name]
+        return host, None, b""
+
+    def record(self, host: str, outcome: str) -> None:
+        with self._lock:
+            self._outcomes[host][outcome] += 1
+
+    def wait(self, seconds: float) -> bool:
+        """seconds 秒待つ（停止中なら待たずに True を返す）"""
+        return self._stopping.wait(seconds)
+
+    def stats(self) -> Dict[str, int]:
+        """ホスト名ごとのリクエスト数"""
+        with self._lock:
+            return {host: sum(outcomes.values()) for host, outcomes in self._outcomes.items()}
+
+    def outcomes(self) -> Dict[str, Dict[str, int]]:
+        """ホスト名 → 応答の種類（ok / hang / truncated / ステータスコード）ごとのリクエスト数"""
+        with self._lock:
+            return {host: dict(outcomes) for host, outcomes in self._outcomes.items()}
+
+    def start(self) -> "SiteServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="site-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def __enter__(self) -> "SiteServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="取得対象サイトの代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--faults", help="遅延と障害の設定（JSON またはそのファイルのパス。省略時は SAFETY_SCORE_SITE_FAULTS）")
+    parser.add_argument("--seed", type=int, help="障害の乱数のシード")
+    args = parser.parse_args()
+
+    faults = config.get_site_faults()
+    if args.faults:
+        if os.path.exists(args.faults):
+            with open(args.faults, encoding="utf-8") as f:
+                faults = json.load(f)
+        else:
+            faults = json.loads(args.faults)
+    server = SiteServer(args.host, args.port, FaultPlan.from_dict(faults, seed=args.seed))
+    print(f"serving {len(corpus.pages())} pages at {server.base_url}")
+    print(f"export SAFETY_SCORE_SITE_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
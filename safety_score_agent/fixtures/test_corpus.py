@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from safety_score_agent.fixtures import corpus
+from safety_score_agent.sub_agents.conflict_agent import tool as conflict_tool
+from safety_score_agent.sub_agents.crime_agent import tool as crime_tool
+from safety_score_agent.sub_agents.infra_agent import tool as infra_tool
+from safety_score_agent.sub_agents.law_agent import tool as law_tool
+
+
+class TestCorpus(unittest.TestCase):
+    """フィクスチャコーパスのテスト"""
+
+    def test_manifest_matches_files(self):
+        self.assertEqual(corpus.verify(), [])
+        self.assertEqual(len({page.url for page in corpus.pages()}), len(corpus.pages()))
+
+    def test_offline_serves_pages_to_tools(self):
+        with corpus.offline():
+            numbeo = crime_tool.get_numbeo_crime_data("Japan")
+            cpi = infra_tool.get_corruption_data("Japan")
+            wgi = law_tool.get_world_bank_governance_data("Japan")
+            conflict = conflict_tool.get_conflict_risk_info("イエメン")
+
+        self.assertEqual(numbeo["crime_index"], 22.11)
+        self.assertEqual(cpi["cpi_score"], 73.0)
+        self.assertEqual(wgi["rule_of_law_percentile"], 89.6)
+        self.assertTrue(conflict["data"]["イエメン"]["danger_level"].startswith("レベル4"))
+
+    def test_offline_unknown_url_is_not_found(self):
+        with corpus.offline():
+            response = requests.get("https://www.numbeo.com/cost-of-living/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_pattern_page_for_other_countries(self):
+        page = corpus.find_page("https://www.numbeo.com/crime/country_result.jsp?country=Peru")
+        self.assertEqual(page.name, "numbeo_japan")
+        self.assertEqual(corpus.find_page("https://www.visionofhumanity.org/maps/country/japan/").name,
+                         "visionofhumanity_japan")
+
+    def test_record_updates_page_and_manifest(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        shutil.copytree(os.path.join(corpus.CORPUS_DIR, "pages"), os.path.join(directory, "pages"))
+        shutil.copy(corpus.MANIFEST_PATH, directory)
+        session = Mock()
+        session.get.return_value = Mock(content=b"<html>live</html>", headers={"Content-Type": "text/html"})
+
+        with patch.object(corpus, "CORPUS_DIR", directory), \
+                patch.object(corpus, "MANIFEST_PATH", os.path.join(directory, "manifest.json")):
+            version = corpus.corpus_version()
+            [page] = corpus.record(["gallup_world_poll"], session=session)
+
+            self.assertEqual(corpus.read_page(page), b"<html>live</html>")
+            self.assertEqual(corpus.corpus_version(), version + 1)
+            self.assertEqual(corpus.verify(), [])
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+            entry = next(entry for entry in json.load(f)["pages"] if entry["name"] == "gallup_world_poll")
+        self.assertEqual(entry["origin"], "recorded")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import collections
+import http.client
+import time
+import unittest
+
+import requests
+
+from safety_score_agent.fixtures.faults import FaultPlan, FaultProfile, parse_profile
+from safety_score_agent.fixtures.site_server import SiteServer
+
+NUMBEO_PATH = "/www.numbeo.com/crime/country_result.jsp?country=Japan"
+
+
+class TestFaultPlan(unittest.TestCase):
+    """遅延と障害の設定のテスト"""
+
+    def test_parse_profile(self):
+        profile = parse_profile({"latency": 0.2, "status_rates": {"429": 0.5}, "bandwidth": 1000})
+        self.assertEqual(profile, FaultProfile(latency=0.2, bandwidth=1000.0, status_rates={429: 0.5}))
+        with self.assertRaises(ValueError):
+            parse_profile({"latncy": 0.2})
+
+    def test_profile_for_domain_and_default(self):
+        plan = FaultPlan.from_dict({"gallup.com": {"hang_rate": 1.0}, "*": {"latency": 0.1}})
+        self.assertEqual(plan.profile_for("www.gallup.com").hang_rate, 1.0)
+        self.assertEqual(plan.profile_for("news.gallup.com").hang_rate, 1.0)
+        self.assertEqual(plan.profile_for("www.numbeo.com").latency, 0.1)
+
+    def test_status_rates_are_reproducible(self):
+        config = {"*": {"status_rates": {"429": 0.3, "503": 0.2}}}
+        first = [FaultPlan.from_dict(config, seed=1).decide("a") for _ in range(5)]
+        second = [FaultPlan.from_dict(config, seed=1).decide("a") for _ in range(5)]
+        self.assertEqual(first, second)
+
+        plan = FaultPlan.from_dict(config, seed=2)
+        counts = collections.Counter(plan.decide("a").status for _ in range(2000))
+        self.assertAlmostEqual(counts[429] / 2000, 0.3, delta=0.05)
+        self.assertAlmostEqual(counts[503] / 2000, 0.2, delta=0.05)
+
+
+class TestFaultyServer(unittest.TestCase):
+    """障害を注入した代替サーバーのテスト"""
+
+    def start(self, config):
+        server = SiteServer(faults=FaultPlan.from_dict(config, seed=0)).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_status(self):
+        server = self.start({"www.numbeo.com": {"status_rates": {"429": 1.0}}})
+        response = requests.get(server.base_url + NUMBEO_PATH, timeout=5)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        self.assertEqual(server.outcomes()["www.numbeo.com"], {"429": 1})
+
+    def test_truncated_body(self):
+        server = self.start({"*": {"truncate_rate": 1.0}})
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            requests.get(server.base_url + NUMBEO_PATH, timeout=5)
+        self.assertEqual(server.outcomes()["www.numbeo.com"], {"truncated": 1})
+
+    def test_hang_times_out(self):
+        server = self.start({"www.numbeo.com": {"hang_rate": 1.0, "hang_seconds": 5}})
+        with self.assertRaises(requests.exceptions.Timeout):
+            requests.get(server.base_url + NUMBEO_PATH, timeout=0.3)
+        self.assertEqual(server.outcomes()["www.numbeo.com"], {"hang": 1})
+
+    def test_latency_and_bandwidth(self):
+        server = self.start({"*": {"latency": 0.2, "bandwidth": 50000}})
+        connection = http.client.HTTPConnection(server.base_url[len("http://"):], timeout=5)
+        self.addCleanup(connection.close)
+        started = time.perf_counter()
+        connection.request("GET", NUMBEO_PATH)
+        response = connection.getresponse()
+        body = response.read()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(body), int(response.headers["Content-Length"]))
+        # 応答前の遅延と、帯域の上限で本文の送信にかかる時間（タイマーの誤差を許容）
+        self.assertGreaterEqual(elapsed, 0.2 + len(body) / 50000 - 0.05)
+        self.assertEqual(server.outcomes()["www.numbeo.com"], {"ok": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from safety_score_agent.fixtures.site_server import SiteServer
+from safety_score_agent.net import limits
+from safety_score_agent.net.limits import HostGovernor
+from safety_score_agent.net.standin import local_url
+from safety_score_agent.sub_agents.crime_agent import tool as crime_tool
+from safety_score_agent.sub_agents.law_agent import tool as law_tool
+
+
+class TestLocalUrl(unittest.TestCase):
+    """代替サーバーの URL への書き換えのテスト"""
+
+    def test_local_url(self):
+        base = "http://127.0.0.1:8800/"
+        self.assertEqual(local_url("https://www.numbeo.com/crime/country_result.jsp?country=United%20States", base),
+                         "http://127.0.0.1:8800/www.numbeo.com/crime/country_result.jsp?country=United%20States")
+        self.assertEqual(local_url("https://www.who.int", base), "http://127.0.0.1:8800/www.who.int/")
+
+
+class TestSiteServer(unittest.TestCase):
+    """代替サーバーのテスト"""
+
+    def setUp(self):
+        self.server = SiteServer().start()
+        self.addCleanup(self.server.stop)
+        limits.set_governor(HostGovernor({}))
+        self.addCleanup(limits.set_governor, None)
+        limits.install()
+        environ = patch.dict(os.environ, {"SAFETY_SCORE_SITE_BASE_URL": self.server.base_url})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def test_tools_fetch_from_server(self):
+        numbeo = crime_tool.get_numbeo_crime_data("Japan")
+        governance = law_tool.get_world_bank_governance_data("Japan")
+        gpi = law_tool.get_gpi_law_enforcement_data("United States")
+
+        self.assertEqual(numbeo["crime_index"], 22.11)
+        self.assertEqual(governance["rule_of_law_percentile"], 89.6)
+        self.assertIsNotNone(gpi["security_officers_and_police"])
+        stats = self.server.stats()
+        self.assertEqual(stats["www.numbeo.com"], 1)
+        self.assertEqual(stats["www.visionofhumanity.org"], 2)
+
+    def test_unknown_url_is_not_found(self):
+        response = requests.get("https://www.numbeo.com/cost-of-living/", timeout=5)
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""テスト用のツール出力
+
+スコア計算・ランキング表・依存グラフ・バッチ実行のテストで共通に使う、4つのツール
+モジュールの出力を組み立てる。
+"""
+
+from typing import Any, Dict, Optional
+
+# テロ・紛争の高リスク国の一覧
+HIGH_RISK = [{"country": "イエメン", "estimated_risk": "高"}, {"country": "ミャンマー", "estimated_risk": "中-高"}]
+
+
+def make_sources(safety_index: float, cpi: float = 70, rule_of_law: float = 80, danger_level: Optional[str] = None,
+                 name_ja: str = "") -> Dict[str, Any]:
+    """
+    1か国分の4つのツールの出力（leaderboard.fetch_country_sources の戻り値の形式）
+
+    Args:
+        safety_index: Numbeo の安全指数
+        cpi: 腐敗認識指数
+        rule_of_law: 法の支配のパーセンタイル
+        danger_level: 外務省の危険レベル（省略時はなし）
+        name_ja: 危険レベルを設定する国の日本語名
+    """
+    conflict = {"status": "success", "data": {}, "high_risk_countries": HIGH_RISK}
+    if danger_level:
+        conflict["data"][name_ja] = {"danger_level": danger_level}
+    return {
+        "conflict": conflict,
+        "crime": {
+            "numbeo_data": {"safety_index": safety_index},
+            "global_peace_index": {"peace_score": 1.5},
+            "unodc_homicide_rate": {"homicide_rate_per_100k": 0.8},
+        },
+        "infra": {
+            "corruption_perception_index": {"cpi_score": cpi},
+            "traffic_safety_data": {"road_traffic_deaths_per_100k": 4.1},
+            "healthcare_system": {"healthcare_access_quality_index": 85.0},
+        },
+        "law": {
+            "global_peace_index_data": {"police_reliability_score": 1.8},
+            "world_bank_governance": {"rule_of_law_percentile": rule_of_law},
+            "police_trust_indicators": {"public_trust_in_police": 75, "corruption_in_police_force": 20},
+        },
+    }
@@ -0,0 +1,38 @@
+"""モジュール属性の遅延生成
+
+エージェント定義モジュールは import 時に google.adk やツールモジュール（requests, bs4）を
+読み込まず、属性への初回アクセス時にエージェントを構築する（PEP 562 の module __getattr__）。
+構築したオブジェクトはモジュール属性としてキャッシュされ、2回目以降は通常の属性参照になる。
+"""
+
+import sys
+import threading
+from typing import Any, Callable, Dict
+
+# 複数スレッドから同時にアクセスされても1度だけ構築する（構築中の再帰アクセスを許可）
+_build_lock = threading.RLock()
+
+
+def lazy_attributes(module_name: str, factories: Dict[str, Callable[[], Any]]) -> Callable[[str], Any]:
+    """
+    遅延生成する属性を持つモジュール用の __getattr__ を作成
+
+    Args:
+        module_name: 対象モジュールの __name__
+        factories: 属性名 → 生成関数
+
+    Returns:
+        Callable: モジュールの __getattr__ として設定する関数
+    """
+    def __getattr__(name: str) -> Any:
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+        module = sys.modules[module_name]
+        with _build_lock:
+            if name not in module.__dict__:
+                setattr(module, name, factory())
+        return module.__dict__[name]
+
+    return __getattr__
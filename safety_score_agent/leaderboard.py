@@ -0,0 +1,405 @@
+"""国別安全スコアのランキング表（マテリアライズドビュー）
+
+「アジアで最も安全な10か国」のようなランキングの問い合わせに、国ごとに
+評価パイプラインを実行せずに答えるため、ツールモジュールの出力から計算した
+カテゴリ別スコアと合計を SQLite に保存しておく。
+
+- 更新は差分のみ: 国ごとにデータソース（Numbeo、CPI など）単位のフィンガープリントを
+  保存し、変わったソースから依存グラフ（dependencies.py）でたどれる構成要素・
+  カテゴリスコアだけを再計算する。影響のない構成要素は保存済みの値を使う。
+  max_age_seconds を指定すると、その期間内に確認済みの国はデータ取得自体を省略する。
+- スコアは scoring.py の一括計算で求める（各カテゴリ 25 点満点、合計 100 点満点。
+  犯罪・治安は 0-100 のスコアを 25 点満点に換算する）。
+
+使い方:
+    python -m safety_score_agent.leaderboard refresh --region asia
+    python -m safety_score_agent.leaderboard top --region asia -n 10
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from . import config
+from .countries import Country, get_countries
+from .dependencies import COMPONENT_CATEGORIES, TOOL_KEYS, changed_sources, invalidated, source_fingerprints
+from .scoring import (
+    COMPONENTS,
+    columns_from_tool_results,
+    combine_components,
+    extract_indicators,
+    score_all,
+    score_components,
+    score_conflict,
+)
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("conflict", "crime", "infrastructure", "law_enforcement", "total")
+LEADERBOARD_FILENAME = "leaderboard.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leaderboard (
+    country TEXT PRIMARY KEY,
+    country_ja TEXT NOT NULL,
+    region TEXT NOT NULL,
+    conflict REAL NOT NULL,
+    crime REAL NOT NULL,
+    infrastructure REAL NOT NULL,
+    law_enforcement REAL NOT NULL,
+    total REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leaderboard_region ON leaderboard (region);
+CREATE TABLE IF NOT EXISTS source_fingerprints (
+    country TEXT NOT NULL,
+    source TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (country, source)
+);
+CREATE TABLE IF NOT EXISTS component_scores (
+    country TEXT NOT NULL,
+    component TEXT NOT NULL,
+    value REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (country, component)
+);
+"""
+
+
+def fetch_country_sources(country: Country, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """4つのツールモジュールから1か国分のデータを取得（timings を渡すとツールごとの所要時間を記録）"""
+    from .sub_agents.conflict_agent.tool import get_conflict_risk_info
+    from .sub_agents.crime_agent.tool import get_crime_data
+    from .sub_agents.infra_agent.tool import get_infrastructure_data
+    from .sub_agents.law_agent.tool import get_law_enforcement_data
+
+    calls = {
+        "conflict": lambda: get_conflict_risk_info(country.name_ja),
+        "crime": lambda: get_crime_data(country.name),
+        "infra": lambda: get_infrastructure_data(country.name),
+        "law": lambda: get_law_enforcement_data(country.name),
+    }
+    sources = {}
+    for key, call in calls.items():
+        started = time.perf_counter()
+        sources[key] = call()
+        if timings is not None:
+            timings[key] = time.perf_counter() - started
+    return sources
+
+
+def category_points(category: str, score: float) -> float:
+    """カテゴリのスコアをランキングの点数（25 点満点）にする（犯罪・治安は 0-100 のスコアを換算）"""
+    return round(score / 4, 1) if category == "crime" else score
+
+
+def total_points(scores: Mapping[str, float]) -> float:
+    """カテゴリ別の点数の合計（100 点満点）"""
+    return round(scores["conflict"] + scores["crime"] + scores["infrastructure"] + scores["law_enforcement"], 1)
+
+
+def score_country_sources(country: Country, sources: Mapping[str, Any]) -> Dict[str, float]:
+    """ツール出力からカテゴリ別の点数（各 25 点満点）と合計（100 点満点）を計算"""
+    columns = columns_from_tool_results([sources.get("crime")], [sources.get("infra")], [sources.get("law")])
+    scores = score_all(columns)
+    result = {"conflict": score_conflict(sources.get("conflict"), country.name_ja)}
+    for category in COMPONENTS:
+        result[category] = category_points(category, float(scores[category][0]))
+    result["total"] = total_points(result)
+    return result
+
+
+def _fingerprint(fingerprints: Mapping[str, str]) -> str:
+    """データソースごとのフィンガープリントをまとめた国単位のフィンガープリント"""
+    return hashlib.sha256(json.dumps(fingerprints, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _value(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+class Leaderboard:
+    """国別安全スコアのランキング表"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite ファイルのパス（省略時は SAFETY_SCORE_DATA_DIR/leaderboard.sqlite3）
+        """
+        if path is None:
+            path = os.path.join(config.get_data_dir(), LEADERBOARD_FILENAME)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def refresh(
+        self,
+        countries: Optional[Iterable[Country]] = None,
+        fetch_sources: Callable[[Country], Dict[str, Any]] = fetch_country_sources,
+        max_age_seconds: Optional[float] = None,
+        max_workers: int = 4,
+    ) -> Dict[str, int]:
+        """
+        ツールからデータを取得してランキング表を差分更新
+
+        Args:
+            countries: 対象国（省略時は全対象国）
+            fetch_sources: 1か国分のツール出力を返す関数
+            max_age_seconds: この期間内に確認済みの国は取得を省略する
+            max_workers: 並列に取得する国の数
+
+        Returns:
+            Dict[str, int]: skipped（取得省略）, updated, unchanged の件数
+        """
+        countries = list(countries) if countries is not None else get_countries()
+        skipped = 0
+        if max_age_seconds is not None:
+            checked = self._checked_at()
+            cutoff = time.time() - max_age_seconds
+            fresh = [c for c in countries if checked.get(c.name, 0.0) >= cutoff]
+            skipped = len(fresh)
+            countries = [c for c in countries if checked.get(c.name, 0.0) < cutoff]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            sources = dict(zip((c.name for c in countries), executor.map(fetch_sources, countries)))
+
+        stats = self.apply_sources({c.name: c for c in countries}, sources)
+        stats["skipped"] = skipped
+        return stats
+
+    def apply_sources(self, countries: Mapping[str, Country], sources: Mapping[str, Mapping[str, Any]]) -> Dict[str, int]:
+        """
+        取得済みのツール出力から、変更のあったデータソースに依存するスコアだけを再計算
+
+        Args:
+            countries: 英語名 → 対象国
+            sources: 英語名 → {"conflict", "crime", "infra", "law"} のツール出力
+
+        Returns:
+            Dict[str, int]: updated（スコアを再計算した国）, unchanged の件数
+        """
+        names = [name for name in countries if name in sources]
+        if not names:
+            return {"updated": 0, "unchanged": 0}
+
+        rows = {row["country"]: row for row in self._conn.execute("SELECT * FROM leaderboard").fetchall()}
+        stored_sources = self._source_fingerprints()
+        stored_components = self._component_values()
+        now = time.time()
+
+        records, component_records, fingerprint_records, stale_components = [], [], [], []
+        unchanged = []
+        recomputed = 0
+        for name in names:
+            country = countries[name]
+            fingerprints = source_fingerprints(sources[name], country.name_ja)
+            previous = stored_sources.get(name) if name in rows else None
+            changed = changed_sources(previous, fingerprints)
+            fingerprint_records.extend((name, source, fingerprints[source]) for source in changed)
+            invalidation = invalidated(changed)
+            if not invalidation.scores:
+                unchanged.append(name)
+                continue
+
+            scores = dict(rows[name]) if name in rows else {}
+            known = stored_components.get(name, {}) if name in rows else {}
+            if "conflict" in invalidation.scores:
+                scores["conflict"] = score_conflict(sources[name].get("conflict"), country.name_ja)
+            for category in COMPONENTS:
+                if category not in invalidation.scores and category in scores:
+                    continue
+                values, updated = self._category_components(
+                    category, sources[name].get(TOOL_KEYS[category]), invalidation.components, known
+                )
+                if values is None:
+                    # 不正な値を含むカテゴリはデフォルト値。構成要素は次回すべて再計算する
+                    stale_components.extend(
+                        (name, component) for component, _, _ in COMPONENTS[category] if component in known
+                    )
+                    values = {component: math.nan for component, _, _ in COMPONENTS[category]}
+                component_records.extend(
+                    (name, component, None if math.isnan(updated[component]) else updated[component], now)
+                    for component in updated
+                )
+                recomputed += len(updated)
+                score = float(combine_components(category, {key: [value] for key, value in values.items()})[0])
+                scores[category] = category_points(category, score)
+
+            total = total_points(scores)
+            fingerprint = _fingerprint({**(previous or {}), **fingerprints})
+            records.append((
+                country.name, country.name_ja, country.region, scores["conflict"], scores["crime"],
+                scores["infrastructure"], scores["law_enforcement"], total, fingerprint, now, now,
+            ))
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO leaderboard VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", records
+            )
+            self._conn.executemany("DELETE FROM component_scores WHERE country = ? AND component = ?", stale_components)
+            self._conn.executemany("INSERT OR REPLACE INTO component_scores VALUES (?, ?, ?, ?)", component_records)
+            self._conn.executemany("INSERT OR REPLACE INTO source_fingerprints VALUES (?, ?, ?)", fingerprint_records)
+            self._conn.executemany(
+                "UPDATE leaderboard SET checked_at = ? WHERE country = ?", [(now, name) for name in unchanged]
+            )
+        logger.info(f"Leaderboard refresh: {len(records)} updated ({recomputed} components), "
+                    f"{len(unchanged)} unchanged")
+        return {"updated": len(records), "unchanged": len(unchanged)}
+
+    @staticmethod
+    def _category_components(
+        category: str,
+        tool_output: Any,
+        invalid: Iterable[str],
+        known: Mapping[str, float],
+    ) -> Tuple[Optional[Dict[str, float]], Dict[str, float]]:
+        """
+        1カテゴリの構成要素を、無効になったもの（と未保存のもの）だけ再計算
+
+        Returns:
+            (構成要素 → 値, 再計算した構成要素 → 値)。不正な値を含む場合は (None, {})
+        """
+        indicators = extract_indicators(category, tool_output)
+        if indicators is None:
+            return None, {}
+        names = [name for name, _, _ in COMPONENTS[category] if name in invalid or name not in known]
+        updated = {
+            name: float(values[0])
+            for name, values in score_components(
+                category, {key: [value] for key, value in indicators.items()}, names
+            ).items()
+        }
+        return {name: updated.get(name, known.get(name)) for name, _, _ in COMPONENTS[category]}, updated
+
+    def components(self, country: str) -> Dict[str, Dict[str, Any]]:
+        """
+        1か国分の構成要素の値（欠損は None）と更新時刻
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 構成要素名 → {"category", "value", "updated_at"}
+        """
+        rows = self._conn.execute(
+            "SELECT component, value, updated_at FROM component_scores WHERE country = ?", (country,)
+        ).fetchall()
+        return {
+            row["component"]: {
+                "category": COMPONENT_CATEGORIES[row["component"]],
+                "value": row["value"],
+                "updated_at": row["updated_at"],
+            }
+            for row in rows
+        }
+
+    def top(self, n: int = 10, region: Optional[str] = None, category: str = "total",
+            ascending: bool = False) -> List[Dict[str, Any]]:
+        """
+        スコア上位（ascending=True で下位）の国を取得
+
+        Args:
+            n: 件数
+            region: 地域キー（countries.REGION_LABELS。省略時は全地域）
+            category: 並べ替えに使うカテゴリ（CATEGORIES）
+            ascending: True の場合はスコアの低い順
+
+        Returns:
+            List[Dict[str, Any]]: 順位（rank）付きの国別スコア
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown category: {category!r} (expected one of {CATEGORIES})")
+        order = "ASC" if ascending else "DESC"
+        query = "SELECT * FROM leaderboard"
+        params: List[Any] = []
+        if region:
+            query += " WHERE region = ?"
+            params.append(region)
+        query += f" ORDER BY {category} {order}, country LIMIT ?"
+        params.append(n)
+        rows = self._conn.execute(query, params).fetchall()
+        return [{"rank": rank, **self._public(row)} for rank, row in enumerate(rows, start=1)]
+
+    def get(self, country: str) -> Optional[Dict[str, Any]]:
+        """1か国分のスコアを取得"""
+        row = self._conn.execute("SELECT * FROM leaderboard WHERE country = ?", (country,)).fetchone()
+        return self._public(row) if row else None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM leaderboard").fetchone()[0]
+
+    @staticmethod
+    def _public(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record.pop("fingerprint")
+        return record
+
+    def _source_fingerprints(self) -> Dict[str, Dict[str, str]]:
+        fingerprints: Dict[str, Dict[str, str]] = {}
+        for country, source, fingerprint in self._conn.execute("SELECT * FROM source_fingerprints"):
+            fingerprints.setdefault(country, {})[source] = fingerprint
+        return fingerprints
+
+    def _component_values(self) -> Dict[str, Dict[str, float]]:
+        values: Dict[str, Dict[str, float]] = {}
+        for country, component, value, _ in self._conn.execute("SELECT * FROM component_scores"):
+            values.setdefault(country, {})[component] = _value(value)
+        return values
+
+    def _checked_at(self) -> Dict[str, float]:
+        return dict(self._conn.execute("SELECT country, checked_at FROM leaderboard").fetchall())
+
+
+def main() -> None:
+    """ランキング表の更新・問い合わせ"""
+    parser = argparse.ArgumentParser(description="国別安全スコアのランキング表")
+    parser.add_argument("--path", help="SQLite ファイルのパス")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refresh = subparsers.add_parser("refresh", help="ツールからデータを取得して差分更新")
+    refresh.add_argument("--region")
+    refresh.add_argument("--max-age", type=float, help="この秒数以内に確認済みの国は取得しない")
+    refresh.add_argument("--workers", type=int, default=4)
+
+    top = subparsers.add_parser("top", help="スコア上位の国を表示")
+    top.add_argument("--region")
+    top.add_argument("--category", default="total", choices=CATEGORIES)
+    top.add_argument("-n", type=int, default=10)
+    top.add_argument("--ascending", action="store_true")
+    args = parser.parse_args()
+
+    leaderboard = Leaderboard(args.path)
+    if args.command == "refresh":
+        from .net import limits
+
+        logging.basicConfig(level=logging.INFO)
+        limits.install()
+        stats = leaderboard.refresh(get_countries(args.region), max_age_seconds=args.max_age, max_workers=args.workers)
+        print(json.dumps(stats))
+    else:
+        started = time.perf_counter()
+        rows = leaderboard.top(args.n, region=args.region, category=args.category, ascending=args.ascending)
+        elapsed = (time.perf_counter() - started) * 1000
+        for row in rows:
+            print(f"{row['rank']:>3}. {row['country']:<32} {row[args.category]:6.1f}  "
+                  f"(紛争 {row['conflict']:.1f} / 犯罪 {row['crime']:.1f} / "
+                  f"基盤 {row['infrastructure']:.1f} / 法執行 {row['law_enforcement']:.1f})")
+        print(f"({len(rows)} rows in {elapsed:.2f} ms)")
+    leaderboard.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""配信サーバーの負荷試験
+
+配信用アプリ（server.py）の GET /evaluate に、指定した同時セッション数と国の構成比で
+評価リクエストを送り続け、スループット・レイテンシ（p50/p95/p99）・エラー率と、
+ワーカーごとの常駐メモリの増加（/metrics の process_resident_memory_bytes）を表示する。
+デプロイの規模の見積もりや、同時実行数を上げたときの性能の急落の検出に使う。
+
+--url を省略すると、代替サーバー（fixtures/site_server.py）と fake モデル（fake_llm.py）を
+使う配信サーバーを --workers 個のプロセスとして起動し、セッションを順に振り分ける。
+インターネットや Gemini に接続せずに、オーケストレーション・ツール層・配信のオーバーヘッドを
+計測できる。モデルの応答時間は --first-token-seconds / --token-seconds、サイトの遅延と障害は
+--faults（faults.py）で指定する。
+
+国の構成比は 国名:重み で指定する（重みの省略時は 1、国名は英語名または日本語名）。
+
+使い方:
+    python -m safety_score_agent loadtest --workers 2 --sessions 16 --requests 200
+    python -m safety_score_agent loadtest --countries Japan:5 France:2 イエメン --duration 60
+    python -m safety_score_agent loadtest --url http://127.0.0.1:8000 --sessions 4 --requests 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+import requests
+
+from .countries import Country, get_countries, get_country
+from .metrics import percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSIONS = 8
+DEFAULT_REQUESTS = 100
+DEFAULT_WORKERS = 1
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 300.0
+MEMORY_SAMPLE_INTERVAL_SECONDS = 1.0
+READY_TIMEOUT_SECONDS = 120.0
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Sample(NamedTuple):
+    """1リクエストの結果"""
+    worker: str                # 送信先の配信サーバーの URL
+    country: str
+    seconds: float
+    error: Optional[str]       # None なら成功（HTTP ステータス・評価のエラー・例外の種類）
+
+
+def parse_mix(specs: List[str], region: Optional[str] = None) -> List[Tuple[Country, float]]:
+    """国名:重み の一覧から国の構成比を作成（省略時は対象国すべてを同じ重みで）"""
+    if not specs:
+        return [(country, 1.0) for country in get_countries(region)]
+    mix = []
+    for spec in specs:
+        name, _, weight = spec.rpartition(":") if ":" in spec else (spec, "", "1")
+        country = get_country(name)
+        if country is None:
+            raise ValueError(f"unknown country: {name}")
+        mix.append((country, float(weight)))
+    return mix
+
+
+def read_resident_memory(url: str, session: Optional[requests.Session] = None) -> Optional[float]:
+    """配信サーバーの /metrics から常駐メモリ（バイト）を取得（取得できなければ None）"""
+    try:
+        response = (session or requests).get(f"{url}/metrics", timeout=5)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None
+    for line in response.text.splitlines():
+        if line.startswith("process_resident_memory_bytes "):
+            return float(line.split()[1])
+    return None
+
+
+class MemoryMonitor:
+    """ワーカーごとの常駐メモリを一定間隔で記録する"""
+
+    def __init__(self, urls: List[str], interval: float = MEMORY_SAMPLE_INTERVAL_SECONDS):
+        self.urls = urls
+        self.interval = interval
+        self.samples: Dict[str, List[float]] = {url: [] for url in urls}
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self._session = requests.Session()
+
+    def sample(self) -> None:
+        for url in self.urls:
+            value = read_resident_memory(url, self._session)
+            if value is not None:
+                self.samples[url].append(value)
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.sample()
+
+    def start(self) -> "MemoryMonitor":
+        self.sample()
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._thread.join()
+        self.sample()
+
+    def report(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """ワーカーごとの開始時・終了時・最大の常駐メモリ（バイト）と増加量"""
+        result = {}
+        for url, values in self.samples.items():
+            if not values:
+                result[url] = {"start": None, "end": None, "peak": None, "growth": None}
+                continue
+            result[url] = {"start": values[0], "end": values[-1], "peak": max(values),
+                           "growth": values[-1] - values[0]}
+        return result
+
+
+def evaluate(session: requests.Session, url: str, country: Country, deadline: Optional[float],
+             timeout: float) -> Sample:
+    """1か国分の評価リクエストを送り、結果を返す"""
+    params: Dict[str, Any] = {"country": country.name_ja}
+    if deadline is not None:
+        params["deadline"] = deadline
+    started = time.perf_counter()
+    error = None
+    try:
+        response = session.get(f"{url}/evaluate", params=params, timeout=timeout)
+        if response.status_code != 200:
+            error = f"HTTP {response.status_code}"
+        elif response.json().get("error"):
+            error = "evaluation"
+    except requests.RequestException as e:
+        error = type(e).__name__
+    return Sample(url, country.name, time.perf_counter() - started, error)
+
+
+def run_load(
+    urls: List[str],
+    mix: List[Tuple[Country, float]],
+    sessions: int = DEFAULT_SESSIONS,
+    total_requests: Optional[int] = DEFAULT_REQUESTS,
+    duration: Optional[float] = None,
+    warmup: int = 1,
+    deadline: Optional[float] = None,
+    timeout: float = DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    配信サーバーに評価リクエストを送り続けて集計する
+
+    Args:
+        urls: 配信サーバー（ワーカー）の URL。リクエストは順に振り分ける
+        mix: 国と重み
+        sessions: 同時に評価するセッション数
+        total_requests: 送るリクエストの総数（duration を指定した場合は上限）
+        duration: 送り続ける秒数
+        warmup: 計測前にワーカーごとに送るリクエスト数（エージェントの構築などを除くため）
+        deadline: 評価の締め切り（秒、省略時はサーバーの設定）
+        timeout: 1リクエストのタイムアウト（秒）
+        seed: 国を選ぶ乱数のシード
+
+    Returns:
+        Dict[str, Any]: summarize() の集計
+    """
+    if total_requests is None and duration is None:
+        raise ValueError("total_requests or duration is required")
+    countries = [country for country, _ in mix]
+    weights = [weight for _, weight in mix]
+    chooser = random.Random(seed)
+
+    warmup_session = requests.Session()
+    for url in urls:
+        for index in range(warmup):
+            evaluate(warmup_session, url, countries[index % len(countries)], deadline, timeout)
+
+    lock = threading.Lock()
+    issued = 0
+    samples: List[Sample] = []
+    started = time.perf_counter()
+    stop_at = started + duration if duration is not None else None
+
+    def next_request() -> Optional[Tuple[str, Country]]:
+        nonlocal issued
+        with lock:
+            if total_requests is not None and issued >= total_requests:
+                return None
+            if stop_at is not None and time.perf_counter() >= stop_at:
+                return None
+            url = urls[issued % len(urls)]
+            issued += 1
+            return url, chooser.choices(countries, weights)[0]
+
+    def client() -> None:
+        session = requests.Session()
+        while True:
+            request = next_request()
+            if request is None:
+                return
+            sample = evaluate(session, request[0], request[1], deadline, timeout)
+            with lock:
+                samples.append(sample)
+
+    monitor = MemoryMonitor(urls).start()
+    threads = [threading.Thread(target=client, name=f"loadtest-{index}", daemon=True) for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+    return summarize(samples, elapsed, sessions, monitor.report())
+
+
+def _latency(values: List[float]) -> Dict[str, Optional[float]]:
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99),
+            "max": max(values) if values else None}
+
+
+def summarize(samples: List[Sample], elapsed: float, sessions: int,
+              memory: Mapping[str, Mapping[str, Optional[float]]]) -> Dict[str, Any]:
+    """スループット・レイテンシ・エラー率とワーカーごとの集計"""
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if sample.error is not None:
+            errors[sample.error] = errors.get(sample.error, 0) + 1
+    succeeded = [sample.seconds for sample in samples if sample.error is None]
+    workers = {}
+    for url in memory:
+        worker_samples = [sample for sample in samples if sample.worker == url]
+        workers[url] = {
+            "requests": len(worker_samples),
+            "errors": sum(1 for sample in worker_samples if sample.error is not None),
+            "latency": _latency([sample.seconds for sample in worker_samples if sample.error is None]),
+            "memory": dict(memory[url]),
+        }
+    return {
+        "sessions": sessions,
+        "requests": len(samples),
+        "errors": sum(errors.values()),
+        "error_rate": sum(errors.values()) / len(samples) if samples else 0.0,
+        "error_kinds": errors,
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "latency": _latency(succeeded),
+        "workers": workers,
+    }
+
+
+def _seconds(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def _megabytes(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value / 1024 / 1024:.1f}MB"
+
+
+def format_summary(summary: Mapping[str, Any]) -> str:
+    latency = summary["latency"]
+    lines = [
+        f"{summary['requests']} requests, {summary['sessions']} sessions in {summary['elapsed_seconds']:.1f}s "
+        f"({summary['requests_per_second']:.2f} req/s, {summary['requests_per_second'] * 60:.1f} countries/min)",
+        f"latency p50 {_seconds(latency['p50'])}  p95 {_seconds(latency['p95'])}  "
+        f"p99 {_seconds(latency['p99'])}  max {_seconds(latency['max'])}",
+        f"errors {summary['errors']} ({summary['error_rate']:.1%})"
+        + "".join(f"  {kind}={count}" for kind, count in sorted(summary["error_kinds"].items())),
+    ]
+    for url, worker in summary["workers"].items():
+        memory = worker["memory"]
+        lines.append(
+            f"  {url:<24} {worker['requests']:>5} req  {worker['errors']:>3} err  "
+            f"p50 {_seconds(worker['latency']['p50'])}  p95 {_seconds(worker['latency']['p95'])}  "
+            f"rss {_megabytes(memory['start'])} -> {_megabytes(memory['end'])} "
+            f"(peak {_megabytes(memory['peak'])}, +{_megabytes(memory['growth'])})"
+        )
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = READY_TIMEOUT_SECONDS) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"process for {url} exited with code {process.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout:.0f}s")
+
+
+@contextmanager
+def standins(
+    workers: int = DEFAULT_WORKERS,
+    faults: Optional[str] = None,
+    fake_llm: Optional[Mapping[str, Any]] = None,
+) -> Iterator[List[str]]:
+    """
+    代替サーバーと、fake モデル・代替サーバーを使う配信サーバー（workers 個）を起動する
+
+    Yields:
+        配信サーバーの URL の一覧
+    """
+    processes: List[subprocess.Popen] = []
+    command = [sys.executable, "-m", "safety_score_agent"]
+    try:
+        site_url = f"http://127.0.0.1:{_free_port()}"
+        site_command = command + ["sites", "--port", site_url.rsplit(":", 1)[1]]
+        if faults:
+            site_command += ["--faults", os.path.abspath(faults) if os.path.exists(faults) else faults]
+        processes.append(subprocess.Popen(site_command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL))
+        _wait_ready(site_url, processes[-1])
+
+        env = dict(os.environ, SAFETY_SCORE_MODEL="fake", SAFETY_SCORE_SITE_BASE_URL=site_url,
+                   SAFETY_SCORE_FAKE_LLM=json.dumps(dict(fake_llm or {})))
+        urls = []
+        for _ in range(workers):
+            url = f"http://127.0.0.1:{_free_port()}"
+            processes.append(subprocess.Popen(command + ["serve", "--port", url.rsplit(":", 1)[1]],
+                                              cwd=PROJECT_DIR, env=env, stdout=subprocess.DEVNULL,
+                                              stderr=subprocess.DEVNULL))
+            urls.append(url)
+        for url, process in zip(urls, processes[1:]):
+            _wait_ready(url, process)
+        yield urls
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="配信サーバーの負荷試験")
+    parser.add_argument("--url", nargs="+", help="負荷をかける配信サーバーの URL（省略時は代替サーバーで起動）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="起動する配信サーバーのプロセス数")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="同時に評価するセッション数")
+    parser.add_argument("--requests", type=int, help=f"リクエストの総数（デフォルト: {DEFAULT_REQUESTS}）")
+    parser.add_argument("--duration", type=float, help="送り続ける秒数")
+    parser.add_argument("--countries", nargs="*", default=[], help="国名:重み の一覧")
+    parser.add_argument("--region", help="--countries の省略時に対象にする地域")
+    parser.add_argument("--warmup", type=int, default=1, help="計測前にワーカーごとに送るリクエスト数")
+    parser.add_argument("--deadline", type=float, help="評価の締め切り（秒）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT_SECONDS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--first-token-seconds", type=float, default=0.0, help="fake モデルの最初のトークンまでの秒数")
+    parser.add_argument("--token-seconds", type=float, default=0.0, help="fake モデルの1トークンあたりの秒数")
+    parser.add_argument("--faults", help="代替サーバーに注入する遅延と障害（JSON またはそのファイルのパス）")
+    parser.add_argument("-o", "--output", help="集計を JSON で保存するパス")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    mix = parse_mix(args.countries, args.region)
+    total_requests = args.requests if args.requests is not None or args.duration is not None else DEFAULT_REQUESTS
+
+    def run(urls: List[str]) -> Dict[str, Any]:
+        logger.info(f"Load testing {len(urls)} worker(s) with {args.sessions} sessions and {len(mix)} countries")
+        return run_load(urls, mix, sessions=args.sessions, total_requests=total_requests, duration=args.duration,
+                        warmup=args.warmup, deadline=args.deadline, timeout=args.timeout, seed=args.seed)
+
+    if args.url:
+        summary = run([url.rstrip("/") for url in args.url])
+    else:
+        fake_llm = {"first_token_seconds": args.first_token_seconds, "token_seconds": args.token_seconds}
+        with standins(args.workers, args.faults, fake_llm) as urls:
+            summary = run(urls)
+
+    print(format_summary(summary))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""運用メトリクス（プロセス内の集計と Prometheus テキスト形式の出力）
+
+遅いサイトやフォールバックの多発をひと目で確認できるよう、次の値をプロセス内で集計する。
+
+- safety_score_span_duration_seconds{span}: ツール層のスパン（tracing.py）ごとの所要時間。
+  source.* がデータソースごとの取得時間、parse / extract.* / score.* が解析・抽出・計算
+- safety_score_fallbacks_total{source}: フォールバック値を使った回数（source.* の件数との比が
+  フォールバック率）
+- safety_score_http_request_duration_seconds{host}: サイトごとの HTTP 応答時間
+- safety_score_http_response_bytes_total{host}: サイトごとの受信バイト数
+- safety_score_page_cache_requests_total{result}: ページキャッシュの hit / miss
+- safety_score_host_concurrency_limit{host}: AIMD で調整中の同時接続数の上限
+- safety_score_hedge_requests_total{kind}: 全リクエスト数・ヘッジ数・ヘッジ側の採用数
+- safety_score_llm_turns_total{agent} / safety_score_llm_tokens_total{agent,kind}:
+  エージェントごとのモデル呼び出し回数とトークン数
+- process_resident_memory_bytes: プロセスの常駐メモリ（/proc を読める環境のみ）
+
+値は snapshot() で辞書として、render() で Prometheus のテキスト形式で取得できる。
+配信用アプリ（server.py）は add_metrics_route で GET /metrics を公開する。
+"""
+
+import bisect
+import math
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 所要時間のヒストグラムの区間（秒）
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    """最近順位法のパーセンタイル（percent% 以上の値がこれ以下になる最小の値。値がなければ None）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percent * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """ラベルごとに加算する値"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_labels(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        with self._lock:
+            return [(self.name, labels, value) for labels, value in sorted(self._values.items())]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {_format_labels(labels): value for labels, value in sorted(self._values.items())}
+
+
+class Histogram:
+    """ラベルごとの値の分布（累積区間・合計・件数）"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._values: Dict[Labels, List[float]] = {}  # 区間ごとの件数 + [合計, 件数]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        result = []
+        with self._lock:
+            items = sorted((labels, list(counts)) for labels, counts in self._values.items())
+        for labels, counts in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                result.append((f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            result.append((f"{self.name}_bucket", labels + (("le", "+Inf"),), counts[-1]))
+            result.append((f"{self.name}_sum", labels, counts[-2]))
+            result.append((f"{self.name}_count", labels, counts[-1]))
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                _format_labels(labels): {"count": counts[-1], "sum": counts[-2],
+                                         "mean": counts[-2] / counts[-1] if counts[-1] else 0.0}
+                for labels, counts in sorted(self._values.items())
+            }
+
+
+class Gauge:
+    """読み出し時に関数から取得する値（他のモジュールが集計している累計値は kind="counter"）"""
+
+    def __init__(self, name: str, help: str, read: Callable[[], Dict[Labels, float]], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self._read = read
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        return [(self.name, labels, value) for labels, value in sorted(self._read().items())]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {_format_labels(labels): value for labels, value in sorted(self._read().items())}
+
+
+class Registry:
+    """メトリクスの一覧"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self.register(Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], Dict[Labels, float]], kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, help, read, kind))
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """メトリクス名 → ラベル → 値 の辞書"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+
+REGISTRY = Registry()
+
+span_duration = REGISTRY.histogram(
+    "safety_score_span_duration_seconds", "Duration of tool-layer spans (source fetch, parse, extract, score)")
+fallbacks = REGISTRY.counter(
+    "safety_score_fallbacks_total", "Times a source fell back to default or estimated data")
+http_duration = REGISTRY.histogram(
+    "safety_score_http_request_duration_seconds", "HTTP response time per host")
+http_bytes = REGISTRY.counter(
+    "safety_score_http_response_bytes_total", "Bytes downloaded per host")
+page_cache_requests = REGISTRY.counter(
+    "safety_score_page_cache_requests_total", "Page cache lookups by result")
+llm_turns = REGISTRY.counter(
+    "safety_score_llm_turns_total", "Model responses per agent")
+llm_tokens = REGISTRY.counter(
+    "safety_score_llm_tokens_total", "Model tokens per agent and kind")
+
+
+def _concurrency_limits() -> Dict[Labels, float]:
+    from .net import limits
+    return {_labels({"host": host}): limit
+            for host, limit in limits.concurrency_limits().items() if limit is not None}
+
+
+def _hedge_requests() -> Dict[Labels, float]:
+    from .net import hedge
+    stats = hedge.get_budget().stats()
+    return {_labels({"kind": kind}): stats[key]
+            for kind, key in (("total", "requests"), ("hedged", "hedges"), ("hedge_won", "hedge_wins"))}
+
+
+REGISTRY.gauge("safety_score_host_concurrency_limit", "Current AIMD concurrency limit per host", _concurrency_limits)
+REGISTRY.gauge("safety_score_hedge_requests_total", "HTTP requests, hedges sent and hedges that won", _hedge_requests,
+               kind="counter")
+
+
+def _resident_memory() -> Dict[Labels, float]:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return {}
+    return {(): float(pages * os.sysconf("SC_PAGE_SIZE"))}
+
+
+REGISTRY.gauge("process_resident_memory_bytes", "Resident memory size of this process", _resident_memory)
+
+
+def record_llm_response(agent: str, usage: Any) -> None:
+    """
+    モデルの応答1件分の呼び出し回数とトークン数を記録
+
+    Args:
+        agent: エージェント名
+        usage: google.genai の GenerateContentResponseUsageMetadata（None 可）
+    """
+    llm_turns.inc(agent=agent)
+    if usage is None:
+        return
+    for kind, field in (("prompt", "prompt_token_count"), ("completion", "candidates_token_count"),
+                        ("cached", "cached_content_token_count"), ("total", "total_token_count")):
+        count = getattr(usage, field, None)
+        if count:
+            llm_tokens.inc(count, agent=agent, kind=kind)
+
+
+def after_model_callback(callback_context: Any, llm_response: Any) -> Optional[Any]:
+    """LlmAgent の after_model_callback（応答は変更しない）"""
+    # ストリーミングの途中経過（partial）は最終応答と重複するため数えない
+    if not getattr(llm_response, "partial", False):
+        record_llm_response(callback_context.agent_name, getattr(llm_response, "usage_metadata", None))
+    return None
+
+
+def snapshot() -> Dict[str, Any]:
+    """プロセス内のメトリクスの辞書"""
+    return REGISTRY.snapshot()
+
+
+def render() -> str:
+    """プロセス内のメトリクスの Prometheus テキスト形式"""
+    return REGISTRY.render()
+
+
+def add_metrics_route(app: Any, path: str = "/metrics") -> None:
+    """FastAPI アプリに Prometheus 形式のメトリクスのエンドポイントを登録"""
+    from fastapi.responses import PlainTextResponse
+
+    @app.get(path, response_class=PlainTextResponse)
+    async def metrics_endpoint():
+        return PlainTextResponse(render(), media_type=CONTENT_TYPE)
+
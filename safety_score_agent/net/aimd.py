@@ -0,0 +1,132 @@
+"""サイトごとの同時接続数の自動調整（AIMD）
+
+固定の同時接続数は、控えめすぎてスループットが出ないか、多すぎて 429 を招くかのどちらかに
+なりやすい。ここでは TCP の輻輳制御と同じく
+
+- 加算的増加: 応答が成功し、レイテンシが平常範囲の間は上限を少しずつ上げる
+  （上限 L のとき成功1件ごとに increase / L。L 件の成功でおよそ +increase）
+- 乗算的減少: 429・5xx・タイムアウトで上限を decrease 倍に下げる
+
+で同時接続数の上限を調整する。同じ混雑で同時に失敗した複数のリクエストで何度も
+下げないよう、減少は直前の減少より後に送ったリクエストの失敗でのみ行う。
+
+レイテンシの平常範囲は、直近 window 件の成功応答の最小値の latency_tolerance 倍
+（最低でも +min_latency_margin 秒）までとし、それを超える応答では上限を上げない。
+"""
+
+import collections
+import logging
+import math
+import threading
+from typing import Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = "success"
+OVERLOAD = "overload"
+IGNORED = "ignored"
+
+
+class AimdController:
+    """AIMD で上限を調整する同時接続数のゲート"""
+
+    def __init__(
+        self,
+        maximum: int,
+        minimum: int = 1,
+        initial: Optional[float] = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        min_latency_margin: float = 0.05,
+        window: int = 50,
+        adaptive: bool = True,
+        name: str = "",
+    ):
+        """
+        Args:
+            maximum: 上限の最大値
+            minimum: 上限の最小値
+            initial: 上限の初期値（省略時は maximum の半分）
+            increase: 上限 L 件分の成功あたりの増加量
+            decrease: 混雑時に上限に掛ける係数
+            latency_tolerance: 平常とみなすレイテンシ（直近の最小値に対する倍率）
+            min_latency_margin: 平常とみなすレイテンシの最小の余裕（秒）
+            window: 平常範囲の計算に使う直近の成功応答の数
+            adaptive: False の場合は maximum で固定
+            name: ログに出すサイト名
+        """
+        if maximum < 1 or minimum < 1 or minimum > maximum:
+            raise ValueError(f"Invalid concurrency bounds: minimum={minimum}, maximum={maximum}")
+        self.maximum = maximum
+        self.minimum = minimum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.min_latency_margin = min_latency_margin
+        self.adaptive = adaptive
+        self.name = name
+        if not adaptive:
+            initial = maximum
+        elif initial is None:
+            initial = max(minimum, math.ceil(maximum / 2))
+        self._limit = float(min(maximum, max(minimum, initial)))
+        self._in_flight = 0
+        self._epoch = 0
+        self._latencies: Deque[float] = collections.deque(maxlen=window)
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """現在の同時接続数の上限"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> int:
+        """接続枠を確保（空くまで待つ）。release に渡すエポックを返す"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return self._epoch
+
+    def release(self, epoch: int, outcome: str = IGNORED, latency: Optional[float] = None) -> None:
+        """
+        接続枠を解放し、結果に応じて上限を調整
+
+        Args:
+            epoch: acquire が返したエポック
+            outcome: SUCCESS / OVERLOAD（429・5xx・タイムアウト）/ IGNORED（調整しない）
+            latency: 応答までの秒数（SUCCESS の場合）
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if self.adaptive:
+                if outcome == SUCCESS:
+                    self._on_success(latency)
+                elif outcome == OVERLOAD:
+                    self._on_overload(epoch)
+            self._condition.notify_all()
+
+    def _on_success(self, latency: Optional[float]) -> None:
+        if latency is not None:
+            healthy = not self._latencies or latency <= max(
+                min(self._latencies) * self.latency_tolerance, min(self._latencies) + self.min_latency_margin
+            )
+            self._latencies.append(latency)
+            if not healthy:
+                return
+        self._limit = min(float(self.maximum), self._limit + self.increase / self._limit)
+
+    def _on_overload(self, epoch: int) -> None:
+        if epoch < self._epoch:
+            # 直前の減少より前に送ったリクエストの失敗（同じ混雑の影響）
+            return
+        previous = self.limit
+        self._limit = max(float(self.minimum), self._limit * self.decrease)
+        self._epoch += 1
+        if self.limit != previous:
+            logger.info(f"Concurrency limit for {self.name or 'host'} reduced: {previous} -> {self.limit}")
@@ -0,0 +1,313 @@
+"""HTTP の記録と再生（カセット）
+
+記録（recording）の間は、ツールモジュールが送ったリクエストと受け取った応答（ステータス・
+ヘッダー・本文）、タイムアウトなどの例外をカセットに記録する。再生（replaying）の間は、
+同じリクエストに記録した応答を本文までバイト単位で同じまま返す。再生ではソケットを使わず、
+タイムアウトも待たない（記録した例外はすぐに送出する）。特定の国の評価のプロファイリングや
+ベンチマークを再現可能かつ高速に行え、本番の通信を記録してベンチマークの入力にできる。
+
+記録と再生は limits.install() が組み込む HTTPAdapter.send のさらに外側で行う。記録される
+URL は代替サーバー（standin.py）への書き換え前の元のサイトの URL で、再生では流量制限・
+タイムアウト・ヘッジを通らない。対象はツールのサイト（limits.TOOL_HOSTS）へのリクエストだけで、
+それ以外（Gemini の認証情報の更新など）は記録も再生もせずにそのまま送る。Cookie や認証に
+関わる応答ヘッダーは記録しない。
+
+カセットは gzip 圧縮した JSON で、同じ本文は1回だけ保存する。同じリクエストを複数回
+記録した場合は記録した順に返し、使い切った後は最後の応答を返す。記録にないリクエストは
+CassetteMiss（requests.ConnectionError）になり、ツールモジュールはフォールバックする。
+
+本番の通信を記録する場合は SAFETY_SCORE_CASSETTE（パス）と SAFETY_SCORE_CASSETTE_MODE
+（record / replay）を設定して配信サーバーを起動する（プロセス終了時に保存する）。
+
+使い方:
+    python -m safety_score_agent cassette record Japan -o japan.cassette
+    python -m safety_score_agent cassette replay japan.cassette --repeat 20
+    python -m safety_score_agent cassette show japan.cassette
+"""
+
+import argparse
+import atexit
+import base64
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from unittest import mock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from .. import config
+from . import limits
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# 記録しないヘッダー（本文は復号済みで保存するため本文と食い違うものと、Cookie・認証に関わるもの）
+_DROPPED_HEADERS = {
+    "content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive",
+    "set-cookie", "set-cookie2", "authorization", "www-authenticate", "proxy-authenticate",
+    "proxy-authorization",
+}
+
+Key = Tuple[str, str, str]
+
+
+class CassetteMiss(requests.ConnectionError):
+    """カセットに記録のないリクエスト"""
+
+
+def request_key(request: requests.PreparedRequest) -> Key:
+    """リクエストの照合キー（メソッド・URL・本文のハッシュ）"""
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return request.method or "GET", request.url or "", hashlib.sha256(body).hexdigest() if body else ""
+
+
+class Cassette:
+    """記録したリクエストと応答の一覧"""
+
+    def __init__(self, interactions: Optional[List[Dict[str, Any]]] = None,
+                 bodies: Optional[Dict[str, bytes]] = None, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            interactions: 記録したリクエストと応答（本文は bodies のハッシュで参照）
+            bodies: 本文の SHA-256 → 本文
+            metadata: 記録の付帯情報（記録した国など）
+        """
+        self.metadata: Dict[str, Any] = dict(metadata or {})
+        self.interactions: List[Dict[str, Any]] = list(interactions or [])
+        self.bodies: Dict[str, bytes] = dict(bodies or {})
+        self.misses = 0
+        self._cursors: Dict[Key, int] = {}
+        self._index: Dict[Key, List[Dict[str, Any]]] = {}
+        for interaction in self.interactions:
+            self._index.setdefault(self._key(interaction), []).append(interaction)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(interaction: Dict[str, Any]) -> Key:
+        return interaction["method"], interaction["url"], interaction.get("body", "")
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def _add(self, interaction: Dict[str, Any]) -> None:
+        with self._lock:
+            self.interactions.append(interaction)
+            self._index.setdefault(self._key(interaction), []).append(interaction)
+
+    def add_response(self, request: requests.PreparedRequest, response: requests.Response,
+                     elapsed: float) -> None:
+        """応答を記録（本文はここで読み込む）"""
+        method, url, body = request_key(request)
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            self.bodies.setdefault(digest, content)
+        self._add({
+            "method": method, "url": url, "body": body,
+            "status": response.status_code, "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items()
+                        if name.lower() not in _DROPPED_HEADERS},
+            "content": digest, "elapsed": round(elapsed, 4),
+        })
+
+    def add_error(self, request: requests.PreparedRequest, error: requests.RequestException,
+                  elapsed: float) -> None:
+        """例外（タイムアウト・接続エラーなど）を記録"""
+        method, url, body = request_key(request)
+        self._add({"method": method, "url": url, "body": body, "error": type(error).__name__,
+                   "message": str(error), "elapsed": round(elapsed, 4)})
+
+    def play(self, request: requests.PreparedRequest) -> requests.Response:
+        """記録した応答を返す（記録した例外は送出する）"""
+        key = request_key(request)
+        with self._lock:
+            recorded = self._index.get(key)
+            if not recorded:
+                self.misses += 1
+                raise CassetteMiss(f"no recorded response for {key[0]} {key[1]}", request=request)
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            interaction = recorded[min(cursor, len(recorded) - 1)]
+        if "error" in interaction:
+            error_class = getattr(requests.exceptions, interaction["error"], requests.ConnectionError)
+            raise error_class(interaction.get("message", ""), request=request)
+        content = self.bodies[interaction["content"]]
+        headers = {**interaction["headers"], "Content-Length": str(len(content))}
+        raw = HTTPResponse(body=io.BytesIO(content), headers=headers, status=interaction["status"],
+                           reason=interaction.get("reason"), preload_content=False, decode_content=False)
+        response = HTTPAdapter().build_response(request, raw)
+        response.content
+        return response
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": CASSETTE_VERSION,
+            "recorded_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "metadata": self.metadata,
+            "interactions": self.interactions,
+            "bodies": {digest: base64.b64encode(content).decode("ascii") for digest, content in self.bodies.items()},
+        }
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            payload = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(payload)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"unsupported cassette version: {data.get('version')!r}")
+        bodies = {digest: base64.b64decode(content) for digest, content in data["bodies"].items()}
+        return cls(data["interactions"], bodies, data.get("metadata"))
+
+
+def _is_tool_request(request: requests.PreparedRequest) -> bool:
+    return (urlsplit(request.url or "").hostname or "").lower() in limits.TOOL_HOSTS
+
+
+def _recording_send(cassette: Cassette, original: Callable[..., requests.Response]) -> Callable[..., Any]:
+    def send(adapter, request, *args, **kwargs):
+        if not _is_tool_request(request):
+            return original(adapter, request, *args, **kwargs)
+        started = time.monotonic()
+        try:
+            response = original(adapter, request, *args, **kwargs)
+        except requests.RequestException as e:
+            cassette.add_error(request, e, time.monotonic() - started)
+            raise
+        cassette.add_response(request, response, time.monotonic() - started)
+        return response
+
+    send.__wrapped__ = original
+    return send
+
+
+def _replaying_send(cassette: Cassette, original: Callable[..., requests.Response]) -> Callable[..., Any]:
+    def send(adapter, request, *args, **kwargs):
+        if not _is_tool_request(request):
+            return original(adapter, request, *args, **kwargs)
+        return cassette.play(request)
+
+    send.__wrapped__ = original
+    return send
+
+
+@contextmanager
+def recording(path: Optional[str] = None, cassette: Optional[Cassette] = None) -> Iterator[Cassette]:
+    """with ブロック内のツールのサイトへの通信をカセットに記録する（path を指定すると終了時に保存）"""
+    limits.install()
+    cassette = cassette if cassette is not None else Cassette()
+    with mock.patch.object(HTTPAdapter, "send", _recording_send(cassette, HTTPAdapter.send)):
+        yield cassette
+    if path is not None:
+        cassette.save(path)
+
+
+@contextmanager
+def replaying(cassette: Union[Cassette, str]) -> Iterator[Cassette]:
+    """with ブロック内のツールのサイトへの通信にカセットの記録を返す（ソケットは使わない）"""
+    limits.install()
+    if isinstance(cassette, str):
+        cassette = Cassette.load(cassette)
+    with mock.patch.object(HTTPAdapter, "send", _replaying_send(cassette, HTTPAdapter.send)):
+        yield cassette
+
+
+def install(path: str, mode: str) -> Cassette:
+    """
+    このプロセスの HTTP の通信にカセットを適用する（配信サーバー用）
+
+    Args:
+        path: カセットのパス
+        mode: record（プロセス終了時に保存）または replay
+    """
+    if mode not in config.CASSETTE_MODES:
+        raise ValueError(f"unknown cassette mode: {mode!r}")
+    limits.install()
+    if mode == "replay":
+        cassette = Cassette.load(path)
+        HTTPAdapter.send = _replaying_send(cassette, HTTPAdapter.send)
+    else:
+        cassette = Cassette()
+        HTTPAdapter.send = _recording_send(cassette, HTTPAdapter.send)
+        atexit.register(cassette.save, path)
+    logger.info(f"HTTP cassette {mode}: {path}")
+    return cassette
+
+
+def install_from_config() -> Optional[Cassette]:
+    """SAFETY_SCORE_CASSETTE が設定されていればカセットを適用する"""
+    path = config.get_cassette_path()
+    if path is None:
+        return None
+    return install(path, config.get_cassette_mode())
+
+
+def _evaluate(names: List[str]) -> List[Dict[str, Any]]:
+    from ..batch import evaluate_country, resolve_countries
+
+    return [evaluate_country(country) for country in resolve_countries(names)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP の記録と再生（カセット）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="国のツール層を実行して通信を記録する")
+    record_parser.add_argument("countries", nargs="+")
+    record_parser.add_argument("-o", "--output", required=True)
+    replay_parser = subparsers.add_parser("replay", help="記録した通信で国のツール層を実行する")
+    replay_parser.add_argument("cassette")
+    replay_parser.add_argument("--countries", nargs="+", help="省略時は記録した国")
+    replay_parser.add_argument("--repeat", type=int, default=1)
+    show_parser = subparsers.add_parser("show", help="記録した通信の一覧を表示する")
+    show_parser.add_argument("cassette")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.command == "record":
+        with recording() as cassette:
+            results = _evaluate(args.countries)
+        cassette.metadata["countries"] = [result["country"] for result in results]
+        cassette.save(args.output)
+        print(f"recorded {len(cassette)} requests ({len(cassette.bodies)} bodies) to {args.output}")
+    elif args.command == "replay":
+        cassette = Cassette.load(args.cassette)
+        countries = args.countries or cassette.metadata.get("countries", [])
+        with replaying(cassette):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                results = _evaluate(countries)
+            elapsed = time.perf_counter() - started
+        for result in results:
+            print(json.dumps({"country": result["country"], "scores": result["scores"]}, ensure_ascii=False))
+        print(f"{args.repeat * len(countries)} evaluations in {elapsed:.3f}s "
+              f"({elapsed / (args.repeat * len(countries)) * 1000:.1f} ms each, {cassette.misses} misses)",
+              file=sys.stderr)
+    else:
+        cassette = Cassette.load(args.cassette)
+        for interaction in cassette.interactions:
+            outcome = interaction.get("error") or interaction["status"]
+            size = len(cassette.bodies[interaction["content"]]) if "content" in interaction else 0
+            print(f"{interaction['method']:<5} {outcome!s:<14} {size:>8}  {interaction['elapsed']:>7.3f}s  "
+                  f"{interaction['url']}")
+
+
+if __name__ == "__main__":
+    main()
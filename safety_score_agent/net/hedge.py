@@ -0,0 +1,153 @@
+"""応答の遅いサイトへのヘッジリクエスト
+
+Vision of Humanity や WHO GHO はほとんどの応答は速いが、まれに数秒以上かかる（裾の重い
+レイテンシ）。1か国の評価はいずれかのソースの遅い応答に引きずられるため、ここでは
+
+- 最初のリクエストがサイトの p90 レイテンシまでに応答しなければ同じリクエストをもう1つ送り、
+- 先に成功した応答を採用し、もう一方の応答は届いた時点で閉じて破棄する
+
+ことで p99 の評価時間を短くする。ブロッキングの HTTP 呼び出しは途中で止められないため、
+破棄される側はタイムアウトまでに終わるのを待って接続を解放する。
+
+追加のリクエストが負荷を増やさないよう、HedgeBudget でプロセス全体のヘッジ数を
+全リクエスト数の ratio（既定 5%）以下に抑える。対象のサイトは limits.HostLimit.hedge で、
+組み込みは limits.install が行う（GET のみ）。
+"""
+
+import contextvars
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .. import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """ヘッジリクエスト数を全リクエスト数の一定割合に抑える予算"""
+
+    def __init__(self, ratio: Optional[float] = None, max_tokens: float = 5.0):
+        """
+        Args:
+            ratio: 1リクエストあたりに貯まるヘッジの枠（省略時は設定値。0 でヘッジしない）
+            max_tokens: 貯めておける枠の上限（短時間にヘッジが集中しないようにする）
+        """
+        self.ratio = config.get_hedge_budget_ratio() if ratio is None else ratio
+        self.max_tokens = max_tokens
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """リクエスト1件分の枠を加える"""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """ヘッジ1件分の枠を使う（枠がなければ False）"""
+        with self._lock:
+            if self._tokens < 1.0 - 1e-9:  # 小数の積み上げ誤差を許容
+                return False
+            self._tokens -= 1.0
+            self.hedges += 1
+            return True
+
+    def record_win(self) -> None:
+        """ヘッジした側の応答が採用された"""
+        with self._lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+                    "ratio": self.hedges / self.requests if self.requests else 0.0}
+
+
+def hedged(call: Callable[[], T], delay: Optional[float], budget: HedgeBudget,
+           discard: Optional[Callable[[T], None]] = None) -> T:
+    """
+    call を実行し、delay 秒以内に終わらなければ予算の範囲で2回目を並行して実行する
+
+    Args:
+        call: 実行する処理（2回実行されてもよいもの）
+        delay: ヘッジするまでの秒数（None の場合はヘッジせずにそのまま実行）
+        budget: ヘッジの予算
+        discard: 採用されなかった成功結果の後始末（応答を閉じるなど）
+
+    Returns:
+        先に成功した結果。両方失敗した場合は最初のリクエストの例外を送出する
+    """
+    if delay is None:
+        return call()
+
+    outcomes: "queue.Queue[Tuple[int, Any, Optional[BaseException]]]" = queue.Queue()
+
+    def run(attempt: int) -> None:
+        try:
+            outcomes.put((attempt, call(), None))
+        except BaseException as e:
+            outcomes.put((attempt, None, e))
+
+    # 呼び出し元のコンテキスト（トレースの親スパンなど）を引き継いで実行する
+    threading.Thread(target=contextvars.copy_context().run, args=(run, 0), daemon=True).start()
+    pending = 1
+    try:
+        outcome = outcomes.get(timeout=delay)
+    except queue.Empty:
+        if budget.withdraw():
+            threading.Thread(target=contextvars.copy_context().run, args=(run, 1), daemon=True).start()
+            pending += 1
+        outcome = outcomes.get()
+
+    errors: List[Tuple[int, BaseException]] = []
+    while True:
+        pending -= 1
+        attempt, result, error = outcome
+        if error is None:
+            if attempt == 1:
+                budget.record_win()
+            if pending:
+                threading.Thread(target=_discard_rest, args=(outcomes, pending, discard), daemon=True).start()
+            return result
+        errors.append((attempt, error))
+        if not pending:
+            raise min(errors, key=lambda item: item[0])[1]
+        outcome = outcomes.get()
+
+
+def _discard_rest(outcomes: "queue.Queue", pending: int, discard: Optional[Callable[[Any], None]]) -> None:
+    """採用されなかったリクエストの終了を待って結果を破棄"""
+    for _ in range(pending):
+        _, result, error = outcomes.get()
+        if error is None and discard is not None:
+            try:
+                discard(result)
+            except Exception as e:
+                logger.debug(f"Failed to discard hedged result: {e}")
+
+
+_budget: Optional[HedgeBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_budget() -> HedgeBudget:
+    """プロセス共通の HedgeBudget（初回に設定から作成）"""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = HedgeBudget()
+        return _budget
+
+
+def set_budget(budget: Optional[HedgeBudget]) -> None:
+    """プロセス共通の HedgeBudget を置き換える（None で次回に作り直す）"""
+    global _budget
+    with _budget_lock:
+        _budget = budget
@@ -0,0 +1,175 @@
+"""サイトごとのレイテンシの記録とタイムアウトの自動設定
+
+ツールモジュールはリクエストごとに 10 秒・15 秒のタイムアウトを固定で指定している。
+速いサイトでは障害時の待ち時間が無駄に長く、遅いが確実に応答するサイトでは混雑時に
+打ち切られてしまう。ここではサイト（ホスト）ごとに直近 window 件の応答時間を
+対数目盛のヒストグラムに記録し、十分な件数が集まったら
+
+    タイムアウト = 高い分位点（既定 p99）× multiplier + margin
+
+を下限・上限（config.get_timeout_floor_seconds / get_timeout_ceiling_seconds）の範囲に
+収めた値をリクエストのタイムアウトにする。件数が min_samples に満たない間は呼び出し側の
+タイムアウトをそのまま使う。タイムアウトしたリクエストはタイムアウト値を応答時間として
+記録するため、遅くなったサイトではタイムアウトが上限まで延びていく。
+
+記録とタイムアウトの置き換えは limits.install が HTTPAdapter.send に組み込む。
+"""
+
+import bisect
+import collections
+import math
+import threading
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from .. import config
+
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+# ヒストグラムの区間の上端（秒）。10ms から 120 秒まで 25% 刻み
+BUCKET_BOUNDS: List[float] = [
+    round(0.01 * 1.25 ** index, 4) for index in range(int(math.log(120 / 0.01, 1.25)) + 2)
+]
+
+
+class LatencyHistogram:
+    """直近 window 件の応答時間の対数目盛ヒストグラム"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[int] = collections.deque(maxlen=window)
+        self._counts = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        if len(self._samples) == self._samples.maxlen:
+            self._counts[self._samples[0]] -= 1
+        index = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        self._samples.append(index)
+        self._counts[index] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q（0〜1）分位点を含む区間の上端（記録がなければ None）"""
+        if not self._samples:
+            return None
+        rank = max(1, math.ceil(q * len(self._samples)))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+
+class LatencyTracker:
+    """サイトごとの応答時間ヒストグラムとタイムアウトの計算"""
+
+    def __init__(
+        self,
+        percentile: float = 0.99,
+        multiplier: float = 1.5,
+        margin: float = 1.0,
+        min_samples: int = 20,
+        window: int = 200,
+        floor: Optional[float] = None,
+        ceiling: Optional[float] = None,
+    ):
+        """
+        Args:
+            percentile: タイムアウトの基準にする分位点
+            multiplier: 分位点に掛ける係数
+            margin: 分位点に加える余裕（秒）
+            min_samples: タイムアウトを自動設定するのに必要な記録数
+            window: サイトごとに保持する直近の記録数
+            floor: タイムアウトの下限（省略時は設定値）
+            ceiling: タイムアウトの上限（省略時は設定値）
+        """
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.margin = margin
+        self.min_samples = min_samples
+        self.window = window
+        self.floor = config.get_timeout_floor_seconds() if floor is None else floor
+        self.ceiling = config.get_timeout_ceiling_seconds() if ceiling is None else ceiling
+        self._hosts: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._hosts.get(host)
+            if histogram is None:
+                histogram = self._hosts[host] = LatencyHistogram(self.window)
+            histogram.record(seconds)
+
+    def quantile(self, host: str, q: float) -> Optional[float]:
+        """サイトの応答時間の q 分位点（記録が min_samples 件未満なら None）"""
+        with self._lock:
+            histogram = self._hosts.get(host)
+            if histogram is None or len(histogram) < self.min_samples:
+                return None
+            return histogram.percentile(q)
+
+    def adaptive_timeout(self, host: str) -> Optional[float]:
+        """記録から計算したタイムアウト（記録が足りなければ None）"""
+        observed = self.quantile(host, self.percentile)
+        if observed is None:
+            return None
+        return min(self.ceiling, max(self.floor, observed * self.multiplier + self.margin))
+
+    def timeout_for(self, host: str, requested: Timeout) -> Timeout:
+        """
+        リクエストに使うタイムアウト
+
+        Args:
+            host: ホスト名
+            requested: 呼び出し側が指定したタイムアウト（(接続, 読み込み) のタプルも可）
+
+        Returns:
+            自動設定したタイムアウト。タプルの場合は読み込み側だけを置き換える
+        """
+        timeout = self.adaptive_timeout(host)
+        if timeout is None:
+            return requested
+        if isinstance(requested, tuple):
+            return (requested[0], timeout)
+        return timeout
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """サイトごとの記録数・p50/p90/p99・現在のタイムアウト"""
+        with self._lock:
+            hosts = list(self._hosts)
+        result = {}
+        for host in hosts:
+            with self._lock:
+                histogram = self._hosts[host]
+                samples = len(histogram)
+                quantiles = {f"p{int(q * 100)}": histogram.percentile(q) for q in (0.5, 0.9, 0.99)}
+            result[host] = {"samples": samples, **quantiles, "timeout": self.adaptive_timeout(host)}
+        return result
+
+
+def read_timeout(timeout: Timeout) -> Optional[float]:
+    """requests のタイムアウト指定から読み込みのタイムアウトを取り出す"""
+    if isinstance(timeout, tuple):
+        return timeout[1]
+    return timeout
+
+
+_tracker: Optional[LatencyTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker() -> LatencyTracker:
+    """プロセス共通の LatencyTracker（初回に設定から作成）"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = LatencyTracker()
+        return _tracker
+
+
+def set_tracker(tracker: Optional[LatencyTracker]) -> None:
+    """プロセス共通の LatencyTracker を置き換える（None で次回に作り直す）"""
+    global _tracker
+    with _tracker_lock:
+        _tracker = tracker
@@ -0,0 +1,375 @@
+"""サイトごとの流量制限（トークンバケット＋同時接続数の上限）
+
+ツールモジュールは Numbeo・WHO・外務省などのサイトへ間隔を空けずにリクエストを送る。
+バッチ実行で多数の国を処理すると Numbeo などが応答を絞り、フォールバック値が増える。
+ここではサイト（ホスト）ごとに
+
+- トークンバケット: rate（1秒あたりのリクエスト数）と burst（連続して送れる数）
+- 同時接続数の上限: max_in_flight
+
+を設け、プロセス内のすべてのスレッド（ツールは run_in_thread でスレッド実行される）と
+タスクからのリクエストに適用する。バッチ実行のように複数のプロセスで取得する場合は、
+プロセス間で共有する接続枠（create_shared_slots）も HostGovernor に渡して併せて適用する。同時接続数の上限は AIMD（aimd.py）で自動調整され、
+max_in_flight はその最大値になる（adaptive=False の場合は固定値）。現在の上限は
+concurrency_limits() と HostGovernor.stats() で参照できる。リクエストのタイムアウトは
+応答時間の記録から自動設定し（latency.py）、hedge=True のサイトへの GET は p90 までに
+応答がなければヘッジする（hedge.py）。代替サーバーが設定されていれば、送信の直前に
+URL をそのサーバーに書き換える（standin.py）。
+
+制限は requests の HTTPAdapter.send に組み込むため（install）、4つのツールモジュールの
+requests.get や独自の Session のどちらからのリクエストにも適用され、ページキャッシュ
+（page_cache.py）から返す応答には適用されない。上限値は DEFAULT_HOST_LIMITS を既定とし、
+環境変数 SAFETY_SCORE_HOST_LIMITS（config.get_host_limit_overrides）で上書きできる。
+
+対象はツールのサイト（TOOL_HOSTS）と上限を設定したサイトへのリクエストだけで、それ以外
+（google-genai の認証情報の更新など）は制限・タイムアウトの置き換え・ヘッジ・スパン・
+代替サーバーへの書き換えを行わずにそのまま送る。install はツールを使うエントリーポイント
+（エージェントの構築、バッチのワーカーなど）で明示的に呼ぶ。
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .. import config, metrics, tracing
+from . import hedge, latency, standin
+from .aimd import IGNORED, OVERLOAD, SUCCESS, AimdController
+
+logger = logging.getLogger(__name__)
+
+
+class HostLimit(NamedTuple):
+    """1サイトの流量制限（None は無制限）"""
+    rate: Optional[float]           # 1秒あたりのリクエスト数
+    burst: int                      # 連続して送れるリクエスト数
+    max_in_flight: Optional[int]    # 同時接続数（adaptive の場合は自動調整の最大値）
+    adaptive: bool = True           # 同時接続数を AIMD で自動調整するか
+    hedge: bool = False             # 遅い応答にヘッジリクエストを送るか（hedge.py）
+
+
+# ツールモジュールがアクセスするサイトの既定の上限
+DEFAULT_HOST_LIMITS: Dict[str, HostLimit] = {
+    # Numbeo は短時間に連続すると応答を絞るため最も控えめにする
+    "www.numbeo.com": HostLimit(rate=1.0, burst=3, max_in_flight=2),
+    "www.anzen.mofa.go.jp": HostLimit(rate=2.0, burst=4, max_in_flight=4),
+    # WHO GHO と Vision of Humanity は応答時間の裾が長いためヘッジする
+    "www.who.int": HostLimit(rate=4.0, burst=8, max_in_flight=8, hedge=True),
+    "www.visionofhumanity.org": HostLimit(rate=1.0, burst=2, max_in_flight=4, hedge=True),
+    "dataunodc.un.org": HostLimit(rate=1.0, burst=2, max_in_flight=4),
+    "www.transparency.org": HostLimit(rate=1.0, burst=2, max_in_flight=4),
+    "info.worldbank.org": HostLimit(rate=1.0, burst=2, max_in_flight=4),
+    "www.gallup.com": HostLimit(rate=1.0, burst=2, max_in_flight=4),
+    "www.oecdbetterlifeindex.org": HostLimit(rate=1.0, burst=2, max_in_flight=4),
+}
+TOOL_HOSTS = tuple(DEFAULT_HOST_LIMITS)
+UNLIMITED = HostLimit(rate=None, burst=1, max_in_flight=None)
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット"""
+
+    def __init__(self, rate: float, burst: int = 1,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """トークンを1つ予約し、使えるようになるまでの待ち時間を返す"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 予約分を先に差し引く（負の残高は後続の待ち時間に反映される）
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """トークンを1つ取得（必要なら待つ）。待った秒数を返す"""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class _HostState:
+    def __init__(self, host: str, limit: HostLimit):
+        self.limit = limit
+        self.bucket = TokenBucket(limit.rate, limit.burst) if limit.rate else None
+        self.gate = AimdController(
+            limit.max_in_flight, adaptive=limit.adaptive, name=host
+        ) if limit.max_in_flight else None
+        self.requests = 0
+        self.in_flight = 0
+        self.wait_seconds = 0.0
+        self.lock = threading.Lock()
+
+
+def _parse_limit(value: Any, base: HostLimit) -> HostLimit:
+    if value is None:
+        return UNLIMITED
+    if not isinstance(value, Mapping):
+        raise ValueError(f"host limit must be an object or null: {value!r}")
+    rate = value.get("rate", base.rate)
+    burst = value.get("burst", base.burst)
+    max_in_flight = value.get("max_in_flight", base.max_in_flight)
+    return HostLimit(
+        rate=float(rate) if rate is not None else None,
+        burst=int(burst) if burst is not None else 1,
+        max_in_flight=int(max_in_flight) if max_in_flight is not None else None,
+        adaptive=bool(value.get("adaptive", base.adaptive)),
+        hedge=bool(value.get("hedge", base.hedge)),
+    )
+
+
+def create_shared_slots(limit: int, hosts: Iterable[str] = TOOL_HOSTS, context=None) -> Dict[str, Any]:
+    """
+    プロセス間で共有するサイトごとの接続枠（HostGovernor の shared_slots に渡す）
+
+    Args:
+        limit: 全プロセス合計でのサイトごとの同時接続数
+        hosts: 対象のホスト名
+        context: multiprocessing のコンテキスト（省略時は既定）
+    """
+    context = context or multiprocessing.get_context()
+    return {host: context.BoundedSemaphore(limit) for host in hosts}
+
+
+class HostGovernor:
+    """サイトごとのトークンバケットと同時接続数の上限"""
+
+    def __init__(self, limits: Optional[Mapping[str, HostLimit]] = None,
+                 shared_slots: Optional[Mapping[str, Any]] = None):
+        """
+        Args:
+            limits: ホスト名（またはドメイン）→ 上限。ドメインは配下のホストにも適用される
+            shared_slots: ホスト名 → 他のプロセスと共有する接続枠（create_shared_slots）
+        """
+        self.limits = dict(DEFAULT_HOST_LIMITS if limits is None else limits)
+        self.shared_slots = dict(shared_slots or {})
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, shared_slots: Optional[Mapping[str, Any]] = None) -> "HostGovernor":
+        """既定の上限に SAFETY_SCORE_HOST_LIMITS の上書きを適用"""
+        limits = dict(DEFAULT_HOST_LIMITS)
+        for host, value in config.get_host_limit_overrides().items():
+            if host == "*":
+                # ツール以外のサイトへのリクエストには上限を適用しない
+                logger.warning("Host limit for '*' is not supported (ignored)")
+                continue
+            try:
+                limits[host] = _parse_limit(value, limits.get(host, UNLIMITED))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Invalid host limit for {host}: {e} (ignored)")
+        return cls(limits, shared_slots)
+
+    def _lookup(self, host: str) -> Optional[HostLimit]:
+        if host in self.limits:
+            return self.limits[host]
+        parts = host.split(".")
+        for index in range(1, len(parts) - 1):
+            limit = self.limits.get(".".join(parts[index:]))
+            if limit is not None:
+                return limit
+        return None
+
+    def limit_for(self, host: str) -> HostLimit:
+        """ホストの上限（完全一致 → 親ドメインの順に探す。一覧にないサイトは無制限）"""
+        limit = self._lookup(host)
+        return limit if limit is not None else UNLIMITED
+
+    def governs(self, host: str) -> bool:
+        """ホストへのリクエストを制限の対象にするか（ツールのサイトと上限を設定したサイト）"""
+        return host in TOOL_HOSTS or self._lookup(host) is not None
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostState(host, self.limit_for(host))
+            return state
+
+    @contextmanager
+    def acquire(self, url: str) -> Iterator["Ticket"]:
+        """
+        URL のサイトの接続枠とトークンを確保してからリクエストを送る
+
+        with ブロック内で ticket.status_code に応答のステータスを設定すると、
+        同時接続数の自動調整に使われる（例外はタイムアウトのみ混雑として扱う）。
+        プロセス間で共有する接続枠があれば、最初にそれを確保する。
+        """
+        host = (urlsplit(url).hostname or "").lower()
+        state = self._state(host)
+        shared = self.shared_slots.get(host)
+        started = time.monotonic()
+        if shared is not None:
+            shared.acquire()
+        try:
+            with self._acquire_local(state, started) as ticket:
+                yield ticket
+        finally:
+            if shared is not None:
+                shared.release()
+
+    @contextmanager
+    def _acquire_local(self, state: _HostState, started: float) -> Iterator["Ticket"]:
+        epoch = state.gate.acquire() if state.gate is not None else 0
+        ticket = Ticket()
+        outcome, latency = IGNORED, None
+        try:
+            if state.bucket is not None:
+                state.bucket.acquire()
+            sent = time.monotonic()
+            with state.lock:
+                state.requests += 1
+                state.in_flight += 1
+                state.wait_seconds += sent - started
+            try:
+                yield ticket
+                latency = time.monotonic() - sent
+                outcome = _classify(ticket.status_code)
+            except requests.Timeout:
+                outcome = OVERLOAD
+                raise
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+        finally:
+            if state.gate is not None:
+                state.gate.release(epoch, outcome, latency)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """サイトごとのリクエスト数・処理中の数・待ち時間の合計"""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {"requests": state.requests, "in_flight": state.in_flight,
+                   "wait_seconds": state.wait_seconds, "limit": state.limit._asdict(),
+                   "concurrency_limit": state.gate.limit if state.gate is not None else None}
+            for host, state in hosts.items()
+        }
+
+    def concurrency_limits(self) -> Dict[str, Optional[int]]:
+        """サイトごとの現在の同時接続数の上限（None は無制限）"""
+        return {host: stats["concurrency_limit"] for host, stats in self.stats().items()}
+
+
+class Ticket:
+    """HostGovernor.acquire が返すリクエストの記録"""
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+
+
+def _classify(status_code: Optional[int]) -> str:
+    """応答のステータスを同時接続数の調整に使う結果に分類"""
+    if status_code is None:
+        return IGNORED
+    if status_code == 429 or status_code >= 500:
+        return OVERLOAD
+    return SUCCESS
+
+
+_governor: Optional[HostGovernor] = None
+_governor_lock = threading.Lock()
+_installed = False
+
+
+def get_governor() -> HostGovernor:
+    """プロセス共通の HostGovernor（初回に設定から作成）"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = HostGovernor.from_config()
+        return _governor
+
+
+def set_governor(governor: Optional[HostGovernor]) -> None:
+    """プロセス共通の HostGovernor を置き換える（None で次回に設定から作り直す）"""
+    global _governor
+    with _governor_lock:
+        _governor = governor
+
+
+def install() -> None:
+    """
+    requests の HTTPAdapter.send に流量制限・タイムアウトの自動設定・ヘッジを組み込む
+
+    対象はツールのサイトと上限を設定したサイトへのリクエストだけ（HostGovernor.governs）。
+    何度呼んでも1回だけ組み込む。応答時間は latency.get_tracker() に記録する。
+    """
+    global _installed
+    with _governor_lock:
+        if _installed:
+            return
+        _installed = True
+
+    from requests.adapters import HTTPAdapter
+
+    original = HTTPAdapter.send
+
+    def governed_send(adapter, request, host, *args, **kwargs):
+        tracker = latency.get_tracker()
+        if kwargs.get("timeout") is not None:
+            kwargs["timeout"] = tracker.timeout_for(host, kwargs["timeout"])
+        stream = kwargs.get("stream", args[0] if args else False)
+        with tracing.span("http.request", **{"http.url": request.url, "http.request.method": request.method,
+                                             "server.address": host}) as span, \
+                get_governor().acquire(request.url) as ticket:
+            started = time.monotonic()
+            try:
+                with tracing.span("http.response"):
+                    routed, routed_kwargs = standin.route(request, kwargs)
+                    response = original(adapter, routed, *args, **routed_kwargs)
+            except requests.Timeout:
+                # 打ち切った時間を応答時間として記録し、遅くなったサイトのタイムアウトを延ばす
+                tracker.record(host, latency.read_timeout(kwargs.get("timeout")) or time.monotonic() - started)
+                raise
+            elapsed = time.monotonic() - started
+            tracker.record(host, elapsed)
+            metrics.http_duration.observe(elapsed, host=host)
+            ticket.status_code = response.status_code
+            span.set_attribute("http.response.status_code", response.status_code)
+            if not stream:
+                # 本文の受信もここで行い、接続枠とスパンに含める
+                with tracing.span("http.download"):
+                    span.set_attribute("http.response.body.size", len(response.content))
+                metrics.http_bytes.inc(len(response.content), host=host)
+            return response
+
+    def send(adapter, request, *args, **kwargs):
+        host = (urlsplit(request.url).hostname or "").lower()
+        if not get_governor().governs(host):
+            return original(adapter, request, *args, **kwargs)
+        budget = hedge.get_budget()
+        budget.deposit()
+        if request.method != "GET" or not get_governor().limit_for(host).hedge:
+            return governed_send(adapter, request, host, *args, **kwargs)
+        return hedge.hedged(
+            lambda: governed_send(adapter, request.copy(), host, *args, **dict(kwargs)),
+            latency.get_tracker().quantile(host, 0.9),
+            budget,
+            discard=lambda response: response.close(),
+        )
+
+    send.__wrapped__ = original
+    HTTPAdapter.send = send
+
+
+def concurrency_limits() -> Dict[str, Optional[int]]:
+    """プロセス共通の HostGovernor のサイトごとの現在の同時接続数の上限"""
+    return get_governor().concurrency_limits()
@@ -0,0 +1,46 @@
+"""取得対象サイトへのリクエストの代替サーバーへの振り替え
+
+SAFETY_SCORE_SITE_BASE_URL（config.get_site_base_url）を設定すると、ツールモジュールの
+リクエストを次のように書き換えて代替サーバーに送る（fixtures/site_server.py のサーバーは
+この形式で受け取る）。
+
+    https://www.numbeo.com/crime/country_result.jsp?country=Japan
+    → http://127.0.0.1:8800/www.numbeo.com/crime/country_result.jsp?country=Japan
+
+書き換えは limits.install() が組み込む HTTPAdapter.send の中で送信の直前に行うため、
+流量制限・タイムアウト・ヘッジ・メトリクス・スパンは元のサイトのホスト名で扱われ、
+ツールモジュールは変更なしで代替サーバーを使える。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from .. import config
+
+
+def local_url(url: str, base: str) -> str:
+    """サイトの URL を代替サーバーの URL に変換"""
+    parts = urlsplit(url)
+    local = f"{base.rstrip('/')}/{parts.netloc}{parts.path or '/'}"
+    return f"{local}?{parts.query}" if parts.query else local
+
+
+def route(request: requests.PreparedRequest, kwargs: Dict[str, Any],
+          base: Optional[str] = None) -> Tuple[requests.PreparedRequest, Dict[str, Any]]:
+    """
+    代替サーバーが設定されていれば、送信するリクエストと send の引数を書き換える
+
+    Args:
+        request: 送信するリクエスト（書き換える場合はコピーを返す）
+        kwargs: HTTPAdapter.send のキーワード引数
+        base: 代替サーバーの URL（None なら config.get_site_base_url()）
+    """
+    base = base or config.get_site_base_url()
+    if not base:
+        return request, kwargs
+    routed = request.copy()
+    routed.prepare_url(local_url(request.url, base), None)
+    # 元のサイト向けに環境変数から選ばれたプロキシは使わない
+    return routed, dict(kwargs, proxies={})
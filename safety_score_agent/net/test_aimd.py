@@ -0,0 +1,144 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from safety_score_agent.net import limits
+from safety_score_agent.net.aimd import IGNORED, OVERLOAD, SUCCESS, AimdController
+from safety_score_agent.net.limits import HostGovernor, HostLimit
+
+
+class TestAimdController(unittest.TestCase):
+    """同時接続数の自動調整のテスト"""
+
+    def test_additive_increase_on_success(self):
+        gate = AimdController(maximum=8)
+        self.assertEqual(gate.limit, 4)
+
+        for _ in range(4):
+            gate.release(gate.acquire(), SUCCESS, 0.1)
+        self.assertEqual(gate.limit, 4)  # 4 + 4 * (1/4 前後) でまだ 5 に届かない
+        for _ in range(100):
+            gate.release(gate.acquire(), SUCCESS, 0.1)
+        self.assertEqual(gate.limit, 8)
+
+    def test_multiplicative_decrease_once_per_congestion(self):
+        """同じ混雑で同時に失敗したリクエストでは1回だけ下げること"""
+        gate = AimdController(maximum=16, initial=8)
+        epochs = [gate.acquire() for _ in range(6)]
+
+        for epoch in epochs:
+            gate.release(epoch, OVERLOAD)
+        self.assertEqual(gate.limit, 4)
+
+        gate.release(gate.acquire(), OVERLOAD)
+        self.assertEqual(gate.limit, 2)
+        for _ in range(3):
+            gate.release(gate.acquire(), OVERLOAD)
+        self.assertEqual(gate.limit, 1)
+
+    def test_latency_inflation_holds_limit(self):
+        gate = AimdController(maximum=8, initial=2)
+        gate.release(gate.acquire(), SUCCESS, 0.1)
+        limit = gate._limit
+
+        for _ in range(10):
+            gate.release(gate.acquire(), SUCCESS, 1.0)
+        self.assertEqual(gate._limit, limit)
+        gate.release(gate.acquire(), IGNORED)
+        self.assertEqual(gate._limit, limit)
+
+    def test_fixed_limit_when_not_adaptive(self):
+        gate = AimdController(maximum=3, adaptive=False)
+        gate.release(gate.acquire(), OVERLOAD)
+        self.assertEqual(gate.limit, 3)
+
+    def test_blocks_beyond_limit_across_threads(self):
+        gate = AimdController(maximum=4, initial=2)
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def request():
+            epoch = gate.acquire()
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            gate.release(epoch, IGNORED)
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(gate.in_flight, 0)
+
+    def test_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            AimdController(maximum=0)
+        with self.assertRaises(ValueError):
+            AimdController(maximum=2, minimum=3)
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    status = 200
+
+    def do_GET(self):
+        self.send_response(ThrottlingHandler.status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestGovernorAdaptation(unittest.TestCase):
+    """HostGovernor に組み込んだ自動調整のテスト"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.governor = HostGovernor({"127.0.0.1": HostLimit(rate=None, burst=1, max_in_flight=8)})
+        limits.set_governor(self.governor)
+        self.addCleanup(limits.set_governor, None)
+        self.addCleanup(setattr, ThrottlingHandler, "status", 200)
+        limits.install()
+
+    def test_limit_follows_responses(self):
+        """成功が続くと上限が上がり、429 で下がること"""
+        for _ in range(20):
+            requests.get(self.url, timeout=5)
+        raised = limits.concurrency_limits()["127.0.0.1"]
+        self.assertGreater(raised, 4)
+
+        ThrottlingHandler.status = 429
+        requests.get(self.url, timeout=5)
+
+        self.assertEqual(limits.concurrency_limits()["127.0.0.1"], raised // 2)
+        self.assertEqual(self.governor.stats()["127.0.0.1"]["concurrency_limit"], raised // 2)
+
+    def test_timeout_counts_as_overload(self):
+        with self.assertRaises(requests.Timeout):
+            with self.governor.acquire(self.url):
+                raise requests.ReadTimeout("slow")
+        self.assertEqual(limits.concurrency_limits()["127.0.0.1"], 2)
+
+    def test_other_errors_do_not_adjust(self):
+        with self.assertRaises(requests.ConnectionError):
+            with self.governor.acquire(self.url):
+                raise requests.ConnectionError("refused")
+        self.assertEqual(limits.concurrency_limits()["127.0.0.1"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
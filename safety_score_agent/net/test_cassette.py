@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from safety_score_agent.fixtures.faults import FaultPlan
+from safety_score_agent.fixtures.site_server import SiteServer
+from safety_score_agent.net import cassette, limits
+from safety_score_agent.net.cassette import Cassette, CassetteMiss
+from safety_score_agent.net.limits import HostGovernor
+from safety_score_agent.sub_agents.crime_agent import tool as crime_tool
+from safety_score_agent.sub_agents.law_agent import tool as law_tool
+
+NUMBEO_URL = "https://www.numbeo.com/crime/country_result.jsp?country=Japan"
+
+
+class TestCassette(unittest.TestCase):
+    """HTTP の記録と再生のテスト"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "japan.cassette")
+        limits.set_governor(HostGovernor({}))
+        self.addCleanup(limits.set_governor, None)
+
+    def record(self, func, faults=None):
+        server = SiteServer(faults=FaultPlan.from_dict(faults or {})).start()
+        try:
+            with patch.dict(os.environ, {"SAFETY_SCORE_SITE_BASE_URL": server.base_url}), \
+                    cassette.recording(self.path) as recorded:
+                result = func()
+        finally:
+            server.stop()
+        return recorded, result
+
+    def test_replay_is_byte_for_byte(self):
+        def fetch():
+            return (requests.get(NUMBEO_URL, timeout=5).content,
+                    crime_tool.get_numbeo_crime_data("Japan"),
+                    law_tool.get_world_bank_governance_data("Japan"))
+
+        recorded, (content, numbeo, governance) = self.record(fetch)
+        self.assertEqual(len(recorded), 3)
+        # 同じ本文は1回だけ保存する
+        self.assertEqual(len(recorded.bodies), 2)
+        self.assertEqual(recorded.interactions[0]["url"], NUMBEO_URL)
+
+        with cassette.replaying(self.path) as replayed:
+            self.assertEqual(requests.get(NUMBEO_URL, timeout=5).content, content)
+            self.assertEqual(crime_tool.get_numbeo_crime_data("Japan"), numbeo)
+            replayed_governance = law_tool.get_world_bank_governance_data("Japan")
+            self.assertEqual(dict(replayed_governance, scraped_at=None), dict(governance, scraped_at=None))
+            # 使い切った後は最後の応答を返す
+            self.assertEqual(requests.get(NUMBEO_URL, timeout=5).content, content)
+        self.assertEqual(replayed.misses, 0)
+
+    def test_replay_errors_without_waiting(self):
+        def fetch():
+            with self.assertRaises(requests.Timeout):
+                requests.get("https://www.gallup.com/analytics/", timeout=0.3)
+            return requests.get("https://www.numbeo.com/cost-of-living/", timeout=5).status_code
+
+        recorded, status = self.record(fetch, {"www.gallup.com": {"hang_rate": 1.0, "hang_seconds": 5}})
+        self.assertEqual(status, 404)
+        self.assertEqual(recorded.interactions[0]["error"], "ReadTimeout")
+
+        with cassette.replaying(self.path):
+            started = time.perf_counter()
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                requests.get("https://www.gallup.com/analytics/", timeout=0.3)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            self.assertEqual(requests.get("https://www.numbeo.com/cost-of-living/").status_code, 404)
+
+    def test_unrecorded_request_misses(self):
+        with cassette.replaying(Cassette()) as replayed:
+            with self.assertRaises(CassetteMiss):
+                requests.get(NUMBEO_URL, timeout=5)
+            # ツールモジュールは接続エラーとしてフォールバックする
+            fallback = crime_tool.get_numbeo_crime_data("Japan")
+        self.assertIsNotNone(fallback)
+        self.assertGreaterEqual(replayed.misses, 2)
+
+    def test_other_hosts_are_not_recorded_or_replayed(self):
+        server = SiteServer().start()
+        self.addCleanup(server.stop)
+        local_url = f"{server.base_url}/www.numbeo.com/crime/country_result.jsp?country=Japan"
+
+        recorded, status = self.record(lambda: requests.get(local_url, timeout=5).status_code)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(recorded), 0)
+
+        with cassette.replaying(Cassette()) as replayed:
+            self.assertEqual(requests.get(local_url, timeout=5).status_code, 200)
+        self.assertEqual(replayed.misses, 0)
+
+    def test_cookie_and_auth_headers_are_dropped(self):
+        request = requests.Request("GET", NUMBEO_URL).prepare()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"ok"
+        response.headers.update({"Content-Type": "text/html", "Set-Cookie": "session=secret",
+                                 "WWW-Authenticate": "Bearer"})
+        recorded = Cassette()
+        recorded.add_response(request, response, 0.1)
+        self.assertEqual(recorded.interactions[0]["headers"], {"Content-Type": "text/html"})
+
+    def test_save_and_load(self):
+        recorded = Cassette(metadata={"countries": ["Japan"]})
+        recorded.save(self.path)
+        loaded = Cassette.load(self.path)
+        self.assertEqual(loaded.metadata, {"countries": ["Japan"]})
+        self.assertEqual(len(loaded), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
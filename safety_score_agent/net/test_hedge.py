@@ -0,0 +1,155 @@
+import itertools
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from safety_score_agent.net import hedge, latency, limits
+from safety_score_agent.net.hedge import HedgeBudget, hedged
+from safety_score_agent.net.latency import LatencyTracker
+from safety_score_agent.net.limits import HostGovernor, HostLimit
+
+
+class TestHedgeBudget(unittest.TestCase):
+    """ヘッジの予算のテスト"""
+
+    def test_hedges_limited_to_ratio_of_requests(self):
+        budget = HedgeBudget(ratio=0.05)
+        for _ in range(100):
+            budget.deposit()
+
+        self.assertEqual(sum(budget.withdraw() for _ in range(10)), 5)
+        self.assertEqual(budget.stats()["ratio"], 0.05)
+
+    def test_zero_ratio_disables_hedging(self):
+        budget = HedgeBudget(ratio=0.0)
+        for _ in range(100):
+            budget.deposit()
+        self.assertFalse(budget.withdraw())
+
+
+def funded_budget():
+    budget = HedgeBudget(ratio=1.0)
+    budget.deposit()
+    return budget
+
+
+class TestHedged(unittest.TestCase):
+    """ヘッジ実行のテスト"""
+
+    def test_slow_first_attempt_is_hedged_and_discarded(self):
+        counter = itertools.count()
+        discarded = threading.Event()
+
+        def call():
+            attempt = next(counter)
+            time.sleep(0.5 if attempt == 0 else 0.0)
+            return attempt
+
+        budget = funded_budget()
+        started = time.perf_counter()
+        result = hedged(call, 0.05, budget, discard=lambda attempt: discarded.set())
+
+        self.assertEqual(result, 1)
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(budget.stats()["hedge_wins"], 1)
+        self.assertTrue(discarded.wait(2))
+
+    def test_waits_for_first_attempt_without_budget(self):
+        calls = []
+
+        def call():
+            calls.append(1)
+            time.sleep(0.1)
+            return "first"
+
+        self.assertEqual(hedged(call, 0.01, HedgeBudget(ratio=0.0)), "first")
+        self.assertEqual(len(calls), 1)
+
+    def test_fast_response_is_not_hedged(self):
+        budget = funded_budget()
+        self.assertEqual(hedged(lambda: "ok", 0.5, budget), "ok")
+        self.assertEqual(hedged(lambda: "ok", None, budget), "ok")
+        self.assertEqual(budget.stats()["hedges"], 0)
+
+    def test_raises_first_error_when_both_fail(self):
+        counter = itertools.count()
+
+        def call():
+            attempt = next(counter)
+            time.sleep(0.1 if attempt == 0 else 0.0)
+            raise ValueError(f"attempt {attempt}")
+
+        with self.assertRaisesRegex(ValueError, "attempt 0"):
+            hedged(call, 0.01, funded_budget())
+
+    def test_falls_back_to_other_attempt_on_error(self):
+        counter = itertools.count()
+
+        def call():
+            attempt = next(counter)
+            if attempt == 1:
+                raise ValueError("hedge failed")
+            time.sleep(0.1)
+            return "first"
+
+        self.assertEqual(hedged(call, 0.01, funded_budget()), "first")
+
+
+class TailHandler(BaseHTTPRequestHandler):
+    """最初のリクエストだけ遅く応答するサーバー"""
+    slow_first = threading.Event()
+
+    def do_GET(self):
+        if TailHandler.slow_first.is_set():
+            TailHandler.slow_first.clear()
+            time.sleep(0.5)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        except ConnectionError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestInstalledHedging(unittest.TestCase):
+    """requests に組み込んだヘッジのテスト"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), TailHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.budget = HedgeBudget(ratio=0.5)
+        hedge.set_budget(self.budget)
+        self.addCleanup(hedge.set_budget, None)
+        latency.set_tracker(LatencyTracker(min_samples=5, floor=5.0, ceiling=5.0))
+        self.addCleanup(latency.set_tracker, None)
+        limits.set_governor(HostGovernor({"127.0.0.1": HostLimit(rate=None, burst=1, max_in_flight=None, hedge=True)}))
+        self.addCleanup(limits.set_governor, None)
+        self.addCleanup(TailHandler.slow_first.clear)
+        limits.install()
+
+    def test_slow_response_is_hedged(self):
+        for _ in range(5):
+            requests.get(self.url, timeout=10)
+
+        TailHandler.slow_first.set()
+        started = time.perf_counter()
+        response = requests.get(self.url, timeout=10)
+
+        self.assertEqual(response.text, "ok")
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(self.budget.stats()["requests"], 6)
+        self.assertEqual(self.budget.stats()["hedge_wins"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
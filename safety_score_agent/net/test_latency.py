@@ -0,0 +1,120 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from safety_score_agent.net import latency, limits
+from safety_score_agent.net.latency import LatencyHistogram, LatencyTracker
+from safety_score_agent.net.limits import HostGovernor
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """応答時間ヒストグラムのテスト"""
+
+    def test_percentile_is_bucket_upper_bound(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.record(0.1)
+        for _ in range(10):
+            histogram.record(2.0)
+
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.1, delta=0.03)
+        self.assertAlmostEqual(histogram.percentile(0.99), 2.0, delta=0.5)
+        self.assertIsNone(LatencyHistogram().percentile(0.5))
+
+    def test_rolling_window_forgets_old_samples(self):
+        histogram = LatencyHistogram(window=10)
+        for _ in range(10):
+            histogram.record(5.0)
+        for _ in range(10):
+            histogram.record(0.1)
+
+        self.assertEqual(len(histogram), 10)
+        self.assertLess(histogram.percentile(1.0), 0.2)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """タイムアウトの自動設定のテスト"""
+
+    def make_tracker(self, samples, seconds):
+        tracker = LatencyTracker(min_samples=10, floor=2.0, ceiling=30.0)
+        for _ in range(samples):
+            tracker.record("www.who.int", seconds)
+        return tracker
+
+    def test_uses_requested_timeout_until_enough_samples(self):
+        tracker = self.make_tracker(5, 0.1)
+        self.assertEqual(tracker.timeout_for("www.who.int", 10), 10)
+        self.assertEqual(tracker.timeout_for("www.numbeo.com", 15), 15)
+
+    def test_fast_source_fails_fast_at_floor(self):
+        tracker = self.make_tracker(20, 0.1)
+        self.assertEqual(tracker.timeout_for("www.who.int", 10), 2.0)
+        self.assertEqual(tracker.timeout_for("www.who.int", (3.05, 10)), (3.05, 2.0))
+
+    def test_slow_source_gets_longer_timeout_up_to_ceiling(self):
+        tracker = self.make_tracker(20, 8.0)
+        timeout = tracker.timeout_for("www.who.int", 10)
+        self.assertGreater(timeout, 12.0)
+        self.assertLessEqual(timeout, 30.0)
+
+        self.assertEqual(self.make_tracker(20, 60.0).timeout_for("www.who.int", 10), 30.0)
+
+    def test_stats(self):
+        stats = self.make_tracker(20, 0.1).stats()["www.who.int"]
+        self.assertEqual(stats["samples"], 20)
+        self.assertEqual(stats["timeout"], 2.0)
+        self.assertIn("p90", stats)
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        time.sleep(SlowHandler.delay)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        except ConnectionError:
+            pass  # クライアントがタイムアウトで切断済み
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestInstalledTimeouts(unittest.TestCase):
+    """requests に組み込んだタイムアウトの自動設定のテスト"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.tracker = LatencyTracker(min_samples=5, floor=0.2, ceiling=1.0, margin=0.0)
+        latency.set_tracker(self.tracker)
+        self.addCleanup(latency.set_tracker, None)
+        limits.set_governor(HostGovernor({"127.0.0.1": limits.UNLIMITED}))
+        self.addCleanup(limits.set_governor, None)
+        self.addCleanup(setattr, SlowHandler, "delay", 0.0)
+        limits.install()
+
+    def test_learned_timeout_replaces_requested_timeout(self):
+        for _ in range(5):
+            requests.get(self.url, timeout=10)
+        self.assertEqual(self.tracker.stats()["127.0.0.1"]["samples"], 5)
+        self.assertEqual(self.tracker.adaptive_timeout("127.0.0.1"), 0.2)
+
+        # 学習したタイムアウト（下限 0.2 秒）で打ち切られ、打ち切った時間が記録される
+        SlowHandler.delay = 0.5
+        with self.assertRaises(requests.Timeout):
+            requests.get(self.url, timeout=10)
+        self.assertEqual(self.tracker.stats()["127.0.0.1"]["samples"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
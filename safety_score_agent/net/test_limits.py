@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from safety_score_agent.net import hedge, latency, limits
+from safety_score_agent.net.limits import HostGovernor, HostLimit, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    """トークンバケットのテスト"""
+
+    def test_burst_then_paced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(4)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 0.5])
+        self.assertEqual(clock.now, 1.0)
+
+    def test_tokens_refill_up_to_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.now += 10
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 1.0])
+
+
+class TestHostGovernor(unittest.TestCase):
+    """サイトごとの流量制限のテスト"""
+
+    def test_limit_lookup_by_host_and_domain(self):
+        governor = HostGovernor({"numbeo.com": HostLimit(1.0, 1, 1), "localhost": HostLimit(None, 1, 3)})
+
+        self.assertEqual(governor.limit_for("www.numbeo.com").max_in_flight, 1)
+        self.assertEqual(governor.limit_for("localhost").max_in_flight, 3)
+        self.assertEqual(governor.limit_for("example.com"), limits.UNLIMITED)
+
+    def test_config_overrides(self):
+        overrides = ('{"www.numbeo.com": {"rate": 0.2}, "who.int": null, "*": {"max_in_flight": 8}, "bad": 3, '
+                     '"api.example.org": {"max_in_flight": 2}}')
+        with patch.dict(os.environ, {"SAFETY_SCORE_HOST_LIMITS": overrides}):
+            governor = HostGovernor.from_config()
+
+        self.assertEqual(governor.limit_for("www.numbeo.com"), HostLimit(rate=0.2, burst=3, max_in_flight=2))
+        self.assertEqual(governor.limit_for("www.who.int"), limits.DEFAULT_HOST_LIMITS["www.who.int"])
+        self.assertEqual(governor.limit_for("apps.who.int"), limits.UNLIMITED)
+        self.assertEqual(governor.limit_for("example.com"), limits.UNLIMITED)
+        self.assertNotIn("bad", governor.limits)
+        self.assertNotIn("*", governor.limits)
+
+        # ツールのサイトと上限を設定したサイトだけが対象になる
+        self.assertTrue(governor.governs("www.numbeo.com"))
+        self.assertTrue(governor.governs("apps.who.int"))
+        self.assertTrue(governor.governs("api.example.org"))
+        self.assertFalse(governor.governs("oauth2.googleapis.com"))
+
+    def test_max_in_flight_across_threads(self):
+        governor = HostGovernor({"www.numbeo.com": HostLimit(rate=None, burst=1, max_in_flight=2, adaptive=False)})
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def request():
+            with governor.acquire("https://www.numbeo.com/crime/"):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(governor.stats()["www.numbeo.com"]["requests"], 8)
+        self.assertEqual(governor.stats()["www.numbeo.com"]["in_flight"], 0)
+
+    def test_shared_slots_across_governors(self):
+        """共有の接続枠は別のプロセス（HostGovernor）からのリクエストと合わせて上限になること"""
+        slots = limits.create_shared_slots(2, hosts=["www.numbeo.com"])
+        governors = [HostGovernor({}, shared_slots=slots) for _ in range(2)]
+        active = {"www.numbeo.com": 0, "example.com": 0}
+        peak = dict(active)
+        lock = threading.Lock()
+
+        def request(governor, host):
+            with governor.acquire(f"https://{host}/page"):
+                with lock:
+                    active[host] += 1
+                    peak[host] = max(peak[host], active[host])
+                time.sleep(0.02)
+                with lock:
+                    active[host] -= 1
+
+        threads = [threading.Thread(target=request, args=(governor, host))
+                   for governor in governors for host in active for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak["www.numbeo.com"], 2)
+        self.assertGreater(peak["example.com"], 2)
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with CountingHandler.lock:
+            CountingHandler.active += 1
+            CountingHandler.peak = max(CountingHandler.peak, CountingHandler.active)
+        time.sleep(0.02)
+        with CountingHandler.lock:
+            CountingHandler.active -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestInstall(unittest.TestCase):
+    """requests への組み込みのテスト"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.governor = HostGovernor({"127.0.0.1": HostLimit(rate=50.0, burst=1, max_in_flight=1)})
+        limits.set_governor(self.governor)
+        self.addCleanup(limits.set_governor, None)
+        limits.install()
+
+    def test_applies_to_requests_get_and_custom_sessions(self):
+        """requests.get と独自のアダプターを持つ Session の両方に上限が適用されること"""
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(max_retries=2))
+
+        def fetch(index):
+            (requests.get if index % 2 else session.get)(self.url, timeout=5)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=fetch, args=(index,)) for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(CountingHandler.peak, 1)
+        self.assertEqual(self.governor.stats()["127.0.0.1"]["requests"], 6)
+        # burst 1・毎秒 50 件なので 6 件で 0.1 秒以上かかる
+        self.assertGreaterEqual(time.perf_counter() - started, 0.1)
+
+    def test_other_hosts_are_sent_unchanged(self):
+        """対象外のサイトへのリクエストは制限・応答時間の記録・ヘッジの予算に含めずに送ること"""
+        limits.set_governor(HostGovernor({}))
+        tracker = latency.LatencyTracker(min_samples=1)
+        latency.set_tracker(tracker)
+        self.addCleanup(latency.set_tracker, None)
+        budget = hedge.HedgeBudget(ratio=0.05)
+        hedge.set_budget(budget)
+        self.addCleanup(hedge.set_budget, None)
+
+        self.assertEqual(requests.get(self.url, timeout=5).status_code, 200)
+
+        self.assertIsNone(tracker.quantile("127.0.0.1", 0.5))
+        self.assertEqual(limits.get_governor().stats(), {})
+        self.assertEqual(budget.stats()["requests"], 0)
+
+    def test_install_is_idempotent(self):
+        limits.install()
+        self.assertIsNot(HTTPAdapter.send.__wrapped__, HTTPAdapter.send)
+        self.assertFalse(hasattr(HTTPAdapter.send.__wrapped__, "__wrapped__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""ダウンロード済みページのディスクキャッシュ
+
+ツールモジュールは requests で外部サイトのページを取得する。バッチ実行を途中から
+再開するときに同じページを取り直さないよう、成功した GET の応答（ステータス・
+ヘッダー・本文）をディレクトリに保存し、同じ URL の GET に保存済みの応答を返す。
+
+複数のワーカープロセスが同じディレクトリを使うため、書き込みは一時ファイルからの
+rename で行う（読み込み側が書きかけのファイルを見ることはない）。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Mapping, Optional
+
+from . import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+
+def page_key(method: str, url: str, params: Any = None) -> str:
+    """リクエストのキャッシュキー"""
+    payload = json.dumps([method.upper(), url, params], sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """URL ごとの応答をディレクトリに保存するキャッシュ"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def get(self, method: str, url: str, params: Any = None):
+        """保存済みの応答（requests.Response）を返す。なければ None"""
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        meta_path, body_path = self._paths(page_key(method, url, params))
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                content = f.read()
+        except (OSError, ValueError):
+            self.misses += 1
+            metrics.page_cache_requests.inc(result="miss")
+            return None
+
+        self.hits += 1
+        metrics.page_cache_requests.inc(result="hit")
+        response = requests.Response()
+        response.status_code = meta["status_code"]
+        response.reason = meta.get("reason")
+        response.url = meta.get("url", url)
+        response.encoding = meta.get("encoding")
+        response.headers = CaseInsensitiveDict(meta.get("headers") or {})
+        response._content = content
+        return response
+
+    def put(self, method: str, url: str, response: Any, params: Any = None) -> None:
+        """成功した応答を保存"""
+        meta_path, body_path = self._paths(page_key(method, url, params))
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            "url": response.url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "encoding": response.encoding,
+            "headers": dict(response.headers),
+        }
+        # 本文を先に置き、メタデータの存在を保存完了の目印にする
+        self._write(body_path, response.content)
+        self._write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        """保存済みの応答をすべて削除"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def install(self) -> None:
+        """このプロセスの requests の GET にキャッシュを適用する"""
+        import requests
+
+        original = requests.Session.request
+
+        def request(session, method, url, *args, params: Optional[Mapping[str, Any]] = None, **kwargs):
+            if method.upper() != "GET":
+                return original(session, method, url, *args, params=params, **kwargs)
+            with tracing.span("http.cache", **{"http.url": url}) as span:
+                cached = self.get(method, url, params)
+                span.set_attribute("safety_score.cache_hit", cached is not None)
+            if cached is not None:
+                tracing.set_attributes(**{"safety_score.cache_hit": True})
+                return cached
+            response = original(session, method, url, *args, params=params, **kwargs)
+            if 200 <= response.status_code < 300:
+                try:
+                    self.put(method, url, response, params)
+                except OSError as e:
+                    logger.warning(f"Page cache write failed for {url}: {e}")
+            return response
+
+        request.__wrapped__ = original
+        requests.Session.request = request
@@ -0,0 +1,64 @@
+"""モデルに渡すツール結果のコンパクト表現
+
+ツール関数の戻り値には、毎回同じ内容の説明文（crime_categories など）や
+数値の細かな桁、null 値が含まれ、そのまま LLM のコンテキストに入るとトークンを浪費する。
+ここではツール結果を以下の規則で射影する。
+
+- ツールごとの定数・静的フィールドを除く
+- 小数を FLOAT_DIGITS 桁に丸める
+- null（None）を省く
+
+射影はモデルに渡す結果にのみ適用し、ツール関数自体の戻り値は変えない。
+SAFETY_SCORE_TOOL_OUTPUT=full でデバッグ用に元の結果（full ビュー）を渡せる。
+"""
+
+from typing import Any, Dict, FrozenSet, Optional
+
+from . import config
+
+FLOAT_DIGITS = 2
+
+# ツール名 → モデルに渡さないトップレベルのフィールド
+STATIC_FIELDS: Dict[str, FrozenSet[str]] = {
+    # 要求された国と無関係な固定の高リスク国一覧と紛争サマリー
+    "get_conflict_risk_info": frozenset({"high_risk_countries", "conflict_summary"}),
+    # カテゴリの説明文と収集時刻（評価に使われない）
+    "get_crime_data": frozenset({"crime_categories", "data_collection_timestamp"}),
+    "get_infrastructure_data": frozenset({"infrastructure_categories", "data_collection_timestamp"}),
+    "get_law_enforcement_data": frozenset({"law_enforcement_categories", "data_collection_timestamp"}),
+}
+
+
+def compact_value(value: Any, float_digits: int = FLOAT_DIGITS) -> Any:
+    """小数を丸め、null を省いた値を再帰的に作成"""
+    if isinstance(value, dict):
+        return {
+            key: compact_value(item, float_digits)
+            for key, item in value.items()
+            if item is not None
+        }
+    if isinstance(value, (list, tuple)):
+        return [compact_value(item, float_digits) for item in value if item is not None]
+    if isinstance(value, float):
+        return round(value, float_digits)
+    return value
+
+
+def project_tool_output(tool_name: str, result: Any, view: Optional[str] = None) -> Any:
+    """
+    ツール結果をモデルに渡す形式に射影
+
+    Args:
+        tool_name: ツール関数名
+        result: ツール関数の戻り値
+        view: ``compact`` または ``full``（省略時は環境変数 SAFETY_SCORE_TOOL_OUTPUT）
+
+    Returns:
+        Any: 射影したツール結果（full ビューでは元の結果）
+    """
+    if (view or config.get_tool_output_view()) == "full":
+        return result
+    if isinstance(result, dict):
+        static_fields = STATIC_FIELDS.get(tool_name, frozenset())
+        result = {key: item for key, item in result.items() if key not in static_fields}
+    return compact_value(result)
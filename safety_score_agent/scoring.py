@@ -0,0 +1,338 @@
+"""NumPy による全対象国の一括スコア計算
+
+各ツールモジュールの calculate_safety_score / calculate_infrastructure_score /
+calculate_law_enforcement_score は1か国分の入れ子の辞書を処理する。
+ここでは N か国分の指標を列（1次元配列）として受け取り、3つのカテゴリスコアを
+ベクトル演算でまとめて計算する。計算式・演算順序・丸めはスカラー版と同一で、
+結果は小数点以下まで一致する。
+
+指標の欠損は NaN で表す。NaN の指標を含む構成要素はスカラー版で
+データソースが存在しない場合と同様に平均から除かれ、すべて欠損した国は
+デフォルト値（犯罪: 50.0、インフラ・法執行機関: 12.5）になる。
+
+カテゴリスコアは構成要素（COMPONENTS）の平均として計算する。構成要素ごとの値は
+score_components で個別に求められ、依存グラフ（dependencies.py）による差分再計算に使う。
+"""
+
+import numbers
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+# 列名（指標）の一覧
+CRIME_INDICATORS = ("safety_index", "peace_score", "homicide_rate")
+INFRASTRUCTURE_INDICATORS = ("cpi_score", "road_deaths_per_100k", "healthcare_index")
+LAW_ENFORCEMENT_INDICATORS = ("police_reliability", "rule_of_law_percentile", "public_trust", "police_corruption")
+INDICATORS = CRIME_INDICATORS + INFRASTRUCTURE_INDICATORS + LAW_ENFORCEMENT_INDICATORS
+
+DEFAULT_CRIME_SCORE = 50.0
+DEFAULT_CATEGORY_SCORE = 12.5
+
+# スカラー版で指標キーがない場合に使われる値（データソース自体は存在する場合）
+INFRASTRUCTURE_DEFAULTS = {"cpi_score": 50, "road_deaths_per_100k": 15, "healthcare_index": 50}
+LAW_ENFORCEMENT_DEFAULTS = {
+    "police_reliability": 3.0,
+    "rule_of_law_percentile": 50,
+    "public_trust": 50,
+    "police_corruption": 50,
+}
+
+
+def round_like_python(values: np.ndarray, digits: int = 1) -> np.ndarray:
+    """
+    Python の round(x, digits) と同じ結果になる丸め
+
+    np.round は x * 10**digits を経由するため、2進数で表せない .x5 付近の値で
+    round() と結果が異なることがある。境界付近の要素だけ round() で計算し直す。
+    """
+    scaled = values * 10 ** digits
+    rounded = np.round(values, digits)
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in np.flatnonzero(near_tie):
+        rounded.flat[index] = round(float(values.flat[index]), digits)
+    return rounded
+
+
+def _mean_of_components(components: Sequence[np.ndarray], default: float) -> np.ndarray:
+    """NaN の構成要素を除いた平均（すべて NaN の場合はデフォルト値）"""
+    total = np.zeros_like(components[0])
+    count = np.zeros(components[0].shape, dtype=np.int64)
+    for component in components:
+        present = ~np.isnan(component)
+        # スカラー版と同じく先頭から順に加算する（欠損分は 0.0 の加算で値は変わらない）
+        total = total + np.where(present, component, 0.0)
+        count += present
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return np.where(count > 0, round_like_python(np.where(count > 0, mean, 0.0), 1), default)
+
+
+def _column(columns: Mapping[str, Any], name: str, size: int) -> np.ndarray:
+    values = columns.get(name)
+    if values is None:
+        return np.full(size, np.nan)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _identity(values: np.ndarray) -> np.ndarray:
+    return values
+
+
+def _peace_component(peace_score: np.ndarray) -> np.ndarray:
+    return np.maximum(0, 100 - (peace_score * 20))
+
+
+def _homicide_component(homicide_rate: np.ndarray) -> np.ndarray:
+    return np.maximum(0, 100 - (homicide_rate * 10))
+
+
+def _political_stability_component(cpi_score: np.ndarray) -> np.ndarray:
+    return (cpi_score / 100) * 25
+
+
+def _transport_safety_component(road_deaths_per_100k: np.ndarray) -> np.ndarray:
+    return np.maximum(0, 25 - (road_deaths_per_100k * 25 / 30))
+
+
+def _healthcare_component(healthcare_index: np.ndarray) -> np.ndarray:
+    return (healthcare_index / 100) * 25
+
+
+def _gpi_component(police_reliability: np.ndarray) -> np.ndarray:
+    return np.maximum(0, 25 - ((police_reliability - 1) * 6.25))
+
+
+def _rule_of_law_component(rule_of_law_percentile: np.ndarray) -> np.ndarray:
+    return (rule_of_law_percentile / 100) * 25
+
+
+def _police_trust_component(public_trust: np.ndarray, police_corruption: np.ndarray) -> np.ndarray:
+    return (public_trust / 100) * 12.5 + ((100 - police_corruption) / 100) * 12.5
+
+
+# カテゴリ → 構成要素（名前, 使用する指標, 計算式）。カテゴリスコアはこの順序で平均する
+COMPONENTS = {
+    "crime": (
+        ("safety_index", ("safety_index",), _identity),
+        ("peace", ("peace_score",), _peace_component),
+        ("homicide", ("homicide_rate",), _homicide_component),
+    ),
+    "infrastructure": (
+        ("political_stability", ("cpi_score",), _political_stability_component),
+        ("transport_safety", ("road_deaths_per_100k",), _transport_safety_component),
+        ("healthcare", ("healthcare_index",), _healthcare_component),
+    ),
+    "law_enforcement": (
+        ("gpi", ("police_reliability",), _gpi_component),
+        ("rule_of_law", ("rule_of_law_percentile",), _rule_of_law_component),
+        ("police_trust", ("public_trust", "police_corruption"), _police_trust_component),
+    ),
+}
+CATEGORY_DEFAULTS = {
+    "crime": DEFAULT_CRIME_SCORE,
+    "infrastructure": DEFAULT_CATEGORY_SCORE,
+    "law_enforcement": DEFAULT_CATEGORY_SCORE,
+}
+
+
+def score_components(category: str, columns: Mapping[str, Any],
+                     names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    カテゴリの構成要素の値を計算（欠損は NaN）
+
+    Args:
+        category: COMPONENTS のカテゴリ名
+        columns: 指標名 → N か国分の値の配列
+        names: 計算する構成要素名（省略時はカテゴリの全構成要素）
+    """
+    wanted = None if names is None else set(names)
+    sizes = {len(values) for values in columns.values() if values is not None}
+    size = sizes.pop() if len(sizes) == 1 else 0
+    return {
+        name: formula(*(_column(columns, indicator, size) for indicator in indicators))
+        for name, indicators, formula in COMPONENTS[category]
+        if wanted is None or name in wanted
+    }
+
+
+def combine_components(category: str, components: Mapping[str, Any]) -> np.ndarray:
+    """構成要素の値（欠損は NaN）からカテゴリスコアを計算"""
+    return _mean_of_components(
+        [np.asarray(components[name], dtype=np.float64) for name, _, _ in COMPONENTS[category]],
+        CATEGORY_DEFAULTS[category],
+    )
+
+
+def score_crime(safety_index: np.ndarray, peace_score: np.ndarray, homicide_rate: np.ndarray) -> np.ndarray:
+    """犯罪・治安の総合安全スコア（0-100）を計算（calculate_safety_score と同一）"""
+    return combine_components("crime", score_components("crime", {
+        "safety_index": safety_index, "peace_score": peace_score, "homicide_rate": homicide_rate,
+    }))
+
+
+def score_infrastructure(cpi_score: np.ndarray, road_deaths_per_100k: np.ndarray,
+                         healthcare_index: np.ndarray) -> np.ndarray:
+    """社会基盤安定度スコア（0-25）を計算（calculate_infrastructure_score と同一）"""
+    return combine_components("infrastructure", score_components("infrastructure", {
+        "cpi_score": cpi_score, "road_deaths_per_100k": road_deaths_per_100k, "healthcare_index": healthcare_index,
+    }))
+
+
+def score_law_enforcement(police_reliability: np.ndarray, rule_of_law_percentile: np.ndarray,
+                          public_trust: np.ndarray, police_corruption: np.ndarray) -> np.ndarray:
+    """法執行機関信頼性スコア（0-25）を計算（calculate_law_enforcement_score と同一）"""
+    return combine_components("law_enforcement", score_components("law_enforcement", {
+        "police_reliability": police_reliability, "rule_of_law_percentile": rule_of_law_percentile,
+        "public_trust": public_trust, "police_corruption": police_corruption,
+    }))
+
+
+def score_all(columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    全カテゴリのスコアを一括計算
+
+    Args:
+        columns: 指標名（INDICATORS）→ N か国分の値の配列。含まれない指標は全て欠損として扱う
+
+    Returns:
+        Dict[str, np.ndarray]: crime（0-100）, infrastructure（0-25）, law_enforcement（0-25）
+    """
+    sizes = {len(values) for values in columns.values() if values is not None}
+    if len(sizes) > 1:
+        raise ValueError(f"All indicator columns must have the same length: {sorted(sizes)}")
+    size = sizes.pop() if sizes else 0
+    column = {name: _column(columns, name, size) for name in INDICATORS}
+
+    return {
+        "crime": score_crime(*(column[name] for name in CRIME_INDICATORS)),
+        "infrastructure": score_infrastructure(*(column[name] for name in INFRASTRUCTURE_INDICATORS)),
+        "law_enforcement": score_law_enforcement(*(column[name] for name in LAW_ENFORCEMENT_INDICATORS)),
+    }
+
+
+# 外務省の危険レベル → テロ・紛争リスクのスコア（統合エージェントの評価基準と同じ配点）
+CONFLICT_LEVEL_SCORES = (("レベル4", 10.0), ("レベル3", 15.0), ("レベル2", 20.0), ("レベル1", 25.0))
+# 危険レベルが取得できない場合の高リスク国一覧の推定リスク → スコア
+CONFLICT_ESTIMATED_RISK_SCORES = {"高": 10.0, "中-高": 15.0}
+CONFLICT_NOT_LISTED_SCORE = 25.0
+
+
+def score_conflict(conflict_result: Optional[Mapping[str, Any]], country_name: str) -> float:
+    """
+    get_conflict_risk_info の結果からテロ・紛争リスクのスコア（0-25）を計算
+
+    Args:
+        conflict_result: get_conflict_risk_info の戻り値
+        country_name: 対象国の日本語名
+
+    Returns:
+        float: 危険レベル → 高リスク国一覧の推定リスク → 一覧外（25点）の順に判定したスコア。
+        取得に失敗した場合は DEFAULT_CATEGORY_SCORE
+    """
+    if not conflict_result or conflict_result.get("status") != "success":
+        return DEFAULT_CATEGORY_SCORE
+
+    danger_level = (conflict_result.get("data") or {}).get(country_name, {}).get("danger_level", "")
+    for level, score in CONFLICT_LEVEL_SCORES:
+        if danger_level.startswith(level):
+            return score
+
+    for entry in conflict_result.get("high_risk_countries") or []:
+        if entry.get("country") == country_name:
+            return CONFLICT_ESTIMATED_RISK_SCORES.get(entry.get("estimated_risk"), 15.0)
+    return CONFLICT_NOT_LISTED_SCORE
+
+
+def _number(value: Any) -> float:
+    """スカラー版の算術演算が成立する数値のみ受け付ける"""
+    if type(value) is not float and type(value) is not int and not isinstance(value, numbers.Real):
+        raise TypeError(f"Indicator value must be a number: {value!r}")
+    return float(value)
+
+
+# カテゴリ → 指標の取得元（ツール出力のセクション, キー, 指標名）
+INDICATOR_FIELDS = {
+    "crime": (
+        ("numbeo_data", "safety_index", "safety_index"),
+        ("global_peace_index", "peace_score", "peace_score"),
+        ("unodc_homicide_rate", "homicide_rate_per_100k", "homicide_rate"),
+    ),
+    "infrastructure": (
+        ("corruption_perception_index", "cpi_score", "cpi_score"),
+        ("traffic_safety_data", "road_traffic_deaths_per_100k", "road_deaths_per_100k"),
+        ("healthcare_system", "healthcare_access_quality_index", "healthcare_index"),
+    ),
+    "law_enforcement": (
+        ("global_peace_index_data", "police_reliability_score", "police_reliability"),
+        ("world_bank_governance", "rule_of_law_percentile", "rule_of_law_percentile"),
+        ("police_trust_indicators", "public_trust_in_police", "public_trust"),
+        ("police_trust_indicators", "corruption_in_police_force", "police_corruption"),
+    ),
+}
+# セクションはあるがキーがない場合の値（犯罪・治安はキーがなければ欠損）
+_FIELD_DEFAULTS = {
+    "crime": None,
+    "infrastructure": INFRASTRUCTURE_DEFAULTS,
+    "law_enforcement": LAW_ENFORCEMENT_DEFAULTS,
+}
+
+
+def extract_indicators(category: str, data: Optional[Mapping[str, Any]]) -> Optional[Dict[str, float]]:
+    """
+    ツール出力から1カテゴリ分の指標を取り出す
+
+    Args:
+        category: INDICATOR_FIELDS のカテゴリ名
+        data: get_crime_data / get_infrastructure_data / get_law_enforcement_data の戻り値
+
+    Returns:
+        Optional[Dict[str, float]]: 指標名 → 値（欠損は NaN）。スカラー版が例外で
+        デフォルト値を返す入力（数値でない値など）の場合は None
+    """
+    fields = INDICATOR_FIELDS[category]
+    row = {name: np.nan for _, _, name in fields}
+    if not data:
+        return row
+    defaults = _FIELD_DEFAULTS[category]
+    try:
+        for section, key, name in fields:
+            if defaults is None:
+                if section in data and key in data[section]:
+                    row[name] = _number(data[section][key])
+            elif section in data:
+                row[name] = _number(data[section].get(key, defaults[name]))
+    except Exception:
+        return None
+    return row
+
+
+def _row(category: str, data: Optional[Mapping[str, Any]]) -> Dict[str, float]:
+    row = extract_indicators(category, data)
+    if row is None:
+        # スカラー版が例外でデフォルト値を返す入力は、全指標を欠損として扱う
+        return {name: np.nan for _, _, name in INDICATOR_FIELDS[category]}
+    return row
+
+
+def columns_from_tool_results(
+    crime_results: Iterable[Optional[Mapping[str, Any]]],
+    infra_results: Iterable[Optional[Mapping[str, Any]]],
+    law_results: Iterable[Optional[Mapping[str, Any]]],
+) -> Dict[str, np.ndarray]:
+    """
+    ツール関数の戻り値（get_crime_data などの入れ子の辞書）を列形式に変換
+
+    3つの引数は同じ国の順序で並べる。データがない国は None を指定する。
+    """
+    crime_results, infra_results, law_results = list(crime_results), list(infra_results), list(law_results)
+    if not len(crime_results) == len(infra_results) == len(law_results):
+        raise ValueError("crime_results, infra_results and law_results must have the same length")
+
+    table = np.empty((len(crime_results), len(INDICATORS)), dtype=np.float64)
+    for index, (crime, infra, law) in enumerate(zip(crime_results, infra_results, law_results)):
+        row = _row("crime", crime)
+        row.update(_row("infrastructure", infra))
+        row.update(_row("law_enforcement", law))
+        table[index] = [row[name] for name in INDICATORS]
+    columns = np.ascontiguousarray(table.T)
+    return {name: columns[position] for position, name in enumerate(INDICATORS)}
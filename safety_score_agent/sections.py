@@ -0,0 +1,16 @@
+"""評価セクション（専門エージェントの出力キー）の定義"""
+
+from typing import Dict
+
+# 専門エージェントの output_key とレポート上のセクション名
+SECTION_LABELS: Dict[str, str] = {
+    "conflict_info": "テロ・紛争",
+    "crime_info": "犯罪・治安",
+    "infra_info": "社会基盤",
+    "law_info": "法執行機関",
+}
+
+
+def get_section_label(output_key: str) -> str:
+    """output_key からセクション名を取得（未登録の場合はキーをそのまま返す）"""
+    return SECTION_LABELS.get(output_key, output_key)
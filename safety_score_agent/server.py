@@ -0,0 +1,74 @@
+"""評価エージェントの配信用 Web アプリ
+
+ADK の FastAPI アプリ（/run, /run_sse などの標準エンドポイント）に、
+評価レポートのストリーミング配信エンドポイントと Prometheus 形式のメトリクス（/metrics）を
+追加して起動する。
+
+使い方:
+    python -m safety_score_agent.server --port 8000
+"""
+
+import argparse
+import os
+from typing import Optional
+
+from fastapi import FastAPI
+from google.adk.agents import BaseAgent
+from google.adk.cli.fast_api import get_fast_api_app
+from google.adk.runners import InMemoryRunner
+
+from . import timing
+from .metrics import add_metrics_route
+from .streaming import REPORT_AUTHOR, add_streaming_routes
+
+APP_NAME = "safety_score_agent"
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(
+    root_agent: Optional[BaseAgent] = None,
+    report_author: Optional[str] = None,
+    web: bool = False,
+) -> FastAPI:
+    """
+    配信用アプリを作成
+
+    Args:
+        root_agent: 評価パイプライン（省略時は safety_score_agent.agent.root_agent）
+        report_author: 統合レポートを出力するエージェント名
+        web: ADK の開発用 UI を有効にするか
+
+    Returns:
+        FastAPI: ADK 標準エンドポイントと評価エンドポイントを持つアプリ
+    """
+    if root_agent is None:
+        from .agent import root_agent, safety_score_synthesizer
+        report_author = report_author or safety_score_synthesizer.name
+
+    app = get_fast_api_app(agents_dir=AGENTS_DIR, web=web)
+    # 評価ごとの所要時間の内訳（timing.py）を集める
+    timing.install()
+    runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+    add_streaming_routes(app, runner, report_author=report_author or REPORT_AUTHOR)
+    add_metrics_route(app)
+    return app
+
+
+def main() -> None:
+    """配信用アプリを uvicorn で起動"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="安全スコア評価エージェントの配信サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--web", action="store_true", help="ADK の開発用 UI を有効にする")
+    args = parser.parse_args()
+
+    # SAFETY_SCORE_CASSETTE が設定されていれば通信を記録・再生する（net/cassette.py）
+    from .net import cassette
+    cassette.install_from_config()
+    uvicorn.run(create_app(web=args.web), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""評価レポートのストリーミング配信
+
+専門エージェントのセクション（テロ・紛争、犯罪・治安、社会基盤、法執行機関）を
+各ブランチの完了時点で配信し、その後統合エージェントのレポートをトークン単位で配信する。
+配信は Server-Sent Events（sse-starlette）で行う。
+
+SSE イベント:
+- ``section``: 専門エージェントの結果（key, label, content, unavailable）
+- ``token``: 統合レポートのテキスト断片
+- ``report``: 統合レポートの全文
+- ``error``: 評価中のエラー
+- ``done``: 配信終了（sections と所要時間の内訳 timing。timing.py）
+"""
+
+import json
+import logging
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from fastapi import FastAPI, Request
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai import types
+from sse_starlette.sse import EventSourceResponse
+
+from . import config, timing
+from .deadline import DEADLINE_STATE_KEY, is_unavailable
+from .sections import SECTION_LABELS, get_section_label
+
+logger = logging.getLogger(__name__)
+
+# 統合エージェント（SafetyScoreSynthesizerAgent が作成する LlmAgent）の名前
+REPORT_AUTHOR = "SafetyScoreSynthesizer"
+DEFAULT_USER_ID = "stream_user"
+
+
+def _sse(event: str, data: Dict[str, Any]) -> Dict[str, str]:
+    """sse-starlette に渡すイベント辞書を作成"""
+    return {"event": event, "data": json.dumps(data, ensure_ascii=False)}
+
+
+def _event_text(event: Event) -> str:
+    """イベントのテキスト（思考過程を除く）を連結して取得"""
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text and not part.thought)
+
+
+async def stream_report(
+    runner: Runner,
+    *,
+    session_id: str,
+    country: str,
+    user_id: str = DEFAULT_USER_ID,
+    report_author: str = REPORT_AUTHOR,
+) -> AsyncGenerator[Dict[str, str], None]:
+    """
+    評価パイプラインを実行し、SSE 用のイベントを発生順に返す
+
+    Args:
+        runner: 評価パイプラインを実行する Runner
+        session_id: 作成済みのセッション ID
+        country: 評価対象の国名
+        user_id: セッションのユーザー ID
+        report_author: 統合レポートを出力するエージェント名
+
+    Yields:
+        Dict[str, str]: sse-starlette 形式のイベント（event, data）
+    """
+    sent_sections = set()
+    streamed_tokens = False
+    message = types.Content(role="user", parts=[types.Part(text=country)])
+
+    with timing.measure(country) as evaluation:
+        try:
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=message,
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                # 専門エージェントのブランチ完了（output_key への書き込み）
+                for key, value in event.actions.state_delta.items():
+                    if key in SECTION_LABELS and key not in sent_sections:
+                        sent_sections.add(key)
+                        yield _sse("section", {
+                            "key": key,
+                            "label": get_section_label(key),
+                            "content": value,
+                            "unavailable": is_unavailable(value),
+                        })
+
+                if event.author != report_author:
+                    continue
+
+                text = _event_text(event)
+                if event.partial:
+                    if text:
+                        streamed_tokens = True
+                        yield _sse("token", {"text": text})
+                elif event.is_final_response() and text:
+                    # ストリーミング非対応のモデルでは全文を1トークンとして送る
+                    if not streamed_tokens:
+                        yield _sse("token", {"text": text})
+                    yield _sse("report", {"text": text})
+        except Exception as e:
+            logger.exception(f"Streaming evaluation failed for {country}")
+            yield _sse("error", {"message": str(e)})
+
+    if config.get_timing_table_enabled():
+        logger.info(f"Timing breakdown for {country}:\n{timing.format_report(evaluation.report)}")
+    yield _sse("done", {"sections": sorted(sent_sections), "timing": evaluation.report})
+
+
+async def create_evaluation_session(
+    runner: Runner,
+    user_id: str = DEFAULT_USER_ID,
+    deadline_seconds: Optional[float] = None,
+) -> str:
+    """評価用のセッションを作成し、セッション ID を返す"""
+    state = {}
+    if deadline_seconds is not None:
+        state[DEADLINE_STATE_KEY] = deadline_seconds
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id, state=state
+    )
+    return session.id
+
+
+def add_streaming_routes(app: FastAPI, runner: Runner, report_author: str = REPORT_AUTHOR) -> None:
+    """
+    評価エンドポイントを FastAPI アプリに登録
+
+    - ``GET /evaluate/stream``: セクション・トークン単位の SSE 配信
+    - ``GET /evaluate``: 評価完了後にまとめて JSON で返す（従来方式）
+    """
+
+    @app.get("/evaluate/stream")
+    async def evaluate_stream(request: Request, country: str, deadline: Optional[float] = None):
+        session_id = await create_evaluation_session(runner, deadline_seconds=deadline)
+
+        async def events():
+            async for item in stream_report(
+                runner, session_id=session_id, country=country, report_author=report_author
+            ):
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected during evaluation of {country}")
+                    break
+                yield item
+
+        return EventSourceResponse(events())
+
+    @app.get("/evaluate")
+    async def evaluate(country: str, deadline: Optional[float] = None):
+        session_id = await create_evaluation_session(runner, deadline_seconds=deadline)
+        result = {"country": country, "sections": {}, "report": "", "error": None}
+        async for item in stream_report(
+            runner, session_id=session_id, country=country, report_author=report_author
+        ):
+            data = json.loads(item["data"])
+            if item["event"] == "section":
+                result["sections"][data["key"]] = data
+            elif item["event"] == "report":
+                result["report"] = data["text"]
+            elif item["event"] == "error":
+                result["error"] = data["message"]
+            elif item["event"] == "done":
+                result["timing"] = data["timing"]
+        return result
@@ -1,14 +1,9 @@
-from google.adk.agents import LlmAgent
-from .tool import get_conflict_risk_info, get_terrorism_info
+from ...lazy import lazy_attributes
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
 
-# Conflict Information Agent
-conflict_agent = LlmAgent(
-    name="ConflictInfoAgent",
-    model=GEMINI_MODEL,
-    instruction="""
+INSTRUCTION = """
     あなたは外務省の海外安全情報を基に、世界各地のテロ・紛争リスクを分析する専門エージェントです。
 
     安全スコアを出力するための評価を求められた場合は、以下の手順で対応してください：
@@ -39,8 +34,27 @@ conflict_agent = LlmAgent(
     - 安全対策の提案
     
     重要: 必ずツールを使用して最新の外務省情報を取得し、推測や古い情報に基づいた回答は避けてください。
-    """,
-    description="外務省の海外安全情報に基づくテロ・紛争リスク分析エージェント",
-    tools=[get_conflict_risk_info, get_terrorism_info],
-    output_key="conflict_info",
-)
\ No newline at end of file
+    """
+
+
+# Conflict Information Agent factory
+def create_conflict_agent():
+    """テロ・紛争リスク評価エージェントを作成（ADK とツールモジュールはここで初めて読み込む）"""
+    from google.adk.agents import LlmAgent
+    from .tool import get_conflict_risk_info, get_terrorism_info
+    from ...agent_tools import as_agent_tools
+    from ... import fake_llm, metrics
+
+    return LlmAgent(
+        name="ConflictInfoAgent",
+        model=fake_llm.get_model_name(GEMINI_MODEL),
+        instruction=INSTRUCTION,
+        description="外務省の海外安全情報に基づくテロ・紛争リスク分析エージェント",
+        tools=as_agent_tools([get_conflict_risk_info, get_terrorism_info]),
+        output_key="conflict_info",
+        after_model_callback=metrics.after_model_callback,
+    )
+
+
+# 初回アクセス時に構築してモジュール属性としてキャッシュする
+__getattr__ = lazy_attributes(__name__, {"conflict_agent": create_conflict_agent})
@@ -3,7 +3,10 @@ from bs4 import BeautifulSoup
 import re
 from typing import Dict, Optional
 
+from safety_score_agent import tracing
 
+
+@tracing.traced("source.mofa_risk")
 def get_conflict_risk_info(country_name: Optional[str] = None, region: Optional[str] = None) -> Dict:
     """
     外務省の海外安全情報サイトからテロ・紛争リスクの情報を取得する
@@ -52,7 +55,8 @@ def get_conflict_risk_info(country_name: Optional[str] = None, region: Optional[
             
             response = requests.get(country_url, timeout=10)
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+                    soup = BeautifulSoup(response.content, 'html.parser')
                 
                 # 危険レベルの抽出
                 danger_level = "不明"
@@ -131,6 +135,7 @@ def get_conflict_risk_info(country_name: Optional[str] = None, region: Optional[
         }
 
 
+@tracing.traced("source.terrorism")
 def get_terrorism_info(region: str = "global") -> Dict:
     """
     特定地域のテロリスク情報を取得
@@ -1,14 +1,9 @@
-from google.adk.agents import LlmAgent
-from .tool import get_crime_data, analyze_travel_safety_risks
+from ...lazy import lazy_attributes
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
 
-# Crime Information Agent
-crime_agent = LlmAgent(
-    name="CrimeAgent",
-    model=GEMINI_MODEL,
-    instruction="""あなたは犯罪・治安情報分析エージェントです。
+INSTRUCTION = """あなたは犯罪・治安情報分析エージェントです。
 
 指定された国や地域の犯罪・治安情報を収集・分析し、旅行者向けの安全評価を提供します。
 
@@ -38,8 +33,27 @@ crime_agent = LlmAgent(
 - データの信頼性と更新日時の記載
 
 重要: 必ず提供されたツールを使用してデータを取得し、推測や仮定による情報は避けてください。
-""",
-    description="国・地域の犯罪・治安情報を分析し、旅行者向けの安全評価を提供します",
-    tools=[get_crime_data, analyze_travel_safety_risks],
-    output_key="crime_info",
-)
\ No newline at end of file
+"""
+
+
+# Crime Information Agent factory
+def create_crime_agent():
+    """犯罪・治安評価エージェントを作成（ADK とツールモジュールはここで初めて読み込む）"""
+    from google.adk.agents import LlmAgent
+    from .tool import get_crime_data, analyze_travel_safety_risks
+    from ...agent_tools import as_agent_tools
+    from ... import fake_llm, metrics
+
+    return LlmAgent(
+        name="CrimeAgent",
+        model=fake_llm.get_model_name(GEMINI_MODEL),
+        instruction=INSTRUCTION,
+        description="国・地域の犯罪・治安情報を分析し、旅行者向けの安全評価を提供します",
+        tools=as_agent_tools([get_crime_data, analyze_travel_safety_risks]),
+        output_key="crime_info",
+        after_model_callback=metrics.after_model_callback,
+    )
+
+
+# 初回アクセス時に構築してモジュール属性としてキャッシュする
+__getattr__ = lazy_attributes(__name__, {"crime_agent": create_crime_agent})
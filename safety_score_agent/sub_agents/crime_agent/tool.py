@@ -7,10 +7,12 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, quote
 import logging
 
-# ログ設定
-logging.basicConfig(level=logging.INFO)
+from safety_score_agent import tracing
+
+# ログ設定（ハンドラーとレベルはアプリケーション側で設定する）
 logger = logging.getLogger(__name__)
 
+@tracing.traced("tool.crime")
 def get_crime_data(country: str) -> Dict[str, Any]:
     """
     複数のデータソースから犯罪データを取得する
@@ -53,6 +55,7 @@ def get_crime_data(country: str) -> Dict[str, Any]:
             "fallback_data": get_fallback_crime_data(country)
         }
 
+@tracing.traced("source.numbeo")
 def get_numbeo_crime_data(country: str) -> Dict[str, Any]:
     """
     Numbeoから実際の犯罪指数データを取得
@@ -64,13 +67,13 @@ def get_numbeo_crime_data(country: str) -> Dict[str, Any]:
         Dict containing crime data from Numbeo
     """
     try:
-        # 国名の正規化とURL生成
-        country_variations = [
+        # 国名の正規化とURL生成（空白を含まない国名では同じURLになるため重複を除く）
+        country_variations = list(dict.fromkeys([
             country,
             country.replace(" ", "+"),
             country.replace(" ", "-"),
             country.replace(" ", "")
-        ]
+        ]))
         
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -84,7 +87,8 @@ def get_numbeo_crime_data(country: str) -> Dict[str, Any]:
                 response = requests.get(url, headers=headers, timeout=10)
                 response.raise_for_status()
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+                    soup = BeautifulSoup(response.content, 'html.parser')
                 
                 # 犯罪指数データを抽出
                 crime_data = extract_numbeo_crime_indices(soup)
@@ -110,6 +114,7 @@ def get_numbeo_crime_data(country: str) -> Dict[str, Any]:
         logger.error(f"Unexpected error processing Numbeo data for {country}: {str(e)}")
         return get_fallback_numbeo_data(country)
 
+@tracing.traced("extract.numbeo")
 def extract_numbeo_crime_indices(soup: BeautifulSoup) -> Dict[str, Any]:
     """
     NumbeoのHTMLから犯罪指数データを抽出
@@ -149,6 +154,7 @@ def extract_numbeo_crime_indices(soup: BeautifulSoup) -> Dict[str, Any]:
         logger.error(f"Error extracting Numbeo indices: {str(e)}")
         return {}
 
+@tracing.traced("extract.numbeo_categories")
 def extract_crime_categories(soup: BeautifulSoup) -> Dict[str, str]:
     """
     個別の犯罪カテゴリレベルを抽出
@@ -185,6 +191,7 @@ def extract_crime_categories(soup: BeautifulSoup) -> Dict[str, str]:
         logger.error(f"Error extracting crime categories: {str(e)}")
         return {}
 
+@tracing.traced("fallback.numbeo", fallback=True)
 def get_fallback_numbeo_data(country: str) -> Dict[str, Any]:
     """
     Numbeoデータ取得失敗時のフォールバックデータ
@@ -202,6 +209,7 @@ def get_fallback_numbeo_data(country: str) -> Dict[str, Any]:
         "note": f"Real-time data for {country} could not be retrieved"
     }
 
+@tracing.traced("source.gpi")
 def get_global_peace_index_data(country: str) -> Dict[str, Any]:
     """
     世界平和度指数から実際の安全データを取得
@@ -217,7 +225,8 @@ def get_global_peace_index_data(country: str) -> Dict[str, Any]:
         response = requests.get(url, headers=headers, timeout=15)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # GPI データを抽出を試行
         gpi_data = extract_gpi_data(soup, country)
@@ -241,6 +250,7 @@ def get_global_peace_index_data(country: str) -> Dict[str, Any]:
         logger.error(f"Unexpected error processing GPI data for {country}: {str(e)}")
         return get_fallback_gpi_data(country)
 
+@tracing.traced("extract.gpi")
 def extract_gpi_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     GPIのHTMLからデータを抽出（構造が複雑なため基本的な抽出）
@@ -266,6 +276,7 @@ def extract_gpi_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
         logger.error(f"Error extracting GPI data: {str(e)}")
         return {}
 
+@tracing.traced("source.mofa")
 def get_mofa_safety_info(country: str) -> Dict[str, Any]:
     """
     外務省の海外安全情報を取得して安全度を評価
@@ -284,7 +295,8 @@ def get_mofa_safety_info(country: str) -> Dict[str, Any]:
         response = requests.get(countries_url, headers=headers, timeout=10)
         response.encoding = 'utf-8'
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 危険度レベルの色分けを確認
         safety_level = extract_mofa_safety_level(soup, country)
@@ -301,6 +313,7 @@ def get_mofa_safety_info(country: str) -> Dict[str, Any]:
         logger.error(f"Error fetching MOFA data for {country}: {str(e)}")
         return {}
 
+@tracing.traced("extract.mofa")
 def extract_mofa_safety_level(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     外務省の安全情報から危険度レベルを抽出
@@ -338,6 +351,7 @@ def extract_mofa_safety_level(soup: BeautifulSoup, country: str) -> Dict[str, An
         logger.error(f"Error extracting MOFA safety level: {str(e)}")
         return {"rank": 50, "score": 2.0, "crime": 2.0, "security": 2.0}
 
+@tracing.traced("fallback.gpi", fallback=True)
 def get_fallback_gpi_data(country: str) -> Dict[str, Any]:
     """
     GPI データ取得失敗時のフォールバック
@@ -353,6 +367,7 @@ def get_fallback_gpi_data(country: str) -> Dict[str, Any]:
         "note": f"Real-time GPI data for {country} could not be retrieved"
     }
 
+@tracing.traced("source.unodc")
 def get_unodc_homicide_data(country: str) -> Dict[str, Any]:
     """
     国連薬物犯罪事務所から実際の殺人率データを取得
@@ -369,7 +384,8 @@ def get_unodc_homicide_data(country: str) -> Dict[str, Any]:
         response = requests.get(unodc_url, headers=headers, timeout=15)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # UNODCデータを抽出
         homicide_data = extract_unodc_homicide_data(soup, country)
@@ -393,6 +409,7 @@ def get_unodc_homicide_data(country: str) -> Dict[str, Any]:
         logger.error(f"Unexpected error processing UNODC data for {country}: {str(e)}")
         return get_fallback_unodc_data(country)
 
+@tracing.traced("extract.unodc")
 def extract_unodc_homicide_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     UNODCのHTMLから殺人率データを抽出
@@ -417,6 +434,7 @@ def extract_unodc_homicide_data(soup: BeautifulSoup, country: str) -> Dict[str,
         logger.error(f"Error extracting UNODC homicide data: {str(e)}")
         return {}
 
+@tracing.traced("source.who_mortality")
 def get_who_mortality_data(country: str) -> Dict[str, Any]:
     """
     WHO Global Health Observatoryから死亡率データを取得
@@ -439,6 +457,7 @@ def get_who_mortality_data(country: str) -> Dict[str, Any]:
         logger.error(f"Error fetching WHO data for {country}: {str(e)}")
         return {}
 
+@tracing.traced("fallback.unodc_regional", fallback=True)
 def estimate_homicide_rate_by_region(country: str) -> Dict[str, Any]:
     """
     地域別の一般的な殺人率を推定
@@ -476,6 +495,7 @@ def estimate_homicide_rate_by_region(country: str) -> Dict[str, Any]:
         "year": 2023
     }
 
+@tracing.traced("fallback.who_mortality_regional", fallback=True)
 def estimate_mortality_by_region(country: str) -> Dict[str, Any]:
     """
     地域に基づく死亡率の推定
@@ -497,6 +517,7 @@ def classify_homicide_rate(rate: float) -> str:
     else:
         return "Very high homicide rate country"
 
+@tracing.traced("fallback.unodc", fallback=True)
 def get_fallback_unodc_data(country: str) -> Dict[str, Any]:
     """
     UNODC データ取得失敗時のフォールバック
@@ -514,6 +535,7 @@ def get_fallback_unodc_data(country: str) -> Dict[str, Any]:
         "note": f"Estimated data for {country} based on regional averages"
     }
 
+@tracing.traced("score.crime")
 def calculate_safety_score(crime_data: Dict[str, Any]) -> float:
     """
     複数のデータソースから総合安全スコアを計算
@@ -550,6 +572,7 @@ def calculate_safety_score(crime_data: Dict[str, Any]) -> float:
     except Exception as e:
         return 50.0  # エラー時のデフォルト値
 
+@tracing.traced("fallback.crime", fallback=True)
 def get_fallback_crime_data(country: str) -> Dict[str, Any]:
     """
     データ取得に失敗した場合のフォールバックデータ
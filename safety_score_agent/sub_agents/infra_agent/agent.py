@@ -1,14 +1,9 @@
-from google.adk.agents import LlmAgent
-from .tool import get_infrastructure_data, analyze_infrastructure_risks, calculate_infrastructure_stability_impact
+from ...lazy import lazy_attributes
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
 
-# Infrastructure Stability Agent
-infra_agent = LlmAgent(
-    name="InfrastructureAgent",
-    model=GEMINI_MODEL,
-    instruction="""あなたは社会基盤の安定度分析エージェントです。
+INSTRUCTION = """あなたは社会基盤の安定度分析エージェントです。
 
 指定された国や地域の社会基盤の安定度を評価し、旅行者の安全に与える影響を分析します。
 
@@ -48,8 +43,27 @@ infra_agent = LlmAgent(
 - 総合的なインフラ脆弱性がリカバリー能力に与える影響
 
 重要: 必ず提供されたツールを使用してデータを取得し、推測や仮定による情報は避けてください。
-""",
-    description="国・地域の社会基盤の安定度を評価し、旅行者の安全への影響を分析します",
-    tools=[get_infrastructure_data, analyze_infrastructure_risks, calculate_infrastructure_stability_impact],
-    output_key="infra_info",
-)
\ No newline at end of file
+"""
+
+
+# Infrastructure Stability Agent factory
+def create_infra_agent():
+    """社会基盤安定度評価エージェントを作成（ADK とツールモジュールはここで初めて読み込む）"""
+    from google.adk.agents import LlmAgent
+    from .tool import get_infrastructure_data, analyze_infrastructure_risks, calculate_infrastructure_stability_impact
+    from ...agent_tools import as_agent_tools
+    from ... import fake_llm, metrics
+
+    return LlmAgent(
+        name="InfrastructureAgent",
+        model=fake_llm.get_model_name(GEMINI_MODEL),
+        instruction=INSTRUCTION,
+        description="国・地域の社会基盤の安定度を評価し、旅行者の安全への影響を分析します",
+        tools=as_agent_tools([get_infrastructure_data, analyze_infrastructure_risks, calculate_infrastructure_stability_impact]),
+        output_key="infra_info",
+        after_model_callback=metrics.after_model_callback,
+    )
+
+
+# 初回アクセス時に構築してモジュール属性としてキャッシュする
+__getattr__ = lazy_attributes(__name__, {"infra_agent": create_infra_agent})
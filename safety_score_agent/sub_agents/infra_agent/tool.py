@@ -6,6 +6,9 @@ from bs4 import BeautifulSoup
 import re
 from urllib.parse import urljoin, quote
 
+from safety_score_agent import tracing
+
+@tracing.traced("tool.infrastructure")
 def get_infrastructure_data(country: str) -> Dict[str, Any]:
     """
     複数のデータソースから社会基盤の安定度データを取得する
@@ -52,6 +55,7 @@ def get_infrastructure_data(country: str) -> Dict[str, Any]:
             "fallback_data": get_fallback_infrastructure_data(country)
         }
 
+@tracing.traced("source.cpi")
 def get_corruption_data(country: str) -> Dict[str, Any]:
     """
     Transparency Internationalから汚職認識指数データをスクレイピング
@@ -72,7 +76,8 @@ def get_corruption_data(country: str) -> Dict[str, Any]:
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # データを抽出する試み（実際のサイト構造に依存）
         cpi_data = scrape_cpi_data(soup, country)
@@ -87,6 +92,7 @@ def get_corruption_data(country: str) -> Dict[str, Any]:
         print(f"汚職認識指数データの取得に失敗: {str(e)}")
         return get_fallback_corruption_data(country)
 
+@tracing.traced("extract.cpi")
 def scrape_cpi_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     BeautifulSoupオブジェクトからCPIデータを抽出
@@ -153,6 +159,7 @@ def classify_cpi_score(score: float) -> str:
     else:
         return "Very Poor"
 
+@tracing.traced("fallback.cpi", fallback=True)
 def get_fallback_corruption_data(country: str) -> Dict[str, Any]:
     """
     スクレイピングに失敗した場合のフォールバックデータ
@@ -171,6 +178,7 @@ def get_fallback_corruption_data(country: str) -> Dict[str, Any]:
         "note": f"実際の{country}のデータ取得に失敗したため、推定値を使用"
     }
 
+@tracing.traced("source.who_road")
 def get_traffic_safety_data(country: str) -> Dict[str, Any]:
     """
     WHO統計サイトから交通安全データをスクレイピング
@@ -191,7 +199,8 @@ def get_traffic_safety_data(country: str) -> Dict[str, Any]:
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 交通安全データを抽出
         traffic_data = scrape_traffic_data(soup, country)
@@ -205,6 +214,7 @@ def get_traffic_safety_data(country: str) -> Dict[str, Any]:
         print(f"交通安全データの取得に失敗: {str(e)}")
         return get_fallback_traffic_data(country)
 
+@tracing.traced("extract.who_road")
 def scrape_traffic_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     BeautifulSoupオブジェクトから交通安全データを抽出
@@ -329,6 +339,7 @@ def get_common_risk_factors() -> List[str]:
         "Pedestrian safety"
     ]
 
+@tracing.traced("fallback.who_road", fallback=True)
 def get_fallback_traffic_data(country: str) -> Dict[str, Any]:
     """
     スクレイピングに失敗した場合のフォールバックデータ
@@ -350,6 +361,7 @@ def get_fallback_traffic_data(country: str) -> Dict[str, Any]:
         "scraped_at": time.time()
     }
 
+@tracing.traced("source.who_gho")
 def get_healthcare_data(country: str) -> Dict[str, Any]:
     """
     WHO統計および各種医療データサイトから医療システムデータをスクレイピング
@@ -370,7 +382,8 @@ def get_healthcare_data(country: str) -> Dict[str, Any]:
         response = requests.get(url, headers=headers, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 医療データを抽出
         healthcare_data = scrape_healthcare_data(soup, country)
@@ -384,6 +397,7 @@ def get_healthcare_data(country: str) -> Dict[str, Any]:
         print(f"医療システムデータの取得に失敗: {str(e)}")
         return get_fallback_healthcare_data(country)
 
+@tracing.traced("extract.who_gho")
 def scrape_healthcare_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     BeautifulSoupオブジェクトから医療システムデータを抽出
@@ -541,6 +555,7 @@ def classify_emergency_care(index: float) -> str:
     else:
         return "Poor"
 
+@tracing.traced("fallback.who_gho", fallback=True)
 def get_fallback_healthcare_data(country: str) -> Dict[str, Any]:
     """
     スクレイピングに失敗した場合のフォールバックデータ
@@ -569,6 +584,7 @@ def get_fallback_healthcare_data(country: str) -> Dict[str, Any]:
         "scraped_at": time.time()
     }
 
+@tracing.traced("score.infrastructure")
 def calculate_infrastructure_score(infra_data: Dict[str, Any]) -> float:
     """
     複数のデータソースから総合インフラ安定度スコア（25点満点）を計算
@@ -666,6 +682,7 @@ def analyze_infrastructure_risks(infra_data: Dict[str, Any]) -> Dict[str, Any]:
     
     return analysis
 
+@tracing.traced("fallback.infrastructure", fallback=True)
 def get_fallback_infrastructure_data(country: str) -> Dict[str, Any]:
     """
     データ取得に失敗した場合のフォールバックデータ
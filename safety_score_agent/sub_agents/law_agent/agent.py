@@ -1,14 +1,9 @@
-from google.adk.agents import LlmAgent
-from .tool import get_law_enforcement_data, analyze_law_enforcement_risks, assess_traveler_law_enforcement_support, calculate_law_enforcement_reliability_impact
+from ...lazy import lazy_attributes
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
 
-# Law Enforcement Reliability Agent
-law_agent = LlmAgent(
-    name="LawEnforcementAgent",
-    model=GEMINI_MODEL,
-    instruction="""あなたは法執行機関の信頼性分析エージェントです。
+INSTRUCTION = """あなたは法執行機関の信頼性分析エージェントです。
 
 指定された国や地域の警察・司法制度の信頼性を評価し、旅行者がトラブルに巻き込まれた際の支援体制を分析します。
 
@@ -57,8 +52,27 @@ law_agent = LlmAgent(
 - 文化的・言語的障壁を考慮した実用的アドバイス提供
 
 重要: 必ず提供されたツールを使用してデータを取得し、推測や仮定による情報は避けてください。
-""",
-    description="国・地域の法執行機関の信頼性を評価し、旅行者のトラブル時サポート体制を分析します",
-    tools=[get_law_enforcement_data, analyze_law_enforcement_risks, assess_traveler_law_enforcement_support, calculate_law_enforcement_reliability_impact],
-    output_key="law_info",
-)
\ No newline at end of file
+"""
+
+
+# Law Enforcement Reliability Agent factory
+def create_law_agent():
+    """法執行機関信頼性評価エージェントを作成（ADK とツールモジュールはここで初めて読み込む）"""
+    from google.adk.agents import LlmAgent
+    from .tool import get_law_enforcement_data, analyze_law_enforcement_risks, assess_traveler_law_enforcement_support, calculate_law_enforcement_reliability_impact
+    from ...agent_tools import as_agent_tools
+    from ... import fake_llm, metrics
+
+    return LlmAgent(
+        name="LawEnforcementAgent",
+        model=fake_llm.get_model_name(GEMINI_MODEL),
+        instruction=INSTRUCTION,
+        description="国・地域の法執行機関の信頼性を評価し、旅行者のトラブル時サポート体制を分析します",
+        tools=as_agent_tools([get_law_enforcement_data, analyze_law_enforcement_risks, assess_traveler_law_enforcement_support, calculate_law_enforcement_reliability_impact]),
+        output_key="law_info",
+        after_model_callback=metrics.after_model_callback,
+    )
+
+
+# 初回アクセス時に構築してモジュール属性としてキャッシュする
+__getattr__ = lazy_attributes(__name__, {"law_agent": create_law_agent})
@@ -8,6 +8,9 @@ import urllib.parse
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from safety_score_agent import tracing
+
+@tracing.traced("tool.law_enforcement")
 def get_law_enforcement_data(country: str) -> Dict[str, Any]:
     """
     複数のデータソースから法執行機関の信頼性データを取得する
@@ -54,6 +57,7 @@ def get_law_enforcement_data(country: str) -> Dict[str, Any]:
             "fallback_data": get_fallback_law_enforcement_data(country)
         }
 
+@tracing.traced("source.gpi")
 def get_gpi_law_enforcement_data(country: str) -> Dict[str, Any]:
     """
     世界平和度指数サイトから法執行関連データを取得
@@ -78,7 +82,8 @@ def get_gpi_law_enforcement_data(country: str) -> Dict[str, Any]:
         }
         
         response = session.get(search_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 国別データページへのリンクを探す
         country_link = None
@@ -93,7 +98,8 @@ def get_gpi_law_enforcement_data(country: str) -> Dict[str, Any]:
                 country_link = base_url + country_link
             
             country_response = session.get(country_link, headers=headers, timeout=10)
-            country_soup = BeautifulSoup(country_response.content, 'html.parser')
+            with tracing.span("parse", **{"http.response.body.size": len(country_response.content)}):
+                country_soup = BeautifulSoup(country_response.content, 'html.parser')
             
             # データ要素を探して抽出
             gpi_data = extract_gpi_data(country_soup, country)
@@ -107,6 +113,7 @@ def get_gpi_law_enforcement_data(country: str) -> Dict[str, Any]:
         print(f"GPI data scraping error for {country}: {str(e)}")
         return get_default_gpi_data(country)
 
+@tracing.traced("extract.gpi")
 def extract_gpi_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     Beautiful SoupオブジェクトからGPIデータを抽出
@@ -170,6 +177,7 @@ def extract_gpi_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
         print(f"Error extracting GPI data: {str(e)}")
         return get_default_gpi_data(country)
 
+@tracing.traced("fallback.gpi", fallback=True)
 def get_default_gpi_data(country: str) -> Dict[str, Any]:
     """
     デフォルトGPIデータ（スクレイピング失敗時）
@@ -190,6 +198,7 @@ def get_default_gpi_data(country: str) -> Dict[str, Any]:
         "note": "Real data could not be retrieved"
     }
 
+@tracing.traced("source.wgi")
 def get_world_bank_governance_data(country: str) -> Dict[str, Any]:
     """
     世界銀行のガバナンス指標サイトから法の支配データを取得
@@ -214,7 +223,8 @@ def get_world_bank_governance_data(country: str) -> Dict[str, Any]:
         }
         
         response = session.get(governance_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 国別データページまたはAPIエンドポイントを探す
         wb_data = extract_worldbank_data(soup, country)
@@ -225,6 +235,7 @@ def get_world_bank_governance_data(country: str) -> Dict[str, Any]:
         print(f"World Bank data scraping error for {country}: {str(e)}")
         return get_default_worldbank_data(country)
 
+@tracing.traced("extract.wgi")
 def extract_worldbank_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
     """
     世界銀行サイトからガバナンス指標を抽出
@@ -290,6 +301,7 @@ def extract_worldbank_data(soup: BeautifulSoup, country: str) -> Dict[str, Any]:
         print(f"Error extracting World Bank data: {str(e)}")
         return get_default_worldbank_data(country)
 
+@tracing.traced("fallback.wgi", fallback=True)
 def get_default_worldbank_data(country: str) -> Dict[str, Any]:
     """
     デフォルト世界銀行データ（スクレイピング失敗時）
@@ -309,6 +321,7 @@ def get_default_worldbank_data(country: str) -> Dict[str, Any]:
         "note": "Real data could not be retrieved"
     }
 
+@tracing.traced("source.police_trust")
 def get_police_trust_data(country: str) -> Dict[str, Any]:
     """
     複数のソースから警察信頼度に関する詳細データを取得
@@ -361,6 +374,7 @@ def get_police_trust_data(country: str) -> Dict[str, Any]:
         print(f"Police trust data scraping error for {country}: {str(e)}")
         return get_default_police_trust_data(country)
 
+@tracing.traced("source.cpi")
 def scrape_transparency_international_data(country: str) -> Dict[str, Any]:
     """
     Transparency International Corruption Perceptions Indexからデータを取得
@@ -373,7 +387,8 @@ def scrape_transparency_international_data(country: str) -> Dict[str, Any]:
         }
         
         response = session.get(ti_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 国別の汚職認識指数を探す
         corruption_score = None
@@ -399,6 +414,7 @@ def scrape_transparency_international_data(country: str) -> Dict[str, Any]:
         print(f"TI data scraping error: {str(e)}")
         return {"corruption_perception": 30.0}
 
+@tracing.traced("source.gallup")
 def scrape_gallup_trust_data(country: str) -> Dict[str, Any]:
     """
     Gallup World Pollから信頼度データを取得
@@ -413,7 +429,8 @@ def scrape_gallup_trust_data(country: str) -> Dict[str, Any]:
         }
         
         response = session.get(gallup_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 警察信頼度に関するデータを探す
         trust_score = None
@@ -435,6 +452,7 @@ def scrape_gallup_trust_data(country: str) -> Dict[str, Any]:
         print(f"Gallup data scraping error: {str(e)}")
         return {"public_trust_score": 65.0}
 
+@tracing.traced("source.oecd")
 def scrape_oecd_safety_data(country: str) -> Dict[str, Any]:
     """
     OECD Better Life Indexから安全データを取得
@@ -447,7 +465,8 @@ def scrape_oecd_safety_data(country: str) -> Dict[str, Any]:
         }
         
         response = session.get(oecd_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with tracing.span("parse", **{"http.response.body.size": len(response.content)}):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 国別の安全指標を探す
         safety_data = {}
@@ -470,6 +489,7 @@ def scrape_oecd_safety_data(country: str) -> Dict[str, Any]:
         print(f"OECD data scraping error: {str(e)}")
         return {"reporting_rate": 68.0}
 
+@tracing.traced("fallback.police_trust", fallback=True)
 def get_default_police_trust_data(country: str) -> Dict[str, Any]:
     """
     デフォルト警察信頼度データ（スクレイピング失敗時）
@@ -498,6 +518,7 @@ def get_default_police_trust_data(country: str) -> Dict[str, Any]:
         "note": "Real data could not be retrieved"
     }
 
+@tracing.traced("score.law_enforcement")
 def calculate_law_enforcement_score(law_data: Dict[str, Any]) -> float:
     """
     複数のデータソースから総合法執行機関信頼性スコア（25点満点）を計算
@@ -646,6 +667,7 @@ def assess_traveler_law_enforcement_support(law_data: Dict[str, Any]) -> Dict[st
     
     return support_assessment
 
+@tracing.traced("fallback.law_enforcement", fallback=True)
 def get_fallback_law_enforcement_data(country: str) -> Dict[str, Any]:
     """
     データ取得に失敗した場合のフォールバックデータ
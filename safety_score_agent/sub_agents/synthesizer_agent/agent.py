@@ -1,5 +1,12 @@
-from typing import Dict, Any, Optional
-from google.adk.agents import LlmAgent
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+from ...context_cache import create_default_backend, make_context_cache_callback
+from ...lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+
+    from ...context_cache import ContextCacheBackend
 
 # --- Constants ---
 GEMINI_MODEL = "gemini-2.0-flash"
@@ -37,39 +44,52 @@ class SafetyScoreLevels:
 class SafetyScoreSynthesizerAgent:
     """安全スコア統合評価エージェント"""
     
-    def __init__(self):
+    def __init__(self, context_cache: Optional["ContextCacheBackend"] = None):
+        """
+        Args:
+            context_cache: 静的指示文のコンテキストキャッシュ（省略時は環境変数
+                SAFETY_SCORE_CONTEXT_CACHE に従って作成し、利用できなければ使用しない）
+        """
         self.categories = SafetyScoreCategories()
         self.thresholds = SafetyScoreThresholds()
         self.levels = SafetyScoreLevels()
+        self.context_cache = context_cache if context_cache is not None else create_default_backend()
         self.agent = self._create_agent()
     
-    def _create_agent(self) -> LlmAgent:
+    def _create_agent(self) -> "LlmAgent":
         """LlmAgentインスタンスを作成"""
+        from google.adk.agents import LlmAgent
+        from ... import fake_llm, metrics
+
+        before_model_callback = None
+        if self.context_cache is not None:
+            # 静的指示文はプロバイダー側のキャッシュから参照し、毎回の送信・トークン化を省く
+            before_model_callback = make_context_cache_callback(
+                self._build_static_instruction(), self.context_cache
+            )
+
         return LlmAgent(
             name="SafetyScoreSynthesizer",
-            model=GEMINI_MODEL,
+            model=fake_llm.get_model_name(GEMINI_MODEL),
             instruction=self._build_instruction(),
             description="4つの専門エージェントからの安全情報を統合し、総合安全スコア（100点満点）を算出します",
+            before_model_callback=before_model_callback,
+            after_model_callback=metrics.after_model_callback,
         )
     
     def _build_instruction(self) -> str:
-        """エージェントの指示文を構築"""
+        """エージェントの指示文を構築（静的指示文の後に入力データを続ける）"""
+        return f"""{self._build_static_instruction()}
+
+{self._build_input_data_section()}"""
+    
+    def _build_static_instruction(self) -> str:
+        """評価対象の国に依存しない静的な指示文を構築（コンテキストキャッシュの対象）"""
         return f"""あなたは高度な安全スコア統合評価エージェントです。
 
 ## 🎯 主要任務
 4つの専門エージェントから取得した多角的な安全情報を総合的に分析・評価し、指定された国・地域の総合安全スコア（{TOTAL_MAX_SCORE}点満点）を科学的かつ客観的に算出します。
 
-## 📥 入力データソース
-各専門エージェントからの詳細情報を統合処理します：
-- **テロ・紛争リスク情報**: {{conflict_info}}
-  - 外務省危険レベル、テロ組織動向、武力衝突データ、政治不安定度指標
-- **犯罪・治安情報**: {{crime_info}}
-  - 犯罪統計、治安当局対応能力、街頭犯罪率、観光客被害データ
-- **社会基盤安定度情報**: {{infra_info}}
-  - 政治腐敗指数、交通安全統計、医療システム評価、経済安定性指標
-- **法執行機関信頼性情報**: {{law_info}}
-  - 警察信頼度調査、司法制度評価、汚職度測定、法の支配指数
-
 ## 🧠 分析アプローチ
 1. **多次元データ統合**: 各エージェントの情報を相互関連性を考慮して統合
 2. **リスク重み付け評価**: 旅行者への実際の影響度に基づく重要度調整
@@ -83,12 +103,26 @@ class SafetyScoreSynthesizerAgent:
 
 {self._get_evaluation_guidelines()}
 
+{self._get_missing_data_guidelines()}
+
 ## 🔍 品質保証要件
 - データの信頼性と最新性を常に検証
 - バイアスを排除した客観的評価の実施
 - 明確な根拠に基づく透明性の高い評価プロセス
-- 実用性と精度のバランスを重視した実践的提言の提供
-"""
+- 実用性と精度のバランスを重視した実践的提言の提供"""
+    
+    def _build_input_data_section(self) -> str:
+        """専門エージェントの結果を埋め込む動的な指示文を構築"""
+        return """## 📥 入力データソース
+各専門エージェントからの詳細情報を統合処理します：
+- **テロ・紛争リスク情報**: {conflict_info}
+  - 外務省危険レベル、テロ組織動向、武力衝突データ、政治不安定度指標
+- **犯罪・治安情報**: {crime_info}
+  - 犯罪統計、治安当局対応能力、街頭犯罪率、観光客被害データ
+- **社会基盤安定度情報**: {infra_info}
+  - 政治腐敗指数、交通安全統計、医療システム評価、経済安定性指標
+- **法執行機関信頼性情報**: {law_info}
+  - 警察信頼度調査、司法制度評価、汚職度測定、法の支配指数"""
     
     def _get_evaluation_criteria(self) -> str:
         """評価基準を取得"""
@@ -193,6 +227,16 @@ class SafetyScoreSynthesizerAgent:
 - 最新の情勢変化を適切に反映
 - 利用者の安全確保を最優先とした実践的提言の提供"""
     
+    def _get_missing_data_guidelines(self) -> str:
+        """データ欠損時のガイドラインを取得"""
+        from ...deadline import DATA_UNAVAILABLE_MARKER
+
+        return f"""### ⏱️ データ欠損時の対応
+- 入力データが「{DATA_UNAVAILABLE_MARKER}」で始まる項目は、制限時間内にデータを取得できなかった項目です
+- 該当項目は推測で補完せず、取得済みの他項目と一般的な傾向に基づく暫定スコアとしてください
+- レポートの該当項目の評価理由に「データ取得不可のため暫定評価」と明記してください
+- 残りの項目の評価は通常どおり実施し、レポート全体の生成を中断しないでください"""
+    
     def get_safety_level(self, total_score: int) -> str:
         """総合スコアから安全レベルを判定"""
         if total_score >= self.thresholds.EXCELLENT:
@@ -241,5 +285,8 @@ class SafetyScoreSynthesizerAgent:
 
 
 # インスタンス作成（後方互換性のため）
-synthesizer_agent = SafetyScoreSynthesizerAgent()
-safety_score_synthesizer = synthesizer_agent.agent
\ No newline at end of file
+# 初回アクセス時に構築してモジュール属性としてキャッシュする
+__getattr__ = lazy_attributes(__name__, {
+    "synthesizer_agent": SafetyScoreSynthesizerAgent,
+    "safety_score_synthesizer": lambda: __getattr__("synthesizer_agent").agent,
+})
@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from safety_score_agent.batch import (
+    STAGES,
+    Checkpoint,
+    evaluate_country,
+    format_summary,
+    main,
+    resolve_countries,
+    run_batch,
+    summarize,
+)
+from safety_score_agent.countries import get_country
+from safety_score_agent.fixtures.tool_outputs import make_sources
+from safety_score_agent.sub_agents.infra_agent.tool import calculate_infrastructure_score
+
+
+def fake_evaluate(country):
+    """ワーカープロセスで実行するテスト用の評価関数"""
+    if country.name == "Yemen":
+        raise RuntimeError("fetch failed")
+    time.sleep(0.05)
+    return {
+        "country": country.name,
+        "scores": {"total": 50.0},
+        "timings": {stage: 0.01 for stage in STAGES},
+    }
+
+
+class TestRunBatch(unittest.TestCase):
+    """バッチ実行のテスト"""
+
+    def test_streams_one_line_per_country_with_summary(self):
+        countries = [get_country(name) for name in ("Japan", "France", "Yemen", "Kenya")]
+        output = io.StringIO()
+
+        summary = run_batch(countries, output, workers=2, evaluate=fake_evaluate)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(sorted(record["country"] for record in records), ["France", "Japan", "Kenya", "Yemen"])
+        failed = [record for record in records if "error" in record]
+        self.assertEqual([record["country"] for record in failed], ["Yemen"])
+        self.assertIn("fetch failed", failed[0]["error"])
+
+        self.assertEqual(summary["countries"], 3)
+        self.assertEqual(summary["errors"], 1)
+        self.assertGreater(summary["countries_per_minute"], 0)
+        self.assertEqual(set(summary["stages"]), set(STAGES))
+        self.assertAlmostEqual(summary["stages"]["crime"]["total"], 0.03)
+        self.assertIn("countries/min", format_summary(summary))
+
+    def test_summary_percentiles(self):
+        results = [{"timings": {"crime": float(seconds)}} for seconds in (6, 1, 5, 2, 4, 3)]
+        stats = summarize(results, errors=0, elapsed=1.0)["stages"]["crime"]
+        self.assertEqual((stats["p50"], stats["p95"], stats["max"]), (3.0, 6.0, 6.0))
+
+
+class TestCheckpoint(unittest.TestCase):
+    """チェックポイントからの再開のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.countries = [get_country(name) for name in ("Japan", "France", "Yemen", "Kenya")]
+
+    def run_batch(self, fresh=False):
+        checkpoint = Checkpoint(self.tmp.name, fresh=fresh)
+        self.addCleanup(checkpoint.close)
+        output = io.StringIO()
+        summary = run_batch(self.countries, output, workers=2, evaluate=fake_evaluate, checkpoint=checkpoint)
+        checkpoint.close()
+        return summary, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_resume_skips_completed_countries(self):
+        """再開時は完了済みの国を評価せず、失敗した国だけを再評価すること"""
+        self.run_batch()
+
+        summary, records = self.run_batch()
+
+        self.assertEqual(summary["resumed"], 3)
+        self.assertEqual(summary["countries"], 0)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(sorted(record["country"] for record in records), ["France", "Japan", "Kenya", "Yemen"])
+
+    def test_previous_checkpoint_is_kept_unless_fresh(self):
+        self.run_batch()
+        with open(os.path.join(self.tmp.name, Checkpoint.LOG_FILENAME), "a", encoding="utf-8") as f:
+            f.write('{"country": "Ja')  # 中断で書きかけになった最終行
+
+        checkpoint = Checkpoint(self.tmp.name)
+        self.assertTrue(checkpoint.has_previous_run())
+        self.assertEqual(len(checkpoint.completed()), 3)
+        checkpoint = Checkpoint(self.tmp.name, fresh=True)
+        self.assertFalse(checkpoint.has_previous_run())
+        self.assertEqual(checkpoint.completed(), {})
+
+    def test_cli_uses_checkpoint_only_when_requested(self):
+        """チェックポイントは指定した場合だけ使い、前回の内容を黙って削除しないこと"""
+        directory = os.path.join(self.tmp.name, "batch")
+        with patch("safety_score_agent.batch.config.get_data_dir", return_value=self.tmp.name), \
+                patch("safety_score_agent.batch.run_batch", return_value=summarize([], 0, 1.0)) as run, \
+                patch("sys.stderr", io.StringIO()):
+            main(["Japan"])
+            self.assertIsNone(run.call_args.kwargs["checkpoint"])
+            self.assertFalse(os.path.exists(directory))
+
+            main(["Japan", "--fresh"])
+            checkpoint = Checkpoint(directory)
+            checkpoint.add({"country": "Japan"})
+            checkpoint.close()
+            with self.assertRaises(SystemExit):
+                main(["Japan", "--checkpoint-dir", directory])
+            main(["Japan", "--resume"])
+            self.assertEqual(list(run.call_args.kwargs["checkpoint"].completed()), ["Japan"])
+
+
+class TestEvaluateCountry(unittest.TestCase):
+    """1か国分のツール層の実行のテスト"""
+
+    def test_scores_and_stage_timings(self):
+        sources = make_sources(77.5, cpi=73)
+        sources["conflict"] = {"status": "success", "data": {}, "high_risk_countries": []}
+        with patch("safety_score_agent.sub_agents.conflict_agent.tool.get_conflict_risk_info",
+                   return_value=sources["conflict"]), \
+                patch("safety_score_agent.sub_agents.crime_agent.tool.get_crime_data", return_value=sources["crime"]), \
+                patch("safety_score_agent.sub_agents.infra_agent.tool.get_infrastructure_data",
+                      return_value=sources["infra"]), \
+                patch("safety_score_agent.sub_agents.law_agent.tool.get_law_enforcement_data",
+                      return_value=sources["law"]):
+            record = evaluate_country(get_country("Japan"))
+
+        self.assertEqual(set(record["timings"]), set(STAGES))
+        scores = record["scores"]
+        self.assertEqual(scores["conflict"], 25.0)
+        self.assertEqual(scores["infrastructure"], calculate_infrastructure_score(sources["infra"]))
+        self.assertEqual(scores["total"], round(
+            scores["conflict"] + scores["crime"] + scores["infrastructure"] + scores["law_enforcement"], 1))
+
+    def test_resolve_countries(self):
+        self.assertEqual(resolve_countries(["Japan", "フランス", "# comment", "", "japan"]),
+                         [get_country("Japan"), get_country("France")])
+        self.assertEqual(resolve_countries([], region="oceania"), resolve_countries([], "oceania"))
+        with self.assertRaises(ValueError):
+            resolve_countries(["Atlantis"])
+
+
+if __name__ == "__main__":
+    unittest.main()
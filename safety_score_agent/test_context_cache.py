@@ -0,0 +1,160 @@
+import asyncio
+import os
+import unittest
+from typing import AsyncGenerator
+from unittest.mock import patch
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import Field
+
+from safety_score_agent.context_cache import (
+    ContextCacheBackend,
+    GenaiContextCache,
+    LocalContextCache,
+    create_default_backend,
+)
+from safety_score_agent.sub_agents.synthesizer_agent.agent import SafetyScoreSynthesizerAgent
+
+SECTIONS = {
+    "conflict_info": "紛争情報テキスト",
+    "crime_info": "犯罪情報テキスト",
+    "infra_info": "社会基盤情報テキスト",
+    "law_info": "法執行機関情報テキスト",
+}
+
+
+class RecordingLlm(BaseLlm):
+    """受け取ったリクエストを記録するテスト用モデル"""
+
+    requests: list = Field(default_factory=list)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(llm_request)
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="report")]))
+
+
+class FailingContextCache(ContextCacheBackend):
+    """キャッシュ作成が常に失敗するテスト用バックエンド"""
+
+    def __init__(self):
+        super().__init__(ttl_seconds=3600)
+        self.attempts = 0
+
+    async def _create(self, model, static_instruction, ttl_seconds):
+        self.attempts += 1
+        raise RuntimeError("cached content is too small")
+
+
+def run_synthesizer(synthesizer: SafetyScoreSynthesizerAgent, runs: int = 1) -> RecordingLlm:
+    llm = RecordingLlm(model="gemini-2.0-flash")
+    synthesizer.agent.model = llm
+    runner = InMemoryRunner(agent=synthesizer.agent, app_name="test")
+
+    async def _run():
+        for _ in range(runs):
+            session = await runner.session_service.create_session(
+                app_name="test", user_id="user", state=dict(SECTIONS)
+            )
+            async for _ in runner.run_async(
+                user_id="user",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text="Japan")]),
+            ):
+                pass
+
+    asyncio.run(_run())
+    return llm
+
+
+class TestInstructionSplit(unittest.TestCase):
+    """指示文の静的部分と動的部分の分割のテスト"""
+
+    def test_static_instruction_has_no_placeholders(self):
+        """静的指示文に状態の埋め込み箇所が含まれないこと"""
+        synthesizer = SafetyScoreSynthesizerAgent(context_cache=LocalContextCache())
+        static = synthesizer._build_static_instruction()
+
+        self.assertNotIn("{", static)
+        self.assertTrue(synthesizer._build_instruction().startswith(static))
+        for key in SECTIONS:
+            self.assertIn("{" + key + "}", synthesizer._build_input_data_section())
+
+
+class TestContextCacheCallback(unittest.TestCase):
+    """統合エージェントのコンテキストキャッシュ利用のテスト"""
+
+    def test_static_prefix_is_sent_as_cached_content(self):
+        """静的指示文はキャッシュ参照になり、動的部分のみがメッセージとして送られること"""
+        cache = LocalContextCache()
+        synthesizer = SafetyScoreSynthesizerAgent(context_cache=cache)
+
+        llm = run_synthesizer(synthesizer, runs=2)
+
+        self.assertEqual(len(cache.contents), 1)
+        name, cached_text = next(iter(cache.contents.items()))
+        self.assertEqual(cached_text, synthesizer._build_static_instruction())
+        for request in llm.requests:
+            self.assertEqual(request.config.cached_content, name)
+            self.assertIsNone(request.config.system_instruction)
+            dynamic = request.contents[0].parts[0].text
+            self.assertTrue(dynamic.startswith("## 📥 入力データソース"))
+            for text in SECTIONS.values():
+                self.assertIn(text, dynamic)
+            self.assertEqual(request.contents[-1].parts[0].text, "Japan")
+
+    def test_full_instruction_is_sent_without_cache(self):
+        """キャッシュを使わない場合は従来どおり指示文全体が送られること"""
+        with patch.dict(os.environ, {"SAFETY_SCORE_CONTEXT_CACHE": "off"}):
+            synthesizer = SafetyScoreSynthesizerAgent()
+
+        llm = run_synthesizer(synthesizer)
+
+        request = llm.requests[0]
+        self.assertIsNone(request.config.cached_content)
+        self.assertTrue(request.config.system_instruction.startswith(synthesizer._build_static_instruction()))
+        self.assertIn(SECTIONS["law_info"], request.config.system_instruction)
+
+    def test_creation_failure_falls_back_and_is_not_retried(self):
+        """キャッシュ作成に失敗した場合は指示文全体を送り、再試行間隔内は作成しないこと"""
+        cache = FailingContextCache()
+        synthesizer = SafetyScoreSynthesizerAgent(context_cache=cache)
+
+        llm = run_synthesizer(synthesizer, runs=2)
+
+        self.assertEqual(cache.attempts, 1)
+        for request in llm.requests:
+            self.assertIsNone(request.config.cached_content)
+            self.assertIn(SECTIONS["crime_info"], request.config.system_instruction)
+
+    def test_backend_requires_create(self):
+        """_create を実装しないバックエンドは作成できないこと"""
+        with self.assertRaises(TypeError):
+            ContextCacheBackend()
+
+
+class TestDefaultBackend(unittest.TestCase):
+    """環境変数によるバックエンド選択のテスト"""
+
+    def test_auto_mode_requires_credentials(self):
+        with patch.dict(os.environ, {"SAFETY_SCORE_CONTEXT_CACHE": "auto"}, clear=True):
+            self.assertIsNone(create_default_backend())
+        with patch.dict(os.environ, {"SAFETY_SCORE_CONTEXT_CACHE": "auto", "GOOGLE_API_KEY": "key"}, clear=True):
+            self.assertIsInstance(create_default_backend(), GenaiContextCache)
+
+    def test_off_mode_disables_cache(self):
+        with patch.dict(os.environ, {"SAFETY_SCORE_CONTEXT_CACHE": "off", "GOOGLE_API_KEY": "key"}):
+            self.assertIsNone(create_default_backend())
+
+    def test_fake_model_disables_cache(self):
+        for mode in ("auto", "genai"):
+            with patch.dict(os.environ, {"SAFETY_SCORE_CONTEXT_CACHE": mode, "GOOGLE_API_KEY": "key",
+                                         "SAFETY_SCORE_MODEL": "fake"}):
+                self.assertIsNone(create_default_backend())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+import unittest
+from typing import AsyncGenerator
+from unittest.mock import patch
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from safety_score_agent.agent_tools import run_in_thread
+from safety_score_agent.deadline import (
+    DATA_UNAVAILABLE_MARKER,
+    DEADLINE_STATE_KEY,
+    DeadlineParallelAgent,
+    is_unavailable,
+)
+
+
+class DelayedAgent(BaseAgent):
+    """指定時間後に output_key へ結果を書き込むテスト用エージェント"""
+
+    delay: float = 0.0
+    output_key: str = ""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.delay)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=f"{self.name} done")]),
+            actions=EventActions(state_delta={self.output_key: f"{self.name} done"}),
+        )
+
+
+def run_agent(agent: BaseAgent, state: dict = None):
+    """InMemoryRunner でエージェントを実行し、(イベント, 最終状態, 経過秒) を返す"""
+    async def _run():
+        runner = InMemoryRunner(agent=agent, app_name="test")
+        session = await runner.session_service.create_session(
+            app_name="test", user_id="user", state=state or {}
+        )
+        events = []
+        started = time.monotonic()
+        async for event in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="Japan")]),
+        ):
+            events.append(event)
+        elapsed = time.monotonic() - started
+        session = await runner.session_service.get_session(
+            app_name="test", user_id="user", session_id=session.id
+        )
+        return events, session.state, elapsed
+
+    return asyncio.run(_run())
+
+
+class TestDeadlineParallelAgent(unittest.TestCase):
+    """締め切り付き並列エージェントのテスト"""
+
+    def build_gatherer(self, slow_delay: float, deadline: float) -> DeadlineParallelAgent:
+        return DeadlineParallelAgent(
+            name="gatherer",
+            deadline_seconds=deadline,
+            sub_agents=[
+                DelayedAgent(name="FastAgent", delay=0.01, output_key="crime_info"),
+                DelayedAgent(name="SlowAgent", delay=slow_delay, output_key="law_info"),
+            ],
+        )
+
+    def test_all_agents_finish_before_deadline(self):
+        """締め切り内に全エージェントが完了した場合は通常どおり結果が残ること"""
+        events, state, _ = run_agent(self.build_gatherer(slow_delay=0.05, deadline=5.0))
+
+        self.assertEqual(state["crime_info"], "FastAgent done")
+        self.assertEqual(state["law_info"], "SlowAgent done")
+        self.assertEqual(len(events), 2)
+
+    def test_slow_agent_is_replaced_with_placeholder(self):
+        """締め切りを過ぎたエージェントの output_key にプレースホルダーが書き込まれること"""
+        events, state, elapsed = run_agent(self.build_gatherer(slow_delay=5.0, deadline=0.2))
+
+        self.assertEqual(state["crime_info"], "FastAgent done")
+        self.assertTrue(state["law_info"].startswith(DATA_UNAVAILABLE_MARKER))
+        self.assertIn("法執行機関", state["law_info"])
+        self.assertTrue(is_unavailable(state["law_info"]))
+        self.assertFalse(is_unavailable(state["crime_info"]))
+        # 遅いエージェントの完了を待たずに終了すること
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(events[-1].author, "SlowAgent")
+        self.assertEqual(events[-1].branch, "gatherer.SlowAgent")
+
+    def test_session_state_overrides_deadline(self):
+        """セッション状態の締め切りが優先されること"""
+        gatherer = self.build_gatherer(slow_delay=5.0, deadline=60.0)
+
+        with patch.dict("os.environ", {"SAFETY_SCORE_SYNTHESIS_RESERVE_SECONDS": "0"}):
+            _, state, elapsed = run_agent(gatherer, state={DEADLINE_STATE_KEY: 0.2})
+
+        self.assertTrue(is_unavailable(state["law_info"]))
+        self.assertLess(elapsed, 2.0)
+
+    def test_deadline_from_environment(self):
+        """deadline_seconds 未指定時は環境変数から締め切りを決定すること"""
+        gatherer = DeadlineParallelAgent(
+            name="gatherer",
+            sub_agents=[DelayedAgent(name="SlowAgent", delay=5.0, output_key="conflict_info")],
+        )
+        env = {
+            "SAFETY_SCORE_DEADLINE_SECONDS": "1.2",
+            "SAFETY_SCORE_SYNTHESIS_RESERVE_SECONDS": "1.0",
+        }
+        with patch.dict("os.environ", env):
+            _, state, elapsed = run_agent(gatherer)
+
+        self.assertTrue(is_unavailable(state["conflict_info"]))
+        self.assertLess(elapsed, 3.0)
+
+
+class TestRunInThread(unittest.TestCase):
+    """ツール関数のスレッド実行ラッパーのテスト"""
+
+    def test_runs_outside_event_loop_thread(self):
+        """ツール関数がイベントループとは別のスレッドで実行されること"""
+        def blocking_tool(country: str) -> dict:
+            """テスト用ツール"""
+            return {"country": country, "thread": threading.get_ident()}
+
+        async def _call():
+            return threading.get_ident(), await run_in_thread(blocking_tool)(country="Japan")
+
+        loop_thread, result = asyncio.run(_call())
+
+        self.assertEqual(result["country"], "Japan")
+        self.assertNotEqual(result["thread"], loop_thread)
+
+    def test_function_declaration_is_preserved(self):
+        """ADK が生成する関数宣言が元の関数と同一であること"""
+        def get_sample_data(country: str, limit: int = 3) -> dict:
+            """サンプルデータを取得する"""
+            return {}
+
+        original = FunctionTool(get_sample_data)._get_declaration()
+        wrapped = FunctionTool(run_in_thread(get_sample_data))._get_declaration()
+
+        self.assertEqual(wrapped.name, "get_sample_data")
+        self.assertEqual(wrapped.description, original.description)
+        self.assertEqual(wrapped.parameters, original.parameters)
+
+
+if __name__ == "__main__":
+    unittest.main()
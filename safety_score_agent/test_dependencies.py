@@ -0,0 +1,85 @@
+import unittest
+
+from safety_score_agent.dependencies import (
+    FIELD_SOURCES,
+    SOURCES,
+    changed_sources,
+    invalidated,
+    source_fingerprints,
+)
+from safety_score_agent.fixtures.tool_outputs import make_sources
+from safety_score_agent.scoring import COMPONENTS
+
+
+class TestDependencyGraph(unittest.TestCase):
+    """依存グラフのテスト"""
+
+    def test_cpi_invalidates_infra_political_and_law_police_trust(self):
+        """CPI の変更で社会基盤の政治的安定性と法執行機関の警察信頼度だけが無効になること"""
+        invalidation = invalidated(["cpi"])
+
+        self.assertEqual(invalidation.components, {"political_stability", "police_trust"})
+        self.assertEqual(invalidation.indicators, {"cpi_score", "police_corruption"})
+        self.assertEqual(invalidation.scores, {"infrastructure", "law_enforcement", "total"})
+
+    def test_gpi_mofa_feeds_crime_and_law(self):
+        invalidation = invalidated(["gpi_mofa"])
+
+        self.assertEqual(invalidation.components, {"peace", "gpi"})
+        self.assertEqual(invalidation.scores, {"crime", "law_enforcement", "total"})
+
+    def test_source_without_scored_fields_invalidates_no_scores(self):
+        """スコアに使われないフィールドだけを生成するソース（OECD）はスコアを無効にしないこと"""
+        invalidation = invalidated(["oecd"])
+
+        self.assertTrue(invalidation.fields)
+        self.assertEqual(invalidation.scores, frozenset())
+
+    def test_every_component_is_reachable_from_a_source(self):
+        all_sources = invalidated(SOURCES)
+        components = {name for category in COMPONENTS.values() for name, _, _ in category}
+
+        self.assertEqual(all_sources.components, components)
+        self.assertEqual(set(FIELD_SOURCES.values()), set(SOURCES))
+        self.assertIn("conflict", all_sources.scores)
+
+    def test_unknown_source(self):
+        with self.assertRaises(ValueError):
+            invalidated(["wikipedia"])
+
+
+class TestSourceFingerprints(unittest.TestCase):
+    """データソースごとのフィンガープリントのテスト"""
+
+    def test_only_changed_source_differs(self):
+        before = source_fingerprints(make_sources(77.5, cpi=73), "日本")
+        after = source_fingerprints(make_sources(77.5, cpi=74), "日本")
+
+        self.assertEqual(changed_sources(before, after), {"cpi"})
+        self.assertEqual(changed_sources(None, after), set(SOURCES))
+
+    def test_missing_section_differs_from_missing_key(self):
+        """セクション欠損（構成要素ごと除外）とキー欠損（デフォルト値）を区別すること"""
+        without_section = make_sources(77.5)
+        del without_section["infra"]["traffic_safety_data"]
+        without_key = make_sources(77.5)
+        without_key["infra"]["traffic_safety_data"] = {}
+
+        self.assertNotEqual(
+            source_fingerprints(without_section, "日本")["who_road"],
+            source_fingerprints(without_key, "日本")["who_road"],
+        )
+
+    def test_conflict_uses_only_target_country(self):
+        """他国の危険レベルの変更では対象国の mofa_risk が変わらないこと"""
+        before = make_sources(77.5)
+        after = make_sources(77.5, danger_level="レベル4（退避勧告）", name_ja="イエメン")
+
+        self.assertEqual(changed_sources(source_fingerprints(before, "日本"), source_fingerprints(after, "日本")),
+                         frozenset())
+        self.assertEqual(changed_sources(source_fingerprints(before, "イエメン"),
+                                         source_fingerprints(after, "イエメン")), {"mofa_risk"})
+
+
+if __name__ == "__main__":
+    unittest.main()
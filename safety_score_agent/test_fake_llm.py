@@ -0,0 +1,118 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from google.adk.models import LLMRegistry, LlmRequest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from safety_score_agent import fake_llm
+from safety_score_agent.fake_llm import FakeLlm, find_country
+from safety_score_agent.fixtures import corpus
+
+
+def make_request(agent: str, contents, tools=()) -> LlmRequest:
+    request = LlmRequest(
+        model="fake",
+        contents=list(contents),
+        config=types.GenerateContentConfig(system_instruction=f'You are an agent. Your internal name is "{agent}".'),
+    )
+    request.tools_dict = {name: None for name in tools}
+    return request
+
+
+def collect(llm: FakeLlm, request: LlmRequest, stream: bool = False):
+    async def run():
+        return [response async for response in llm.generate_content_async(request, stream=stream)]
+    return asyncio.run(run())
+
+
+USER = types.UserContent(parts=[types.Part.from_text(text="日本の安全性を評価してください")])
+CRIME_TOOLS = ("get_crime_data", "analyze_travel_safety_risks")
+
+
+class TestFakeLlm(unittest.TestCase):
+    """fake モデルのテスト"""
+
+    def test_registered(self):
+        self.assertIs(LLMRegistry.resolve("fake"), FakeLlm)
+        with patch.dict(os.environ, {"SAFETY_SCORE_MODEL": "fake"}):
+            self.assertEqual(fake_llm.get_model_name("gemini-2.0-flash"), "fake")
+        with patch.dict(os.environ, {"SAFETY_SCORE_MODEL": ""}):
+            self.assertEqual(fake_llm.get_model_name("gemini-2.0-flash"), "gemini-2.0-flash")
+
+    def test_find_country(self):
+        self.assertEqual(find_country("日本").name, "Japan")
+        self.assertEqual(find_country("Please evaluate south korea").name, "South Korea")
+        self.assertIsNone(find_country("Atlantis"))
+
+    def test_script_then_text(self):
+        llm = FakeLlm()
+        [first] = collect(llm, make_request("CrimeAgent", [USER], CRIME_TOOLS))
+        call = first.content.parts[0].function_call
+        self.assertEqual((call.name, call.args), ("get_crime_data", {"country": "Japan"}))
+
+        response = types.Part.from_function_response(name="get_crime_data", response={"crime_index": 22.1})
+        contents = [USER, first.content, types.UserContent(parts=[response])]
+        [second] = collect(llm, make_request("CrimeAgent", contents, CRIME_TOOLS))
+        call = second.content.parts[0].function_call
+        self.assertEqual((call.name, call.args), ("analyze_travel_safety_risks", {"crime_data": {"crime_index": 22.1}}))
+
+        contents += [second.content, types.UserContent(parts=[
+            types.Part.from_function_response(name="analyze_travel_safety_risks", response={"risk": "低"})])]
+        [final] = collect(llm, make_request("CrimeAgent", contents, CRIME_TOOLS))
+        self.assertIn("CrimeAgent: 日本", final.content.parts[0].text)
+        self.assertIn('"risk": "低"', final.content.parts[0].text)
+        self.assertGreater(final.usage_metadata.prompt_token_count, 0)
+
+    def test_texts_override_and_streaming(self):
+        llm = FakeLlm(texts={"*": "{country}: " + "x" * 100}, token_seconds=0.001)
+        started = time.perf_counter()
+        responses = collect(llm, make_request("SafetyScoreSynthesizer", [USER]), stream=True)
+
+        self.assertTrue(all(response.partial for response in responses[:-1]))
+        self.assertGreater(len(responses), 2)
+        self.assertEqual("".join(response.content.parts[0].text for response in responses[:-1]),
+                         responses[-1].content.parts[0].text)
+        self.assertEqual(responses[-1].content.parts[0].text, "日本: " + "x" * 100)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.02)
+
+    def test_settings_from_environment(self):
+        with patch.dict(os.environ, {"SAFETY_SCORE_FAKE_LLM": '{"first_token_seconds": 0.5, "texts": {"A": "a"}}'}):
+            llm = FakeLlm()
+        self.assertEqual(llm.first_token_seconds, 0.5)
+        self.assertEqual(llm.texts, {"A": "a"})
+        self.assertIn("CrimeAgent", llm.scripts)
+
+    def test_pipeline_runs_offline(self):
+        from safety_score_agent.agent import create_safety_score_gatherer
+        from safety_score_agent.sub_agents.synthesizer_agent.agent import SafetyScoreSynthesizerAgent
+        from google.adk.agents import SequentialAgent
+
+        # 認証情報があっても fake モデルではコンテキストキャッシュを作らない
+        with patch.dict(os.environ, {"SAFETY_SCORE_MODEL": "fake", "GOOGLE_API_KEY": "key"}):
+            synthesizer = SafetyScoreSynthesizerAgent()
+            pipeline = SequentialAgent(name="pipeline", sub_agents=[create_safety_score_gatherer(), synthesizer.agent])
+        self.assertIsNone(synthesizer.context_cache)
+
+        async def run():
+            runner = InMemoryRunner(agent=pipeline, app_name="test")
+            session = await runner.session_service.create_session(app_name="test", user_id="user")
+            events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=USER)]
+            session = await runner.session_service.get_session(app_name="test", user_id="user", session_id=session.id)
+            return events, session
+
+        with corpus.offline():
+            events, session = asyncio.run(run())
+
+        calls = {part.function_call.name for event in events for part in event.content.parts if part.function_call}
+        self.assertTrue({"get_crime_data", "get_law_enforcement_data", "get_conflict_risk_info"} <= calls)
+        for key in ("crime_info", "infra_info", "law_info", "conflict_info"):
+            self.assertIn("日本 の評価", session.state[key])
+        self.assertEqual(events[-1].author, "SafetyScoreSynthesizer")
+
+
+if __name__ == "__main__":
+    unittest.main()
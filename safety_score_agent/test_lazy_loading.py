@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import types
+import unittest
+
+from safety_score_agent.lazy import lazy_attributes
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "requests",
+    "bs4",
+    "google.adk",
+    "safety_score_agent.sub_agents.conflict_agent.tool",
+    "safety_score_agent.sub_agents.crime_agent.tool",
+    "safety_score_agent.sub_agents.infra_agent.tool",
+    "safety_score_agent.sub_agents.law_agent.tool",
+]
+
+
+def run_isolated(code: str) -> dict:
+    """新しいインタープリターでコードを実行し、最終行の JSON を返す"""
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class TestLazyAttributes(unittest.TestCase):
+    """lazy_attributes のテスト"""
+
+    def setUp(self):
+        self.module = types.ModuleType("lazy_test_module")
+        sys.modules[self.module.__name__] = self.module
+        self.addCleanup(sys.modules.pop, self.module.__name__)
+
+    def test_factory_runs_once_and_is_cached(self):
+        """初回アクセス時のみ生成され、以降はモジュール属性として参照されること"""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        self.module.__getattr__ = lazy_attributes(self.module.__name__, {"agent": factory})
+
+        first = self.module.agent
+        self.assertIs(self.module.agent, first)
+        self.assertEqual(len(calls), 1)
+        self.assertIn("agent", vars(self.module))
+
+    def test_unknown_attribute_raises(self):
+        """未定義の属性は AttributeError になること"""
+        self.module.__getattr__ = lazy_attributes(self.module.__name__, {})
+
+        with self.assertRaises(AttributeError):
+            self.module.missing
+        self.assertFalse(hasattr(self.module, "missing"))
+
+
+class TestLazyAgentImport(unittest.TestCase):
+    """エージェント定義の遅延構築のテスト（別プロセスで import 状態を確認）"""
+
+    def test_import_does_not_load_heavy_modules(self):
+        """agent モジュールの import で ADK・ツールモジュールが読み込まれないこと"""
+        loaded = run_isolated(
+            "import json, sys\n"
+            "import safety_score_agent.agent\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+        )
+        self.assertEqual(loaded, [])
+
+    def test_root_agent_is_built_on_first_access(self):
+        """root_agent へのアクセスでエージェント木が構築され、サブエージェントと共有されること"""
+        result = run_isolated(
+            "import json, sys\n"
+            "import safety_score_agent.agent as agent\n"
+            "from safety_score_agent.sub_agents.crime_agent.agent import crime_agent\n"
+            "root = agent.root_agent\n"
+            "gatherer, synthesizer = root.sub_agents\n"
+            "print(json.dumps({\n"
+            "    'names': [a.name for a in gatherer.sub_agents],\n"
+            "    'shared': crime_agent in gatherer.sub_agents,\n"
+            "    'cached': agent.root_agent is root and agent.safety_score_synthesizer is synthesizer,\n"
+            "    'tools_loaded': 'safety_score_agent.sub_agents.crime_agent.tool' in sys.modules,\n"
+            "}))"
+        )
+        self.assertEqual(
+            result["names"],
+            ["ConflictInfoAgent", "CrimeAgent", "InfrastructureAgent", "LawEnforcementAgent"],
+        )
+        self.assertTrue(result["shared"])
+        self.assertTrue(result["cached"])
+        self.assertTrue(result["tools_loaded"])
+
+    def test_tool_import_does_not_configure_logging(self):
+        """ツールモジュールの import でルートロガーが設定されないこと"""
+        handlers = run_isolated(
+            "import json, logging\n"
+            "import safety_score_agent.sub_agents.crime_agent.tool\n"
+            "print(json.dumps(len(logging.getLogger().handlers)))"
+        )
+        self.assertEqual(handlers, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
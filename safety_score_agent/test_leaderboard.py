@@ -0,0 +1,179 @@
+import os
+import tempfile
+import time
+import unittest
+
+from safety_score_agent.countries import get_countries, get_country
+from safety_score_agent.fixtures.tool_outputs import HIGH_RISK, make_sources
+from safety_score_agent.leaderboard import Leaderboard
+from safety_score_agent.scoring import score_conflict
+from safety_score_agent.sub_agents.crime_agent.tool import calculate_safety_score
+from safety_score_agent.sub_agents.infra_agent.tool import calculate_infrastructure_score
+from safety_score_agent.sub_agents.law_agent.tool import calculate_law_enforcement_score
+
+class FakeFetcher:
+    """国ごとのツール出力を返すテスト用の取得関数"""
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.calls = []
+
+    def __call__(self, country):
+        self.calls.append(country.name)
+        return self.sources[country.name]
+
+
+class TestScoreConflict(unittest.TestCase):
+    """テロ・紛争スコアのテスト"""
+
+    def test_danger_level_takes_precedence(self):
+        result = {"status": "success", "data": {"イエメン": {"danger_level": "レベル3（渡航中止勧告）"}},
+                  "high_risk_countries": HIGH_RISK}
+        self.assertEqual(score_conflict(result, "イエメン"), 15.0)
+
+    def test_estimated_risk_and_unlisted_country(self):
+        result = {"status": "success", "data": {}, "high_risk_countries": HIGH_RISK}
+        self.assertEqual(score_conflict(result, "イエメン"), 10.0)
+        self.assertEqual(score_conflict(result, "ミャンマー"), 15.0)
+        self.assertEqual(score_conflict(result, "日本"), 25.0)
+
+    def test_error_result_uses_default(self):
+        self.assertEqual(score_conflict({"status": "error"}, "日本"), 12.5)
+
+
+class TestLeaderboard(unittest.TestCase):
+    """ランキング表のテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "leaderboard.sqlite3")
+        self.countries = [get_country(name) for name in ("Japan", "Singapore", "Myanmar", "Yemen", "France")]
+        self.fetcher = FakeFetcher({
+            "Japan": make_sources(77.5, cpi=73),
+            "Singapore": make_sources(82.0, cpi=83),
+            "Myanmar": make_sources(50.0, cpi=20, rule_of_law=10),
+            "Yemen": make_sources(30.0, cpi=16, rule_of_law=2, danger_level="レベル4（退避勧告）", name_ja="イエメン"),
+            "France": make_sources(45.0, cpi=71),
+        })
+        self.leaderboard = Leaderboard(self.path)
+        self.addCleanup(self.leaderboard.close)
+
+    def test_scores_match_tool_functions(self):
+        """保存されるカテゴリスコアが各ツールのスコア計算と一致すること"""
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+
+        japan = self.leaderboard.get("Japan")
+        sources = self.fetcher.sources["Japan"]
+        self.assertEqual(japan["crime"], round(calculate_safety_score(sources["crime"]) / 4, 1))
+        self.assertEqual(japan["infrastructure"], calculate_infrastructure_score(sources["infra"]))
+        self.assertEqual(japan["law_enforcement"], calculate_law_enforcement_score(sources["law"]))
+        self.assertEqual(japan["conflict"], 25.0)
+        self.assertEqual(japan["total"], round(
+            japan["conflict"] + japan["crime"] + japan["infrastructure"] + japan["law_enforcement"], 1))
+        self.assertEqual(self.leaderboard.get("Yemen")["conflict"], 10.0)
+
+    def test_top_by_region_and_category(self):
+        """地域・カテゴリごとの上位を返すこと"""
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+
+        asia = self.leaderboard.top(10, region="asia")
+        self.assertEqual([row["country"] for row in asia], ["Singapore", "Japan", "Myanmar"])
+        self.assertEqual([row["rank"] for row in asia], [1, 2, 3])
+
+        safest_crime = self.leaderboard.top(1, category="crime")
+        self.assertEqual(safest_crime[0]["country"], "Singapore")
+        self.assertEqual(self.leaderboard.top(1, ascending=True)[0]["country"], "Yemen")
+        with self.assertRaises(ValueError):
+            self.leaderboard.top(category="population")
+
+    def test_incremental_refresh_updates_only_changed_countries(self):
+        """指標が変わった国だけが再計算されること"""
+        first = self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+        self.assertEqual(first, {"updated": 5, "unchanged": 0, "skipped": 0})
+        before = self.leaderboard.get("Japan")
+
+        self.fetcher.sources["France"] = make_sources(60.0, cpi=71)
+        second = self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+
+        self.assertEqual(second, {"updated": 1, "unchanged": 4, "skipped": 0})
+        self.assertEqual(self.leaderboard.get("Japan")["updated_at"], before["updated_at"])
+        self.assertGreater(self.leaderboard.get("France")["crime"], 0)
+
+    def test_source_change_recomputes_only_dependent_components(self):
+        """CPI だけが変わった場合、CPI に依存する構成要素だけが再計算されること"""
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+        before = self.leaderboard.components("Japan")
+        crime_before = self.leaderboard.get("Japan")["crime"]
+
+        sources = make_sources(77.5, cpi=60)
+        self.fetcher.sources["Japan"] = sources
+        stats = self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+
+        self.assertEqual(stats, {"updated": 1, "unchanged": 4, "skipped": 0})
+        after = self.leaderboard.components("Japan")
+        recomputed = {name for name in after if after[name]["updated_at"] != before[name]["updated_at"]}
+        self.assertEqual(recomputed, {"political_stability", "police_trust"})
+        self.assertEqual(after["political_stability"]["value"], 15.0)
+
+        japan = self.leaderboard.get("Japan")
+        self.assertEqual(japan["crime"], crime_before)
+        self.assertEqual(japan["infrastructure"], calculate_infrastructure_score(sources["infra"]))
+        self.assertEqual(japan["law_enforcement"], calculate_law_enforcement_score(sources["law"]))
+
+    def test_malformed_value_defaults_whole_category(self):
+        """不正な値を含むカテゴリはスカラー版と同じくデフォルト値になり、修正後に全構成要素が戻ること"""
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+        malformed = make_sources(77.5, cpi=73)
+        malformed["infra"]["corruption_perception_index"]["cpi_score"] = "N/A"
+        self.fetcher.sources["Japan"] = malformed
+
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+        self.assertEqual(self.leaderboard.get("Japan")["infrastructure"], calculate_infrastructure_score(malformed["infra"]))
+
+        self.fetcher.sources["Japan"] = make_sources(77.5, cpi=73)
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+        self.assertEqual(self.leaderboard.get("Japan")["infrastructure"],
+                         calculate_infrastructure_score(self.fetcher.sources["Japan"]["infra"]))
+
+    def test_max_age_skips_recently_checked_countries(self):
+        """確認済みの期間内の国はデータ取得を省略すること"""
+        self.leaderboard.refresh(self.countries[:2], fetch_sources=self.fetcher)
+        self.fetcher.calls.clear()
+
+        stats = self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher, max_age_seconds=3600)
+
+        self.assertEqual(stats["skipped"], 2)
+        self.assertEqual(sorted(self.fetcher.calls), ["France", "Myanmar", "Yemen"])
+
+    def test_table_is_persisted(self):
+        """ランキング表がファイルに保存され、再度開いても参照できること"""
+        self.leaderboard.refresh(self.countries, fetch_sources=self.fetcher)
+        self.leaderboard.close()
+
+        reopened = Leaderboard(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened), 5)
+        started = time.perf_counter()
+        reopened.top(10, region="asia")
+        self.assertLess(time.perf_counter() - started, 0.05)
+
+
+class TestCountries(unittest.TestCase):
+    """対象国一覧のテスト"""
+
+    def test_lookup_by_english_and_japanese_name(self):
+        self.assertEqual(get_country("japan"), get_country("日本"))
+        self.assertIsNone(get_country("Atlantis"))
+
+    def test_conflict_tool_countries_are_registered(self):
+        """テロ・紛争ツールが対応する国がすべて対象国に含まれること"""
+        names_ja = {country.name_ja for country in get_countries()}
+        for name in ["イエメン", "シリア", "アフガニスタン", "イラク", "ソマリア", "リビア", "南スーダン",
+                     "中央アフリカ", "マリ", "ブルキナファソ", "ウクライナ", "ミャンマー", "パキスタン",
+                     "ナイジェリア", "コンゴ民主共和国"]:
+            self.assertIn(name, names_ja)
+
+
+if __name__ == "__main__":
+    unittest.main()
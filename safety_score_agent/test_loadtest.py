@@ -0,0 +1,87 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from safety_score_agent.loadtest import format_summary, parse_mix, read_resident_memory, run_load
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """評価エンドポイントと /metrics を模したテスト用サーバー（イエメンは評価エラー）"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/metrics":
+            self.server.memory += 1024 * 1024
+            body = f"# TYPE process_resident_memory_bytes gauge\nprocess_resident_memory_bytes {self.server.memory}\n"
+        else:
+            country = parse_qs(parts.query)["country"][0]
+            with self.server.lock:
+                self.server.countries.append(country)
+            body = json.dumps({"country": country, "error": "failed" if country == "イエメン" else None})
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.memory = 100 * 1024 * 1024
+    server.countries = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class TestLoadTest(unittest.TestCase):
+    """負荷試験のテスト"""
+
+    def setUp(self):
+        self.servers = [start_server(), start_server()]
+        self.urls = [f"http://127.0.0.1:{server.server_address[1]}" for server in self.servers]
+        for server in self.servers:
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+
+    def test_parse_mix(self):
+        mix = parse_mix(["Japan:3", "イエメン"])
+        self.assertEqual([(country.name, weight) for country, weight in mix], [("Japan", 3.0), ("Yemen", 1.0)])
+        self.assertTrue(all(country.region == "asia" for country, _ in parse_mix([], region="asia")))
+        with self.assertRaises(ValueError):
+            parse_mix(["Atlantis"])
+
+    def test_read_resident_memory(self):
+        self.assertEqual(read_resident_memory(self.urls[0]), 101 * 1024 * 1024)
+        self.assertIsNone(read_resident_memory("http://127.0.0.1:1"))
+
+    def test_run_load(self):
+        summary = run_load(self.urls, parse_mix(["Japan:1", "イエメン:1"]), sessions=4, total_requests=40,
+                           warmup=1, seed=1)
+
+        self.assertEqual(summary["requests"], 40)
+        # 計測前のリクエストは構成比の先頭の国（日本）
+        yemen = sum(server.countries.count("イエメン") for server in self.servers)
+        self.assertEqual(summary["errors"], yemen)
+        self.assertEqual(summary["error_kinds"], {"evaluation": yemen})
+        self.assertAlmostEqual(summary["error_rate"], yemen / 40)
+        self.assertIsNotNone(summary["latency"]["p99"])
+        for url in self.urls:
+            worker = summary["workers"][url]
+            self.assertEqual(worker["requests"], 20)
+            self.assertGreater(worker["memory"]["growth"], 0)
+        self.assertIn("40 requests, 4 sessions", format_summary(summary))
+
+    def test_duration(self):
+        summary = run_load(self.urls[:1], parse_mix(["Japan"]), sessions=2, total_requests=None, duration=0.2)
+        self.assertGreater(summary["requests"], 0)
+        self.assertEqual(summary["errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
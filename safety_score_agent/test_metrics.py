@@ -0,0 +1,93 @@
+import unittest
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from safety_score_agent import metrics, tracing
+from safety_score_agent.metrics import Registry
+
+
+class TestRegistry(unittest.TestCase):
+    """メトリクスの集計と出力のテスト"""
+
+    def test_render_prometheus_text(self):
+        registry = Registry()
+        requests_total = registry.counter("test_requests_total", "Requests")
+        duration = registry.histogram("test_duration_seconds", "Duration", buckets=(0.1, 1.0))
+        registry.gauge("test_limit", "Limit", lambda: {(("host", "a"),): 3})
+
+        requests_total.inc(host='we"ird')
+        requests_total.inc(2, host='we"ird')
+        for value in (0.05, 0.5, 5.0):
+            duration.observe(value, host="a")
+
+        text = registry.render()
+        self.assertIn("# TYPE test_requests_total counter", text)
+        self.assertIn('test_requests_total{host="we\\"ird"} 3', text)
+        self.assertIn('test_duration_seconds_bucket{host="a",le="0.1"} 1', text)
+        self.assertIn('test_duration_seconds_bucket{host="a",le="1"} 2', text)
+        self.assertIn('test_duration_seconds_bucket{host="a",le="+Inf"} 3', text)
+        self.assertIn('test_duration_seconds_sum{host="a"} 5.55', text)
+        self.assertIn('test_limit{host="a"} 3', text)
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["test_duration_seconds"]['{host="a"}']["count"], 3)
+        self.assertEqual(snapshot["test_limit"], {'{host="a"}': 3})
+
+    def test_register_returns_existing_metric(self):
+        registry = Registry()
+        self.assertIs(registry.counter("test_total", "a"), registry.counter("test_total", "b"))
+
+    def test_percentile(self):
+        values = list(range(100, 0, -1))
+        self.assertEqual([metrics.percentile(values, percent) for percent in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual([metrics.percentile([1, 2, 3, 4], percent) for percent in (25, 50, 75, 99)], [1, 2, 3, 4])
+        self.assertEqual(metrics.percentile([7.0], 99), 7.0)
+        self.assertIsNone(metrics.percentile([], 50))
+
+
+class TestInstrumentation(unittest.TestCase):
+    """ツール層・モデル呼び出しの記録のテスト"""
+
+    def test_spans_and_fallbacks_are_counted(self):
+        @tracing.traced("fallback.metrics_test", fallback=True)
+        def fallback(country):
+            return {}
+
+        @tracing.traced("source.metrics_test")
+        def source(country):
+            return fallback(country)
+
+        before = metrics.fallbacks.value(source="metrics_test")
+        source("Japan")
+
+        self.assertEqual(metrics.fallbacks.value(source="metrics_test"), before + 1)
+        self.assertIn('{span="source.metrics_test"}', metrics.snapshot()["safety_score_span_duration_seconds"])
+
+    def test_llm_turns_and_tokens(self):
+        usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=30,
+                                cached_content_token_count=None, total_token_count=150)
+        context = SimpleNamespace(agent_name="MetricsTestAgent")
+
+        self.assertIsNone(metrics.after_model_callback(context, SimpleNamespace(partial=False, usage_metadata=usage)))
+        metrics.after_model_callback(context, SimpleNamespace(partial=True, usage_metadata=usage))
+
+        self.assertEqual(metrics.llm_turns.value(agent="MetricsTestAgent"), 1)
+        self.assertEqual(metrics.llm_tokens.value(agent="MetricsTestAgent", kind="prompt"), 120)
+        self.assertEqual(metrics.llm_tokens.value(agent="MetricsTestAgent", kind="total"), 150)
+
+    def test_metrics_endpoint(self):
+        app = FastAPI()
+        metrics.add_metrics_route(app)
+
+        response = TestClient(app).get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("# TYPE safety_score_host_concurrency_limit gauge", response.text)
+        self.assertIn('safety_score_hedge_requests_total{kind="total"}', response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
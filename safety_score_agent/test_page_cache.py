@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from safety_score_agent.page_cache import PageCache
+
+
+class FakeSite:
+    """URL ごとの応答を返し、呼び出し回数を数える requests.Session.request の代替"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, session, method, url, *args, **kwargs):
+        self.calls.append(url)
+        response = requests.Response()
+        response.status_code = 404 if "missing" in url else 200
+        response.reason = "OK"
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response._content = f"<html>{url}</html>".encode("utf-8")
+        return response
+
+
+class TestPageCache(unittest.TestCase):
+    """ダウンロード済みページのキャッシュのテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.site = FakeSite()
+
+    def test_reuses_pages_across_instances(self):
+        """保存済みのページは再起動後も取り直さないこと"""
+        with patch.object(requests.Session, "request", self.site):
+            PageCache(self.tmp.name).install()
+            first = requests.get("https://www.numbeo.com/crime/", timeout=10)
+
+        with patch.object(requests.Session, "request", self.site):
+            cache = PageCache(self.tmp.name)
+            cache.install()
+            second = requests.Session().get("https://www.numbeo.com/crime/", timeout=10)
+
+        self.assertEqual(self.site.calls, ["https://www.numbeo.com/crime/"])
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(second.headers["content-type"], "text/html; charset=utf-8")
+        self.assertEqual(cache.hits, 1)
+
+    def test_error_responses_and_params(self):
+        """失敗した応答は保存せず、クエリパラメータの違いは別のページとして扱うこと"""
+        with patch.object(requests.Session, "request", self.site):
+            PageCache(self.tmp.name).install()
+            requests.get("https://example.com/missing")
+            requests.get("https://example.com/missing")
+            requests.get("https://example.com/page", params={"country": "Japan"})
+            requests.get("https://example.com/page", params={"country": "France"})
+
+        self.assertEqual(len(self.site.calls), 4)
+
+    def test_clear(self):
+        cache = PageCache(self.tmp.name)
+        with patch.object(requests.Session, "request", self.site):
+            cache.install()
+            requests.get("https://example.com/page")
+        cache.clear()
+
+        self.assertIsNone(cache.get("GET", "https://example.com/page"))
+
+
+if __name__ == "__main__":
+    unittest.main()
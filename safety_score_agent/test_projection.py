@@ -0,0 +1,81 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from safety_score_agent.agent_tools import as_agent_tools
+from safety_score_agent.projection import STATIC_FIELDS, compact_value, project_tool_output
+
+
+def get_crime_data(country):
+    """テスト用の犯罪データ取得ツール"""
+    return {
+        "country": country,
+        "numbeo_data": {"crime_index": 22.456789, "safety_index": 77.543211, "source": None},
+        "crime_categories": {"violent_crimes": {"description": "殺人・強盗・暴行などの凶悪犯罪"}},
+        "overall_safety_score": 78.4,
+        "data_collection_timestamp": 1718000000.123456,
+    }
+
+
+class TestCompactValue(unittest.TestCase):
+    """compact_value のテスト"""
+
+    def test_rounds_floats_and_drops_nulls(self):
+        value = {"a": 1.23456, "b": None, "c": [0.5555, None, {"d": None, "e": 2}], "f": True}
+
+        self.assertEqual(compact_value(value), {"a": 1.23, "c": [0.56, {"e": 2}], "f": True})
+
+    def test_keeps_non_float_values(self):
+        self.assertEqual(compact_value({"rank": 12, "level": "高", "ok": False}),
+                         {"rank": 12, "level": "高", "ok": False})
+
+
+class TestProjectToolOutput(unittest.TestCase):
+    """ツール結果の射影のテスト"""
+
+    def test_compact_view_strips_static_fields(self):
+        """compact ビューでは定数フィールドが除かれ、小数が丸められること"""
+        projected = project_tool_output("get_crime_data", get_crime_data("Japan"), view="compact")
+
+        self.assertEqual(projected, {
+            "country": "Japan",
+            "numbeo_data": {"crime_index": 22.46, "safety_index": 77.54},
+            "overall_safety_score": 78.4,
+        })
+
+    def test_conflict_summary_is_stripped(self):
+        result = {"status": "success", "data": {}, "high_risk_countries": [{"country": "イエメン"}],
+                  "conflict_summary": "...", "timestamp": None}
+
+        projected = project_tool_output("get_conflict_risk_info", result, view="compact")
+
+        self.assertEqual(projected, {"status": "success", "data": {}})
+
+    def test_full_view_returns_original_result(self):
+        """full ビューでは元の結果がそのまま返ること"""
+        result = get_crime_data("Japan")
+
+        self.assertIs(project_tool_output("get_crime_data", result, view="full"), result)
+        with patch.dict(os.environ, {"SAFETY_SCORE_TOOL_OUTPUT": "full"}):
+            self.assertIs(project_tool_output("get_crime_data", result), result)
+
+    def test_static_fields_cover_all_data_tools(self):
+        self.assertEqual(set(STATIC_FIELDS), {
+            "get_conflict_risk_info", "get_crime_data", "get_infrastructure_data", "get_law_enforcement_data",
+        })
+
+    def test_agent_tools_return_compact_output(self):
+        """LlmAgent に渡すツールはコンパクト表現を返すこと"""
+        tool = as_agent_tools([get_crime_data])[0]
+
+        with patch.dict(os.environ, {"SAFETY_SCORE_TOOL_OUTPUT": "compact"}):
+            result = asyncio.run(tool("Japan"))
+
+        self.assertEqual(tool.__name__, "get_crime_data")
+        self.assertNotIn("crime_categories", result)
+        self.assertEqual(result["numbeo_data"]["crime_index"], 22.46)
+
+
+if __name__ == "__main__":
+    unittest.main()
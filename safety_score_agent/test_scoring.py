@@ -0,0 +1,112 @@
+import random
+import unittest
+
+import numpy as np
+
+from safety_score_agent.scoring import (
+    columns_from_tool_results,
+    round_like_python,
+    score_all,
+    score_crime,
+)
+from safety_score_agent.sub_agents.crime_agent.tool import calculate_safety_score
+from safety_score_agent.sub_agents.infra_agent.tool import calculate_infrastructure_score
+from safety_score_agent.sub_agents.law_agent.tool import calculate_law_enforcement_score
+
+
+def random_value(rng: random.Random, low: float, high: float):
+    """小数・整数・丸め境界（x.x5）付近の値を混ぜて生成"""
+    kind = rng.random()
+    if kind < 0.2:
+        return rng.randint(int(low), int(high))
+    if kind < 0.4:
+        return round(rng.uniform(low, high), 2)
+    return rng.uniform(low, high)
+
+
+def random_section(rng: random.Random, fields: dict):
+    """データソースの辞書（キー欠損を含む）を生成。None はデータソース自体の欠損"""
+    if rng.random() < 0.15:
+        return None
+    return {key: random_value(rng, *bounds) for key, bounds in fields.items() if rng.random() > 0.15}
+
+
+def random_records(rng: random.Random):
+    crime, infra, law = {}, {}, {}
+    for target, sections in [
+        (crime, {
+            "numbeo_data": {"safety_index": (0, 100)},
+            "global_peace_index": {"peace_score": (1, 6)},
+            "unodc_homicide_rate": {"homicide_rate_per_100k": (0, 15)},
+        }),
+        (infra, {
+            "corruption_perception_index": {"cpi_score": (0, 100)},
+            "traffic_safety_data": {"road_traffic_deaths_per_100k": (0, 40)},
+            "healthcare_system": {"healthcare_access_quality_index": (0, 100)},
+        }),
+        (law, {
+            "global_peace_index_data": {"police_reliability_score": (1, 5)},
+            "world_bank_governance": {"rule_of_law_percentile": (0, 100)},
+            "police_trust_indicators": {"public_trust_in_police": (0, 100), "corruption_in_police_force": (0, 100)},
+        }),
+    ]:
+        for name, fields in sections.items():
+            section = random_section(rng, fields)
+            if section is not None:
+                target[name] = section
+    return crime, infra, law
+
+
+class TestRoundLikePython(unittest.TestCase):
+    """round_like_python のテスト"""
+
+    def test_matches_builtin_round_on_ties(self):
+        values = np.array([0.05, 0.15, 0.25, 0.35, 2.675, 1.45, 12.25, 78.45, 33.35, -0.05])
+
+        self.assertEqual(round_like_python(values, 1).tolist(), [round(float(v), 1) for v in values])
+
+
+class TestVectorizedScoring(unittest.TestCase):
+    """一括スコア計算がスカラー版と一致することのテスト"""
+
+    def test_matches_scalar_functions(self):
+        """ランダムな国データで3カテゴリのスコアがスカラー版と完全に一致すること"""
+        rng = random.Random(20240611)
+        records = [random_records(rng) for _ in range(3000)]
+
+        scores = score_all(columns_from_tool_results(*zip(*records)))
+
+        for index, (crime, infra, law) in enumerate(records):
+            self.assertEqual(scores["crime"][index], calculate_safety_score(crime), (index, crime))
+            self.assertEqual(scores["infrastructure"][index], calculate_infrastructure_score(infra), (index, infra))
+            self.assertEqual(scores["law_enforcement"][index], calculate_law_enforcement_score(law), (index, law))
+
+    def test_invalid_values_fall_back_to_default(self):
+        """スカラー版が例外でデフォルト値を返す入力は同じデフォルト値になること"""
+        crime = {"numbeo_data": {"safety_index": "high"}, "global_peace_index": {"peace_score": 1.5}}
+        infra = {"traffic_safety_data": {"road_traffic_deaths_per_100k": None}}
+        law = {"world_bank_governance": "unavailable"}
+
+        scores = score_all(columns_from_tool_results([crime], [infra], [law]))
+
+        self.assertEqual(scores["crime"][0], calculate_safety_score(crime))
+        self.assertEqual(scores["infrastructure"][0], calculate_infrastructure_score(infra))
+        self.assertEqual(scores["law_enforcement"][0], calculate_law_enforcement_score(law))
+
+    def test_columnar_input(self):
+        """列形式の入力から直接計算できること（欠損は NaN）"""
+        scores = score_crime(
+            safety_index=np.array([80.0, np.nan, np.nan]),
+            peace_score=np.array([1.5, 2.0, np.nan]),
+            homicide_rate=np.array([0.5, np.nan, np.nan]),
+        )
+
+        self.assertEqual(scores.tolist(), [81.7, 60.0, 50.0])
+
+    def test_column_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            score_all({"safety_index": [1.0, 2.0], "cpi_score": [50.0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.adk.runners import InMemoryRunner
+from sse_starlette.sse import AppStatus
+
+from safety_score_agent.fixtures.agents import build_pipeline, collect
+from safety_score_agent.streaming import add_streaming_routes
+
+
+class TestStreamReport(unittest.TestCase):
+    """ストリーミング配信ジェネレーターのテスト"""
+
+    def test_sections_are_sent_in_completion_order(self):
+        """セクションが各ブランチの完了順に配信され、その後トークンが続くこと"""
+        events = collect(InMemoryRunner(agent=build_pipeline(), app_name="test"))
+
+        kinds = [kind for kind, _ in events]
+        self.assertEqual(kinds[:4], ["section"] * 4)
+        self.assertEqual(
+            [data["key"] for _, data in events[:4]],
+            ["crime_info", "infra_info", "conflict_info", "law_info"],
+        )
+        self.assertEqual(events[0][1]["label"], "犯罪・治安")
+        self.assertEqual(kinds[4:], ["token", "token", "token", "report", "done"])
+        self.assertEqual(events[-2][1]["text"], "## 総合評価レポート")
+
+    def test_unavailable_section_is_flagged(self):
+        """締め切りを過ぎたセクションが unavailable として配信されること"""
+        runner = InMemoryRunner(agent=build_pipeline(deadline=0.15), app_name="test")
+        events = collect(runner)
+
+        sections = {data["key"]: data for kind, data in events if kind == "section"}
+        self.assertFalse(sections["crime_info"]["unavailable"])
+        self.assertTrue(sections["law_info"]["unavailable"])
+        self.assertTrue(sections["conflict_info"]["unavailable"])
+        self.assertEqual(events[-1][0], "done")
+
+    def test_non_streaming_report_is_sent_as_single_token(self):
+        """部分イベントがない場合は全文が1トークンとして配信されること"""
+        pipeline = build_pipeline()
+        pipeline.sub_agents[1].stream = False
+        runner = InMemoryRunner(agent=pipeline, app_name="test")
+
+        events = collect(runner)
+
+        self.assertEqual([kind for kind, _ in events][4:], ["token", "report", "done"])
+        self.assertEqual(events[4][1]["text"], "## 総合評価レポート")
+        self.assertEqual(events[4][1]["text"], events[5][1]["text"])
+
+
+class TestStreamingRoutes(unittest.TestCase):
+    """評価エンドポイントのテスト"""
+
+    def setUp(self):
+        # sse-starlette はイベントループごとに終了イベントを作り直す必要がある
+        AppStatus.should_exit_event = None
+        app = FastAPI()
+        add_streaming_routes(app, InMemoryRunner(agent=build_pipeline(), app_name="test"),
+                             report_author="Synthesizer")
+        self.client = TestClient(app)
+
+    def test_evaluate_stream_endpoint(self):
+        """SSE エンドポイントがセクション・トークン・終了イベントを配信すること"""
+        with self.client.stream("GET", "/evaluate/stream", params={"country": "Japan"}) as response:
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+            body = "".join(response.iter_text())
+
+        event_names = [line.split(":", 1)[1].strip() for line in body.splitlines()
+                       if line.startswith("event:")]
+        self.assertEqual(event_names.count("section"), 4)
+        self.assertIn("token", event_names)
+        self.assertEqual(event_names[-1], "done")
+
+    def test_evaluate_endpoint(self):
+        """非ストリーミングのエンドポイントが全セクションとレポートを返すこと"""
+        response = self.client.get("/evaluate", params={"country": "Japan"})
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(len(result["sections"]), 4)
+        self.assertEqual(result["report"], "## 総合評価レポート")
+        self.assertIsNone(result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
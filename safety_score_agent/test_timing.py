@@ -0,0 +1,106 @@
+import unittest
+
+from google.adk.runners import InMemoryRunner
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from safety_score_agent import timing
+from safety_score_agent.fixtures.agents import build_pipeline, collect
+from safety_score_agent.timing import build_report, format_report
+
+MS = 1_000_000
+
+
+class SpanBuilder:
+    """開始・終了時刻（ミリ秒）を指定してスパンを作成する"""
+
+    def __init__(self):
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        self.tracer = provider.get_tracer("test")
+
+    def span(self, name, start, end, parent=None, **attributes):
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        span = self.tracer.start_span(name, context=context, start_time=start * MS, attributes=attributes)
+        span.end(end_time=end * MS)
+        return span
+
+
+class TestBuildReport(unittest.TestCase):
+    """所要時間の内訳のテスト"""
+
+    def setUp(self):
+        builder = SpanBuilder()
+        span = builder.span
+        root = span("evaluation", 0, 1000)
+        gatherer = span("agent_run [gatherer]", 0, 600, root)
+        crime = span("agent_run [CrimeAgent]", 0, 200, gatherer)
+        source = span("source.numbeo", 10, 190, crime, **{"safety_score.fallback_used": True})
+        span("http.request", 10, 150, source)
+        span("parse", 150, 170, source)
+        span("extract.numbeo", 170, 180, source)
+        law = span("agent_run [LawEnforcementAgent]", 0, 600, gatherer)
+        span("call_llm", 0, 100, law)
+        span("source.wgi", 100, 500, law)
+        span("call_llm", 500, 600, law)
+        synthesizer = span("agent_run [SafetyScoreSynthesizer]", 600, 1000, root)
+        span("score.crime", 600, 605, synthesizer)
+        span("call_llm", 605, 1000, synthesizer)
+        self.report = build_report(builder.exporter.get_finished_spans())
+
+    def test_breakdown(self):
+        report = self.report
+        self.assertAlmostEqual(report["total_seconds"], 1.0)
+        self.assertAlmostEqual(report["agents"]["CrimeAgent"], 0.2)
+        self.assertAlmostEqual(report["agents"]["SafetyScoreSynthesizer"], 0.4)
+
+        numbeo = report["sources"][0]
+        self.assertEqual((numbeo["source"], numbeo["agent"], numbeo["fallback"]), ("numbeo", "CrimeAgent", True))
+        self.assertAlmostEqual(numbeo["http_seconds"], 0.14)
+        self.assertAlmostEqual(numbeo["parse_seconds"], 0.02)
+        self.assertAlmostEqual(numbeo["extract_seconds"], 0.01)
+        self.assertAlmostEqual(report["scoring"]["crime"], 0.005)
+        self.assertEqual([call["agent"] for call in report["llm_calls"]],
+                         ["LawEnforcementAgent", "LawEnforcementAgent", "SafetyScoreSynthesizer"])
+
+    def test_critical_path_follows_slowest_parallel_branch(self):
+        names = [step["name"] for step in self.report["critical_path"]]
+        self.assertEqual(names, [
+            "evaluation", "agent_run [gatherer]", "agent_run [LawEnforcementAgent]",
+            "call_llm", "source.wgi", "call_llm",
+            "agent_run [SafetyScoreSynthesizer]", "score.crime", "call_llm",
+        ])
+        self.assertNotIn("agent_run [CrimeAgent]", names)
+
+    def test_format_report(self):
+        table = format_report(self.report)
+        self.assertIn("total: 1.000s", table)
+        self.assertIn("numbeo", table)
+        self.assertIn("critical path:", table)
+
+    def test_empty(self):
+        self.assertEqual(build_report([])["critical_path"], [])
+
+
+class TestEvaluationTiming(unittest.TestCase):
+    """配信結果に付く内訳のテスト"""
+
+    def setUp(self):
+        timing.install()
+
+    def test_done_event_carries_timing(self):
+        events = collect(InMemoryRunner(agent=build_pipeline(), app_name="test"))
+
+        timing = events[-1][1]["timing"]
+        self.assertGreaterEqual(timing["agents"]["LawAgent"], 0.3)
+        names = [step["name"] for step in timing["critical_path"]]
+        self.assertIn("agent_run [LawAgent]", names)
+        self.assertNotIn("agent_run [CrimeAgent]", names)
+        self.assertEqual(names[0], "evaluation")
+
+
+if __name__ == "__main__":
+    unittest.main()
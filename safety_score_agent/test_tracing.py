@@ -0,0 +1,100 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import requests
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from safety_score_agent import tracing
+from safety_score_agent.net import limits
+from safety_score_agent.net.limits import HostGovernor
+from safety_score_agent.sub_agents.crime_agent import tool as crime_tool
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        tracing.set_tracer_provider(provider)
+        self.addCleanup(tracing.set_tracer_provider, None)
+
+    def spans(self):
+        return {span.name: span for span in self.exporter.get_finished_spans()}
+
+
+class TestTraced(TracingTestCase):
+    """スパンを記録するデコレーターのテスト"""
+
+    def test_fallback_marks_calling_span(self):
+        @tracing.traced("fallback.test", fallback=True)
+        def fallback(country):
+            return {}
+
+        @tracing.traced("source.test")
+        def source(soup, country):
+            return fallback(country)
+
+        source(None, "Japan")
+
+        spans = self.spans()
+        self.assertEqual(spans["source.test"].attributes["safety_score.country"], "Japan")
+        self.assertTrue(spans["source.test"].attributes["safety_score.fallback_used"])
+        self.assertEqual(spans["fallback.test"].parent.span_id, spans["source.test"].context.span_id)
+
+    def test_tool_source_spans(self):
+        """ソースの取得・解析・抽出・フォールバックが1つのトレースに記録されること"""
+        response = Mock(content=b"<html><body>no data</body></html>", status_code=200)
+        with patch.object(crime_tool.requests, "get", return_value=response), \
+                patch.object(crime_tool, "extract_gpi_data", tracing.traced("extract.gpi")(lambda soup, country: {})):
+            crime_tool.get_global_peace_index_data("Japan")
+
+        spans = self.spans()
+        self.assertEqual(set(spans), {"source.gpi", "parse", "extract.gpi", "fallback.gpi"})
+        self.assertEqual(spans["parse"].attributes["http.response.body.size"], len(response.content))
+        self.assertTrue(spans["source.gpi"].attributes["safety_score.fallback_used"])
+        self.assertEqual({span.context.trace_id for span in spans.values()}, {spans["source.gpi"].context.trace_id})
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "5")
+        self.end_headers()
+        self.wfile.write(b"hello")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpSpans(TracingTestCase):
+    """HTTP リクエストのスパンのテスト"""
+
+    def test_request_response_download_spans(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        limits.set_governor(HostGovernor({"127.0.0.1": limits.UNLIMITED}))
+        self.addCleanup(limits.set_governor, None)
+        limits.install()
+        url = f"http://127.0.0.1:{server.server_address[1]}/page"
+
+        with tracing.span("source.test"):
+            requests.get(url, timeout=5)
+
+        spans = self.spans()
+        request = spans["http.request"]
+        self.assertEqual(request.attributes["http.url"], url)
+        self.assertEqual(request.attributes["http.response.status_code"], 200)
+        self.assertEqual(request.attributes["http.response.body.size"], 5)
+        self.assertEqual(request.parent.span_id, spans["source.test"].context.span_id)
+        for child in ("http.response", "http.download"):
+            self.assertEqual(spans[child].parent.span_id, request.context.span_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from safety_score_agent.work_queue import WorkQueue, _filesystem_type, run_worker
+
+COUNTRIES = [f"Country {index:02d}" for index in range(24)]
+
+
+def fake_evaluate(country):
+    """ワーカープロセスで実行するテスト用の評価関数（Country 03 は常に失敗する）"""
+    if country == "Country 03":
+        raise RuntimeError("fetch failed")
+    time.sleep(0.02)
+    return {"country": country, "pid": os.getpid()}
+
+
+def worker_process(path, worker_id):
+    run_worker(path, worker_id=worker_id, evaluate=fake_evaluate, poll_seconds=0.05)
+
+
+class TestWorkQueue(unittest.TestCase):
+    """ジョブキューのテスト"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "queue.sqlite3")
+        self.queue = WorkQueue(self.path, lease_seconds=60)
+        self.addCleanup(self.queue.close)
+
+    def test_enqueue_is_idempotent(self):
+        self.assertEqual(self.queue.enqueue(["Japan", "France"]), 2)
+        self.assertEqual(self.queue.enqueue(["Japan", "Kenya"]), 1)
+        self.assertEqual(self.queue.enqueue(["Japan"], run="other"), 1)
+        self.assertEqual(self.queue.stats()["pending"], 3)
+
+    def test_multiple_processes_process_each_job_once(self):
+        """複数のワーカープロセスで全ジョブが1回ずつ処理され、結果が共有テーブルに入ること"""
+        self.queue.enqueue(COUNTRIES, max_attempts=2)
+        processes = [
+            multiprocessing.Process(target=worker_process, args=(self.path, f"worker-{index}"))
+            for index in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+        results = self.queue.results()
+        self.assertEqual(sorted(record["country"] for record in results),
+                         [country for country in COUNTRIES if country != "Country 03"])
+        self.assertGreater(len({record["worker"] for record in results}), 1)
+        self.assertEqual(self.queue.stats(), {"pending": 0, "leased": 0, "done": 23, "failed": 1})
+        self.assertEqual(self.queue.failures(),
+                         [{"country": "Country 03", "attempts": 2, "last_error": "RuntimeError: fetch failed"}])
+
+    def test_expired_lease_is_reclaimed(self):
+        """ハートビートが途絶えたジョブは期限切れ後に他のワーカーが取り直すこと"""
+        queue = WorkQueue(self.path, lease_seconds=0.1)
+        self.addCleanup(queue.close)
+        queue.enqueue(["Japan"])
+
+        stalled = queue.claim("stalled")
+        self.assertIsNone(queue.claim("other"))
+        time.sleep(0.15)
+        job = queue.claim("other")
+
+        self.assertEqual((job.country, job.attempts), ("Japan", 2))
+        self.assertFalse(queue.heartbeat(stalled, "stalled"))
+        self.assertFalse(queue.complete(stalled, "stalled", {"country": "Japan"}))
+        self.assertTrue(queue.complete(job, "other", {"country": "Japan"}))
+        self.assertEqual(queue.results()[0]["worker"], "other")
+
+    def test_heartbeat_extends_lease(self):
+        queue = WorkQueue(self.path, lease_seconds=0.2)
+        self.addCleanup(queue.close)
+        queue.enqueue(["Japan"])
+        job = queue.claim("worker")
+
+        for _ in range(3):
+            time.sleep(0.1)
+            self.assertTrue(queue.heartbeat(job, "worker"))
+        self.assertIsNone(queue.claim("other"))
+
+    def test_lease_expired_after_last_attempt_fails_job(self):
+        queue = WorkQueue(self.path, lease_seconds=0.05)
+        self.addCleanup(queue.close)
+        queue.enqueue(["Japan"], max_attempts=1)
+        queue.claim("stalled")
+        time.sleep(0.1)
+
+        self.assertIsNone(queue.claim("other"))
+        self.assertEqual(queue.stats()["failed"], 1)
+
+    def test_wal_mode(self):
+        self.assertEqual(self.queue._conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_delete_mode_from_environment(self):
+        path = os.path.join(self.tmp.name, "shared.sqlite3")
+        with patch.dict(os.environ, {"SAFETY_SCORE_QUEUE_JOURNAL_MODE": "delete"}):
+            queue = WorkQueue(path)
+        self.addCleanup(queue.close)
+        self.assertEqual(queue._conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+
+    def test_wal_is_refused_on_network_filesystem(self):
+        """ネットワークファイルシステム上では wal を使わず、delete なら作成できること"""
+        path = os.path.join(self.tmp.name, "nfs", "queue.sqlite3")
+        with patch("safety_score_agent.work_queue._filesystem_type", return_value="nfs4"):
+            with self.assertRaises(ValueError):
+                WorkQueue(path, journal_mode="wal")
+            queue = WorkQueue(path, journal_mode="delete")
+        queue.close()
+
+    def test_filesystem_type_uses_longest_mount_point(self):
+        mounts = os.path.join(self.tmp.name, "mounts")
+        with open(mounts, "w", encoding="utf-8") as f:
+            f.write("/dev/sda1 / ext4 rw 0 0\n"
+                    "server:/export /mnt/shared\\040queue nfs4 rw 0 0\n")
+        self.assertEqual(_filesystem_type("/mnt/shared queue/db.sqlite3", mounts), "nfs4")
+        self.assertEqual(_filesystem_type("/mnt/shared", mounts), "ext4")
+        self.assertIsNone(_filesystem_type("/", os.path.join(self.tmp.name, "missing")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+"""1回の評価の所要時間の内訳
+
+評価パイプライン（ADK の invocation / agent_run / call_llm / execute_tool スパン）と
+ツール層（tracing.py の source.* / http.* / parse / extract.* / score.* スパン）のスパンを
+評価ごとに集め、次の内訳をまとめる。
+
+- agents: エージェントごとの実行時間（専門エージェントと統合エージェント）
+- sources: データソースごとの取得時間と、そのうちの HTTP・解析・抽出の時間、フォールバックの有無
+- scoring: スコア計算関数ごとの時間
+- llm_calls: エージェントごとのモデル呼び出しの時間
+- critical_path: 評価全体の時間を決めたスパンの連鎖（ParallelAgent では最後に終わった
+  専門エージェントを通る）
+
+スパンは OpenTelemetry SDK のスパンプロセッサー（TimingCollector）で集める。プロセッサーの
+トレーサープロバイダーへの登録は install() で行い、配信用アプリの作成（server.create_app）で
+明示的に呼ぶ（登録前の評価の内訳は空になる）。streaming.stream_report が評価ごとに結果に付け、
+SAFETY_SCORE_TIMING_TABLE を有効にすると format_report の表をログに出力する。
+"""
+
+import collections
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+
+from . import tracing
+
+AGENT_SPAN_PREFIX = "agent_run ["
+
+
+def _seconds(span: ReadableSpan) -> float:
+    return (span.end_time - span.start_time) / 1e9
+
+
+def _agent_name(span: ReadableSpan) -> Optional[str]:
+    if span.name.startswith(AGENT_SPAN_PREFIX) and span.name.endswith("]"):
+        return span.name[len(AGENT_SPAN_PREFIX):-1]
+    return None
+
+
+class TimingCollector(SpanProcessor):
+    """監視中のトレースの終了したスパンを集めるスパンプロセッサー"""
+
+    def __init__(self):
+        self._traces: Dict[int, List[ReadableSpan]] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, trace_id: int) -> None:
+        with self._lock:
+            self._traces.setdefault(trace_id, [])
+
+    def pop(self, trace_id: int) -> List[ReadableSpan]:
+        with self._lock:
+            return self._traces.pop(trace_id, [])
+
+    def on_end(self, span: ReadableSpan) -> None:
+        with self._lock:
+            spans = self._traces.get(span.context.trace_id)
+            if spans is not None:
+                spans.append(span)
+
+
+_collector = TimingCollector()
+_install_lock = threading.Lock()
+_installed = False
+
+
+def get_collector() -> TimingCollector:
+    """プロセス共通の TimingCollector（install() で登録するまではスパンを受け取らない）"""
+    return _collector
+
+
+def install() -> None:
+    """
+    プロセス共通の TimingCollector をトレーサープロバイダーに登録する
+
+    SDK のプロバイダーが未設定の場合は作成してグローバルに設定する（ADK の配信用アプリは
+    作成時に設定済み）。何度呼んでも1回だけ登録する。
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider()
+            trace.set_tracer_provider(provider)
+        provider.add_span_processor(_collector)
+
+
+class Evaluation:
+    """measure() が返す評価の記録（終了後に report に内訳が入る）"""
+
+    def __init__(self):
+        self.report: Optional[Dict[str, Any]] = None
+
+
+@contextmanager
+def measure(country: Optional[str] = None) -> Iterator[Evaluation]:
+    """
+    with ブロック内の評価のスパンを集め、終了時に内訳を作成する
+
+    Args:
+        country: 評価対象の国名（スパンの属性に付ける）
+    """
+    collector = get_collector()
+    evaluation = Evaluation()
+    with tracing.span("evaluation", **{"safety_score.country": country}) as root:
+        trace_id = root.get_span_context().trace_id
+        collector.watch(trace_id)
+        try:
+            yield evaluation
+        except BaseException:
+            collector.pop(trace_id)
+            raise
+    evaluation.report = build_report(collector.pop(trace_id))
+
+
+def build_report(spans: List[ReadableSpan]) -> Dict[str, Any]:
+    """スパンの一覧から所要時間の内訳を作成"""
+    spans = [span for span in spans if span.end_time is not None]
+    if not spans:
+        return {"total_seconds": 0.0, "agents": {}, "sources": [], "scoring": {}, "llm_calls": [],
+                "critical_path": []}
+    by_id = {span.context.span_id: span for span in spans}
+    children: Dict[int, List[ReadableSpan]] = collections.defaultdict(list)
+    for span in spans:
+        if span.parent is not None and span.parent.span_id in by_id:
+            children[span.parent.span_id].append(span)
+    roots = [span for span in spans if span.parent is None or span.parent.span_id not in by_id]
+    root = min(roots, key=lambda span: span.start_time)
+
+    def ancestor_agent(span: ReadableSpan) -> Optional[str]:
+        while span.parent is not None and span.parent.span_id in by_id:
+            span = by_id[span.parent.span_id]
+            name = _agent_name(span)
+            if name is not None:
+                return name
+        return None
+
+    def descendants(span: ReadableSpan) -> Iterator[ReadableSpan]:
+        for child in children[span.context.span_id]:
+            yield child
+            yield from descendants(child)
+
+    agents: Dict[str, float] = collections.defaultdict(float)
+    scoring: Dict[str, float] = collections.defaultdict(float)
+    sources, llm_calls = [], []
+    for span in sorted(spans, key=lambda span: span.start_time):
+        name = _agent_name(span)
+        if name is not None:
+            agents[name] += _seconds(span)
+        elif span.name.startswith("source."):
+            breakdown = collections.defaultdict(float)
+            for child in descendants(span):
+                step = child.name.split(".", 1)[0] if child.name.startswith("extract.") else child.name
+                if step in ("http.request", "parse", "extract"):
+                    breakdown[step] += _seconds(child)
+            sources.append({
+                "source": span.name[len("source."):],
+                "agent": ancestor_agent(span),
+                "seconds": _seconds(span),
+                "http_seconds": breakdown["http.request"],
+                "parse_seconds": breakdown["parse"],
+                "extract_seconds": breakdown["extract"],
+                "fallback": bool(span.attributes.get("safety_score.fallback_used", False)),
+            })
+        elif span.name.startswith("score."):
+            scoring[span.name[len("score."):]] += _seconds(span)
+        elif span.name == "call_llm":
+            llm_calls.append({"agent": ancestor_agent(span), "seconds": _seconds(span)})
+
+    return {
+        "total_seconds": _seconds(root),
+        "agents": dict(agents),
+        "sources": sources,
+        "scoring": dict(scoring),
+        "llm_calls": llm_calls,
+        "critical_path": critical_path(root, children),
+    }
+
+
+def critical_path(root: ReadableSpan, children: Dict[int, List[ReadableSpan]]) -> List[Dict[str, Any]]:
+    """
+    root の終了時刻を決めたスパンの連鎖
+
+    終了時刻から遡り、その時点で実行中だった子スパンのうち最後に終わったものを選び、
+    その開始時刻からさらに遡る（並列に実行された子スパンのうち待たされた側だけが残る）。
+    """
+    path: List[Dict[str, Any]] = []
+
+    def walk(span: ReadableSpan, depth: int) -> None:
+        path.append({"name": span.name, "seconds": _seconds(span), "depth": depth,
+                     "offset_seconds": (span.start_time - root.start_time) / 1e9})
+        cursor = span.end_time
+        chain = []
+        for child in sorted(children[span.context.span_id], key=lambda child: child.end_time, reverse=True):
+            if child.end_time <= cursor:
+                chain.append(child)
+                cursor = child.start_time
+        for child in reversed(chain):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return path
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """内訳を表形式の文字列にする"""
+    lines = [f"total: {report['total_seconds']:.3f}s"]
+    if report["agents"]:
+        lines.append(f"{'agent':<32}{'seconds':>10}")
+        for name, seconds in sorted(report["agents"].items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<32}{seconds:>10.3f}")
+    if report["sources"]:
+        lines.append(f"{'source':<24}{'agent':<22}{'total':>8}{'http':>8}{'parse':>8}{'extract':>8}  fallback")
+        for source in report["sources"]:
+            lines.append(
+                f"{source['source']:<24}{source['agent'] or '-':<22}"
+                + "".join(f"{source[key]:>8.3f}" for key in ("seconds", "http_seconds", "parse_seconds",
+                                                             "extract_seconds"))
+                + ("  yes" if source["fallback"] else "")
+            )
+    if report["scoring"]:
+        lines.append(f"{'score':<32}{'seconds':>10}")
+        for name, seconds in report["scoring"].items():
+            lines.append(f"{name:<32}{seconds:>10.3f}")
+    if report["llm_calls"]:
+        lines.append(f"{'llm call':<32}{'seconds':>10}")
+        for call in report["llm_calls"]:
+            lines.append(f"{call['agent'] or '-':<32}{call['seconds']:>10.3f}")
+    if report["critical_path"]:
+        lines.append("critical path:")
+        for step in report["critical_path"]:
+            lines.append(f"{'  ' * step['depth']}{step['name']}  {step['seconds']:.3f}s (+{step['offset_seconds']:.3f}s)")
+    return "\n".join(lines)
@@ -0,0 +1,102 @@
+"""ツール層の OpenTelemetry トレース
+
+google-adk に含まれる opentelemetry-sdk のトレーサーで、ツールモジュールの処理を
+次のスパンとして記録する（1回の評価の時間がどこで使われたかを1つのトレースで確認できる）。
+
+- source.<ソース名>: データソースごとの取得処理（フォールバックを使った場合は
+  safety_score.fallback_used 属性が付く）
+- http.request / http.response / http.download: HTTP リクエスト全体、接続〜応答ヘッダーまで
+  （名前解決・接続を含む）、本文の受信（net/limits.py が記録）
+- http.cache: ページキャッシュの参照（page_cache.py が記録）
+- parse: HTML の解析
+- extract.<ソース名>: 解析済み HTML からの値の抽出
+- fallback.<ソース名>: フォールバック値の生成
+- score.<カテゴリ>: スコアの計算
+
+スパンの所要時間とフォールバックの回数は metrics.py にも集計する。
+トレーサープロバイダーはアプリケーション側（adk web --trace_to_cloud など）の設定を使い、
+未設定の場合はスパンは記録されない（オーバーヘッドはほぼない）。
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from opentelemetry import trace
+
+from . import metrics
+
+TRACER_NAME = "safety_score_agent"
+
+_provider: Optional[trace.TracerProvider] = None
+
+
+def get_tracer() -> trace.Tracer:
+    """ツール層のトレーサー"""
+    provider = _provider if _provider is not None else trace.get_tracer_provider()
+    return provider.get_tracer(TRACER_NAME)
+
+
+def set_tracer_provider(provider: Optional[trace.TracerProvider]) -> None:
+    """ツール層で使うトレーサープロバイダーを置き換える（None でグローバルの設定に戻す）"""
+    global _provider
+    _provider = provider
+
+
+def _attributes(attributes: dict) -> dict:
+    # OpenTelemetry の属性は None を受け付けないため除く
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """
+    スパンを開始して現在のスパンにする
+
+    属性名はキーワード引数で渡す（"." を含む名前は **{"http.url": url} のように渡す）。
+    """
+    started = time.perf_counter()
+    try:
+        with get_tracer().start_as_current_span(name, attributes=_attributes(attributes)) as current:
+            yield current
+    finally:
+        metrics.span_duration.observe(time.perf_counter() - started, span=name)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """現在のスパンに属性を追加"""
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes(_attributes(attributes))
+
+
+def traced(name: str, fallback: bool = False) -> Callable[[Callable], Callable]:
+    """
+    関数の実行をスパンとして記録するデコレーター
+
+    Args:
+        name: スパン名
+        fallback: フォールバック値を返す関数の場合 True。呼び出し元のスパンに
+            safety_score.fallback_used 属性を付ける
+    """
+    def decorator(func: Callable) -> Callable:
+        # 国名の引数（country / country_name）の位置
+        parameters = list(inspect.signature(func).parameters)
+        country_arg = next((arg for arg in ("country", "country_name") if arg in parameters), None)
+        country_index = parameters.index(country_arg) if country_arg else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if fallback:
+                set_attributes(**{"safety_score.fallback_used": True})
+                metrics.fallbacks.inc(source=name.split(".", 1)[-1])
+            country = None
+            if country_arg is not None:
+                country = kwargs.get(country_arg, args[country_index] if country_index < len(args) else None)
+            with span(name, **{"code.function": func.__name__,
+                               "safety_score.country": country if isinstance(country, str) else None}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,473 @@
+"""SQLite を使ったジョブキュー
+
+夜間のバッチ評価を多数のワーカープロセスに分散するため、国ごとのジョブを SQLite
+データベースに登録し、各ワーカーがリース方式で取り出してツール層を実行する。
+結果は同じデータベースの results テーブルに保存される。外部のメッセージブローカーは使わない。
+
+- リース: ワーカーはジョブを lease_seconds の期限付きで確保し、実行中は
+  ハートビートで期限を延長する。ワーカーが停止して期限が切れたジョブは
+  他のワーカーが取り直す。
+- リトライ: 失敗またはリース切れのジョブは attempts が max_attempts に達するまで
+  再実行され、達した場合は failed になる。
+- 確保は BEGIN IMMEDIATE のトランザクションで行うため、同じジョブを
+  2つのワーカーが同時に確保することはない。
+
+使い方:
+    python -m safety_score_agent queue --run 2024-06-11 enqueue --region asia
+    python -m safety_score_agent queue --run 2024-06-11 work --workers 4
+    python -m safety_score_agent queue --run 2024-06-11 status
+    python -m safety_score_agent queue --run 2024-06-11 results -o scores.jsonl
+
+データベースは --db（省略時は SAFETY_SCORE_DATA_DIR/work_queue.sqlite3）で指定する。
+
+ジャーナルモードは --journal-mode または SAFETY_SCORE_QUEUE_JOURNAL_MODE で指定する。
+既定の wal はデータベースと同じマシンのプロセス間でしか使えない（WAL のインデックスは
+共有メモリに置かれ、NFS / SMB などのネットワークファイルシステムでは壊れる）ため、
+ネットワークファイルシステム上のパスでは WorkQueue の作成をエラーにする。複数のマシンの
+ワーカーで共有する場合は delete を指定する。この場合はネットワークファイルシステムの
+ファイルロックに依存し、書き込みはデータベース全体のロックで直列化されるため、
+ワーカー数を増やしても確保・完了の処理は並列にならない。
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from . import config
+from .countries import get_country
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILENAME = "work_queue.sqlite3"
+DEFAULT_RUN = "default"
+DEFAULT_LEASE_SECONDS = 120.0
+DEFAULT_MAX_ATTEMPTS = 3
+STATES = ("pending", "leased", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run TEXT NOT NULL,
+    country TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (run, country)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (run, state, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    run TEXT NOT NULL,
+    country TEXT NOT NULL,
+    record TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (run, country)
+);
+"""
+
+
+class Job(NamedTuple):
+    """確保したジョブ"""
+    id: int
+    run: str
+    country: str
+    attempts: int
+
+
+# WAL を使えないネットワークファイルシステム（/proc/mounts のファイルシステム名）
+NETWORK_FILESYSTEMS = ("nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs",
+                       "lustre", "fuse.sshfs", "fuse.glusterfs", "fuse.cephfs")
+
+
+def _filesystem_type(path: str, mounts_path: str = "/proc/mounts") -> Optional[str]:
+    """path を含むマウントのファイルシステム名（/proc/mounts がない環境では None）"""
+    path = os.path.realpath(path)
+    try:
+        with open(mounts_path, encoding="utf-8") as f:
+            mounts = [line.split() for line in f]
+    except OSError:
+        return None
+    best, fstype = "", None
+    for fields in mounts:
+        if len(fields) < 3:
+            continue
+        # マウントポイントの空白などは 8 進数でエスケープされている
+        mount_point = fields[1].encode("latin-1").decode("unicode_escape")
+        inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+        if inside and len(mount_point) >= len(best):
+            best, fstype = mount_point, fields[2]
+    return fstype
+
+
+def is_network_filesystem(path: str) -> bool:
+    """path がネットワークファイルシステム上にあるか"""
+    fstype = _filesystem_type(path)
+    return fstype is not None and fstype.lower() in NETWORK_FILESYSTEMS
+
+
+def default_worker_id() -> str:
+    """ノード名とプロセス ID からなるワーカー ID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """国ごとのジョブキュー"""
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                 journal_mode: Optional[str] = None):
+        """
+        Args:
+            path: SQLite ファイルのパス（省略時は SAFETY_SCORE_DATA_DIR/work_queue.sqlite3）
+            lease_seconds: ジョブを確保してからハートビートなしで保持できる秒数
+            journal_mode: wal または delete（省略時は SAFETY_SCORE_QUEUE_JOURNAL_MODE）
+
+        Raises:
+            ValueError: 不明なジャーナルモード、またはネットワークファイルシステム上で wal を指定した場合
+        """
+        if path is None:
+            path = os.path.join(config.get_data_dir(), QUEUE_FILENAME)
+        journal_mode = (journal_mode or config.get_queue_journal_mode()).lower()
+        if journal_mode not in config.QUEUE_JOURNAL_MODES:
+            raise ValueError(f"unknown journal mode: {journal_mode!r}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if journal_mode == "wal" and is_network_filesystem(os.path.dirname(os.path.abspath(path))):
+            raise ValueError(f"{path} is on a network filesystem where SQLite WAL is unsafe; "
+                             "use journal mode 'delete' (--journal-mode delete)")
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.journal_mode = journal_mode
+        # トランザクションは明示的に開始する（確保は BEGIN IMMEDIATE で書き込みロックを取る）
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        applied = self._conn.execute(f"PRAGMA journal_mode={journal_mode.upper()}").fetchone()[0]
+        if applied.lower() != journal_mode:
+            # 他の接続が開いている間はジャーナルモードを切り替えられない
+            logger.warning(f"Work queue {path} stays in journal mode {applied} (requested {journal_mode})")
+        # WAL では NORMAL でもコミット済みのトランザクションは壊れない（電源断で直近のものが失われうる）
+        self._conn.execute(f"PRAGMA synchronous={'NORMAL' if journal_mode == 'wal' else 'FULL'}")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _write(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(sql, tuple(params))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor
+
+    def enqueue(self, countries: Iterable[str], run: str = DEFAULT_RUN,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """
+        国ごとのジョブを登録（登録済みの国は無視する）
+
+        Returns:
+            int: 新たに登録したジョブ数
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = 0
+                for country in countries:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO jobs (run, country, max_attempts, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (run, country, max_attempts, now, now),
+                    )
+                    added += cursor.rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def claim(self, worker_id: str, run: str = DEFAULT_RUN) -> Optional[Job]:
+        """
+        未処理またはリース切れのジョブを1件確保
+
+        リース切れのジョブで attempts が上限に達しているものは failed にする。
+
+        Returns:
+            Optional[Job]: 確保したジョブ（なければ None）
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'failed', lease_owner = NULL, updated_at = ?, "
+                    "last_error = COALESCE(last_error, 'lease expired') "
+                    "WHERE run = ? AND state = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now, run, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id, country, attempts FROM jobs WHERE run = ? AND "
+                    "(state = 'pending' OR (state = 'leased' AND lease_expires < ?)) ORDER BY id LIMIT 1",
+                    (run, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(row["id"], run, row["country"], row["attempts"] + 1)
+
+    def heartbeat(self, job: Job, worker_id: str) -> bool:
+        """リースの期限を延長（リースを失っていた場合は False）"""
+        now = time.time()
+        cursor = self._write(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (now + self.lease_seconds, now, job.id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job: Job, worker_id: str, record: Dict[str, Any]) -> bool:
+        """
+        ジョブの完了と結果を記録
+
+        Returns:
+            bool: 記録した場合 True（リースを失っていて他のワーカーが処理中・処理済みの場合は False）
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET state = 'done', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                    "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+                    (now, job.id, worker_id),
+                )
+                if cursor.rowcount == 1:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                        (job.run, job.country, json.dumps(record, ensure_ascii=False), worker_id, now),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount == 1
+
+    def fail(self, job: Job, worker_id: str, error: str) -> None:
+        """ジョブの失敗を記録（上限に達していなければ再実行待ちに戻す）"""
+        now = time.time()
+        self._write(
+            "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (error, now, job.id, worker_id),
+        )
+
+    def stats(self, run: str = DEFAULT_RUN) -> Dict[str, int]:
+        """状態ごとのジョブ数"""
+        counts = dict.fromkeys(STATES, 0)
+        for state, count in self._conn.execute(
+            "SELECT state, COUNT(*) FROM jobs WHERE run = ? GROUP BY state", (run,)
+        ):
+            counts[state] = count
+        return counts
+
+    def results(self, run: str = DEFAULT_RUN) -> List[Dict[str, Any]]:
+        """完了したジョブの結果（worker に処理したワーカー ID を含む）"""
+        rows = self._conn.execute(
+            "SELECT record, worker FROM results WHERE run = ? ORDER BY finished_at", (run,)
+        ).fetchall()
+        return [{**json.loads(row["record"]), "worker": row["worker"]} for row in rows]
+
+    def failures(self, run: str = DEFAULT_RUN) -> List[Dict[str, Any]]:
+        """失敗したジョブ（国名・試行回数・最後のエラー）"""
+        rows = self._conn.execute(
+            "SELECT country, attempts, last_error FROM jobs WHERE run = ? AND state = 'failed' ORDER BY id", (run,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def _evaluate_job(country_name: str) -> Dict[str, Any]:
+    """ジョブの国名でツール層を実行"""
+    from .batch import evaluate_country
+
+    country = get_country(country_name)
+    if country is None:
+        raise ValueError(f"Unknown country: {country_name}")
+    return evaluate_country(country)
+
+
+def run_worker(
+    path: str,
+    run: str = DEFAULT_RUN,
+    worker_id: Optional[str] = None,
+    evaluate: Callable[[str], Dict[str, Any]] = _evaluate_job,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    heartbeat_seconds: Optional[float] = None,
+    poll_seconds: float = 1.0,
+    exit_when_idle: bool = True,
+    journal_mode: Optional[str] = None,
+) -> int:
+    """
+    キューからジョブを取り出して実行するワーカー
+
+    Args:
+        path: キューの SQLite ファイル
+        run: 処理する実行名
+        worker_id: ワーカー ID（省略時はノード名とプロセス ID）
+        evaluate: 国名 → 結果の辞書を返す評価関数
+        lease_seconds: リースの期限
+        heartbeat_seconds: ハートビートの間隔（省略時はリース期限の 1/3）
+        poll_seconds: ジョブがないときの待ち時間
+        exit_when_idle: True の場合、未処理・処理中のジョブがなくなったら終了する
+        journal_mode: SQLite のジャーナルモード（WorkQueue を参照）
+
+    Returns:
+        int: このワーカーが完了したジョブ数
+    """
+    worker_id = worker_id or default_worker_id()
+    heartbeat_seconds = heartbeat_seconds or lease_seconds / 3
+    work_queue = WorkQueue(path, lease_seconds=lease_seconds, journal_mode=journal_mode)
+    completed = 0
+    try:
+        while True:
+            job = work_queue.claim(worker_id, run)
+            if job is None:
+                counts = work_queue.stats(run)
+                if exit_when_idle and counts["pending"] == 0 and counts["leased"] == 0:
+                    return completed
+                time.sleep(poll_seconds)
+                continue
+
+            stop = threading.Event()
+
+            def beat(job: Job = job) -> None:
+                while not stop.wait(heartbeat_seconds):
+                    if not work_queue.heartbeat(job, worker_id):
+                        logger.warning(f"Lease lost for {job.country} ({worker_id})")
+                        return
+
+            heartbeat = threading.Thread(target=beat, daemon=True)
+            heartbeat.start()
+            try:
+                record = evaluate(job.country)
+            except Exception as e:
+                logger.warning(f"Job failed for {job.country} (attempt {job.attempts}): {e}")
+                work_queue.fail(job, worker_id, f"{type(e).__name__}: {e}")
+            else:
+                if work_queue.complete(job, worker_id, record):
+                    completed += 1
+            finally:
+                stop.set()
+                heartbeat.join()
+    finally:
+        work_queue.close()
+
+
+def _worker_process(path: str, run: str, lease_seconds: float, shared_slots: Any,
+                    journal_mode: Optional[str] = None) -> None:
+    from .batch import _init_worker
+
+    _init_worker(shared_slots)
+    run_worker(path, run, lease_seconds=lease_seconds, journal_mode=journal_mode)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """ジョブの登録・ワーカーの起動・進捗と結果の表示"""
+    from .batch import DEFAULT_HOST_CONCURRENCY, resolve_countries
+    from .net import limits
+
+    parser = argparse.ArgumentParser(prog="safety_score_agent queue", description="バッチ評価のジョブキュー")
+    parser.add_argument("--db", help="キューの SQLite ファイル（省略時は SAFETY_SCORE_DATA_DIR/work_queue.sqlite3）")
+    parser.add_argument("--journal-mode", choices=config.QUEUE_JOURNAL_MODES,
+                        help="SQLite のジャーナルモード（複数のマシンで共有する場合は delete。"
+                             "省略時は SAFETY_SCORE_QUEUE_JOURNAL_MODE）")
+    parser.add_argument("--run", default=DEFAULT_RUN, help="実行名（夜間バッチの日付など）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = subparsers.add_parser("enqueue", help="国ごとのジョブを登録")
+    enqueue.add_argument("countries", nargs="*")
+    enqueue.add_argument("--region")
+    enqueue.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS)
+
+    work = subparsers.add_parser("work", help="このマシンでワーカーを起動")
+    work.add_argument("--workers", type=int, default=4, help="ワーカープロセス数")
+    work.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="リースの期限（秒）")
+    work.add_argument("--host-concurrency", type=int, default=DEFAULT_HOST_CONCURRENCY,
+                      help="このマシンでのサイトごとの同時接続数の上限（0 で無制限）")
+
+    subparsers.add_parser("status", help="状態ごとのジョブ数を表示")
+    results = subparsers.add_parser("results", help="結果を JSON Lines で出力")
+    results.add_argument("-o", "--output")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(config.get_data_dir(), QUEUE_FILENAME)
+    try:
+        work_queue = WorkQueue(path, journal_mode=args.journal_mode)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command == "enqueue":
+        try:
+            countries = resolve_countries(args.countries, args.region)
+        except ValueError as e:
+            parser.error(str(e))
+        added = work_queue.enqueue([country.name for country in countries], args.run, args.max_attempts)
+        print(json.dumps({"enqueued": added, **work_queue.stats(args.run)}))
+        work_queue.close()
+    elif args.command == "work":
+        logging.basicConfig(level=logging.WARNING)
+        work_queue.close()
+        shared_slots = limits.create_shared_slots(args.host_concurrency) if args.host_concurrency else None
+        started = time.perf_counter()
+        processes = [
+            multiprocessing.Process(target=_worker_process,
+                                    args=(path, args.run, args.lease, shared_slots, args.journal_mode))
+            for _ in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+        work_queue = WorkQueue(path, journal_mode=args.journal_mode)
+        print(json.dumps({"elapsed_seconds": round(elapsed, 1), **work_queue.stats(args.run)}), file=sys.stderr)
+        work_queue.close()
+    elif args.command == "status":
+        print(json.dumps(work_queue.stats(args.run)))
+        for failure in work_queue.failures(args.run):
+            print(json.dumps(failure, ensure_ascii=False))
+        work_queue.close()
+    else:
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        for record in work_queue.results(args.run):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if output is not sys.stdout:
+            output.close()
+        work_queue.close()
+
+
+if __name__ == "__main__":
+    main()